@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Benchmark de ``generate_many`` vs chamadas seriais de ``summarize``.
+
+Resume 200 transcrições contra um servidor local com ~100 ms de latência por
+resposta: primeiro uma a uma, como nos scripts de lote, depois com
+``generate_many`` em concorrência 8, 32 e 64. Com concorrência acima da
+janela do limitador adaptativo (``ADAPTA_LIMITER_MAX``), o ganho para de
+crescer: o lote respeita os limites do cliente.
+
+Uso:
+    poetry run python benchmarks/bench_batch.py
+"""
+
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+os.environ.setdefault("ADAPTA_COOKIES_STR", "bench=1")
+os.environ.setdefault("ADAPTA_RATE_API_PER_SECOND", "100000")
+os.environ.setdefault("RESPONSE_CACHE_ENABLED", "false")
+os.environ.setdefault("CONFIG_WATCH_MODE", "off")
+
+from stub_server import StubAdaptaServer, fake_session_cookie  # noqa: E402
+
+ITEMS = 200
+CONCURRENCY_LEVELS = [8, 32, 64]
+
+
+async def main() -> None:
+    os.environ["ADAPTA_COOKIES_STR"] = fake_session_cookie()
+
+    from generators.adapta import ModelGenerator
+    from generators.adapta.client import AdaptaClient
+    from utils.logger import setup_logger
+
+    setup_logger("ERROR")
+    server = await StubAdaptaServer(base_latency=0.1, tail_latency=0.02).start()
+    generator = ModelGenerator(model="Gemini")
+    generator.client = AdaptaClient(
+        cookies_str=fake_session_cookie(),
+        session_id="bench-session",
+        api_base_url=server.http1_url,
+        timeout=30.0,
+    )
+    transcripts = [f"Transcrição {i}: " + "conteúdo da aula " * 50 for i in range(ITEMS)]
+
+    start = time.perf_counter()
+    for text in transcripts:
+        await generator.summarize(text)
+    serial = time.perf_counter() - start
+    print(f"{'modo':<18} | {'tempo':>8} | {'itens/s':>8} | ganho")
+    print("-" * 50)
+    print(f"{'serial':<18} | {serial:>7.2f}s | {ITEMS / serial:>8.1f} | 1.0x")
+
+    for concurrency in CONCURRENCY_LEVELS:
+        failures = 0
+        start = time.perf_counter()
+        async for result in generator.generate_many(transcripts, task="summarize", concurrency=concurrency):
+            failures += not result.ok
+        elapsed = time.perf_counter() - start
+        label = f"generate_many({concurrency})"
+        print(f"{label:<18} | {elapsed:>7.2f}s | {ITEMS / elapsed:>8.1f} | {serial / elapsed:.1f}x"
+              + (f"  ({failures} falhas)" if failures else ""))
+
+    await generator.client.aclose()
+    await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Benchmark de HTTP/1.1 vs HTTP/2 no AdaptaClient.
+
+Dispara 10, 50 e 100 chamadas ``call_model`` simultâneas contra um servidor
+local que imita a API Adapta.one e mostra quantas conexões foram abertas e a
+latência (p50/p95/p99) em cada modo.
+
+Uso:
+    poetry run python benchmarks/bench_http2.py
+"""
+
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+os.environ.setdefault("ADAPTA_COOKIES_STR", "bench=1")
+
+from generators.adapta.client import AdaptaClient  # noqa: E402
+from generators.adapta.pool import PoolConfig, get_registry  # noqa: E402
+from utils.logger import setup_logger  # noqa: E402
+from stub_server import StubAdaptaServer, fake_session_cookie  # noqa: E402
+
+CONCURRENCY_LEVELS = [10, 50, 100]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Calcula o percentil por interpolação do vizinho mais próximo."""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+async def run_level(server: StubAdaptaServer, base_url: str, http2: bool, concurrency: int) -> str:
+    """Executa uma rodada de chamadas simultâneas e formata o resultado."""
+    registry = get_registry()
+    await registry.aclose()
+    registry.configure(PoolConfig(
+        max_connections=200,
+        max_keepalive_connections=200,
+        http2=http2,
+        http2_prior_knowledge=http2,
+    ))
+    server.stats.reset()
+
+    client = AdaptaClient(
+        cookies_str=fake_session_cookie(),
+        session_id="bench-session",
+        api_base_url=base_url,
+        timeout=30.0,
+    )
+    messages = [{"role": "user", "content": "Olá"}]
+
+    async def timed_call() -> float:
+        start = time.perf_counter()
+        result = await client.call_model(messages, "GEMINI")
+        if result is None:
+            raise RuntimeError("Chamada falhou")
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(timed_call() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    # Apaga as conversas temporárias antes de fechar o pool
+    await client.aclose()
+    await registry.aclose()
+
+    mode = "HTTP/2  " if http2 else "HTTP/1.1"
+    return (
+        f"{mode} | {concurrency:>4} | {server.stats.connections:>6} | "
+        f"{percentile(latencies, 50) * 1000:>7.1f} | {percentile(latencies, 95) * 1000:>7.1f} | "
+        f"{percentile(latencies, 99) * 1000:>7.1f} | {elapsed * 1000:>8.1f}"
+    )
+
+
+async def main() -> None:
+    setup_logger("WARNING")
+    server = await StubAdaptaServer(base_latency=0.05, tail_latency=0.05).start()
+    try:
+        print("Modo     | Conc | Conex. | p50 ms  | p95 ms  | p99 ms  | Total ms")
+        print("-" * 68)
+        for concurrency in CONCURRENCY_LEVELS:
+            for http2, url in ((False, server.http1_url), (True, server.http2_url)):
+                print(await run_level(server, url, http2, concurrency))
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Benchmark do tempo de importação dos geradores (inicialização das interfaces).
+
+Cada cenário roda em um interpretador novo com ``python -X importtime`` e
+mede o tempo cumulativo dos módulos do projeto:
+
+- ``import generators`` / ``import generators.adapta``: devem ser leves,
+  sem carregar ``httpx``, ``pydantic_settings`` nem as configurações;
+- ``import generators.registry``: o que as interfaces Streamlit importam;
+- ``registry["Gemini"]``: primeiro uso de um único gerador;
+- ``todos os geradores``: importa e instancia os dez geradores, como as
+  interfaces faziam antes do registro.
+
+Sai com código 1 se algum cenário leve passar a importar módulos pesados.
+
+Uso:
+    poetry run python benchmarks/bench_import_time.py
+"""
+
+import os
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+ROUNDS = 5
+
+# Módulos que não podem ser importados pelos cenários leves
+HEAVY_MODULES = ("httpx", "pydantic_settings", "config")
+
+SCENARIOS: List[Tuple[str, str, bool]] = [
+    ("import generators", "import generators", True),
+    ("import generators.adapta", "import generators.adapta", True),
+    ("import generators.registry", "import generators.registry", True),
+    (
+        'registry["Gemini"]',
+        "from generators.registry import GeneratorRegistry; GeneratorRegistry()['Gemini']",
+        False,
+    ),
+    (
+        "todos os geradores",
+        "from generators.registry import GeneratorRegistry; r = GeneratorRegistry(); [r[n] for n in r]",
+        False,
+    ),
+]
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def run_scenario(code: str) -> Tuple[float, int, Dict[str, int]]:
+    """Executa o código em um processo novo.
+
+    Returns:
+        Tuple: (tempo de parede em segundos, tempo total de importação em µs,
+        módulo -> tempo cumulativo em µs).
+    """
+    env = dict(os.environ, PYTHONPATH=str(SRC_DIR), ADAPTA_COOKIES_STR="bench=1", CONFIG_WATCH_MODE="off")
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=SRC_DIR.parent,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    elapsed = time.perf_counter() - start
+    modules: Dict[str, int] = {}
+    total = 0
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            modules[match.group(4)] = int(match.group(2))
+            # Só os imports de primeiro nível, para não contar submódulos duas vezes
+            if len(match.group(3)) == 1:
+                total += int(match.group(2))
+    return elapsed, total, modules
+
+
+def main() -> int:
+    failures = []
+    print(f"{'cenário':<28} | {'processo':>9} | {'imports':>9} | módulos")
+    print("-" * 66)
+    for label, code, light in SCENARIOS:
+        runs = [run_scenario(code) for _ in range(ROUNDS)]
+        elapsed = min(run[0] for run in runs)
+        _, total, modules = min(runs, key=lambda run: run[1])
+        print(f"{label:<28} | {elapsed * 1000:>7.1f}ms | {total / 1000:>7.1f}ms | {len(modules)}")
+        if light:
+            loaded = [name for name in HEAVY_MODULES if name in modules]
+            if loaded:
+                failures.append(f"{label}: importou {', '.join(loaded)}")
+
+    for failure in failures:
+        print(f"REGRESSÃO: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
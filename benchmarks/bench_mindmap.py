@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""Benchmark do motor incremental de mapas mentais OPML.
+
+Usa um modelo simulado que gera OPML a ~35 mil caracteres/s e corta cada
+resposta em ``MAX_OUTPUT`` caracteres, como o limite de tokens dos modelos
+reais. Nas continuações, o modelo às vezes abre um bloco ```xml e repete o
+fim do que já tinha escrito. Compara, para 8 transcrições:
+
+- ``prompt único``: o ``create_mindmap`` anterior (todos os textos em um
+  prompt, resposta aceita como veio);
+- ``motor (1)`` e ``motor (8)``: ``MindmapEngine`` processando 1 ou 8
+  textos ao mesmo tempo, com continuação automática e junção local.
+
+Uso:
+    poetry run python benchmarks/bench_mindmap.py
+"""
+
+import asyncio
+import os
+import re
+import sys
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+os.environ.setdefault("ADAPTA_COOKIES_STR", "bench=1")
+os.environ.setdefault("CONFIG_WATCH_MODE", "off")
+
+from generators.base import BaseContentGenerator  # noqa: E402
+from generators.mindmap import MindmapEngine  # noqa: E402
+
+TEXTS = 8
+TOPICS_PER_TEXT = 30
+MAX_OUTPUT = 6000
+CHARS_PER_SECOND = 35_000
+FIRST_CHUNK_LATENCY = 0.2
+CHUNK = 64
+
+
+def build_opml(lesson: str, topics: int) -> str:
+    """OPML que o modelo simulado "gera" para uma aula."""
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<opml version="2.0">',
+        "  <head>",
+        "    <title>[directory_name]</title>",
+        "  </head>",
+        "  <body>",
+        '    <outline text="[directory_name]">',
+    ]
+    for topic in range(topics):
+        lines.append(f'      <outline text="{lesson}, tema {topic}: automação de fluxos com agentes">')
+        for concept in range(4):
+            lines.append(f'        <outline text="Conceito {concept} do tema {topic} em {lesson}, explicado em detalhes"/>')
+        lines.append("      </outline>")
+    lines.append('      <outline text="Ferramentas Mencionadas">')
+    lines.append(f'        <outline text="n8n & webhooks, como usados em {lesson}"/>')
+    lines.append("      </outline>")
+    lines += ["    </outline>", "  </body>", "</opml>"]
+    return "\n".join(lines)
+
+
+class ScriptedGenerator(BaseContentGenerator):
+    """Gerador simulado: sem rede, com latência proporcional ao tamanho da resposta."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls = 0
+        self.generated = 0
+
+    async def preprocess_mindmap(self, texts: List[str]) -> str:
+        await asyncio.sleep(FIRST_CHUNK_LATENCY)
+        return "\n".join(texts)
+
+    async def stream_model_with_messages(self, messages: List[Dict[str, str]], searchType: Optional[str] = None, tool: Optional[str] = None, chat_id: Optional[str] = None) -> AsyncIterator[str]:
+        self.calls += 1
+        lessons = re.findall(r"Aula \d+", messages[0]["content"])
+        if len(lessons) == 1:
+            document = build_opml(lessons[0], TOPICS_PER_TEXT)
+        else:
+            document = build_opml(", ".join(lessons), TOPICS_PER_TEXT * len(lessons))
+        output = document
+        if len(messages) > 1:
+            written = messages[1]["content"].replace("&amp;", "&")
+            # Repete o fim do que já foi escrito, como os modelos costumam fazer
+            output = "```xml\n" + written[-80:] + document[len(written):]
+        output = output[:MAX_OUTPUT]
+
+        await asyncio.sleep(FIRST_CHUNK_LATENCY)
+        for start in range(0, len(output), CHUNK):
+            await asyncio.sleep(CHUNK / CHARS_PER_SECOND)
+            self.generated += CHUNK
+            yield output[start:start + CHUNK]
+
+    async def _collect(self, messages: List[Dict[str, str]]) -> str:
+        return "".join([chunk async for chunk in self.stream_model_with_messages(messages)])
+
+    async def create_mindmap(self, texts: List[str]) -> str:
+        """Implementação anterior: todos os textos em um único prompt."""
+        return await self._collect([{"role": "user", "content": self._render_prompt("mindmap", texts="\n\n".join(texts))}])
+
+    async def summarize(self, text: str) -> str:
+        raise NotImplementedError
+
+    async def diagram(self, text: str) -> str:
+        raise NotImplementedError
+
+    async def generate_content(self, prompt: str, text: str) -> str:
+        raise NotImplementedError
+
+    async def call_model_with_messages(self, messages: List[Dict[str, str]], searchType: Optional[str] = None, tool: Optional[str] = None, chat_id: Optional[str] = None) -> str:
+        return await self._collect(messages)
+
+    async def health_check(self) -> bool:
+        return True
+
+    def get_supported_models(self) -> List[str]:
+        return ["SIMULADO"]
+
+    def get_provider_name(self) -> str:
+        return "Simulado"
+
+
+def describe(document: str) -> str:
+    """Resume a validade e o tamanho do mapa gerado."""
+    try:
+        root = ET.fromstring(document.encode("utf-8"))
+    except ET.ParseError as e:
+        return f"inválido ({e.msg}), {len(document)} caracteres"
+    return f"válido, {len(root.findall('.//outline'))} outlines"
+
+
+async def main() -> None:
+    from utils.logger import setup_logger
+
+    setup_logger("ERROR")
+    texts = [f"Transcrição da Aula {number}: conteúdo sobre automação." for number in range(1, TEXTS + 1)]
+    expected = TEXTS * TOPICS_PER_TEXT * 5 + 1 + 1 + TEXTS
+    print(f"{TEXTS} textos, {MAX_OUTPUT} caracteres por resposta, {expected} outlines esperados")
+    print(f"{'modo':<14} | {'tempo':>7} | {'chamadas':>8} | {'gerado':>9} | resultado")
+    print("-" * 72)
+
+    runs = [
+        ("prompt único", lambda g: g.create_mindmap(texts)),
+        ("motor (1)", lambda g: MindmapEngine(g, concurrency=1, max_continuations=5).build(texts)),
+        (f"motor ({TEXTS})", lambda g: MindmapEngine(g, concurrency=TEXTS, max_continuations=5).build(texts)),
+    ]
+    for label, run in runs:
+        generator = ScriptedGenerator()
+        start = time.perf_counter()
+        document = await run(generator)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{label:<14} | {elapsed:>6.2f}s | {generator.calls:>8} | "
+            f"{generator.generated:>9} | {describe(document)}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
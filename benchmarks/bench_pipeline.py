@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Benchmark do pipeline ContentGen (resumo, diagrama e mapa mental).
+
+Processa uma transcrição de ~380 KB contra um servidor local cuja latência
+cresce com o tamanho da requisição (``per_kb_latency``). Compara:
+
+- ``serial``: ``summarize``, ``diagram`` e ``create_mindmap`` chamados um
+  após o outro sobre a transcrição, como faziam os chamadores;
+- ``pipeline``: ``run_pipeline``, com resumo e diagrama em paralelo e o mapa
+  mental gerado a partir do resumo;
+- ``pipeline (cache)``: a mesma execução repetida, com as etapas vindas do
+  cache de respostas.
+
+Uso:
+    poetry run python benchmarks/bench_pipeline.py
+"""
+
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+os.environ.setdefault("ADAPTA_COOKIES_STR", "bench=1")
+os.environ.setdefault("ADAPTA_RATE_API_PER_SECOND", "100000")
+os.environ.setdefault("CONFIG_WATCH_MODE", "off")
+os.environ["RESPONSE_CACHE_ENABLED"] = "true"
+os.environ["RESPONSE_CACHE_PATH"] = str(Path(tempfile.mkdtemp(prefix="bench-pipeline-")) / "responses.sqlite3")
+
+from stub_server import StubAdaptaServer, build_stream_body, fake_session_cookie  # noqa: E402
+
+PER_KB_LATENCY = 0.02
+
+WORDS = (
+    "automação fluxo agente modelo dados ferramenta integração webhook planilha cliente "
+    "processo etapa resultado exemplo configuração nó gatilho resposta mensagem API"
+).split()
+
+# Resposta do servidor local: um OPML curto, válido para todas as etapas
+RESPONSE = """<?xml version="1.0" encoding="UTF-8"?>
+<opml version="2.0">
+  <head><title>Aula</title></head>
+  <body>
+    <outline text="Aula">
+      <outline text="Automação de fluxos com agentes"/>
+      <outline text="Ferramentas Mencionadas"/>
+    </outline>
+  </body>
+</opml>"""
+
+
+def build_transcript(paragraphs: int = 400, seed: int = 7) -> str:
+    """Gera uma transcrição sintética com parágrafos e frases de tamanhos variados."""
+    rng = random.Random(seed)
+
+    def sentence() -> str:
+        return " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 28))).capitalize() + rng.choice(".!?")
+
+    return "\n\n".join(" ".join(sentence() for _ in range(rng.randint(2, 12))) for _ in range(paragraphs))
+
+
+async def main() -> None:
+    os.environ["ADAPTA_COOKIES_STR"] = fake_session_cookie()
+
+    from generators.adapta import ModelGenerator
+    from generators.adapta.client import AdaptaClient
+    from utils.logger import setup_logger
+    from utils.response_cache import cache_mode
+
+    setup_logger("ERROR")
+    server = await StubAdaptaServer(
+        base_latency=0.2, tail_latency=0.05, per_kb_latency=PER_KB_LATENCY, body=build_stream_body(RESPONSE)
+    ).start()
+    generator = ModelGenerator(model="Gemini")
+    generator.client = AdaptaClient(
+        cookies_str=fake_session_cookie(),
+        session_id="bench-session",
+        api_base_url=server.http1_url,
+        timeout=120.0,
+    )
+    transcript = build_transcript()
+
+    async def serial() -> None:
+        await generator.summarize(transcript)
+        await generator.diagram(transcript)
+        await generator.create_mindmap([transcript])
+
+    async def pipeline() -> None:
+        result = await generator.run_pipeline(transcript)
+        if not result.ok:
+            raise RuntimeError(f"Etapas com erro: {result.errors}")
+        timings.update(result.timings)
+
+    print(f"transcrição: {len(transcript) / 1024:.0f} KB, {PER_KB_LATENCY * 1000:.0f} ms/KB de latência")
+    print(f"{'modo':<17} | {'chamadas':>8} | {'tempo':>7} | {'ganho':>7} | etapas")
+    print("-" * 86)
+
+    baseline = None
+    runs = [("serial", serial, "bypass"), ("pipeline", pipeline, "refresh"), ("pipeline (cache)", pipeline, "use")]
+    for label, run, mode in runs:
+        timings: dict = {}
+        server.stats.reset()
+        start = time.perf_counter()
+        with cache_mode(mode):
+            await run()
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        calls = sum(count for path, count in server.stats.paths.items() if path.endswith("/conversation"))
+        stages = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in timings.items())
+        print(f"{label:<17} | {calls:>8} | {elapsed:>6.2f}s | {baseline / elapsed:>6.1f}x | {stages}")
+
+    await generator.client.aclose()
+    await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Benchmark da renderização de prompts: leitura por chamada vs PromptStore.
+
+Para cada template de ``src/prompts`` e uma transcrição de ~20 KB, mede:
+
+- ``legado``: o ``_load_prompt`` anterior (``exists()`` + ``read_text()``)
+  seguido de ``str.format``, como era feito a cada chamada;
+- ``store``: ``PromptStore.render`` com o template já compilado;
+- o tamanho do prompt renderizado, com e sem ``PROMPT_MINIFY``.
+
+Uso:
+    poetry run python benchmarks/bench_prompt_store.py
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+# Adiciona o diretório src ao path
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+sys.path.insert(0, str(SRC_DIR))
+os.environ.setdefault("ADAPTA_COOKIES_STR", "bench=1")
+
+from generators.base import BaseContentGenerator  # noqa: E402
+from generators.prompt_store import PromptStore, minify  # noqa: E402
+
+PROMPTS_DIR = SRC_DIR / "prompts"
+ITERATIONS = 2000
+TRANSCRIPT = ("Hoje vamos falar sobre automação com n8n e agentes de IA. " * 350).strip()
+
+
+def legacy_render(name: str, **values: str) -> str:
+    """Implementação anterior: lê o arquivo e formata a cada chamada."""
+    prompt_file = PROMPTS_DIR / f"{name}.txt"
+    if not prompt_file.exists():
+        raise FileNotFoundError(prompt_file)
+    return prompt_file.read_text(encoding="utf-8").format(**values)
+
+
+def per_call_us(func: Callable[[], object]) -> float:
+    """Tempo médio por chamada, em microssegundos (melhor de 3 rodadas)."""
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(ITERATIONS):
+            func()
+        best = min(best, (time.perf_counter() - start) / ITERATIONS)
+    return best * 1e6
+
+
+def main() -> None:
+    store = PromptStore(PROMPTS_DIR, BaseContentGenerator.PROMPT_FIELDS)
+    print(f"{'prompt':<20} | {'legado':>9} | {'store':>8} | ganho | {'bytes':>7} | {'minificado':>10}")
+    print("-" * 72)
+    for name, fields in BaseContentGenerator.PROMPT_FIELDS.items():
+        values = {field: TRANSCRIPT for field in fields}
+        expected = legacy_render(name, **values)
+        assert store.render(name, **values) == expected
+
+        legacy = per_call_us(lambda: legacy_render(name, **values))
+        compiled = per_call_us(lambda: store.render(name, **values))
+        template = (PROMPTS_DIR / f"{name}.txt").read_text(encoding="utf-8")
+        minified = minify(template).format(**values)
+        print(
+            f"{name:<20} | {legacy:>7.1f}µs | {compiled:>6.1f}µs | {legacy / compiled:>4.1f}x | "
+            f"{len(expected.encode()):>7} | {len(minified.encode()):>10}"
+        )
+    for problem in store.problems:
+        print(f"PROBLEMA: {problem}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Benchmark do parser de stream vs a extração antiga por fatiamento de linhas.
+
+Monta respostas de 1, 5 e 20 MB no formato de stream da API (frames ``0:``
+com escapes, mais frames ``f:``, ``e:`` e ``d:``) e mede:
+
+- ``legado``: o ``_extract_content`` anterior (``splitlines`` + ``line[3:-1]`` +
+  ``replace`` encadeados), mantido aqui apenas como referência;
+- ``parser``: ``parse_stream`` sobre a resposta completa;
+- ``incremental``: ``DataStreamParser.feed`` com trechos de 4 KB, como no
+  caminho de streaming.
+
+Uso:
+    poetry run python benchmarks/bench_stream_parser.py
+"""
+
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List, Optional
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+os.environ.setdefault("ADAPTA_COOKIES_STR", "bench=1")
+
+from generators.adapta.stream_protocol import DataStreamParser, EventKind, extract_text, parse_stream  # noqa: E402
+
+SIZES_MB = [1, 5, 20]
+CHUNK_SIZE = 4096
+ROUNDS = 5
+
+
+def legacy_extract(response_text: str, new_line: bool = True) -> Optional[str]:
+    """Implementação anterior de ``AdaptaClient._extract_content``."""
+    content_parts = []
+    for line in response_text.strip().splitlines():
+        if not line.startswith("0:\""):
+            continue
+        content = line[3:-1]
+        if new_line:
+            content_parts.append(content.replace('\\n', '\n').replace('\\"', '\"'))
+        else:
+            content_parts.append(content.replace('\\n', ' ').replace('\\"', ' '))
+    return ''.join(content_parts) if content_parts else None
+
+
+def build_body(size_mb: int) -> str:
+    """Monta uma resposta com frames de texto de tamanho realista (~10-40 caracteres)."""
+    words = ['Olá', 'mundo', '"citação"', 'linha\nnova', 'tab\there', 'ação', '\\barra', 'código']
+    lines = ['f:{"messageId":"msg-bench"}']
+    size = 0
+    index = 0
+    while size < size_mb * 1024 * 1024:
+        delta = " ".join(words[(index + k) % len(words)] for k in range(3)) + " "
+        line = "0:" + json.dumps(delta, ensure_ascii=False)
+        lines.append(line)
+        size += len(line) + 1
+        index += 1
+    lines.append('e:{"finishReason":"stop","usage":{"promptTokens":10,"completionTokens":20}}')
+    lines.append('d:{"finishReason":"stop","usage":{"promptTokens":10,"completionTokens":20}}')
+    return "\n".join(lines) + "\n"
+
+
+def parser_extract(body: str) -> str:
+    return extract_text(parse_stream(body))
+
+
+def incremental_extract(body: str) -> str:
+    parser = DataStreamParser()
+    parts: List[str] = []
+    for start in range(0, len(body), CHUNK_SIZE):
+        for event in parser.feed(body[start:start + CHUNK_SIZE]):
+            if event.kind is EventKind.TEXT:
+                parts.append(event.value)
+    for event in parser.close():
+        if event.kind is EventKind.TEXT:
+            parts.append(event.value)
+    return "".join(parts)
+
+
+def best_of(func: Callable[[str], object], body: str) -> float:
+    """Melhor tempo, em segundos, de ``ROUNDS`` execuções."""
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        func(body)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    print(f"{'tamanho':>8} | {'legado':>10} | {'parser':>10} | {'incremental':>11} | ganho")
+    print("-" * 60)
+    for size_mb in SIZES_MB:
+        body = build_body(size_mb)
+        expected = "".join(
+            event.value for event in parse_stream(body) if event.kind is EventKind.TEXT
+        )
+        legacy = legacy_extract(body)
+        assert incremental_extract(body) == expected
+        if legacy != expected:
+            # O fatiamento antigo não decodifica \t, \\ e \uXXXX corretamente
+            print(f"{size_mb:>6}MB   (legado produz texto diferente: escapes mal decodificados)")
+
+        legacy_time = best_of(legacy_extract, body)
+        parser_time = best_of(parser_extract, body)
+        incremental_time = best_of(incremental_extract, body)
+        print(
+            f"{size_mb:>6}MB | {legacy_time * 1000:>8.1f}ms | {parser_time * 1000:>8.1f}ms | "
+            f"{incremental_time * 1000:>9.1f}ms | {legacy_time / parser_time:.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Benchmark do resumo em partes (map-reduce) de transcrições longas.
+
+Resume uma transcrição de ~160 mil tokens estimados contra um servidor local
+cuja latência cresce com o tamanho da requisição (``per_kb_latency``), como
+o processamento de prompts longos nos modelos reais. Compara o envio em uma
+única mensagem (``SUMMARIZE_CHUNK_TOKENS=0``) com o resumo em partes de
+4, 12 e 30 mil tokens: o tempo total passa a acompanhar a maior parte.
+
+Uso:
+    poetry run python benchmarks/bench_summarize_chunked.py
+"""
+
+import asyncio
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+os.environ.setdefault("ADAPTA_COOKIES_STR", "bench=1")
+os.environ.setdefault("ADAPTA_RATE_API_PER_SECOND", "100000")
+os.environ.setdefault("RESPONSE_CACHE_ENABLED", "false")
+os.environ.setdefault("CONFIG_WATCH_MODE", "off")
+
+from stub_server import StubAdaptaServer, fake_session_cookie  # noqa: E402
+
+CHUNK_TOKENS = [0, 4000, 12000, 30000]
+PER_KB_LATENCY = 0.02
+
+WORDS = (
+    "automação fluxo agente modelo dados ferramenta integração webhook planilha cliente "
+    "processo etapa resultado exemplo configuração nó gatilho resposta mensagem API"
+).split()
+
+
+def build_transcript(paragraphs: int = 600, seed: int = 7) -> str:
+    """Gera uma transcrição sintética com parágrafos e frases de tamanhos variados."""
+    rng = random.Random(seed)
+
+    def sentence() -> str:
+        return " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 28))).capitalize() + rng.choice(".!?")
+
+    return "\n\n".join(" ".join(sentence() for _ in range(rng.randint(2, 12))) for _ in range(paragraphs))
+
+
+async def main() -> None:
+    os.environ["ADAPTA_COOKIES_STR"] = fake_session_cookie()
+
+    from config import settings
+    from generators.adapta import ModelGenerator
+    from generators.adapta.client import AdaptaClient
+    from generators.chunking import estimate_tokens, split_text
+    from utils.logger import setup_logger
+
+    setup_logger("ERROR")
+    server = await StubAdaptaServer(base_latency=0.2, tail_latency=0.05, per_kb_latency=PER_KB_LATENCY).start()
+    generator = ModelGenerator(model="Gemini")
+    generator.client = AdaptaClient(
+        cookies_str=fake_session_cookie(),
+        session_id="bench-session",
+        api_base_url=server.http1_url,
+        timeout=120.0,
+    )
+    transcript = build_transcript()
+    print(f"transcrição: {len(transcript) / 1024:.0f} KB, ~{estimate_tokens(transcript)} tokens estimados")
+    print(f"concorrência: {settings.batch_concurrency} chamadas (BATCH_CONCURRENCY)")
+    print(f"{'partes de':<12} | {'partes':>6} | {'chamadas':>8} | {'tempo':>8} | ganho")
+    print("-" * 52)
+
+    baseline = None
+    for chunk_tokens in CHUNK_TOKENS:
+        os.environ["SUMMARIZE_CHUNK_TOKENS"] = str(chunk_tokens)
+        settings.reload()
+        parts = len(split_text(transcript, chunk_tokens)) if chunk_tokens else 1
+        server.stats.reset()
+        start = time.perf_counter()
+        await generator.summarize(transcript)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        label = f"{chunk_tokens} tokens" if chunk_tokens else "sem divisão"
+        calls = sum(count for path, count in server.stats.paths.items() if path.endswith("/conversation"))
+        print(f"{label:<12} | {parts:>6} | {calls:>8} | {elapsed:>7.2f}s | {baseline / elapsed:.1f}x")
+
+    await generator.client.aclose()
+    await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,183 @@
+"""Servidor local que imita a API Adapta.one para benchmarks.
+
+Atende HTTP/1.1 (com keep-alive) e HTTP/2 sem TLS (h2c com prior knowledge)
+em portas separadas, conta quantas conexões foram abertas e responde às rotas
+de conversa e exclusão com o mesmo formato de stream usado pela API real
+(linhas ``0:"..."``).
+"""
+
+import asyncio
+import base64
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import h2.config
+import h2.connection
+import h2.events
+import h2.settings
+
+
+def fake_session_cookie(ttl: float = 3600.0) -> str:
+    """Gera uma string de cookies com um JWT falso válido por ``ttl`` segundos."""
+    payload = json.dumps({"exp": int(time.time() + ttl)}).encode()
+    jwt = "h." + base64.urlsafe_b64encode(payload).decode().rstrip("=") + ".s"
+    return f"__session={jwt}; bench=1"
+
+
+def build_stream_body(text: str, chunk_size: int = 16) -> bytes:
+    """Monta um corpo de resposta no formato de stream da API."""
+    lines = ['f:{"messageId":"msg-bench"}']
+    for start in range(0, len(text), chunk_size):
+        lines.append("0:" + json.dumps(text[start:start + chunk_size], ensure_ascii=False))
+    lines.append('e:{"finishReason":"stop","usage":{"promptTokens":10,"completionTokens":20}}')
+    lines.append('d:{"finishReason":"stop","usage":{"promptTokens":10,"completionTokens":20}}')
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+@dataclass
+class ServerStats:
+    """Estatísticas coletadas pelo servidor."""
+
+    connections: int = 0
+    requests: int = 0
+    paths: Dict[str, int] = field(default_factory=dict)
+
+    def reset(self) -> None:
+        self.connections = 0
+        self.requests = 0
+        self.paths = {}
+
+
+class StubAdaptaServer:
+    """Servidor de teste com latência configurável.
+
+    A latência de cada resposta é ``base_latency`` somada a uma cauda
+    exponencial de média ``tail_latency``, imitando a distribuição de cauda
+    longa dos modelos reais. Com ``per_kb_latency``, cada KB do corpo da
+    requisição acrescenta esse tempo, como o processamento de prompts longos.
+    """
+
+    def __init__(
+        self,
+        base_latency: float = 0.05,
+        tail_latency: float = 0.05,
+        body: Optional[bytes] = None,
+        seed: int = 42,
+        per_kb_latency: float = 0.0,
+    ):
+        self.base_latency = base_latency
+        self.tail_latency = tail_latency
+        self.per_kb_latency = per_kb_latency
+        self.body = body or build_stream_body("Resposta de teste do servidor local. " * 4)
+        self.stats = ServerStats()
+        self._random = random.Random(seed)
+        self._servers: List[asyncio.AbstractServer] = []
+        self.http1_url = ""
+        self.http2_url = ""
+
+    async def start(self) -> "StubAdaptaServer":
+        h1 = await asyncio.start_server(self._handle_http1, "127.0.0.1", 0)
+        h2_server = await asyncio.start_server(self._handle_http2, "127.0.0.1", 0)
+        self._servers = [h1, h2_server]
+        self.http1_url = f"http://127.0.0.1:{h1.sockets[0].getsockname()[1]}"
+        self.http2_url = f"http://127.0.0.1:{h2_server.sockets[0].getsockname()[1]}"
+        return self
+
+    async def stop(self) -> None:
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+
+    def _latency(self, path: str, size: int = 0) -> float:
+        if not path.endswith("/conversation"):
+            return 0.0
+        latency = self.base_latency + self.per_kb_latency * size / 1024
+        return latency + self._random.expovariate(1 / self.tail_latency) if self.tail_latency else latency
+
+    def _record(self, path: str) -> None:
+        self.stats.requests += 1
+        self.stats.paths[path] = self.stats.paths.get(path, 0) + 1
+
+    def _response_body(self, path: str) -> bytes:
+        if path.endswith("/conversation"):
+            return self.body
+        return b'{"status":"ok"}'
+
+    async def _handle_http1(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.stats.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                lines = head.decode("latin-1").split("\r\n")
+                path = lines[0].split(" ")[1]
+                headers = {}
+                for line in lines[1:]:
+                    if ":" in line:
+                        key, value = line.split(":", 1)
+                        headers[key.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", "0"))
+                if length:
+                    await reader.readexactly(length)
+
+                self._record(path)
+                await asyncio.sleep(self._latency(path, length))
+                body = self._response_body(path)
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\ncontent-type: text/plain; charset=utf-8\r\n"
+                    b"content-length: " + str(len(body)).encode() + b"\r\n\r\n" + body
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    async def _handle_http2(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.stats.connections += 1
+        config = h2.config.H2Configuration(client_side=False, header_encoding="utf-8")
+        conn = h2.connection.H2Connection(config=config)
+        conn.initiate_connection()
+        conn.update_settings({h2.settings.SettingCodes.MAX_CONCURRENT_STREAMS: 1000})
+        writer.write(conn.data_to_send())
+        paths: Dict[int, str] = {}
+        sizes: Dict[int, int] = {}
+        tasks = set()
+
+        async def respond(stream_id: int) -> None:
+            path = paths.pop(stream_id, "/")
+            self._record(path)
+            await asyncio.sleep(self._latency(path, sizes.pop(stream_id, 0)))
+            body = self._response_body(path)
+            conn.send_headers(stream_id, [
+                (":status", "200"),
+                ("content-type", "text/plain; charset=utf-8"),
+                ("content-length", str(len(body))),
+            ])
+            conn.send_data(stream_id, body, end_stream=True)
+            writer.write(conn.data_to_send())
+
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                for event in conn.receive_data(data):
+                    if isinstance(event, h2.events.RequestReceived):
+                        paths[event.stream_id] = dict(event.headers).get(":path", "/")
+                    elif isinstance(event, h2.events.DataReceived):
+                        sizes[event.stream_id] = sizes.get(event.stream_id, 0) + len(event.data)
+                        conn.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+                    elif isinstance(event, h2.events.StreamEnded):
+                        task = asyncio.ensure_future(respond(event.stream_id))
+                        tasks.add(task)
+                        task.add_done_callback(tasks.discard)
+                writer.write(conn.data_to_send())
+        except ConnectionResetError:
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
@@ -1,33 +1,51 @@
 import streamlit as st
 import asyncio
+import time
 import nest_asyncio
-from generators.adapta import (
-    GeminiGenerator, ClaudeGenerator, GPTGenerator, ClaudeOpusGenerator,
-    DeepseekGenerator, Grok4Generator, GptOssGenerator, DeepseekR1Generator,
-    GptO3Generator, GptO4MiniGenerator
-)
+from generators.registry import GeneratorRegistry
 
 nest_asyncio.apply()
 
 # Page configuration
 st.set_page_config(page_title="Adapta.one Chat", layout="wide")
 
+# Minimum interval (seconds) between re-renders of a streaming response
+STREAM_RENDER_INTERVAL = 0.1
+
 # Function to initialize generators (cached to run only once)
 @st.cache_resource
 def initialize_generators():
-    """Initializes the base generator models. This runs only once."""
-    return {
-        "Gemini": GeminiGenerator(),
-        "Claude": ClaudeGenerator(),
-        "GPT": GPTGenerator(),
-        "Claude Opus": ClaudeOpusGenerator(),
-        "Deepseek": DeepseekGenerator(),
-        "Grok-4": Grok4Generator(),
-        "GPT-OSS": GptOssGenerator(),
-        "Deepseek-R1": DeepseekR1Generator(),
-        "O3": GptO3Generator(),
-        "O4-Mini": GptO4MiniGenerator(),
-    }
+    """Registers the base generator models. This runs only once.
+
+    Each generator (and its HTTP client) is imported and created on first use,
+    so startup does not pay for models the session never selects.
+    """
+    return GeneratorRegistry()
+
+async def stream_response(generator, messages, placeholder, searchType=None, tool=None, chat_id=None):
+    """Streams the model response into the placeholder and returns the full text.
+
+    Chunks are accumulated and the placeholder is redrawn at most once every
+    STREAM_RENDER_INTERVAL seconds, so Streamlit is not re-rendered per token.
+    """
+    chunks = []
+    last_render = 0.0
+    async for chunk in generator.stream_model_with_messages(
+        messages,
+        searchType=searchType,
+        tool=tool,
+        chat_id=chat_id
+    ):
+        chunks.append(chunk)
+        now = time.monotonic()
+        if now - last_render >= STREAM_RENDER_INTERVAL:
+            placeholder.markdown("".join(chunks) + "▌")
+            last_render = now
+
+    response = "".join(chunks)
+    if response:
+        placeholder.markdown(response)
+    return response
 
 # Main app logic
 def main():
@@ -121,10 +139,12 @@ def main():
                 if st.session_state.current_chat_id is None:
                     st.session_state.current_chat_id = selected_generator.generate_chat_id()
 
-                # Call the model asynchronously with search parameters and chat ID
+                # Stream the model response with search parameters and chat ID
                 response = asyncio.run(
-                    selected_generator.call_model_with_messages(
+                    stream_response(
+                        selected_generator,
                         st.session_state.messages,
+                        message_placeholder,
                         searchType=searchType,
                         tool=tool,
                         chat_id=st.session_state.current_chat_id
@@ -132,8 +152,7 @@ def main():
                 )
 
                 if response:
-                    message_placeholder.markdown(response)
-                    # Add assistant response to history
+                    # Add assistant response to history only once it is complete
                     st.session_state.messages.append({"role": "assistant", "content": response})
                 else:
                     message_placeholder.error("Failed to get a response from the model.")
@@ -1,14 +1,11 @@
 import streamlit as st
 import asyncio
 import os
+import time
 import nest_asyncio
 from itertools import cycle
 from utils.text_cleaner import remove_think_tags
-from generators.adapta import (
-    GeminiGenerator, ClaudeGenerator, GPTGenerator, ClaudeOpusGenerator,
-    DeepseekGenerator, Grok4Generator, GptOssGenerator, DeepseekR1Generator,
-    GptO3Generator, GptO4MiniGenerator
-)
+from generators.registry import GeneratorRegistry
 
 nest_asyncio.apply()
 
@@ -19,22 +16,18 @@ def run_agent_call_sync(agent_instance, messages):
 # --- App Configuration ---
 st.set_page_config(page_title="Multi-Agent Debate Chat", layout="wide")
 
+# Minimum interval (seconds) between re-renders of a streaming agent response
+STREAM_RENDER_INTERVAL = 0.2
+
 # --- Agent Initialization ---
 @st.cache_resource
 def initialize_base_generators():
-    """Initializes the base generator models. This runs only once."""
-    return {
-        "Gemini": GeminiGenerator(),
-        "Claude": ClaudeGenerator(),
-        "GPT": GPTGenerator(),
-        "Claude Opus": ClaudeOpusGenerator(),
-        "Deepseek": DeepseekGenerator(),
-        "Grok-4": Grok4Generator(),
-        "GPT-OSS": GptOssGenerator(),
-        "Deepseek-R1": DeepseekR1Generator(),
-        "O3": GptO3Generator(),
-        "O4-Mini": GptO4MiniGenerator(),
-    }
+    """Registers the base generator models. This runs only once.
+
+    Each generator (and its HTTP client) is imported and created on first use,
+    so startup does not pay for models the session never selects.
+    """
+    return GeneratorRegistry()
 
 # --- Helper Functions ---
 def get_agent_prompt(current_round, num_rounds, agent_name, problem, other_agent_memories, custom_prompt=""):
@@ -208,21 +201,14 @@ def main():
                 # --- Initialize Debate State ---
                 st.session_state.debate_started = True
                 st.session_state.current_round = 1
-                st.session_state.manager_agent = GeminiGenerator() # Manager always Gemini
+                st.session_state.manager_agent = base_generators.create("Gemini") # Manager always Gemini
                 
                 # Assign models to worker agents based on selection or rotation
                 st.session_state.worker_agents = {}
+                # Rotation order; generators are only created for the names actually used
                 available_models = cycle([
-                    ("GPT", base_generators["GPT"]),
-                    ("Gemini", base_generators["Gemini"]),
-                    ("Claude", base_generators["Claude"]),
-                    ("Claude Opus", base_generators["Claude Opus"]),
-                    ("Deepseek", base_generators["Deepseek"]),
-                    ("Grok-4", base_generators["Grok-4"]),
-                    ("GPT-OSS", base_generators["GPT-OSS"]),
-                    ("Deepseek-R1", base_generators["Deepseek-R1"]),
-                    ("O3", base_generators["O3"]),
-                    ("O4-Mini", base_generators["O4-Mini"]),
+                    "GPT", "Gemini", "Claude", "Claude Opus", "Deepseek",
+                    "Grok-4", "GPT-OSS", "Deepseek-R1", "O3", "O4-Mini",
                 ])
                 for i in range(st.session_state.num_agents):
                     agent_name = f"Agent {i+1}"
@@ -232,7 +218,8 @@ def main():
                         st.session_state.worker_agents[agent_name] = (selected_model_name, base_generators[selected_model_name])
                     else:
                         # Fallback to rotating if no selection or invalid selection
-                        st.session_state.worker_agents[agent_name] = next(available_models)
+                        model_name = next(available_models)
+                        st.session_state.worker_agents[agent_name] = (model_name, base_generators[model_name])
                 
                 st.session_state.agent_memories = {name: "" for name in st.session_state.worker_agents}
                 st.session_state.conversation_histories = {name: [] for name in st.session_state.worker_agents}
@@ -254,9 +241,56 @@ def main():
 
         st.subheader(f"Round {st.session_state.current_round} of {st.session_state.num_rounds}")
 
+        # --- Render one column per agent, filled in as each agent responds ---
+        agent_columns = st.columns(st.session_state.num_agents)
+        agent_placeholders = {}
+        for i, (agent_name, (model_name, _)) in enumerate(st.session_state.worker_agents.items()):
+            with agent_columns[i]:
+                st.info(f"**{agent_name} ({model_name})**")
+                agent_placeholders[agent_name] = st.empty()
+                agent_placeholders[agent_name].markdown("Thinking...")
+
+        def record_agent_response(agent_name, response):
+            """Renders an agent's final response and updates the round state."""
+            placeholder = agent_placeholders[agent_name]
+            if isinstance(response, Exception):
+                error_message = f"Error for {agent_name}: {response}"
+                placeholder.error(error_message)
+                st.session_state.agent_memories[agent_name] = error_message
+            elif response:
+                model_name = st.session_state.worker_agents[agent_name][0]
+                if model_name == "Gemini":
+                    response = remove_think_tags(response)
+                placeholder.markdown(response)
+                st.session_state.agent_memories[agent_name] = response
+                # Append the assistant's response to the history for the next round
+                st.session_state.conversation_histories[agent_name].append({"role": "assistant", "content": response})
+            else:
+                error_message = f"{agent_name} returned an empty response."
+                placeholder.warning(error_message)
+                st.session_state.agent_memories[agent_name] = error_message
+
+        async def run_agent(agent_name, agent_instance, history, search_type):
+            """Streams one agent's response into its column and returns (name, response or exception)."""
+            placeholder = agent_placeholders[agent_name]
+            chunks = []
+            last_render = 0.0
+            try:
+                async for chunk in agent_instance.stream_model_with_messages(history, searchType=search_type):
+                    chunks.append(chunk)
+                    now = time.monotonic()
+                    if now - last_render >= STREAM_RENDER_INTERVAL:
+                        placeholder.markdown("".join(chunks) + "▌")
+                        last_render = now
+                return agent_name, "".join(chunks)
+            except Exception as e:
+                return agent_name, e
+
         # --- Function to run all agents in parallel for a round ---
         async def run_debate_round():
             tasks = []
+            # Prompts are built from the previous round only, so agents finishing
+            # early in this round do not leak into the others' prompts.
             previous_memories = st.session_state.agent_memories.copy()
             search_type = "normal" if st.session_state.internet_access else None
 
@@ -275,42 +309,21 @@ def main():
                 st.session_state.conversation_histories[agent_name].append({"role": "user", "content": prompt})
                 
                 # Create a coroutine for the API call
-                task = agent_instance.call_model_with_messages(
+                tasks.append(run_agent(
+                    agent_name,
+                    agent_instance,
                     st.session_state.conversation_histories[agent_name],
-                    searchType=search_type
-                )
-                tasks.append(task)
+                    search_type
+                ))
             
-            # Gather results from all tasks
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            return results
+            # Render each agent as soon as it completes, in completion order
+            for finished in asyncio.as_completed(tasks):
+                agent_name, response = await finished
+                record_agent_response(agent_name, response)
 
-        # --- Execute the round and display results ---
+        # --- Execute the round, displaying results as they arrive ---
         with st.spinner(f"Round {st.session_state.current_round} in progress... Agents are thinking..."):
-            all_responses = asyncio.run(run_debate_round())
-        agent_columns = st.columns(st.session_state.num_agents)
-
-        for i, (agent_name, response) in enumerate(zip(st.session_state.worker_agents.keys(), all_responses)):
-            with agent_columns[i]:
-                model_name = st.session_state.worker_agents[agent_name][0]
-                st.info(f"**{agent_name} ({model_name})**")
-
-                if isinstance(response, Exception):
-                    error_message = f"Error for {agent_name}: {response}"
-                    st.error(error_message)
-                    st.session_state.agent_memories[agent_name] = error_message
-                elif response:
-                    model_name = st.session_state.worker_agents[agent_name][0]
-                    if model_name == "Gemini":
-                        response = remove_think_tags(response)
-                    st.markdown(response)
-                    st.session_state.agent_memories[agent_name] = response
-                    # Append the assistant's response to the history for the next round
-                    st.session_state.conversation_histories[agent_name].append({"role": "assistant", "content": response})
-                else:
-                    error_message = f"{agent_name} returned an empty response."
-                    st.warning(error_message)
-                    st.session_state.agent_memories[agent_name] = error_message
+            asyncio.run(run_debate_round())
 
         st.success(f"Round {st.session_state.current_round} complete.")
 
@@ -2,12 +2,21 @@
 
 from __future__ import annotations
 
+import ctypes
+import ctypes.util
+import inspect
+import os
+import select
+import struct
+import sys
 from pathlib import Path
-from threading import Lock
-from typing import Any, Optional
+from threading import Event, Lock, Thread, current_thread
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+from weakref import WeakMethod
 
-from dotenv import load_dotenv
-from pydantic import Field
+from dotenv import dotenv_values
+from loguru import logger
+from pydantic import Field, ValidationError
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -18,6 +27,7 @@ class Settings(BaseSettings):
         env_file=".env",
         env_file_encoding="utf-8",
         extra="ignore",
+        frozen=True,
     )
 
     # Configuracoes do Adapta.one
@@ -27,52 +37,517 @@ class Settings(BaseSettings):
         description="ID de sessao do Adapta.one a partir da variavel ADAPTA_SESSION_ID",
     )
 
-class SettingsManager:
-    """Gerencia o carregamento dinamico das configuracoes."""
+    # Observacao do arquivo .env
+    config_watch_mode: str = Field(
+        default="auto",
+        description="Como detectar mudancas no .env: auto (inotify com fallback), inotify, poll ou off",
+    )
+    config_watch_interval: float = Field(
+        default=1.0,
+        description="Intervalo em segundos da verificacao do .env no modo poll",
+    )
 
-    def __init__(self, env_path: Optional[Path] = None) -> None:
-        self._env_path = env_path or Path(__file__).resolve().parents[1] / ".env"
-        self._lock = Lock()
-        self._settings = self._load_settings()
-        self._env_timestamp = self._get_env_timestamp()
+    # Pool de contas (credenciais adicionais)
+    adapta_accounts: List[Dict[str, Any]] = Field(
+        default_factory=list,
+        description='Contas adicionais (JSON, ex.: [{"name": "conta-2", "cookies": "__client=...;__client_uat=...", "session_id": "sess_...", "weight": 1}])',
+    )
+    adapta_account_weight: float = Field(
+        default=1.0,
+        description="Peso da conta principal na distribuicao das chamadas",
+    )
+    adapta_account_strategy: str = Field(
+        default="least_in_flight",
+        description="Distribuicao das chamadas entre as contas: least_in_flight ou round_robin",
+    )
+    adapta_account_max_failures: int = Field(
+        default=3,
+        description="Falhas consecutivas que afastam uma conta do pool",
+    )
+    adapta_account_eject_duration: float = Field(
+        default=300.0,
+        description="Tempo em segundos que uma conta com problema fica afastada",
+    )
+
+    # Pool de conexoes HTTP compartilhado entre os geradores
+    adapta_pool_max_connections: int = Field(
+        default=100,
+        description="Numero maximo de conexoes abertas no pool compartilhado",
+    )
+    adapta_pool_max_keepalive: int = Field(
+        default=20,
+        description="Numero de conexoes ociosas mantidas abertas (keep-alive)",
+    )
+    adapta_pool_keepalive_expiry: float = Field(
+        default=60.0,
+        description="Tempo em segundos que uma conexao ociosa e mantida aberta",
+    )
+    adapta_pool_max_per_host: Optional[int] = Field(
+        default=None,
+        description="Limite de requisicoes simultaneas por host (vazio = sem limite)",
+    )
+    adapta_http2: bool = Field(
+        default=True,
+        description="Habilita HTTP/2 com fallback automatico para HTTP/1.1",
+    )
+    adapta_http2_max_streams: Optional[int] = Field(
+        default=None,
+        description="Streams HTTP/2 simultaneos por host (vazio = limite do servidor)",
+    )
+
+    # Exclusao em lote das conversas temporarias
+    adapta_cleanup_batch_size: int = Field(
+        default=20,
+        description="Quantidade de conversas temporarias que dispara uma exclusao imediata",
+    )
+    adapta_cleanup_flush_interval: float = Field(
+        default=2.0,
+        description="Tempo maximo em segundos que uma conversa temporaria aguarda exclusao",
+    )
+
+    # Politica de retentativas das chamadas de modelo
+    adapta_retry_max_attempts: int = Field(
+        default=3,
+        description="Numero maximo de tentativas por chamada de modelo",
+    )
+    adapta_retry_base_delay: float = Field(
+        default=1.0,
+        description="Espera inicial em segundos antes de repetir uma chamada",
+    )
+    adapta_retry_max_delay: float = Field(
+        default=30.0,
+        description="Espera maxima em segundos entre tentativas",
+    )
+    adapta_retry_budget: Optional[float] = Field(
+        default=300.0,
+        description="Tempo maximo em segundos gasto com retentativas por chamada (vazio = sem limite)",
+    )
+
+    # Limitador adaptativo de concorrencia por modelo (AIMD)
+    adapta_limiter_initial: int = Field(
+        default=4,
+        description="Janela inicial de chamadas simultaneas por modelo",
+    )
+    adapta_limiter_min: int = Field(
+        default=1,
+        description="Janela minima de chamadas simultaneas por modelo",
+    )
+    adapta_limiter_max: int = Field(
+        default=32,
+        description="Janela maxima de chamadas simultaneas por modelo",
+    )
+
+    # Limite de taxa por conta (token bucket por credencial)
+    adapta_rate_api_per_second: Optional[float] = Field(
+        default=5.0,
+        description="Requisicoes por segundo a API de chat e arquivos por conta (vazio = sem limite)",
+    )
+    adapta_rate_api_burst: float = Field(
+        default=20.0,
+        description="Rajada maxima de requisicoes a API de chat e arquivos por conta",
+    )
+    adapta_rate_clerk_per_second: Optional[float] = Field(
+        default=1.0,
+        description="Requisicoes por segundo aos endpoints de autenticacao do Clerk (vazio = sem limite)",
+    )
+    adapta_rate_clerk_burst: float = Field(
+        default=5.0,
+        description="Rajada maxima de requisicoes aos endpoints do Clerk",
+    )
+
+    # Circuit breaker por modelo
+    adapta_breaker_failure_rate: float = Field(
+        default=0.5,
+        description="Fracao de falhas na janela que abre o circuito de um modelo",
+    )
+    adapta_breaker_min_calls: int = Field(
+        default=5,
+        description="Numero minimo de chamadas na janela antes de avaliar a taxa de falhas",
+    )
+    adapta_breaker_window: float = Field(
+        default=60.0,
+        description="Duracao em segundos da janela de observacao do circuit breaker",
+    )
+    adapta_breaker_open_duration: float = Field(
+        default=30.0,
+        description="Tempo em segundos que o circuito fica aberto antes das chamadas de teste",
+    )
+    adapta_breaker_fallbacks: Dict[str, str] = Field(
+        default_factory=dict,
+        description='Modelo alternativo usado quando o circuito de um modelo esta aberto (JSON, ex.: {"CLAUDE_4": "GPT_5"})',
+    )
 
-    def _get_env_timestamp(self) -> Optional[float]:
+    # Requisicoes hedged em call_model_with_messages
+    adapta_hedging: bool = Field(
+        default=False,
+        description="Dispara uma copia da chamada quando ela excede o p90 de latencia do modelo",
+    )
+    adapta_hedge_budget: float = Field(
+        default=0.1,
+        description="Fracao maxima de requisicoes extras geradas por hedging",
+    )
+    adapta_hedge_min_samples: int = Field(
+        default=20,
+        description="Amostras de latencia necessarias antes de disparar copias",
+    )
+    adapta_hedge_models: Dict[str, str] = Field(
+        default_factory=dict,
+        description='Modelo usado na copia de cada modelo (JSON, ex.: {"CLAUDE_4": "GPT_5"}; padrao: o mesmo modelo)',
+    )
+
+    # Cache persistente de respostas (resumo, diagrama, mapa mental, conteudo)
+    response_cache_enabled: bool = Field(
+        default=True,
+        description="Reaproveita respostas de tarefas deterministicas dos geradores",
+    )
+    response_cache_path: Optional[str] = Field(
+        default="cache/responses.sqlite3",
+        description="Arquivo SQLite do cache de respostas, relativo a raiz do projeto (vazio = somente memoria)",
+    )
+    response_cache_ttl: Optional[float] = Field(
+        default=604800.0,
+        description="Validade em segundos das respostas em cache (vazio = sem expiracao)",
+    )
+    response_cache_max_bytes: int = Field(
+        default=268435456,
+        description="Tamanho maximo em bytes das respostas comprimidas em disco",
+    )
+    response_cache_memory_entries: int = Field(
+        default=128,
+        description="Quantidade de respostas mantidas em memoria",
+    )
+
+    # Resumo de textos longos em partes (map-reduce)
+    summarize_chunk_tokens: int = Field(
+        default=12000,
+        description="Tamanho estimado (tokens) acima do qual summarize resume o texto em partes paralelas; 0 desativa",
+    )
+
+    # Mapas mentais OPML (create_mindmap)
+    mindmap_incremental: bool = Field(
+        default=True,
+        description="Gera o OPML de cada texto em paralelo, validando durante o stream e juntando as partes",
+    )
+    mindmap_max_continuations: int = Field(
+        default=3,
+        description="Pedidos de continuacao por documento OPML incompleto antes de fechar os elementos abertos",
+    )
+
+    # Processamento em lote (generate_many)
+    batch_concurrency: int = Field(
+        default=8,
+        description="Itens processados ao mesmo tempo por generate_many",
+    )
+
+    # Templates de prompt (prompts/*.txt)
+    prompt_minify: bool = Field(
+        default=False,
+        description="Remove indentacao e linhas em branco dos templates antes do envio",
+    )
+    prompt_reload_interval: float = Field(
+        default=1.0,
+        description="Intervalo minimo em segundos entre verificacoes de alteracao dos templates",
+    )
+
+class SettingsChange:
+    """Mudanca de configuracao publicada aos assinantes do SettingsManager."""
+
+    __slots__ = ("old", "new", "changed")
+
+    def __init__(self, old: Settings, new: Settings, changed: FrozenSet[str]) -> None:
+        self.old = old
+        self.new = new
+        self.changed = changed
+
+    def __repr__(self) -> str:  # pragma: no cover - comportamento trivial
+        return f"SettingsChange(changed={sorted(self.changed)})"
+
+
+class EnvFileWatcher:
+    """Observa o arquivo .env em uma thread de fundo.
+
+    Usa inotify (Linux) quando disponivel e, caso contrario, verifica o
+    ``stat`` do arquivo a cada ``interval`` segundos. O diretorio do arquivo
+    e observado, e nao o arquivo em si, para detectar editores que salvam
+    gravando um arquivo temporario e renomeando-o.
+    """
+
+    # Eventos do inotify (linux/inotify.h)
+    _IN_MODIFY = 0x00000002
+    _IN_ATTRIB = 0x00000004
+    _IN_CLOSE_WRITE = 0x00000008
+    _IN_MOVED_FROM = 0x00000040
+    _IN_MOVED_TO = 0x00000080
+    _IN_CREATE = 0x00000100
+    _IN_DELETE = 0x00000200
+    _IN_NONBLOCK = 0o4000
+    _IN_CLOEXEC = 0o2000000
+    _EVENT_HEADER = struct.Struct("iIII")
+
+    # Espera para agrupar os varios eventos de um mesmo salvamento
+    _DEBOUNCE = 0.05
+
+    def __init__(
+        self,
+        path: Path,
+        callback: Callable[[], None],
+        mode: str = "auto",
+        interval: float = 1.0,
+    ) -> None:
+        """Inicializa o observador.
+
+        Args:
+            path: Arquivo observado.
+            callback: Funcao chamada (na thread do observador) quando o
+                arquivo muda.
+            mode: ``auto`` (inotify com fallback), ``inotify`` ou ``poll``.
+            interval: Intervalo de verificacao do modo ``poll``, em segundos.
+        """
+        self.path = path
+        self.callback = callback
+        self.interval = interval
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+        self._inotify_fd: Optional[int] = None
+        if mode in ("auto", "inotify"):
+            self._inotify_fd = self._open_inotify()
+            if self._inotify_fd is None and mode == "inotify":
+                logger.warning("inotify indisponivel; observando o .env por polling")
+        self.mode = "inotify" if self._inotify_fd is not None else "poll"
+
+    def _open_inotify(self) -> Optional[int]:
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            fd = libc.inotify_init1(self._IN_NONBLOCK | self._IN_CLOEXEC)
+            if fd < 0:
+                return None
+            mask = (
+                self._IN_MODIFY | self._IN_ATTRIB | self._IN_CLOSE_WRITE | self._IN_MOVED_FROM
+                | self._IN_MOVED_TO | self._IN_CREATE | self._IN_DELETE
+            )
+            if libc.inotify_add_watch(fd, str(self.path.parent).encode(), mask) < 0:
+                os.close(fd)
+                return None
+            return fd
+        except (OSError, AttributeError):
+            return None
+
+    def start(self) -> "EnvFileWatcher":
+        """Inicia a thread do observador."""
+        if self._thread is None:
+            target = self._run_inotify if self._inotify_fd is not None else self._run_poll
+            self._thread = Thread(target=target, name="settings-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Encerra a thread do observador."""
+        self._stop.set()
+        if self._thread is not None and self._thread is not current_thread():
+            self._thread.join(timeout=2.0)
+        if self._inotify_fd is not None:
+            os.close(self._inotify_fd)
+            self._inotify_fd = None
+
+    def _notify(self) -> None:
         try:
-            return self._env_path.stat().st_mtime
+            self.callback()
+        except Exception as e:  # a thread do observador nao pode morrer
+            logger.error(f"Erro ao aplicar mudanca do .env: {e}")
+
+    def _read_events(self, fd: int) -> bool:
+        """Le os eventos pendentes; retorna True se algum for do arquivo observado."""
+        target = self.path.name.encode()
+        relevant = False
+        while True:
+            try:
+                data = os.read(fd, 4096)
+            except BlockingIOError:
+                return relevant
+            offset = 0
+            while offset + self._EVENT_HEADER.size <= len(data):
+                _, _, _, length = self._EVENT_HEADER.unpack_from(data, offset)
+                offset += self._EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b"\0")
+                offset += length
+                relevant = relevant or name == target
+
+    def _run_inotify(self) -> None:
+        fd = self._inotify_fd
+        while not self._stop.is_set() and fd is not None:
+            try:
+                ready, _, _ = select.select([fd], [], [], 1.0)
+                if not ready or not self._read_events(fd):
+                    continue
+                # Agrupa os eventos de um mesmo salvamento antes de recarregar
+                while select.select([fd], [], [], self._DEBOUNCE)[0]:
+                    self._read_events(fd)
+            except (OSError, ValueError):
+                # Descritor fechado por stop()
+                return
+            self._notify()
+
+    def _signature(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = self.path.stat()
         except FileNotFoundError:
             return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def _run_poll(self) -> None:
+        signature = self._signature()
+        while not self._stop.wait(self.interval):
+            current = self._signature()
+            if current == signature:
+                continue
+            # Espera o arquivo parar de mudar: um salvamento que trunca e depois
+            # grava o .env nao pode publicar o arquivo vazio
+            while not self._stop.wait(self._DEBOUNCE):
+                latest = self._signature()
+                if latest == current:
+                    break
+                current = latest
+            if self._stop.is_set():
+                return
+            signature = current
+            self._notify()
+
+
+class SettingsManager:
+    """Gerencia o carregamento dinamico das configuracoes.
+
+    As leituras usam um snapshot imutavel das configuracoes, sem acesso ao
+    disco. Um ``EnvFileWatcher`` recarrega o snapshot quando o ``.env`` muda
+    e avisa os assinantes (ex.: clientes que precisam trocar os cookies).
+
+    O ``.env`` so e lido (e o observador so e iniciado) no primeiro acesso a
+    uma configuracao, e nao na importacao do modulo.
+    """
+
+    def __init__(self, env_path: Optional[Path] = None, watch: bool = True) -> None:
+        self._env_path = env_path or Path(__file__).resolve().parents[1] / ".env"
+        self._watch = watch
+        self._lock = Lock()
+        self._subscribers: List[Callable[[], Optional[Callable[[SettingsChange], None]]]] = []
+        # Valor original (None = ausente) das variaveis de ambiente definidas pelo .env
+        self._original_environ: Dict[str, Optional[str]] = {}
+        self._settings: Optional[Settings] = None
+        self._watcher: Optional[EnvFileWatcher] = None
+
+    def _ensure_loaded(self) -> Settings:
+        """Carrega as configuracoes no primeiro acesso e inicia o observador."""
+        with self._lock:
+            if self._settings is None:
+                self._settings = self._load_settings()
+                if self._watch and self._settings.config_watch_mode != "off":
+                    self._watcher = EnvFileWatcher(
+                        self._env_path,
+                        self._on_file_changed,
+                        mode=self._settings.config_watch_mode,
+                        interval=self._settings.config_watch_interval,
+                    ).start()
+            return self._settings
 
     def _load_settings(self) -> Settings:
-        load_dotenv(self._env_path, override=True)
+        values = dotenv_values(self._env_path) if self._env_path.exists() else {}
+        # Variaveis removidas do .env voltam ao valor original do ambiente
+        for key in [key for key in self._original_environ if values.get(key) is None]:
+            original = self._original_environ.pop(key)
+            if original is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = original
+        # O .env tem precedencia sobre o ambiente (como load_dotenv(override=True))
+        for key, value in values.items():
+            if value is not None:
+                self._original_environ.setdefault(key, os.environ.get(key))
+                os.environ[key] = value
         return Settings()
 
-    def _refresh_if_needed(self) -> None:
-        current = self._get_env_timestamp()
-        if current != self._env_timestamp:
-            with self._lock:
-                current = self._get_env_timestamp()
-                if current != self._env_timestamp:
-                    self._settings = self._load_settings()
-                    self._env_timestamp = current
+    def _on_file_changed(self) -> None:
+        try:
+            self.reload()
+        except ValidationError as e:
+            # Arquivo incompleto ou invalido: mantem as configuracoes atuais
+            logger.warning(f"Configuracoes do .env invalidas, mantendo as atuais: {e}")
 
     def reload(self) -> Settings:
         """Recarrega explicitamente as configuracoes a partir do .env."""
+        if self._settings is None:
+            return self._ensure_loaded()
         with self._lock:
-            self._settings = self._load_settings()
-            self._env_timestamp = self._get_env_timestamp()
-            return self._settings
+            old = self._settings
+            new = self._load_settings()
+            self._settings = new
+        old_values, new_values = old.model_dump(), new.model_dump()
+        changed = frozenset(k for k in new_values if old_values.get(k) != new_values[k])
+        if changed:
+            self._publish(SettingsChange(old, new, changed))
+        return new
+
+    def subscribe(self, callback: Callable[[SettingsChange], None]) -> Callable[[], None]:
+        """Registra uma funcao chamada a cada mudanca das configuracoes.
+
+        A funcao e chamada na thread que detectou a mudanca: assinantes com
+        estado usado por requisicoes em andamento (ex.: cookies) devem so
+        guardar o novo valor e aplica-lo na proxima requisicao. Metodos de
+        objetos sao guardados por referencia fraca, para que o registro nao
+        impeca o objeto de ser coletado.
+
+        Returns:
+            Funcao que cancela a assinatura.
+        """
+        ref: Callable[[], Optional[Callable[[SettingsChange], None]]]
+        if inspect.ismethod(callback):
+            ref = WeakMethod(callback)
+        else:
+            ref = lambda: callback  # noqa: E731
+        with self._lock:
+            self._subscribers.append(ref)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                if ref in self._subscribers:
+                    self._subscribers.remove(ref)
+
+        return unsubscribe
+
+    def _publish(self, change: SettingsChange) -> None:
+        with self._lock:
+            refs = list(self._subscribers)
+        for ref in refs:
+            callback = ref()
+            if callback is None:
+                with self._lock:
+                    if ref in self._subscribers:
+                        self._subscribers.remove(ref)
+                continue
+            try:
+                callback(change)
+            except Exception as e:
+                logger.error(f"Erro em assinante de mudanca de configuracao: {e}")
+
+    @property
+    def snapshot(self) -> Settings:
+        """Snapshot imutavel das configuracoes atuais."""
+        return self._settings or self._ensure_loaded()
+
+    def close(self) -> None:
+        """Encerra o observador do .env."""
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
 
     def __getattr__(self, item: str) -> Any:
-        self._refresh_if_needed()
-        return getattr(self._settings, item)
+        return getattr(self._settings or self._ensure_loaded(), item)
 
     def __repr__(self) -> str:  # pragma: no cover - comportamento trivial
-        self._refresh_if_needed()
-        return repr(self._settings)
+        return repr(self.snapshot)
 
     def model_dump(self, *args: Any, **kwargs: Any) -> Any:
-        self._refresh_if_needed()
-        return self._settings.model_dump(*args, **kwargs)
+        return self.snapshot.model_dump(*args, **kwargs)
 
 
 # Instancia global das configuracoes com recarga automatica
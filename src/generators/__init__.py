@@ -1,11 +1,18 @@
-"""Módulo generators - Implementações de provedores de IA para geração de conteúdo."""
+"""Módulo generators - Implementações de provedores de IA para geração de conteúdo.
+
+Os geradores do sub-pacote ``adapta`` são importados sob demanda; para obter
+geradores por nome, veja ``generators.registry``.
+"""
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, List
 
 from .base import BaseContentGenerator
 
-# Importa geradores do sub-pacote adapta
-try:
+if TYPE_CHECKING:
     from .adapta import (
         AdaptaClient,
+        ModelGenerator,
         GeminiGenerator,
         ClaudeGenerator,
         GPTGenerator,
@@ -17,20 +24,37 @@ try:
         GptO3Generator,
         GptO4MiniGenerator
     )
-    __all__ = [
-        "BaseContentGenerator",
-        "AdaptaClient",
-        "GeminiGenerator",
-        "ClaudeGenerator", 
-        "GPTGenerator",
-        "ClaudeOpusGenerator",
-        "DeepseekGenerator",
-        "Grok4Generator",
-        "GptOssGenerator",
-        "DeepseekR1Generator",
-        "GptO3Generator",
-        "GptO4MiniGenerator",
-    ]
-except ImportError:
-    # Se o sub-pacote adapta não estiver disponível, exporta apenas a base
-    __all__ = ["BaseContentGenerator"]
\ No newline at end of file
+
+# Nomes reexportados do sub-pacote adapta
+_ADAPTA_EXPORTS = (
+    "AdaptaClient",
+    "ModelGenerator",
+    "GeminiGenerator",
+    "ClaudeGenerator",
+    "GPTGenerator",
+    "ClaudeOpusGenerator",
+    "DeepseekGenerator",
+    "Grok4Generator",
+    "GptOssGenerator",
+    "DeepseekR1Generator",
+    "GptO3Generator",
+    "GptO4MiniGenerator",
+)
+
+__all__ = ["BaseContentGenerator", *_ADAPTA_EXPORTS]
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _ADAPTA_EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    try:
+        value = getattr(import_module(".adapta", __name__), name)
+    except ImportError as e:
+        # Sub-pacote adapta indisponível: apenas a base é exportada
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r} ({e})") from e
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
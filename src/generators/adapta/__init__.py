@@ -2,22 +2,67 @@
 
 Este módulo contém as implementações dos geradores de conteúdo que utilizam
 a API Adapta.one, incluindo suporte para diferentes modelos de IA (GPT, Gemini, Claude).
+
+Os nomes exportados são importados sob demanda (PEP 562): importar o pacote
+não carrega ``httpx``, as configurações nem os dez módulos de geradores; cada
+um é carregado no primeiro acesso, ex.: ``from generators.adapta import GeminiGenerator``.
 """
 
-from .client import AdaptaClient
-from .gemini_generator import GeminiGenerator
-from .claude_generator import ClaudeGenerator
-from .gpt_generator import GPTGenerator
-from .claude_opus_generator import ClaudeOpusGenerator
-from .deepseek_generator import DeepseekGenerator
-from .grok_4_generator import Grok4Generator
-from .gpt_oss_generator import GptOssGenerator
-from .deepseek_r1_generator import DeepseekR1Generator
-from .gpt_o3_generator import GptO3Generator
-from .gpt_o4_mini_generator import GptO4MiniGenerator
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:
+    from .accounts import CredentialPool, PooledAdaptaClient
+    from .breaker import CircuitOpenError
+    from .catalog import ModelCatalog, ModelSpec
+    from .client import AdaptaClient
+    from .model_generator import ModelGenerator
+    from .stream_protocol import StreamError
+    from .usage import CallResult
+    from .gemini_generator import GeminiGenerator
+    from .claude_generator import ClaudeGenerator
+    from .gpt_generator import GPTGenerator
+    from .claude_opus_generator import ClaudeOpusGenerator
+    from .deepseek_generator import DeepseekGenerator
+    from .grok_4_generator import Grok4Generator
+    from .gpt_oss_generator import GptOssGenerator
+    from .deepseek_r1_generator import DeepseekR1Generator
+    from .gpt_o3_generator import GptO3Generator
+    from .gpt_o4_mini_generator import GptO4MiniGenerator
+
+# Nome exportado -> módulo que o define
+_EXPORTS = {
+    "AdaptaClient": ".client",
+    "CallResult": ".usage",
+    "CircuitOpenError": ".breaker",
+    "CredentialPool": ".accounts",
+    "PooledAdaptaClient": ".accounts",
+    "StreamError": ".stream_protocol",
+    "ModelCatalog": ".catalog",
+    "ModelSpec": ".catalog",
+    "ModelGenerator": ".model_generator",
+    "GeminiGenerator": ".gemini_generator",
+    "ClaudeGenerator": ".claude_generator",
+    "GPTGenerator": ".gpt_generator",
+    "ClaudeOpusGenerator": ".claude_opus_generator",
+    "DeepseekGenerator": ".deepseek_generator",
+    "Grok4Generator": ".grok_4_generator",
+    "GptOssGenerator": ".gpt_oss_generator",
+    "DeepseekR1Generator": ".deepseek_r1_generator",
+    "GptO3Generator": ".gpt_o3_generator",
+    "GptO4MiniGenerator": ".gpt_o4_mini_generator",
+}
 
 __all__ = [
     "AdaptaClient",
+    "CallResult",
+    "CircuitOpenError",
+    "CredentialPool",
+    "PooledAdaptaClient",
+    "StreamError",
+    "ModelCatalog",
+    "ModelSpec",
+    "ModelGenerator",
     "GeminiGenerator", 
     "ClaudeGenerator",
     "GPTGenerator",
@@ -28,4 +73,18 @@ __all__ = [
     "DeepseekR1Generator",
     "GptO3Generator",
     "GptO4MiniGenerator",
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    # Acessos seguintes não passam mais por __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,561 @@
+"""Pool de credenciais (contas) da Adapta.one.
+
+Com uma única conta, todo o tráfego fica limitado à concorrência e à cota que
+o servidor concede a ela. Este módulo distribui as chamadas entre várias
+contas configuradas em ``ADAPTA_ACCOUNTS``, além da conta principal
+(``ADAPTA_COOKIES_STR``/``ADAPTA_SESSION_ID``):
+
+- cada conta mantém a sua própria sessão autenticada (um ``AdaptaClient`` por
+  credencial, com o JWT e o limite de taxa da conta);
+- novas chamadas vão para a conta com menos chamadas em andamento
+  proporcionalmente ao peso (``least_in_flight``) ou seguem um round-robin
+  ponderado (``round_robin``);
+- contas com falhas consecutivas, ou recusadas pela API (401/403, ex.: cookies
+  expirados), são afastadas por um intervalo e depois voltam a receber
+  chamadas de teste;
+- conversas persistentes (``chat_id``) ficam presas à conta que as criou.
+
+O estado do pool é compartilhado por todo o processo; cada gerador recebe um
+``PooledAdaptaClient`` com a mesma interface de ``AdaptaClient``.
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+
+import httpx
+
+from config import SettingsChange, settings
+from utils.logger import logger
+from utils.metrics import metrics
+from .breaker import CircuitOpenError
+from .client import AdaptaClient, is_call_failure
+from .coalesce import CoalescedCallAborted
+
+# Configurações que alteram as contas do pool
+_ACCOUNT_SETTINGS = (
+    "adapta_cookies_str",
+    "adapta_session_id",
+    "adapta_accounts",
+    "adapta_account_weight",
+    "adapta_account_strategy",
+    "adapta_account_max_failures",
+    "adapta_account_eject_duration",
+)
+
+# Quantidade máxima de conversas persistentes cuja conta é lembrada
+_MAX_STICKY_CHATS = 10000
+
+
+class AccountStrategy(Enum):
+    """Critério de escolha da conta para uma nova chamada."""
+
+    LEAST_IN_FLIGHT = "least_in_flight"
+    ROUND_ROBIN = "round_robin"
+
+
+@dataclass(frozen=True)
+class Credential:
+    """Credencial de uma conta.
+
+    Attributes:
+        name: Nome da conta usado em logs e métricas (nunca os cookies).
+        cookies_str: String de cookies da conta.
+        session_id: ID de sessão do Clerk, se conhecido.
+        weight: Peso relativo da conta na distribuição das chamadas.
+    """
+
+    name: str
+    cookies_str: str
+    session_id: Optional[str] = None
+    weight: float = 1.0
+
+
+def load_credentials() -> List[Credential]:
+    """Lê a conta principal e as contas adicionais das configurações.
+
+    Entradas inválidas ou repetidas de ``ADAPTA_ACCOUNTS`` são ignoradas com
+    um aviso.
+    """
+    credentials = [
+        Credential(
+            name="primary",
+            cookies_str=settings.adapta_cookies_str,
+            session_id=settings.adapta_session_id,
+            weight=settings.adapta_account_weight,
+        )
+    ]
+    seen = {settings.adapta_cookies_str.strip()}
+    for position, entry in enumerate(settings.adapta_accounts, start=1):
+        cookies_str = str(entry.get("cookies") or "").strip()
+        if not cookies_str:
+            logger.warning(f"Conta {position} de ADAPTA_ACCOUNTS ignorada: sem 'cookies'")
+            continue
+        if cookies_str in seen:
+            logger.warning(f"Conta {position} de ADAPTA_ACCOUNTS ignorada: cookies repetidos")
+            continue
+        try:
+            weight = float(entry.get("weight", 1.0))
+        except (TypeError, ValueError):
+            weight = 0.0
+        if weight <= 0:
+            logger.warning(f"Conta {position} de ADAPTA_ACCOUNTS ignorada: peso inválido")
+            continue
+        seen.add(cookies_str)
+        credentials.append(Credential(
+            name=str(entry.get("name") or f"account-{position}"),
+            cookies_str=cookies_str,
+            session_id=entry.get("session_id"),
+            weight=weight,
+        ))
+    return credentials
+
+
+class _AccountState:
+    """Estado de escalonamento e saúde de uma conta."""
+
+    def __init__(self, credential: Credential):
+        self.credential = credential
+        self.in_flight = 0
+        self.failures = 0
+        self.ejected_until = 0.0
+        self.current_weight = 0.0
+        self.last_selected = 0
+
+
+class CredentialPool:
+    """Distribui chamadas entre contas e afasta as que estão com problema."""
+
+    def __init__(
+        self,
+        credentials: List[Credential],
+        strategy: Union[AccountStrategy, str] = AccountStrategy.LEAST_IN_FLIGHT,
+        max_failures: int = 3,
+        eject_duration: float = 300.0,
+    ):
+        """Inicializa o pool.
+
+        Args:
+            credentials: Contas disponíveis (ao menos uma).
+            strategy: Critério de escolha da conta para novas chamadas.
+            max_failures: Falhas consecutivas que afastam uma conta.
+            eject_duration: Tempo, em segundos, que uma conta fica afastada.
+        """
+        if not credentials:
+            raise ValueError("O pool de credenciais precisa de ao menos uma conta")
+        self.strategy = AccountStrategy(strategy)
+        self.max_failures = max(1, max_failures)
+        self.eject_duration = eject_duration
+        self._accounts = [_AccountState(credential) for credential in credentials]
+        self._by_name = {state.credential.name: index for index, state in enumerate(self._accounts)}
+        self._sticky: "OrderedDict[str, int]" = OrderedDict()
+        self._selections = 0
+        self._lock = threading.Lock()
+
+    @property
+    def credentials(self) -> List[Credential]:
+        """Contas do pool, na ordem de configuração."""
+        return [state.credential for state in self._accounts]
+
+    def _healthy(self, state: _AccountState, now: float) -> bool:
+        return state.ejected_until <= now
+
+    def _select_locked(self, now: float) -> int:
+        candidates = [i for i, state in enumerate(self._accounts) if self._healthy(state, now)]
+        if not candidates:
+            # Todas afastadas: usa a que volta primeiro em vez de recusar a chamada
+            return min(range(len(self._accounts)), key=lambda i: self._accounts[i].ejected_until)
+
+        if self.strategy is AccountStrategy.ROUND_ROBIN:
+            # Round-robin ponderado suave (mesmo algoritmo do nginx)
+            total = 0.0
+            for i in candidates:
+                state = self._accounts[i]
+                state.current_weight += state.credential.weight
+                total += state.credential.weight
+            chosen = max(candidates, key=lambda i: self._accounts[i].current_weight)
+            self._accounts[chosen].current_weight -= total
+            return chosen
+
+        # Menos chamadas em andamento por unidade de peso; empate vai para a
+        # conta escolhida há mais tempo
+        return min(
+            candidates,
+            key=lambda i: (
+                (self._accounts[i].in_flight + 1) / self._accounts[i].credential.weight,
+                self._accounts[i].last_selected,
+            ),
+        )
+
+    def acquire(self, chat_id: Optional[str] = None) -> Credential:
+        """Escolhe a conta para uma chamada e a marca como em andamento.
+
+        Args:
+            chat_id: Conversa persistente da chamada. A primeira chamada de uma
+                conversa escolhe a conta; as seguintes usam sempre a mesma.
+
+        Returns:
+            Credencial da conta escolhida. Deve ser devolvida com ``release``.
+        """
+        now = time.monotonic()
+        with self._lock:
+            index = self._sticky.get(chat_id) if chat_id else None
+            if index is not None:
+                self._sticky.move_to_end(chat_id)
+            else:
+                index = self._select_locked(now)
+                if chat_id:
+                    self._sticky[chat_id] = index
+                    while len(self._sticky) > _MAX_STICKY_CHATS:
+                        self._sticky.popitem(last=False)
+            state = self._accounts[index]
+            self._selections += 1
+            state.last_selected = self._selections
+            state.in_flight += 1
+            in_flight = state.in_flight
+        name = state.credential.name
+        metrics.increment("adapta_account_calls_total", account=name)
+        metrics.set_gauge("adapta_account_in_flight", in_flight, account=name)
+        return state.credential
+
+    def release(self, credential: Credential, success: Optional[bool] = True, eject: bool = False) -> None:
+        """Devolve a conta ao fim de uma chamada e registra o resultado.
+
+        Args:
+            credential: Conta retornada por ``acquire``.
+            success: True para sucesso, False para falha e None para um
+                resultado que não diz nada sobre a conta (ex.: cancelamento).
+            eject: Afasta a conta imediatamente (credencial recusada).
+        """
+        with self._lock:
+            state = self._accounts[self._by_name[credential.name]]
+            state.in_flight = max(0, state.in_flight - 1)
+            in_flight = state.in_flight
+        metrics.set_gauge("adapta_account_in_flight", in_flight, account=credential.name)
+        self.record(credential, success, eject)
+
+    def record(self, credential: Credential, success: Optional[bool], eject: bool = False) -> None:
+        """Registra o resultado de uma operação na saúde da conta.
+
+        Args:
+            credential: Conta da operação.
+            success: True para sucesso, False para falha e None para neutro.
+            eject: Afasta a conta imediatamente (credencial recusada).
+        """
+        now = time.monotonic()
+        ejected = False
+        with self._lock:
+            state = self._accounts[self._by_name[credential.name]]
+            if success:
+                state.failures = 0
+            elif success is False or eject:
+                state.failures += 1
+                if (eject or state.failures >= self.max_failures) and self._healthy(state, now):
+                    state.ejected_until = now + self.eject_duration
+                    # Ao voltar, uma única falha afasta a conta de novo
+                    state.failures = self.max_failures - 1
+                    ejected = True
+        name = credential.name
+        if success is False or eject:
+            metrics.increment("adapta_account_failures_total", account=name)
+        if ejected:
+            reason = "rejected" if eject else "failures"
+            metrics.increment("adapta_account_ejections_total", account=name, reason=reason)
+            logger.warning(
+                f"Conta {name} afastada por {self.eject_duration:.0f}s "
+                f"({'credencial recusada' if eject else 'falhas consecutivas'})"
+            )
+
+    def status(self) -> List[Dict[str, Any]]:
+        """Retorna o estado de cada conta (para diagnóstico)."""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "name": state.credential.name,
+                    "weight": state.credential.weight,
+                    "in_flight": state.in_flight,
+                    "failures": state.failures,
+                    "healthy": self._healthy(state, now),
+                    "ejected_for": max(0.0, state.ejected_until - now),
+                }
+                for state in self._accounts
+            ]
+
+
+_pool: Optional[CredentialPool] = None
+_pool_key: Optional[Tuple[Any, ...]] = None
+_pool_lock = threading.Lock()
+
+
+def get_credential_pool() -> CredentialPool:
+    """Retorna o pool de credenciais do processo.
+
+    O pool é recriado quando as contas ou os parâmetros do pool mudam.
+    """
+    global _pool, _pool_key
+    credentials = tuple(load_credentials())
+    key = (
+        credentials,
+        settings.adapta_account_strategy,
+        settings.adapta_account_max_failures,
+        settings.adapta_account_eject_duration,
+    )
+    with _pool_lock:
+        if _pool is None or _pool_key != key:
+            _pool = CredentialPool(
+                list(credentials),
+                strategy=settings.adapta_account_strategy,
+                max_failures=settings.adapta_account_max_failures,
+                eject_duration=settings.adapta_account_eject_duration,
+            )
+            _pool_key = key
+        return _pool
+
+
+def _outcome(error: Optional[BaseException]) -> Tuple[Optional[bool], bool]:
+    """Classifica o erro de uma chamada em (sucesso, afastar a conta)."""
+    if error is None:
+        return True, False
+    if isinstance(error, (CircuitOpenError, CoalescedCallAborted)) or not isinstance(error, Exception):
+        # Problema do modelo ou cancelamento: nada a dizer sobre a conta
+        return None, False
+    if isinstance(error, (httpx.TimeoutException, asyncio.TimeoutError)):
+        # Tempo limite (do chamador ou do modelo), não da conta
+        return None, False
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        if status in (401, 403):
+            return False, True
+        if 400 <= status < 500 and status != 429:
+            # Requisição recusada pelo seu conteúdo (ex.: 400, 413)
+            return None, False
+    return False, False
+
+
+class PooledAdaptaClient:
+    """Cliente com a interface de ``AdaptaClient`` que distribui as chamadas entre as contas.
+
+    Chamadas idênticas simultâneas continuam sendo agrupadas entre contas
+    diferentes. Upload e exclusão de arquivos usam a conta principal. Com o
+    pool do processo, mudanças nas contas do ``.env`` valem a partir da
+    próxima chamada.
+    """
+
+    def __init__(self, pool: Optional[CredentialPool] = None, **client_kwargs: Any):
+        """Inicializa o cliente.
+
+        Args:
+            pool: Pool de credenciais (padrão: o pool do processo, que
+                acompanha as mudanças do ``.env``).
+            **client_kwargs: Argumentos repassados a cada ``AdaptaClient``
+                (timeouts, URLs base, política de retentativas).
+        """
+        self._client_kwargs = client_kwargs
+        self._clients: Dict[str, AdaptaClient] = {}
+        # Pool novo do .env, aplicado na próxima chamada
+        self._pending_pool: Optional[CredentialPool] = None
+        self._pending_lock = threading.Lock()
+        self._attach(pool or get_credential_pool())
+        if pool is None:
+            settings.subscribe(self._on_settings_change)
+
+    def _attach(self, pool: CredentialPool) -> None:
+        """Passa a usar ``pool``, reaproveitando os clientes das contas mantidas."""
+        clients: Dict[str, AdaptaClient] = {}
+        for credential in pool.credentials:
+            client = self._clients.get(credential.name)
+            if client is None:
+                client = AdaptaClient(
+                    cookies_str=credential.cookies_str,
+                    session_id=credential.session_id,
+                    **self._client_kwargs,
+                )
+            elif (client.cookies_str, client.session_id) != (credential.cookies_str, credential.session_id):
+                client.set_credentials(credential.cookies_str, credential.session_id)
+            clients[credential.name] = client
+        # As contas pertencem ao mesmo dono: chamadas idênticas podem ser
+        # agrupadas mesmo quando o pool as envia por contas diferentes
+        scope = "pool:" + ",".join(client._credential_key for client in clients.values())
+        for client in clients.values():
+            client._coalesce_scope = scope
+        self._clients = clients
+        self.pool = pool
+
+    def _on_settings_change(self, change: SettingsChange) -> None:
+        # Chamado na thread do observador do .env: os clientes das contas só
+        # são trocados no início da próxima chamada, no event loop dela
+        if any(name in change.changed for name in _ACCOUNT_SETTINGS):
+            pool = get_credential_pool()
+            if pool is not self.pool:
+                logger.info("Contas da Adapta.one alteradas no .env; aplicando na próxima chamada")
+                with self._pending_lock:
+                    self._pending_pool = pool
+
+    def _current_pool(self) -> CredentialPool:
+        """Pool em uso, após aplicar as contas recebidas do ``.env``."""
+        if self._pending_pool is None:
+            return self.pool
+        with self._pending_lock:
+            pool, self._pending_pool = self._pending_pool, None
+        if pool is not None and pool is not self.pool:
+            self._attach(pool)
+        return self.pool
+
+    def _client(self, credential: Credential) -> AdaptaClient:
+        return self._clients[credential.name]
+
+    @property
+    def primary(self) -> AdaptaClient:
+        """Cliente da conta principal."""
+        return self._client(self._current_pool().credentials[0])
+
+    def __getattr__(self, item: str) -> Any:
+        # Demais operações (arquivos, formatos aceitos) usam a conta principal
+        if item.startswith("__") or item in ("pool", "_clients", "_client_kwargs", "_pending_pool"):
+            raise AttributeError(item)
+        return getattr(self.primary, item)
+
+    async def __aenter__(self):
+        await self._ensure_client()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+    async def _ensure_client(self) -> None:
+        self._current_pool()
+        for client in self._clients.values():
+            await client._ensure_client()
+
+    async def aclose(self) -> None:
+        """Fecha os clientes de todas as contas."""
+        for client in self._clients.values():
+            await client.aclose()
+
+    async def call_model(
+        self,
+        messages: List[Dict[str, str]],
+        model: str = "GPT_5",
+        *args: Any,
+        chat_id: Optional[str] = None,
+        **kwargs: Any
+    ) -> Any:
+        """Executa ``AdaptaClient.call_model`` na conta escolhida pelo pool.
+
+        A chamada é feita com ``raise_errors=True`` para que o erro (ex.: 401
+        ou 403, que afastam a conta) seja classificado; o chamador recebe
+        None, como de ``AdaptaClient.call_model``, a menos que também passe
+        ``raise_errors=True``.
+        """
+        raise_errors = kwargs.pop("raise_errors", False)
+        pool = self._current_pool()
+        credential = pool.acquire(chat_id)
+        try:
+            result = await self._client(credential).call_model(
+                messages, model, *args, chat_id=chat_id, raise_errors=True, **kwargs
+            )
+        except BaseException as e:
+            pool.release(credential, *_outcome(e))
+            if raise_errors or not is_call_failure(e):
+                raise
+            return None
+        # Resposta vazia: a API aceitou a chamada, mas não respondeu
+        pool.release(credential, success=result is not None)
+        return result
+
+    async def call_model_stream(
+        self,
+        messages: List[Dict[str, str]],
+        model: str = "GPT_5",
+        *args: Any,
+        chat_id: Optional[str] = None,
+        **kwargs: Any
+    ) -> AsyncIterator[str]:
+        """Executa ``AdaptaClient.call_model_stream`` na conta escolhida pelo pool."""
+        pool = self._current_pool()
+        credential = pool.acquire(chat_id)
+        error: Optional[BaseException] = None
+        try:
+            async for content in self._client(credential).call_model_stream(
+                messages, model, *args, chat_id=chat_id, **kwargs
+            ):
+                yield content
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            pool.release(credential, *_outcome(error))
+
+    async def health_check(self) -> bool:
+        """Verifica todas as contas; afasta as que falharem.
+
+        Returns:
+            True se ao menos uma conta estiver funcionando.
+        """
+        pool = self._current_pool()
+        clients = self._clients
+        credentials = pool.credentials
+        results = await asyncio.gather(
+            *(clients[credential.name].health_check() for credential in credentials)
+        )
+        for credential, healthy in zip(credentials, results):
+            pool.record(credential, success=healthy)
+        return any(results)
+
+
+def create_client(
+    cookies_str: Optional[str] = None,
+    session_id: Optional[str] = None,
+    **client_kwargs: Any
+) -> Union[AdaptaClient, PooledAdaptaClient]:
+    """Cria o cliente de um gerador.
+
+    Clientes da conta principal (cookies omitidos ou iguais a
+    ``ADAPTA_COOKIES_STR``) usam o pool quando há contas adicionais
+    configuradas e acompanham as mudanças de credenciais do ``.env``;
+    credenciais explícitas de outra conta usam um ``AdaptaClient`` fixo.
+
+    Args:
+        cookies_str: String de cookies (padrão: a conta principal).
+        session_id: ID de sessão do Clerk (padrão: o da conta principal).
+        **client_kwargs: Argumentos repassados ao ``AdaptaClient``.
+    """
+    if cookies_str is None:
+        cookies_str = settings.adapta_cookies_str
+    if session_id is None:
+        session_id = settings.adapta_session_id
+    primary = cookies_str == settings.adapta_cookies_str
+    if settings.adapta_accounts and primary:
+        return PooledAdaptaClient(**client_kwargs)
+    client = AdaptaClient(cookies_str=cookies_str, session_id=session_id, **client_kwargs)
+    if primary:
+        # Cookies rotacionados no .env valem sem reiniciar o processo
+        client.follow_settings()
+    return client
+
+
+_shared_clients: Dict[Tuple[Any, ...], Union[AdaptaClient, PooledAdaptaClient]] = {}
+_shared_clients_lock = threading.Lock()
+
+
+def get_shared_client(**client_kwargs: Any) -> Union[AdaptaClient, PooledAdaptaClient]:
+    """Retorna o cliente da conta principal compartilhado pelos geradores.
+
+    Geradores com as mesmas opções (ex.: timeouts) usam um único cliente, em
+    vez de um por gerador. O cliente acompanha as mudanças de credenciais do
+    ``.env`` como os criados por ``create_client``.
+
+    Args:
+        **client_kwargs: Argumentos repassados ao ``AdaptaClient``.
+    """
+    key = tuple(sorted(client_kwargs.items()))
+    with _shared_clients_lock:
+        client = _shared_clients.get(key)
+        if client is None:
+            client = _shared_clients[key] = create_client(**client_kwargs)
+        return client
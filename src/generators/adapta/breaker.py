@@ -0,0 +1,232 @@
+"""Circuit breaker por modelo.
+
+Quando um modelo da Adapta.one degrada, cada chamada ficaria presa até o
+timeout de leitura (600s) dos geradores. O breaker acompanha a taxa de falhas
+recentes de cada ``chatAiModel`` e, acima do limite configurado, passa a
+recusar chamadas imediatamente com ``CircuitOpenError``:
+
+- ``closed``: chamadas liberadas; falhas e sucessos entram na janela;
+- ``open``: chamadas recusadas até o fim do intervalo de espera;
+- ``half_open``: algumas chamadas de teste são liberadas; um sucesso fecha
+  o circuito e uma falha o reabre.
+
+Só contam como falha erros que indicam problema no modelo (timeouts, erros
+de transporte, 429 e 5xx); erros do chamador, como 400, são neutros.
+"""
+
+import threading
+import time
+from collections import deque
+from enum import Enum
+from typing import Deque, Dict, Optional, Tuple
+
+import httpx
+
+from config import settings
+from utils.logger import logger
+from utils.metrics import metrics
+from .retry import RetryAction, RetryPolicy
+
+
+class CircuitState(Enum):
+    """Estados do circuit breaker."""
+
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+
+
+# Valor numérico publicado no gauge ``adapta_breaker_state``
+_STATE_GAUGE = {CircuitState.CLOSED: 0, CircuitState.HALF_OPEN: 1, CircuitState.OPEN: 2}
+
+
+class CircuitOpenError(RuntimeError):
+    """Chamada recusada porque o circuito do modelo está aberto."""
+
+    def __init__(self, model: str, retry_in: float):
+        super().__init__(
+            f"Modelo {model} indisponível (circuit breaker aberto); "
+            f"nova tentativa liberada em {retry_in:.0f}s"
+        )
+        self.model = model
+        self.retry_in = retry_in
+
+
+def is_breaker_failure(error: BaseException) -> bool:
+    """Indica se a falha deve contar contra a saúde do modelo."""
+    if isinstance(error, httpx.HTTPStatusError) and error.response.status_code == 401:
+        return False
+    return RetryPolicy().classify(error) is RetryAction.RETRY
+
+
+class CircuitBreaker:
+    """Circuit breaker baseado na taxa de falhas em uma janela de tempo."""
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float = 0.5,
+        min_calls: int = 5,
+        window: float = 60.0,
+        open_duration: float = 30.0,
+        half_open_probes: int = 1,
+    ):
+        """Inicializa o breaker fechado.
+
+        Args:
+            name: Nome do modelo (usado em logs e métricas).
+            failure_rate: Fração de falhas na janela que abre o circuito.
+            min_calls: Número mínimo de chamadas na janela antes de avaliar a taxa.
+            window: Duração da janela de observação, em segundos.
+            open_duration: Tempo, em segundos, que o circuito fica aberto
+                antes de liberar chamadas de teste.
+            half_open_probes: Chamadas de teste simultâneas no estado half_open.
+        """
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window = window
+        self.open_duration = open_duration
+        self.half_open_probes = half_open_probes
+
+        self._state = CircuitState.CLOSED
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._lock = threading.Lock()
+        self._publish()
+
+    @property
+    def state(self) -> CircuitState:
+        """Estado atual, considerando o fim do intervalo de espera."""
+        with self._lock:
+            self._advance_locked()
+            return self._state
+
+    @property
+    def available(self) -> bool:
+        """Indica se uma chamada seria liberada agora."""
+        with self._lock:
+            self._advance_locked()
+            if self._state is CircuitState.OPEN:
+                return False
+            if self._state is CircuitState.HALF_OPEN:
+                return self._probes_in_flight < self.half_open_probes
+            return True
+
+    @property
+    def retry_in(self) -> float:
+        """Segundos até o circuito aberto liberar chamadas de teste."""
+        with self._lock:
+            if self._state is not CircuitState.OPEN:
+                return 0.0
+            return max(0.0, self.open_duration - (time.monotonic() - self._opened_at))
+
+    def _publish(self) -> None:
+        metrics.set_gauge("adapta_breaker_state", _STATE_GAUGE[self._state], model=self.name)
+
+    def _transition_locked(self, state: CircuitState) -> None:
+        if state is self._state:
+            return
+        previous, self._state = self._state, state
+        if state is CircuitState.OPEN:
+            self._opened_at = time.monotonic()
+        if state is not CircuitState.HALF_OPEN:
+            self._probes_in_flight = 0
+        self._outcomes.clear()
+        metrics.increment("adapta_breaker_transitions_total", model=self.name, state=state.value)
+        self._publish()
+        log = logger.warning if state is CircuitState.OPEN else logger.info
+        log(f"[{self.name}] Circuit breaker: {previous.value} -> {state.value}")
+
+    def _advance_locked(self) -> None:
+        if self._state is CircuitState.OPEN and time.monotonic() - self._opened_at >= self.open_duration:
+            self._transition_locked(CircuitState.HALF_OPEN)
+
+    def check(self) -> None:
+        """Reserva a passagem de uma chamada.
+
+        Cada ``check`` bem-sucedido deve ser seguido de um ``record``.
+
+        Raises:
+            CircuitOpenError: Se o circuito estiver aberto ou sem vagas de teste.
+        """
+        with self._lock:
+            self._advance_locked()
+            if self._state is CircuitState.CLOSED:
+                return
+            if self._state is CircuitState.HALF_OPEN and self._probes_in_flight < self.half_open_probes:
+                self._probes_in_flight += 1
+                return
+            retry_in = max(0.0, self.open_duration - (time.monotonic() - self._opened_at))
+        metrics.increment("adapta_breaker_rejections_total", model=self.name)
+        raise CircuitOpenError(self.name, retry_in)
+
+    def record(self, error: Optional[BaseException] = None) -> None:
+        """Registra o resultado de uma chamada liberada por ``check``.
+
+        Args:
+            error: Falha da chamada, ou None em caso de sucesso. Falhas que não
+                indicam problema no modelo são ignoradas.
+        """
+        failed = error is not None and is_breaker_failure(error)
+        neutral = error is not None and not failed
+        with self._lock:
+            if self._state is CircuitState.HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                if failed:
+                    self._transition_locked(CircuitState.OPEN)
+                elif not neutral:
+                    self._transition_locked(CircuitState.CLOSED)
+                return
+            if self._state is not CircuitState.CLOSED or neutral:
+                return
+
+            now = time.monotonic()
+            self._outcomes.append((now, failed))
+            while self._outcomes and now - self._outcomes[0][0] > self.window:
+                self._outcomes.popleft()
+            if failed and len(self._outcomes) >= self.min_calls:
+                failures = sum(1 for _, f in self._outcomes if f)
+                if failures / len(self._outcomes) >= self.failure_rate:
+                    self._transition_locked(CircuitState.OPEN)
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(model: str) -> CircuitBreaker:
+    """Retorna o circuit breaker compartilhado de um modelo."""
+    with _breakers_lock:
+        breaker = _breakers.get(model)
+        if breaker is None:
+            breaker = _breakers[model] = CircuitBreaker(
+                model,
+                failure_rate=settings.adapta_breaker_failure_rate,
+                min_calls=settings.adapta_breaker_min_calls,
+                window=settings.adapta_breaker_window,
+                open_duration=settings.adapta_breaker_open_duration,
+            )
+        return breaker
+
+
+def select_model(model: str) -> str:
+    """Escolhe o modelo a ser chamado, aplicando o failover configurado.
+
+    Se o circuito de ``model`` estiver aberto e houver um modelo alternativo
+    em ``ADAPTA_BREAKER_FALLBACKS`` com circuito disponível, ele é usado.
+
+    Raises:
+        CircuitOpenError: Se nem o modelo nem o alternativo estiverem disponíveis.
+    """
+    breaker = get_breaker(model)
+    if breaker.available:
+        return model
+    fallback = settings.adapta_breaker_fallbacks.get(model)
+    if fallback and fallback != model and get_breaker(fallback).available:
+        metrics.increment("adapta_breaker_failover_total", model=model, fallback=fallback)
+        logger.warning(f"[{model}] Circuito aberto; usando modelo alternativo {fallback}")
+        return fallback
+    metrics.increment("adapta_breaker_rejections_total", model=model)
+    raise CircuitOpenError(model, breaker.retry_in)
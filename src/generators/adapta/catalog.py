@@ -0,0 +1,204 @@
+"""Catálogo de modelos da Adapta.one.
+
+Os modelos disponíveis são descritos em ``prompts/models_catalog.json``, ao
+lado da configuração dos agentes (``prompts/agentes/models.json``). Cada
+entrada, indexada pelo nome de exibição ("Gemini", "O3", ...), define:
+
+- ``model``: identificador do modelo na API;
+- ``provider_name`` e ``supported_models``: valores informados pelo gerador;
+- ``post_processors``: tratamentos aplicados à resposta (ver ``POST_PROCESSORS``);
+- ``timeout``, ``connect_timeout`` e ``read_timeout``: timeouts do cliente;
+- ``max_concurrency``: teto da janela de concorrência do modelo (opcional);
+- ``capabilities``: ``search``, ``tools`` e ``reasoning``.
+
+Campos omitidos vêm da seção ``defaults``. Adicionar um modelo é só
+adicionar uma entrada ao arquivo; ``ModelGenerator`` o atende.
+
+Este módulo não importa ``config`` nem ``httpx``: listar os modelos é barato.
+"""
+
+import json
+import threading
+from collections.abc import Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from importlib import import_module
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+DEFAULT_CATALOG_PATH = Path(__file__).resolve().parents[2] / "prompts" / "models_catalog.json"
+
+# Nome do pós-processador -> ("módulo:função" sobre o texto completo,
+# "módulo:função" equivalente para respostas em trechos)
+POST_PROCESSORS: Dict[str, Tuple[str, str]] = {
+    "remove_think_tags": (
+        "utils.text_cleaner:remove_think_tags",
+        "utils.text_cleaner:remove_think_tags_stream",
+    ),
+}
+
+CAPABILITIES = ("search", "tools", "reasoning")
+
+
+class CatalogError(ValueError):
+    """Catálogo de modelos ausente ou inválido."""
+
+
+def _resolve(path: str) -> Callable[..., Any]:
+    module_name, _, attribute = path.partition(":")
+    return getattr(import_module(module_name), attribute)
+
+
+def get_post_processor(
+    name: str,
+) -> Tuple[Callable[[str], str], Callable[[AsyncIterator[str]], AsyncIterator[str]]]:
+    """Retorna as funções de um pós-processador: (texto completo, streaming).
+
+    Raises:
+        KeyError: Se o pós-processador não existir.
+    """
+    text_path, stream_path = POST_PROCESSORS[name]
+    return _resolve(text_path), _resolve(stream_path)
+
+
+@dataclass(frozen=True)
+class ModelSpec:
+    """Descrição de um modelo do catálogo.
+
+    Attributes:
+        name: Nome de exibição (chave no catálogo).
+        model: Identificador do modelo na API.
+        provider_name: Nome retornado por ``get_provider_name``.
+        supported_models: Identificadores retornados por ``get_supported_models``.
+        post_processors: Nomes dos pós-processadores, na ordem de aplicação.
+        timeout: Timeout geral do cliente, em segundos.
+        connect_timeout: Timeout de conexão, em segundos.
+        read_timeout: Timeout de leitura, em segundos.
+        max_concurrency: Teto da janela de concorrência (None = padrão global).
+        capabilities: Capacidades suportadas pelo modelo.
+    """
+
+    name: str
+    model: str
+    provider_name: str
+    supported_models: Tuple[str, ...]
+    post_processors: Tuple[str, ...] = ()
+    timeout: Optional[float] = None
+    connect_timeout: Optional[float] = None
+    read_timeout: Optional[float] = None
+    max_concurrency: Optional[int] = None
+    capabilities: frozenset = frozenset()
+
+    def supports(self, capability: str) -> bool:
+        """True se o modelo tiver a capacidade (``search``, ``tools``, ``reasoning``)."""
+        return capability in self.capabilities
+
+    @property
+    def client_options(self) -> Dict[str, Optional[float]]:
+        """Argumentos de timeout repassados ao cliente."""
+        return {
+            "timeout": self.timeout,
+            "connect_timeout": self.connect_timeout,
+            "read_timeout": self.read_timeout,
+        }
+
+
+def _build_spec(name: str, entry: Mapping[str, Any], defaults: Mapping[str, Any]) -> ModelSpec:
+    if not isinstance(entry, Mapping):
+        raise CatalogError(f"Entrada do modelo {name!r} deve ser um objeto")
+    values = {**defaults, **entry}
+    capabilities = {**defaults.get("capabilities", {}), **entry.get("capabilities", {})}
+    unknown = set(capabilities) - set(CAPABILITIES)
+    if unknown:
+        raise CatalogError(f"Capacidades desconhecidas em {name!r}: {sorted(unknown)}")
+
+    model = values.get("model")
+    if not model or not isinstance(model, str):
+        raise CatalogError(f"Modelo {name!r} sem identificador 'model'")
+
+    post_processors = tuple(values.get("post_processors") or ())
+    for processor in post_processors:
+        if processor not in POST_PROCESSORS:
+            raise CatalogError(f"Pós-processador desconhecido em {name!r}: {processor!r}")
+
+    max_concurrency = values.get("max_concurrency")
+    if max_concurrency is not None and (not isinstance(max_concurrency, int) or max_concurrency < 1):
+        raise CatalogError(f"max_concurrency de {name!r} deve ser um inteiro positivo")
+
+    return ModelSpec(
+        name=name,
+        model=model,
+        provider_name=values.get("provider_name") or f"{name}Generator",
+        supported_models=tuple(values.get("supported_models") or (model,)),
+        post_processors=post_processors,
+        timeout=values.get("timeout"),
+        connect_timeout=values.get("connect_timeout"),
+        read_timeout=values.get("read_timeout"),
+        max_concurrency=max_concurrency,
+        capabilities=frozenset(key for key, enabled in capabilities.items() if enabled),
+    )
+
+
+class ModelCatalog(Mapping):
+    """Mapa somente leitura nome de exibição -> ``ModelSpec``, na ordem do arquivo."""
+
+    def __init__(self, specs: List[ModelSpec]):
+        self._specs = {spec.name: spec for spec in specs}
+        self._by_model = {spec.model: spec for spec in specs}
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "ModelCatalog":
+        """Monta o catálogo a partir do conteúdo do arquivo JSON.
+
+        Raises:
+            CatalogError: Se o conteúdo for inválido.
+        """
+        models = data.get("models")
+        if not isinstance(models, Mapping) or not models:
+            raise CatalogError("Catálogo de modelos sem a seção 'models'")
+        defaults = data.get("defaults") or {}
+        return cls([_build_spec(name, entry, defaults) for name, entry in models.items()])
+
+    def __getitem__(self, name: str) -> ModelSpec:
+        return self._specs[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._specs)
+
+    def __len__(self) -> int:
+        return len(self._specs)
+
+    def by_model(self, model: str) -> Optional[ModelSpec]:
+        """Retorna a entrada pelo identificador do modelo na API, se existir."""
+        return self._by_model.get(model)
+
+
+def load_catalog(path: Optional[Union[str, Path]] = None) -> ModelCatalog:
+    """Lê o catálogo de modelos de um arquivo JSON.
+
+    Args:
+        path: Caminho do arquivo (padrão: ``prompts/models_catalog.json``).
+
+    Raises:
+        CatalogError: Se o arquivo não existir ou for inválido.
+    """
+    path = Path(path) if path is not None else DEFAULT_CATALOG_PATH
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        raise CatalogError(f"Catálogo de modelos não encontrado: {path}") from None
+    except json.JSONDecodeError as e:
+        raise CatalogError(f"Catálogo de modelos inválido ({path}): {e}") from e
+    return ModelCatalog.from_dict(data)
+
+
+_catalog: Optional[ModelCatalog] = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog() -> ModelCatalog:
+    """Retorna o catálogo padrão, lido uma única vez por processo."""
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = load_catalog()
+        return _catalog
@@ -0,0 +1,153 @@
+"""Fila de exclusão em segundo plano para conversas temporárias.
+
+Chamadas sem ``chat_id`` criam uma conversa que precisa ser apagada depois.
+Em vez de aguardar essa exclusão antes de devolver a resposta, o cliente
+enfileira o ID e a fila envia as exclusões em lote (campo ``chatIds``) quando
+atinge um tamanho mínimo ou após um intervalo. Falhas são repetidas algumas
+vezes e a fila é esvaziada no encerramento do processo.
+
+A fila e os seus timers vivem no loop de I/O compartilhado (``io_loop``), e
+não no event loop de quem enfileira: os aplicativos Streamlit executam cada
+chamada com ``asyncio.run``, cujo loop deixa de rodar antes do intervalo de
+envio.
+"""
+
+import asyncio
+import weakref
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from utils.logger import logger
+from .io_loop import IoLoop, get_io_loop
+
+
+class ConversationCleanupQueue:
+    """Acumula IDs de conversas temporárias e os apaga em lote."""
+
+    def __init__(
+        self,
+        delete_batch: Callable[[List[str]], Awaitable[None]],
+        batch_size: int = 20,
+        flush_interval: float = 2.0,
+        max_retries: int = 3,
+        io_loop: Optional[IoLoop] = None,
+    ):
+        """Inicializa a fila.
+
+        Args:
+            delete_batch: Corrotina que apaga uma lista de conversas e levanta
+                exceção em caso de falha.
+            batch_size: Quantidade de IDs que dispara uma exclusão imediata.
+            flush_interval: Tempo máximo, em segundos, que um ID aguarda na fila.
+            max_retries: Tentativas por ID antes de desistir.
+            io_loop: Loop onde a fila executa (padrão: o loop de I/O compartilhado).
+        """
+        self._delete_batch = delete_batch
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self._io = io_loop or get_io_loop()
+        self._pending: List[str] = []
+        self._attempts: Dict[str, int] = {}
+        self._timer: Optional[asyncio.Task] = None
+        self._flushing: Optional[asyncio.Task] = None
+
+        _queues.add(self)
+
+    @property
+    def pending(self) -> List[str]:
+        """IDs aguardando exclusão."""
+        return list(self._pending)
+
+    def enqueue(self, chat_id: str) -> None:
+        """Adiciona uma conversa à fila sem bloquear o chamador.
+
+        Pode ser chamado de qualquer thread ou event loop; a exclusão é feita
+        no loop de I/O mesmo que o loop do chamador seja encerrado em seguida.
+        """
+        self._io.call_soon(self._add, chat_id)
+
+    def _add(self, chat_id: str) -> None:
+        """Registra o ID e agenda o envio (executado no loop de I/O)."""
+        self._pending.append(chat_id)
+        loop = asyncio.get_running_loop()
+
+        if len(self._pending) >= self.batch_size:
+            if self._flushing is None or self._flushing.done():
+                self._flushing = loop.create_task(self.flush())
+        elif self._timer is None or self._timer.done():
+            self._timer = loop.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.flush_interval)
+        # Libera o timer antes do envio, para que uma falha possa agendar a
+        # próxima tentativa
+        self._timer = None
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Envia todos os IDs pendentes, em lotes de ``batch_size``."""
+        while self._pending:
+            batch = self._pending[:self.batch_size]
+            del self._pending[:len(batch)]
+            try:
+                await self._delete_batch(batch)
+            except asyncio.CancelledError:
+                # O loop foi encerrado no meio do envio; o lote volta para a fila
+                self._pending[:0] = batch
+                raise
+            except Exception as e:
+                self._requeue_failed(batch, e)
+                return
+            for chat_id in batch:
+                self._attempts.pop(chat_id, None)
+            logger.debug(f"Conversas temporárias excluídas em lote: {len(batch)}")
+
+    def _requeue_failed(self, batch: List[str], error: Exception) -> None:
+        retry = []
+        for chat_id in batch:
+            attempts = self._attempts.get(chat_id, 0) + 1
+            if attempts < self.max_retries:
+                self._attempts[chat_id] = attempts
+                retry.append(chat_id)
+            else:
+                self._attempts.pop(chat_id, None)
+                logger.warning(f"Desistindo de excluir a conversa temporária {chat_id} após {attempts} tentativas")
+        logger.warning(f"Erro ao excluir lote de conversas temporárias (não crítico): {error}")
+        if retry:
+            self._pending[:0] = retry
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                return
+            if self._timer is None or self._timer.done():
+                self._timer = loop.create_task(self._flush_later())
+
+    async def drain(self) -> None:
+        """Cancela o timer e apaga imediatamente tudo o que estiver pendente.
+
+        Pode ser aguardado de qualquer event loop; o envio roda no loop de I/O.
+        """
+        await self._io.run(self._drain())
+
+    async def _drain(self) -> None:
+        if self._timer is not None and not self._timer.done():
+            self._timer.cancel()
+        for _ in range(self.max_retries):
+            if not self._pending:
+                break
+            await self.flush()
+
+
+_queues: "weakref.WeakSet[ConversationCleanupQueue]" = weakref.WeakSet()
+
+
+async def _drain_all() -> None:
+    """Esvazia as filas com itens pendentes (executado no encerramento do processo)."""
+    queues = [queue for queue in _queues if queue.pending]
+    if queues:
+        await asyncio.gather(*(queue._drain() for queue in queues), return_exceptions=True)
+
+
+# Registrada na importação, antes do cliente HTTP compartilhado, que só é
+# fechado depois que as filas forem esvaziadas
+get_io_loop().at_shutdown(_drain_all)
@@ -5,14 +5,30 @@ fornecendo autenticação, gerenciamento de sessão e métodos para chamadas de
 """
 
 import asyncio
+import threading
+import time
 import uuid
-from typing import Dict, List, Optional, Any
+from dataclasses import replace
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, Union
 from pathlib import Path
 
 import httpx
 
-from config import settings
+from config import SettingsChange, settings
 from utils.logger import logger
+from utils.metrics import metrics
+from utils.response_cache import CacheMode, current_cache_mode, get_response_cache, make_cache_key
+from .breaker import CircuitOpenError, get_breaker, select_model
+from .cleanup import ConversationCleanupQueue
+from .coalesce import CoalescedCallAborted, coalesce_key, get_single_flight
+from .hedging import get_hedge_budget, hedge_delay, hedge_model
+from .limiter import get_limiter
+from .pool import credential_key, get_registry
+from .ratelimit import get_rate_limiter
+from .retry import RetryPolicy
+from .stream_protocol import EventKind, StreamError, aiter_events, extract_text, parse_stream
+from .usage import CallResult, UsageAccumulator
 
 
 # Formatos de arquivo aceitos para upload
@@ -21,6 +37,15 @@ FORMATOS_ACEITOS = {
 }
 
 
+def is_call_failure(error: BaseException) -> bool:
+    """True se ``call_model`` sinaliza ``error`` retornando None.
+
+    Circuito aberto, cancelamento e chamadas agrupadas interrompidas são
+    sempre repassados ao chamador.
+    """
+    return isinstance(error, Exception) and not isinstance(error, (CircuitOpenError, CoalescedCallAborted))
+
+
 class AdaptaClient:
     """Cliente assíncrono para a API Adapta.one.
     
@@ -36,6 +61,10 @@ class AdaptaClient:
         connect_timeout: Optional[float] = None,
         read_timeout: Optional[float] = None,
         session_id: Optional[str] = None, 
+        session_refresh_margin: float = 10.0,
+        api_base_url: Optional[str] = None,
+        clerk_base_url: Optional[str] = None,
+        retry_policy: Optional[RetryPolicy] = None,
     ):
         """Inicializa o cliente Adapta.
         
@@ -45,31 +74,111 @@ class AdaptaClient:
             timeout: Timeout geral em segundos (None = sem timeout).
             connect_timeout: Timeout de conexão em segundos (None = sem timeout).
             read_timeout: Timeout de leitura em segundos (None = sem timeout).
+            session_id: ID de sessão do Clerk.
+            session_refresh_margin: Antecedência, em segundos, com que o JWT de
+                sessão é renovado antes de expirar.
+            api_base_url: URL base da API de chat (padrão: https://api.adapta.one).
+            clerk_base_url: URL base da API do Clerk.
+            retry_policy: Política de retentativas das chamadas de modelo
+                (padrão: lida das configurações).
         """
         self.cookies_str = cookies_str
         self.user_id = user_id or "user_2yPVNPe0Wc1yTd83pzslODn0it2"
-        self.clerk_base_url = "https://clerk.adapta.one/v1"
+        self.clerk_base_url = clerk_base_url or "https://clerk.adapta.one/v1"
+        self.api_base_url = api_base_url or "https://api.adapta.one"
         self.client: Optional[httpx.AsyncClient] = None
         self.session_id: Optional[str] = None
         
+        self.retry_policy = retry_policy or RetryPolicy.from_settings()
+        
         # Configurações de timeout
         self.timeout = timeout
         self.connect_timeout = connect_timeout
         self.read_timeout = read_timeout
         
+        self._session_refresh_margin = session_refresh_margin
+        self._credential_key = ""
+        # Escopo do agrupamento de chamadas idênticas (o pool de contas usa um
+        # escopo comum a todas as suas contas)
+        self._coalesce_scope = ""
+        self.set_credentials(cookies_str, session_id)
+        # Credencial nova do .env, aplicada pelo próprio cliente na próxima requisição
+        self._pending_credentials: Optional[Tuple[Optional[str], Optional[str]]] = None
+        self._pending_lock = threading.Lock()
+
+        # Headers padrão
+        self.headers = self._default_headers()
+
+        # Conversas temporárias são apagadas em lote, fora do caminho crítico
+        self._cleanup_queue = ConversationCleanupQueue(
+            partial(self._delete_conversations, raise_errors=True),
+            batch_size=settings.adapta_cleanup_batch_size,
+            flush_interval=settings.adapta_cleanup_flush_interval,
+        )
+    
+    def set_credentials(self, cookies_str: Optional[str], session_id: Optional[str] = None) -> None:
+        """Define os cookies e o ID de sessão usados pelo cliente.
+        
+        Pode ser chamado com o cliente em uso (ex.: cookies rotacionados no
+        ``.env``): as requisições em andamento terminam com a credencial
+        anterior e as seguintes usam a nova.
+        
+        Args:
+            cookies_str: String de cookies do navegador.
+            session_id: ID de sessão do Clerk.
+        """
+        self.cookies_str = cookies_str
         # Parse dos cookies se fornecidos
         if cookies_str:
             sanitized_cookies = cookies_str.strip().strip("'\"")
-            self.cookies = self._parse_cookies(sanitized_cookies)
+            cookies = self._parse_cookies(sanitized_cookies)
         else:
-            self.cookies = {}
+            cookies = {}
 
-        if session_id:
-            self.session_id = session_id.strip().strip("'\"")
-            #logger.info(f"Usando session_id fornecida: {self.session_id}")
+        session_id = session_id.strip().strip("'\"") if session_id else None
 
-        # Headers padrão
-        self.headers = self._default_headers()
+        # Reaproveita o JWT de sessão até pouco antes de expirar. O cache é
+        # compartilhado entre todos os clientes que usam a mesma credencial.
+        key = credential_key(cookies, session_id)
+        session_cache = get_registry().get_session_cache(
+            key,
+            refresh_margin=self._session_refresh_margin,
+        )
+        if session_cache.token is None and cookies.get("__session"):
+            session_cache.set(cookies["__session"])
+
+        self.cookies = cookies
+        self.session_id = session_id
+        self._session_cache = session_cache
+        if self._coalesce_scope == self._credential_key:
+            self._coalesce_scope = key
+        self._credential_key = key
+    
+    def follow_settings(self) -> None:
+        """Passa a acompanhar a conta principal do ``.env``.
+        
+        Quando ``ADAPTA_COOKIES_STR`` ou ``ADAPTA_SESSION_ID`` mudam, a nova
+        credencial vale a partir da próxima requisição, sem reiniciar o processo.
+        """
+        settings.subscribe(self._on_settings_change)
+    
+    def _on_settings_change(self, change: SettingsChange) -> None:
+        # Chamado na thread do observador do .env: só guarda a credencial
+        # nova, que o cliente aplica no início da próxima requisição, sem
+        # alterar os cookies e a sessão de requisições em andamento
+        if {"adapta_cookies_str", "adapta_session_id"} & change.changed:
+            logger.info("Credenciais da Adapta.one alteradas no .env; aplicando na próxima requisição")
+            with self._pending_lock:
+                self._pending_credentials = (change.new.adapta_cookies_str, change.new.adapta_session_id)
+    
+    def _apply_pending_credentials(self) -> None:
+        """Aplica a credencial recebida do ``.env``, se houver."""
+        if self._pending_credentials is None:
+            return
+        with self._pending_lock:
+            pending, self._pending_credentials = self._pending_credentials, None
+        if pending is not None:
+            self.set_credentials(*pending)
     
     def _default_headers(self) -> Dict[str, str]:
         """Retorna os headers padrão para as requisições.
@@ -125,35 +234,66 @@ class AdaptaClient:
     async def __aenter__(self):
         """Context manager entry."""
         await self._ensure_client()
-        await self._update_session()
+        await self._ensure_session()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Context manager exit."""
-        if self.client:
-            await self.client.aclose()
+        """Context manager exit.
 
-    async def _ensure_client(self) -> None:
-        """Garante que o cliente HTTP est inicializado e aberto."""
-        if self.client is None or self.client.is_closed:
-            if self.client is not None:
-                await self.client.aclose()
-            if self.timeout is None and self.connect_timeout is None and self.read_timeout is None:
-                timeout_config = None
-            else:
-                timeout_config = httpx.Timeout(
-                    timeout=self.timeout or 300.0,
-                    connect=self.connect_timeout or 60.0,
-                    read=self.read_timeout or 300.0,
-                )
+        O cliente HTTP pertence ao pool compartilhado e não é fechado aqui.
+        """
+        await self.aclose()
 
-            self.client = httpx.AsyncClient(
-                timeout=timeout_config,
-                follow_redirects=True,
-            )
+    async def aclose(self) -> None:
+        """Apaga as conversas temporárias pendentes e libera o cliente HTTP."""
+        await self._cleanup_queue.drain()
+        self.client = None
 
-            if not self.session_id:
-                await self._update_credentials()
+    @property
+    def _timeout_config(self) -> Optional[httpx.Timeout]:
+        """Timeouts aplicados a cada requisição deste cliente."""
+        if self.timeout is None and self.connect_timeout is None and self.read_timeout is None:
+            return None
+        return httpx.Timeout(
+            timeout=self.timeout or 300.0,
+            connect=self.connect_timeout or 60.0,
+            read=self.read_timeout or 300.0,
+        )
+
+    async def _acquire_rate(self, kind: str = "api") -> None:
+        """Aguarda o limitador de taxa da conta antes de uma requisição.
+
+        Args:
+            kind: ``api`` (conversas e arquivos) ou ``clerk`` (autenticação).
+        """
+        bucket = get_rate_limiter(self._credential_key, kind)
+        if bucket is not None:
+            waited = await bucket.acquire()
+            if waited > 0:
+                logger.debug(f"Limite de taxa da conta ({kind}): aguardou {waited:.2f}s")
+
+    def rate_limit_wait_time(self, kind: str = "api") -> float:
+        """Segundos até que uma nova requisição seja liberada pelo limitador da conta.
+
+        Não consome a cota; permite que a interface avise que a conta está
+        ocupada antes de enfileirar uma chamada.
+
+        Args:
+            kind: ``api`` (conversas e arquivos) ou ``clerk`` (autenticação).
+
+        Returns:
+            Espera estimada (0 = imediata).
+        """
+        bucket = get_rate_limiter(self._credential_key, kind)
+        return bucket.wait_time() if bucket is not None else 0.0
+
+    async def _ensure_client(self) -> None:
+        """Garante que o cliente HTTP compartilhado do event loop atual está disponível."""
+        self._apply_pending_credentials()
+        self.client = get_registry().get_client()
+
+        if not self.session_id:
+            await self._update_credentials()
 
     async def _update_credentials(self) -> None:
         """Atualiza as credenciais do cliente, incluindo o session_id."""
@@ -171,10 +311,13 @@ class AdaptaClient:
             client_url = f"{self.clerk_base_url}/client?__clerk_api_version=2024-10-01&_clerk_js_version=5.55.1"
             logger.debug(f"Fazendo requisição para: {client_url}")
 
+            await self._acquire_rate("clerk")
+
             response = await self.client.get(
                 client_url,
                 headers=self.headers,
                 cookies=self.cookies,
+                timeout=self._timeout_config,
             )
             logger.debug(f"Resposta da API: Status {response.status_code}")
 
@@ -223,8 +366,27 @@ class AdaptaClient:
             logger.error(f"Tipo do erro: {type(e).__name__}")
             raise
 
-    async def _update_session(self) -> None:
-        """Atualiza o cookie __session com o token JWT atualizado."""
+    async def _ensure_session(self) -> str:
+        """Garante um token de sessão válido, renovando-o apenas se necessário.
+
+        O JWT em cache é reaproveitado até pouco antes do seu ``exp``. Se várias
+        chamadas concorrentes encontrarem o token vencido, somente uma delas
+        executa o ``touch`` no Clerk.
+
+        Returns:
+            Token JWT de sessão válido.
+        """
+        token = await self._session_cache.get_or_refresh(self._update_session)
+        self.cookies["__session"] = token
+        self.cookies["__session_xcsZUTdN"] = token
+        return token
+
+    async def _update_session(self) -> str:
+        """Atualiza o cookie __session com o token JWT atualizado.
+
+        Returns:
+            Novo token JWT de sessão.
+        """
         if not self.client or not self.session_id:
             logger.error("Cliente ou session_id não inicializado")
             raise RuntimeError("Cliente ou session_id não inicializado")
@@ -240,11 +402,14 @@ class AdaptaClient:
             #logger.debug(f"HEADERS: {touch_headers}")
             #logger.debugf"Cookies: {self.cookies}")
 
+            await self._acquire_rate("clerk")
+
             response = await self.client.post(
                 touch_url,
                 headers=touch_headers,
                 cookies=self.cookies,
                 content="active_organization_id=",
+                timeout=self._timeout_config,
             )
             response.raise_for_status()
 
@@ -258,6 +423,7 @@ class AdaptaClient:
             self.cookies["__session_xcsZUTdN"] = session_jwt
 
             logger.debug(f"Sessão atualizada com sucesso. Token: {session_jwt[:20]}...")
+            return session_jwt
 
         except httpx.HTTPError as e:
             logger.error(f"Erro ao atualizar sessão: {e}")
@@ -302,7 +468,7 @@ class AdaptaClient:
             httpx.HTTPError: Se a requisição falhar.
         """
         await self._ensure_client()
-        await self._update_session()
+        await self._ensure_session()
         
         if not self.client:
             logger.error("Cliente HTTP não inicializado")
@@ -317,12 +483,15 @@ class AdaptaClient:
         if headers:
             request_headers.update(headers)
         
+        await self._acquire_rate("api")
+        
         try:
             response = await self.client.request(
                 method=method,
                 url=url,
                 headers=request_headers,
                 cookies=self.cookies,
+                timeout=self._timeout_config,
                 **kwargs
             )
             response.raise_for_status()
@@ -380,7 +549,7 @@ class AdaptaClient:
             
             url = 'https://adapta-one-services-production.up.railway.app/v1/files'
             await self._ensure_client()
-            await self._update_session()
+            await self._ensure_session()
             
             arquivo_headers = self.headers.copy()
             arquivo_headers['origin'] = "https://app.adapta.one"
@@ -426,7 +595,7 @@ class AdaptaClient:
         try:
             url = f'https://app.adapta.one/api/v1/file/{id_arquivo}'
             await self._ensure_client()
-            await self._update_session()
+            await self._ensure_session()
             
             arquivo_headers = self.headers.copy()
             arquivo_headers['origin'] = "https://app.adapta.one"
@@ -451,10 +620,21 @@ class AdaptaClient:
         new_line: bool = True,
         searchType: Optional[str] = None,
         tool: Optional[str] = None,
-        chat_id: Optional[str] = None
-    ) -> Optional[str]:
+        chat_id: Optional[str] = None,
+        hedge: bool = False,
+        cache: bool = False,
+        detailed: bool = False,
+        raise_errors: bool = False
+    ) -> Optional[Union[str, CallResult]]:
         """Chama um modelo específico da API Adapta.one.
         
+        Chamadas idênticas simultâneas em conversas temporárias (sem
+        ``chat_id``) compartilham uma única requisição e o mesmo resultado.
+        Com ``cache=True``, a resposta é guardada no cache persistente de
+        respostas; o uso do cache pode ser alterado com
+        ``utils.response_cache.cache_mode``. O uso de tokens e o motivo de
+        término de cada resposta são agregados por modelo em ``utils.metrics``.
+        
         Args:
             messages: Lista de mensagens para o modelo.
             model: Nome do modelo (GPT, GEMINI, CLAUDE, etc.).
@@ -462,11 +642,114 @@ class AdaptaClient:
             searchType: O tipo de pesquisa a ser realizada (ex: 'normal', 'scientific').
             tool: A ferramenta a ser usada (ex: 'PERFORM_RESEARCH').
             chat_id: O ID do chat a ser usado para manter a conversa.
+            hedge: Se True, dispara uma cópia da chamada quando ela excede o
+                p90 de latência do modelo (ignorado em conversas persistentes).
+            cache: Se True, reaproveita respostas anteriores da mesma chamada
+                (ignorado em conversas persistentes). Use apenas em tarefas
+                determinísticas, como resumos e diagramas. Só são guardadas
+                respostas do próprio ``model``.
+            detailed: Se True, retorna um ``CallResult`` com o texto, o uso de
+                tokens, o motivo de término, os tempos e os tamanhos da
+                requisição e da resposta.
+            raise_errors: Se True, repassa ao chamador o erro da chamada em vez
+                de retornar None (usado pelo pool de contas para classificar
+                a falha).
+            
+        Returns:
+            Conteúdo da resposta extraído (ou ``CallResult``, com
+            ``detailed=True``) ou None se houver erro ou a resposta vier vazia.
             
+        Raises:
+            CircuitOpenError: Se o circuito do modelo (e do alternativo
+                configurado) estiver aberto.
+            Exception: O erro da chamada (ex.: ``httpx.HTTPStatusError``, ou
+                ``StreamError`` se a resposta trouxer um frame de erro), com
+                ``raise_errors=True``.
+        """
+        try:
+            result = await self._call_model_cached(
+                messages, model, new_line, searchType, tool, chat_id, hedge, cache
+            )
+        except Exception as e:
+            if raise_errors or not is_call_failure(e):
+                raise
+            return None
+        if result is None:
+            return None
+        return result if detailed else result.text
+    
+    async def _call_model_cached(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        new_line: bool,
+        searchType: Optional[str],
+        tool: Optional[str],
+        chat_id: Optional[str],
+        hedge: bool,
+        cache: bool,
+    ) -> Optional[CallResult]:
+        """Executa ``call_model`` consultando o cache de respostas; erros são repassados."""
+        if chat_id:
+            return await self._call_model_once(messages, model, new_line, searchType=searchType, tool=tool, chat_id=chat_id)
+        
+        response_cache = get_response_cache() if cache else None
+        mode = current_cache_mode()
+        cache_key: Optional[str] = None
+        if response_cache is not None and mode is not CacheMode.BYPASS:
+            cache_key = make_cache_key(model, messages, new_line, searchType, tool)
+            if mode is CacheMode.USE:
+                cached = response_cache.get(cache_key)
+                if cached is not None:
+                    logger.debug(f"Resposta de {model} obtida do cache ({len(cached)} caracteres)")
+                    return CallResult(text=cached, model=model, cached=True)
+        
+        key = coalesce_key("call", self._coalesce_scope, model, messages, new_line, searchType, tool)
+        result = await get_single_flight().call(
+            key,
+            lambda: self._call_model_uncoalesced(messages, model, new_line, searchType, tool, hedge),
+            label=model,
+        )
+        if result is not None and cache_key is not None and result.model == model:
+            # Respostas do modelo alternativo (failover ou hedging) não ficam
+            # no cache: a chave é a do modelo pedido
+            response_cache.set(cache_key, result.text)
+        return result
+    
+    async def _call_model_uncoalesced(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        new_line: bool,
+        searchType: Optional[str],
+        tool: Optional[str],
+        hedge: bool,
+    ) -> Optional[CallResult]:
+        """Executa a chamada compartilhada, com ou sem hedging."""
+        if hedge:
+            return await self._call_model_hedged(messages, model, new_line, searchType=searchType, tool=tool)
+        return await self._call_model_once(messages, model, new_line, searchType=searchType, tool=tool)
+    
+    async def _call_model_once(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        new_line: bool = True,
+        searchType: Optional[str] = None,
+        tool: Optional[str] = None,
+        chat_id: Optional[str] = None
+    ) -> Optional[CallResult]:
+        """Faz uma única chamada ao modelo, sem agrupamento nem hedging.
+        
         Returns:
-            Conteúdo da resposta extraído ou None se houver erro.
+            Resultado da chamada ou None se a resposta vier vazia.
+            
+        Raises:
+            Exception: O erro da chamada, depois das retentativas.
         """
+        start = time.monotonic()
         try:
+            model = select_model(model)
             logger.debug(f"Iniciando call_model para modelo: {model}")
             logger.debug(f"Número de mensagens: {len(messages)}")
             
@@ -477,10 +760,24 @@ class AdaptaClient:
                 logger.debug(f"Tamanho da resposta: {len(response.text)} caracteres")
                 
                 if response.status_code == 200:
-                    content = self._extract_content(response.text, new_line)
+                    usage = UsageAccumulator()
+                    content = self._extract_content(response.text, new_line, usage=usage)
+                    request_bytes = len(response.request.content)
+                    usage.record(model, request_bytes=request_bytes, response_bytes=len(response.content))
                     if content:
                         logger.debug(f"Conteúdo extraído com sucesso: {len(content)} caracteres")
-                        return content
+                        duration = time.monotonic() - start
+                        metrics.observe("adapta_call_latency_seconds", duration, model=model)
+                        return CallResult(
+                            text=content,
+                            model=model,
+                            finish_reason=usage.finish_reason,
+                            upstream_seconds=response.elapsed.total_seconds(),
+                            duration_seconds=duration,
+                            request_bytes=request_bytes,
+                            response_bytes=len(response.content),
+                            **usage.usage(),
+                        )
                     else:
                         logger.error("Conteúdo extraído está vazio")
                         return None
@@ -491,30 +788,407 @@ class AdaptaClient:
                 logger.error("Resposta da conversa é None")
                 return None
             
+        except CircuitOpenError:
+            raise
         except Exception as e:
             logger.error(f"Erro ao chamar modelo {model}: {e}")
             logger.error(f"Tipo do erro: {type(e).__name__}")
-            return None
+            raise
     
-    async def _create_conversation(
+    async def call_model_stream(
+        self,
+        messages: List[Dict[str, str]],
+        model: str = "GPT_5",
+        new_line: bool = True,
+        searchType: Optional[str] = None,
+        tool: Optional[str] = None,
+        chat_id: Optional[str] = None,
+        hedge: bool = False
+    ) -> AsyncIterator[str]:
+        """Chama um modelo e produz o conteúdo da resposta à medida que chega.
+        
+        Diferente de ``call_model``, o corpo da resposta não é acumulado em
+        memória: cada frame de texto é decodificado assim que é recebido.
+        Conversas temporárias (sem ``chat_id``) são apagadas ao final do stream,
+        e streams idênticos simultâneos compartilham uma única requisição: quem
+        chega depois recebe o stream reproduzido desde o início.
+        
+        Args:
+            messages: Lista de mensagens para o modelo.
+            model: Nome do modelo (GPT, GEMINI, CLAUDE, etc.).
+            new_line: Se True, mantém quebras de linha; caso contrário, substitui por espaços.
+            searchType: O tipo de pesquisa a ser realizada (ex: 'normal', 'scientific').
+            tool: A ferramenta a ser usada (ex: 'PERFORM_RESEARCH').
+            chat_id: O ID do chat a ser usado para manter a conversa.
+            hedge: Se True, dispara uma cópia da chamada quando o primeiro
+                trecho não chega dentro do p90 do modelo (ignorado em
+                conversas persistentes).
+            
+        Yields:
+            Trechos do conteúdo da resposta, na ordem em que chegam.
+            
+        Raises:
+            httpx.HTTPError: Se a requisição falhar.
+            StreamError: Se a API informar um erro no meio do stream.
+            CircuitOpenError: Se o circuito do modelo (e do alternativo
+                configurado) estiver aberto.
+        """
+        if chat_id:
+            async for content in self._call_model_stream_once(messages, model, new_line, searchType=searchType, tool=tool, chat_id=chat_id):
+                yield content
+            return
+        
+        key = coalesce_key("stream", self._coalesce_scope, model, messages, new_line, searchType, tool)
+        shared = get_single_flight().stream(
+            key,
+            lambda: self._call_model_stream_uncoalesced(messages, model, new_line, searchType, tool, hedge),
+            label=model,
+        )
+        async for content in shared:
+            yield content
+    
+    def _call_model_stream_uncoalesced(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        new_line: bool,
+        searchType: Optional[str],
+        tool: Optional[str],
+        hedge: bool,
+    ) -> AsyncIterator[str]:
+        """Abre o stream compartilhado, com ou sem hedging."""
+        if hedge:
+            return self._call_model_stream_hedged(messages, model, new_line, searchType=searchType, tool=tool)
+        return self._call_model_stream_once(messages, model, new_line, searchType=searchType, tool=tool)
+    
+    async def _call_model_stream_once(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        new_line: bool = True,
+        searchType: Optional[str] = None,
+        tool: Optional[str] = None,
+        chat_id: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """Faz um único stream do modelo, sem agrupamento nem hedging."""
+        start = time.monotonic()
+        model = select_model(model)
+        logger.debug(f"Iniciando call_model_stream para modelo: {model}")
+        
+        # Só a abertura do stream é repetida; depois do primeiro byte a
+        # resposta já foi parcialmente entregue ao chamador.
+        response, current_chat_id, time_to_headers = await self.retry_policy.execute(
+            lambda: self._open_conversation_stream(messages, model, searchType=searchType, tool=tool, chat_id=chat_id),
+            refresh_session=self._session_cache.invalidate,
+            label=model,
+        )
+        
+        # A vaga no limitador de concorrência ocupada na abertura do stream só é
+        # liberada quando a resposta termina de chegar.
+        limiter = get_limiter(model)
+        usage = UsageAccumulator()
+        stream_error: Optional[BaseException] = None
+        first_content = True
+        try:
+            async for event in aiter_events(response.aiter_text()):
+                usage.add(event)
+                if event.kind is EventKind.ERROR:
+                    logger.error(f"Erro informado no stream de {model}: {event.value}")
+                    raise StreamError(str(event.value))
+                if event.kind is not EventKind.TEXT or not event.value:
+                    continue
+                if first_content:
+                    first_content = False
+                    metrics.observe("adapta_time_to_first_token_seconds", time.monotonic() - start, model=model)
+                yield event.value if new_line else event.value.replace("\n", " ")
+        except Exception as e:
+            stream_error = e
+            raise
+        else:
+            usage.record(
+                model,
+                request_bytes=len(response.request.content),
+                response_bytes=response.num_bytes_downloaded,
+            )
+        finally:
+            await response.aclose()
+            limiter.release(latency=None if stream_error else time_to_headers, error=stream_error)
+            get_breaker(model).record(error=stream_error)
+            # Apaga a conversa APENAS se o chat_id foi gerado por esta chamada (não persistente)
+            if not chat_id:
+                self._cleanup_queue.enqueue(current_chat_id)
+    
+    async def _call_model_hedged(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        new_line: bool = True,
+        searchType: Optional[str] = None,
+        tool: Optional[str] = None,
+    ) -> Optional[CallResult]:
+        """Executa ``call_model`` disparando uma cópia se a resposta atrasar.
+        
+        A primeira resposta válida vence; a outra chamada é cancelada e sua
+        conversa temporária é apagada.
+        """
+        budget = get_hedge_budget()
+        budget.record_request()
+        delay = hedge_delay("adapta_call_latency_seconds", model)
+        
+        primary = asyncio.ensure_future(
+            self._call_model_once(messages, model, new_line, searchType=searchType, tool=tool)
+        )
+        tasks = [primary]
+        try:
+            if delay is not None:
+                await asyncio.wait(tasks, timeout=delay)
+            if primary.done() or delay is None or not budget.try_spend():
+                return await primary
+            
+            alternate = hedge_model(model)
+            metrics.increment("adapta_hedges_total", model=model, hedge=alternate)
+            logger.debug(f"[{model}] Sem resposta após {delay:.2f}s; disparando cópia em {alternate}")
+            tasks.append(asyncio.ensure_future(
+                self._call_model_once(messages, alternate, new_line, searchType=searchType, tool=tool)
+            ))
+            
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None and task.result() is not None:
+                        winner = "primary" if task is primary else "hedge"
+                        metrics.increment("adapta_hedge_wins_total", model=model, winner=winner)
+                        return task.result()
+            # Nenhuma das chamadas produziu resposta
+            return await primary
+        finally:
+            await self._cancel_tasks(tasks)
+    
+    async def _call_model_stream_hedged(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        new_line: bool = True,
+        searchType: Optional[str] = None,
+        tool: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        """Executa ``call_model_stream`` disparando uma cópia se o primeiro trecho atrasar.
+        
+        O stream que entregar o primeiro trecho vence e é repassado ao
+        chamador; o outro é fechado e sua conversa temporária é apagada.
+        """
+        budget = get_hedge_budget()
+        budget.record_request()
+        delay = hedge_delay("adapta_time_to_first_token_seconds", model)
+        
+        streams = {}
+        primary = self._call_model_stream_once(messages, model, new_line, searchType=searchType, tool=tool)
+        first_task = asyncio.ensure_future(primary.__anext__())
+        streams[first_task] = primary
+        winner: Optional[AsyncIterator[str]] = None
+        first_content: Optional[str] = None
+        try:
+            if delay is not None:
+                await asyncio.wait([first_task], timeout=delay)
+            if not first_task.done() and delay is not None and budget.try_spend():
+                alternate = hedge_model(model)
+                metrics.increment("adapta_hedges_total", model=model, hedge=alternate)
+                logger.debug(f"[{model}] Sem primeiro trecho após {delay:.2f}s; disparando cópia em {alternate}")
+                hedge = self._call_model_stream_once(messages, alternate, new_line, searchType=searchType, tool=tool)
+                streams[asyncio.ensure_future(hedge.__anext__())] = hedge
+            
+            pending = set(streams)
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    error = task.exception()
+                    if error is None or isinstance(error, StopAsyncIteration):
+                        winner = streams[task]
+                        first_content = None if error else task.result()
+                        break
+            if winner is None:
+                # Todas as cópias falharam: repassa o erro da chamada original
+                first_task.result()
+            elif len(streams) > 1:
+                label = "primary" if winner is primary else "hedge"
+                metrics.increment("adapta_hedge_wins_total", model=model, winner=label)
+        finally:
+            await self._cancel_tasks([task for task in streams if streams[task] is not winner])
+            for stream in streams.values():
+                if stream is not winner:
+                    await stream.aclose()
+        
+        if first_content is None:
+            return
+        yield first_content
+        async for content in winner:
+            yield content
+    
+    @staticmethod
+    async def _cancel_tasks(tasks: List["asyncio.Future[Any]"]) -> None:
+        """Cancela as tarefas pendentes e aguarda sua finalização."""
+        pending = [task for task in tasks if not task.done()]
+        for task in pending:
+            task.cancel()
+        # gather também marca como lidas as falhas das tarefas já concluídas
+        await asyncio.gather(*tasks, return_exceptions=True)
+    
+    async def _open_conversation_stream(
         self,
         messages: List[Dict[str, str]],
         model: str,
         searchType: Optional[str] = None,
         tool: Optional[str] = None,
         chat_id: Optional[str] = None
-    ) -> Optional[httpx.Response]:
+    ) -> Tuple[httpx.Response, str, float]:
+        """Envia a requisição de conversa e retorna a resposta ainda não lida.
+        
+        Returns:
+            Tupla (resposta em modo stream, chat_id usado, segundos até os
+            headers da resposta). A vaga no limitador
+            de concorrência do modelo permanece ocupada e deve ser liberada
+            pelo chamador quando a resposta terminar, assim como o resultado
+            deve ser registrado no circuit breaker do modelo.
+            
+        Raises:
+            httpx.HTTPStatusError: Se a API responder com erro.
+            CircuitOpenError: Se o circuito do modelo estiver aberto.
+        """
+        await self._ensure_client()
+        token = await self._ensure_session()
+        
+        if not self.client:
+            logger.error("Cliente HTTP não inicializado")
+            raise RuntimeError("Cliente HTTP não inicializado")
+        
+        current_chat_id = chat_id if chat_id else self._generate_random_id()
+        url, headers, payload = self._build_conversation_request(
+            messages, model, current_chat_id, token, searchType=searchType, tool=tool
+        )
+        request = self.client.build_request(
+            "POST",
+            url,
+            headers=headers,
+            cookies=self.cookies,
+            json=payload,
+            timeout=self._timeout_config,
+        )
+        
+        breaker = get_breaker(model)
+        breaker.check()
+        limiter = get_limiter(model)
+        try:
+            # A cota da conta é aguardada antes de ocupar uma vaga do modelo
+            await self._acquire_rate("api")
+            await limiter.acquire()
+        except BaseException as e:
+            breaker.record(error=e)
+            raise
+        start = time.monotonic()
+        try:
+            response = await self.client.send(request, stream=True)
+            if response.is_error:
+                await response.aread()
+                await response.aclose()
+                logger.error(f"Erro HTTP no stream: {response.status_code} - {response.text[:200]}")
+                response.raise_for_status()
+        except Exception as e:
+            limiter.release(error=e)
+            breaker.record(error=e)
+            raise
+        except BaseException as e:
+            limiter.release()
+            breaker.record(error=e)
+            # Cancelada (ex.: perdeu a corrida de um hedge) depois do envio
+            if not chat_id:
+                self._cleanup_queue.enqueue(current_chat_id)
+            raise
+        return response, current_chat_id, time.monotonic() - start
+    
+    def _build_conversation_request(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        chat_id: str,
+        token: str,
+        searchType: Optional[str] = None,
+        tool: Optional[str] = None,
+    ) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+        """Monta URL, headers e payload de uma requisição de conversa.
+        
+        Args:
+            messages: Lista de mensagens da conversa.
+            model: Modelo de IA a ser usado.
+            chat_id: ID do chat da conversa.
+            token: JWT de sessão usado na autorização.
+            searchType: O tipo de pesquisa a ser realizada.
+            tool: A ferramenta a ser usada.
+            
+        Returns:
+            Tupla (url, headers, payload).
+        """
+        payload = {
+            "messages": messages,
+            "files": [],
+            "chatAiModel": model,
+            "chatId": chat_id,
+            "chatType": "CHAT",
+            "agentId": None,
+            "folderId": None,
+            "tool": tool or None, # Use provided tool or default to None
+            "imageModel": "FLUX",
+            "imageAspectRatio": "ONE_TO_ONE",
+            "searchType": searchType or None, # Use provided searchType or default to None
+            "flowType": None,
+            "shouldEditMessage": False,
+            "shouldGenerateNewFileFromSheetAssistant": False,
+            "enhanceResponse": False,
+        }
+        
+        logger.debug(f"Payload preparado: {len(messages)} mensagens, modelo: {model}")
+        
+        headers = self.headers.copy()
+        headers['content-type'] = 'application/json'
+        headers['referer'] = "https://app.adapta.one/"
+        headers['authorization'] = f"Bearer {token}"
+        headers['x-user-id'] = self.user_id
+        
+        logger.debug(f"Headers preparados: {list(headers.keys())}")
+        logger.debug(f"Authorization header: Bearer {token[:20]}...")
+        
+        #url = f"{self.api_base_url}/api/chat/conversation"
+        url = f"{self.api_base_url}/api/preview/chat/conversation"
+        return url, headers, payload
+    
+    async def _create_conversation(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        searchType: Optional[str] = None,
+        tool: Optional[str] = None,
+        chat_id: Optional[str] = None,
+        on_headers: Optional[Callable[[], None]] = None
+    ) -> httpx.Response:
         """Cria uma nova conversa na API.
         
+        Os erros são repassados ao chamador para que a política de
+        retentativas possa classificá-los.
+        
         Args:
             messages: Lista de mensagens da conversa.
             model: Modelo de IA a ser usado.
             searchType: O tipo de pesquisa a ser realizada.
             tool: A ferramenta a ser usada.
             chat_id: O ID do chat a ser usado para manter a conversa.
+            on_headers: Chamada quando os cabeçalhos da resposta chegam,
+                antes da leitura do corpo.
             
         Returns:
-            Resposta da API ou None em caso de erro.
+            Resposta da API.
+            
+        Raises:
+            httpx.HTTPError: Se a requisição falhar.
         """
         try:
             logger.debug(f"Iniciando criação de conversa para modelo: {model}")
@@ -522,7 +1196,7 @@ class AdaptaClient:
             await self._ensure_client()
             logger.debug("Cliente HTTP garantido")
             
-            await self._update_session()
+            await self._ensure_session()
             logger.debug("Sessão atualizada")
             
             # Verificar token após atualização
@@ -537,37 +1211,9 @@ class AdaptaClient:
             current_chat_id = chat_id if chat_id else self._generate_random_id()
             logger.debug(f"Chat ID usado: {current_chat_id}")
             
-            payload = {
-                "messages": messages,
-                "files": [],
-                "chatAiModel": model,
-                "chatId": current_chat_id,
-                "chatType": "CHAT",
-                "agentId": None,
-                "folderId": None,
-                "tool": tool or None, # Use provided tool or default to None
-                "imageModel": "FLUX",
-                "imageAspectRatio": "ONE_TO_ONE",
-                "searchType": searchType or None, # Use provided searchType or default to None
-                "flowType": None,
-                "shouldEditMessage": False,
-                "shouldGenerateNewFileFromSheetAssistant": False,
-                "enhanceResponse": False,
-            }
-            
-            logger.debug(f"Payload preparado: {len(messages)} mensagens, modelo: {model}")
-            
-            headers = self.headers.copy()
-            headers['content-type'] = 'application/json'
-            headers['referer'] = "https://app.adapta.one/"
-            headers['authorization'] = f"Bearer {token}"
-            headers['x-user-id'] = self.user_id
-            
-            logger.debug(f"Headers preparados: {list(headers.keys())}")
-            logger.debug(f"Authorization header: Bearer {token[:20]}...")
-            
-            #url = "https://api.adapta.one/api/chat/conversation"
-            url = "https://api.adapta.one/api/preview/chat/conversation"
+            url, headers, payload = self._build_conversation_request(
+                messages, model, current_chat_id, token, searchType=searchType, tool=tool
+            )
             logger.debug(f"URL da requisição: {url}")
             
             if not self.client:
@@ -582,30 +1228,40 @@ class AdaptaClient:
             logger.debug("Iniciando requisição HTTP...")
             
             try:
-                response = await self.client.request(
-                    method="POST",
-                    url=url,
+                request = self.client.build_request(
+                    "POST",
+                    url,
                     headers=headers,
                     cookies=self.cookies,
-                    json=payload
+                    json=payload,
+                    timeout=self._timeout_config,
                 )
+                response = await self.client.send(request, stream=True)
+                if on_headers is not None:
+                    on_headers()
+                try:
+                    await response.aread()
+                finally:
+                    await response.aclose()
                 logger.debug(f"Resposta recebida: Status {response.status_code}")
                 
                 response.raise_for_status()
                 logger.debug("Requisição bem-sucedida")
                 
-                # Apaga a conversa APENAS se o chat_id foi gerado por esta chamada (não persistente)
+                # Apaga a conversa APENAS se o chat_id foi gerado por esta chamada (não persistente).
+                # A exclusão é feita em lote, em segundo plano.
                 if not chat_id:
-                    logger.debug("Iniciando exclusão da conversa temporária...")
-                    try:
-                        await self._delete_conversations([current_chat_id])
-                        logger.debug("Conversa temporária excluída com sucesso")
-                    except Exception as delete_error:
-                        logger.warning(f"Erro ao excluir conversa temporária {current_chat_id} (não crítico): {delete_error}")
-                        logger.warning(f"Tipo do erro de exclusão: {type(delete_error).__name__}")
+                    self._cleanup_queue.enqueue(current_chat_id)
+                    logger.debug("Conversa temporária enfileirada para exclusão")
                 
                 return response
                 
+            except asyncio.CancelledError:
+                # A conversa pode ter sido criada mesmo sem resposta (ex.: cópia
+                # de um hedge que perdeu a corrida)
+                if not chat_id:
+                    self._cleanup_queue.enqueue(current_chat_id)
+                raise
             except httpx.TimeoutException as e:
                 logger.error(f"Timeout na requisição: {e}")
                 logger.error(f"Detalhes do timeout: {type(e).__name__}")
@@ -625,13 +1281,15 @@ class AdaptaClient:
         except Exception as e:
             logger.error(f"Erro ao criar conversa: {e}")
             logger.error(f"Tipo do erro: {type(e).__name__}")
-            return None
+            raise
     
-    async def _delete_conversations(self, chat_ids: List[str]) -> None:
+    async def _delete_conversations(self, chat_ids: List[str], raise_errors: bool = False) -> None:
         """Apaga conversas especificadas pelos seus IDs.
         
         Args:
             chat_ids: Lista de IDs das conversas a serem apagadas.
+            raise_errors: Se True, repassa erros ao chamador (usado pela fila de
+                exclusão para repetir lotes que falharam).
         """
         try:
             logger.debug(f"Iniciando exclusão de conversas: {chat_ids}")
@@ -639,7 +1297,7 @@ class AdaptaClient:
             await self._ensure_client()
             logger.debug("Cliente HTTP garantido para exclusão")
             
-            await self._update_session()
+            await self._ensure_session()
             logger.debug("Sessão atualizada para exclusão")
             
             headers = self.headers.copy()
@@ -653,7 +1311,7 @@ class AdaptaClient:
             logger.debug(f"Headers para exclusão preparados: {list(headers.keys())}")
             
             payload = {"chatIds": chat_ids}
-            url = "https://api.adapta.one/api/chat/delete"
+            url = f"{self.api_base_url}/api/chat/delete"
             
             logger.debug(f"URL de exclusão: {url}")
             logger.debug(f"Payload de exclusão: {payload}")
@@ -669,13 +1327,16 @@ class AdaptaClient:
             
             logger.debug("Iniciando requisição de exclusão...")
             
+            await self._acquire_rate("api")
+            
             try:
                 response = await self.client.request(
                     method="DELETE",
                     url=url,
                     headers=headers,
                     cookies=self.cookies,
-                    json=payload
+                    json=payload,
+                    timeout=self._timeout_config,
                 )
                 logger.debug(f"Resposta de exclusão recebida: Status {response.status_code}")
                 
@@ -701,28 +1362,39 @@ class AdaptaClient:
         except Exception as e:
             logger.warning(f"Erro ao apagar conversas: {e}")
             logger.warning(f"Tipo do erro: {type(e).__name__}")
+            if raise_errors:
+                raise
     
-    def _extract_content(self, response_text: str, new_line: bool = True) -> Optional[str]:
+    def _extract_content(
+        self,
+        response_text: str,
+        new_line: bool = True,
+        usage: Optional[UsageAccumulator] = None
+    ) -> Optional[str]:
         """Extrai o conteúdo da resposta da API.
         
         Args:
             response_text: Texto da resposta da API.
             new_line: Se True, mantém quebras de linha; caso contrário, substitui por espaços.
+            usage: Acumulador que recebe os frames de metadados (uso de tokens
+                e motivo de término), se informado.
             
         Returns:
             Conteúdo extraído ou None se não encontrar.
+            
+        Raises:
+            StreamError: Se a API informar um erro na resposta; o texto
+                anterior ao erro está incompleto e não é retornado.
         """
-        content_parts = []
-        
-        for line in response_text.strip().splitlines():
-            if line.startswith("0:\""):
-                content = line[3:-1]  # Remove "0:", aspas e espaços extras
-                if new_line:
-                    content_parts.append(content.replace('\\n', '\n').replace('\\"', '\"'))
-                else:
-                    content_parts.append(content.replace('\\n', ' ').replace('\\"', ' '))
-        
-        return ''.join(content_parts) if content_parts else None
+        events = list(parse_stream(response_text))
+        for event in events:
+            if event.kind is EventKind.ERROR:
+                logger.error(f"Erro informado no stream: {event.value}")
+                raise StreamError(str(event.value))
+            if usage is not None:
+                usage.add(event)
+        content = extract_text(events, new_line)
+        return content or None
     
     async def health_check(self) -> bool:
         """Verifica se o cliente está funcionando corretamente.
@@ -739,53 +1411,73 @@ class AdaptaClient:
             logger.error(f"Health check falhou: {e}")
             return False
     
+    async def _create_conversation_limited(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        searchType: Optional[str] = None,
+        tool: Optional[str] = None,
+        chat_id: Optional[str] = None
+    ) -> httpx.Response:
+        """Cria a conversa passando pelo circuit breaker, pela cota da conta e pelo limitador do modelo."""
+        breaker = get_breaker(model)
+        breaker.check()
+        try:
+            await self._acquire_rate("api")
+            async with get_limiter(model).slot() as slot:
+                # O limitador mede só a espera pelos cabeçalhos, como no streaming
+                response = await self._create_conversation(
+                    messages, model, searchType=searchType, tool=tool, chat_id=chat_id,
+                    on_headers=slot.mark_headers,
+                )
+        except BaseException as e:
+            breaker.record(error=e)
+            raise
+        breaker.record()
+        return response
+    
     async def _create_conversation_with_retry(
         self,
         messages: List[Dict[str, str]],
         model: str,
-        max_retries: int = 3,
-        delay: float = 1.0,
+        max_retries: Optional[int] = None,
+        delay: Optional[float] = None,
         searchType: Optional[str] = None,
         tool: Optional[str] = None,
         chat_id: Optional[str] = None
-    ) -> Optional[httpx.Response]:
-        """Cria uma nova conversa na API com retry automático.
+    ) -> httpx.Response:
+        """Cria uma nova conversa na API aplicando a política de retentativas.
         
         Args:
             messages: Lista de mensagens da conversa.
             model: Modelo de IA a ser usado.
-            max_retries: Número máximo de tentativas.
-            delay: Delay entre tentativas em segundos.
+            max_retries: Número máximo de tentativas (None = valor da política).
+            delay: Espera inicial entre tentativas em segundos (None = valor da política).
             searchType: O tipo de pesquisa a ser realizada.
             tool: A ferramenta a ser usada.
             chat_id: O ID do chat a ser usado para manter a conversa.
             
         Returns:
-            Resposta da API ou None se todas as tentativas falharem.
+            Resposta da API.
+            
+        Raises:
+            CircuitOpenError: Se o circuito do modelo abrir durante as tentativas.
+            Exception: A última falha, se todas as tentativas falharem.
         """
-        last_error = None
+        policy = self.retry_policy
+        if max_retries is not None:
+            policy = replace(policy, max_attempts=max_retries)
+        if delay is not None:
+            policy = replace(policy, base_delay=delay)
         
-        for attempt in range(max_retries):
-            try:
-                logger.debug(f"Tentativa {attempt + 1}/{max_retries} para criar conversa")
-                
-                response = await self._create_conversation(messages, model, searchType=searchType, tool=tool, chat_id=chat_id)
-                
-                if response:
-                    logger.debug(f"Conversa criada com sucesso na tentativa {attempt + 1}")
-                    return response
-                else:
-                    logger.error(f"Tentativa {attempt + 1} falhou: resposta é None")
-                    
-            except Exception as e:
-                last_error = e
-                logger.error(f"Tentativa {attempt + 1} falhou: {e}")
-                
-                if attempt < max_retries - 1:
-                    logger.debug(f"Aguardando {delay} segundos antes da próxima tentativa...")
-                    await asyncio.sleep(delay)
-                    # Aumenta o delay exponencialmente
-                    delay *= 1.5
-        
-        logger.error(f"Todas as {max_retries} tentativas falharam. Último erro: {last_error}")
-        return None 
+        try:
+            return await policy.execute(
+                lambda: self._create_conversation_limited(messages, model, searchType=searchType, tool=tool, chat_id=chat_id),
+                refresh_session=self._session_cache.invalidate,
+                label=model,
+            )
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            logger.error(f"Não foi possível criar a conversa com {model}: {e}")
+            raise
@@ -0,0 +1,199 @@
+"""Agrupamento (single-flight) de chamadas idênticas em andamento.
+
+Reexecuções do Streamlit, cliques duplos e usuários fazendo a mesma pergunta
+geram chamadas idênticas simultâneas. Enquanto a primeira estiver em
+andamento, as seguintes com a mesma chave se juntam a ela: uma única
+requisição é feita e todos recebem o mesmo resultado, ou o mesmo stream
+reproduzido desde o início.
+
+A requisição roda em uma tarefa própria no event loop de quem a iniciou,
+então o resultado continua disponível para os demais mesmo que o primeiro
+chamador desista. A tarefa só é cancelada quando não resta nenhum
+interessado. Chamadas de outras threads (sessões do Streamlit) são acordadas
+com ``call_soon_threadsafe``.
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from utils.metrics import metrics
+
+T = TypeVar("T")
+
+
+def coalesce_key(*parts: Any) -> str:
+    """Gera a chave de agrupamento a partir dos parâmetros da chamada."""
+    encoded = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class CoalescedCallAborted(RuntimeError):
+    """A chamada compartilhada foi interrompida antes de terminar."""
+
+
+def _wake(future: "asyncio.Future[None]") -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class _Flight:
+    """Chamada em andamento e os itens já produzidos por ela."""
+
+    def __init__(self, key: str, label: str):
+        self.key = key
+        self.label = label
+        self.items: List[Any] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.subscribers = 0
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.task: Optional["asyncio.Task[None]"] = None
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, "asyncio.Future[None]"]] = []
+        self._lock = threading.Lock()
+
+    def _wake_locked(self) -> None:
+        for loop, future in self._waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, future)
+            except RuntimeError:
+                # Event loop do chamador já foi encerrado
+                pass
+        self._waiters.clear()
+
+    def publish(self, item: Any) -> None:
+        with self._lock:
+            self.items.append(item)
+            self._wake_locked()
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            self.done = True
+            self.error = error
+            self._wake_locked()
+
+    async def replay(self) -> AsyncIterator[Any]:
+        """Produz todos os itens da chamada, desde o primeiro."""
+        index = 0
+        while True:
+            waiter: Optional["asyncio.Future[None]"] = None
+            with self._lock:
+                if index < len(self.items):
+                    item = self.items[index]
+                    index += 1
+                elif self.done:
+                    if self.error is not None:
+                        raise self.error
+                    return
+                else:
+                    loop = asyncio.get_running_loop()
+                    waiter = loop.create_future()
+                    self._waiters.append((loop, waiter))
+            if waiter is None:
+                yield item
+            else:
+                await waiter
+
+
+class SingleFlight:
+    """Registro das chamadas em andamento, compartilhado pelo processo."""
+
+    def __init__(self) -> None:
+        self._flights: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.leaders = 0
+
+    @property
+    def in_flight(self) -> int:
+        """Chamadas distintas em andamento."""
+        return len(self._flights)
+
+    def _join(self, key: str, source: Callable[[], AsyncIterator[Any]], label: str, kind: str) -> _Flight:
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                flight.subscribers += 1
+                self.hits += 1
+                metrics.increment("adapta_coalesced_calls_total", model=label, kind=kind)
+                return flight
+            flight = self._flights[key] = _Flight(key, label)
+            flight.subscribers = 1
+            self.leaders += 1
+            flight.loop = asyncio.get_running_loop()
+            flight.task = flight.loop.create_task(self._pump(flight, source))
+            return flight
+
+    def _leave(self, flight: _Flight) -> None:
+        with self._lock:
+            flight.subscribers -= 1
+            if flight.subscribers > 0 or flight.done:
+                return
+            # Ninguém mais aguarda o resultado: interrompe a requisição
+            if self._flights.get(flight.key) is flight:
+                del self._flights[flight.key]
+        if flight.task is not None and flight.loop is not None:
+            try:
+                flight.loop.call_soon_threadsafe(flight.task.cancel)
+            except RuntimeError:
+                pass
+
+    async def _pump(self, flight: _Flight, source: Callable[[], AsyncIterator[Any]]) -> None:
+        try:
+            async for item in source():
+                flight.publish(item)
+        except Exception as error:
+            flight.finish(error)
+        except BaseException:
+            flight.finish(CoalescedCallAborted(f"Chamada compartilhada a {flight.label} foi interrompida"))
+            raise
+        else:
+            flight.finish()
+        finally:
+            with self._lock:
+                if self._flights.get(flight.key) is flight:
+                    del self._flights[flight.key]
+
+    async def stream(
+        self,
+        key: str,
+        source: Callable[[], AsyncIterator[T]],
+        label: str = "",
+        kind: str = "stream",
+    ) -> AsyncIterator[T]:
+        """Produz os itens de ``source``, compartilhando a execução entre chamadas com a mesma chave.
+
+        Args:
+            key: Chave de agrupamento (ver ``coalesce_key``).
+            source: Fábrica do iterador executado apenas pela primeira chamada.
+            label: Rótulo (ex.: nome do modelo) usado nas métricas.
+            kind: Tipo de chamada, usado nas métricas.
+        """
+        flight = self._join(key, source, label, kind)
+        try:
+            async for item in flight.replay():
+                yield item
+        finally:
+            self._leave(flight)
+
+    async def call(self, key: str, operation: Callable[[], Awaitable[T]], label: str = "") -> T:
+        """Executa ``operation`` uma única vez para todas as chamadas simultâneas com a mesma chave."""
+
+        async def source() -> AsyncIterator[T]:
+            yield await operation()
+
+        replay = self.stream(key, source, label=label, kind="call")
+        try:
+            return await replay.__anext__()
+        finally:
+            await replay.aclose()
+
+
+_single_flight = SingleFlight()
+
+
+def get_single_flight() -> SingleFlight:
+    """Retorna o registro de chamadas em andamento do processo."""
+    return _single_flight
@@ -0,0 +1,84 @@
+"""Requisições "hedged" para chamadas sensíveis à latência.
+
+Se uma chamada não responde dentro do p90 de latência observado para o
+modelo, uma cópia é disparada (no mesmo modelo ou no alternativo configurado
+em ``ADAPTA_HEDGE_MODELS``) e vence a primeira que terminar.
+
+Para que a duplicação não se torne uma fonte de carga, cada chamada elegível
+credita ``ADAPTA_HEDGE_BUDGET`` (ex.: 0.1) em um orçamento compartilhado e
+cada cópia disparada consome 1: no máximo ~10% de requisições extras.
+"""
+
+import threading
+from typing import Optional
+
+from config import settings
+from utils.metrics import metrics
+
+
+class HedgeBudget:
+    """Orçamento de cópias proporcional ao número de chamadas."""
+
+    def __init__(self, ratio: float = 0.1, max_tokens: float = 10.0):
+        """Inicializa o orçamento vazio.
+
+        Args:
+            ratio: Cópias permitidas por chamada elegível.
+            max_tokens: Saldo máximo acumulado em períodos sem atraso.
+        """
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def tokens(self) -> float:
+        """Saldo atual do orçamento."""
+        return self._tokens
+
+    def record_request(self) -> None:
+        """Credita o orçamento por uma chamada elegível."""
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        """Consome uma cópia do orçamento, se houver saldo."""
+        with self._lock:
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            return False
+
+
+_budget: Optional[HedgeBudget] = None
+_budget_lock = threading.Lock()
+
+
+def get_hedge_budget() -> HedgeBudget:
+    """Retorna o orçamento de cópias compartilhado pelo processo."""
+    global _budget
+    with _budget_lock:
+        if _budget is None:
+            _budget = HedgeBudget(ratio=settings.adapta_hedge_budget)
+        return _budget
+
+
+def hedge_delay(metric: str, model: str) -> Optional[float]:
+    """Espera antes de disparar a cópia: o p90 da latência observada.
+
+    Args:
+        metric: Histograma de latência em ``utils.metrics``.
+        model: Modelo da chamada.
+
+    Returns:
+        Espera em segundos, ou None se ainda não houver amostras suficientes.
+    """
+    summary = metrics.get_histogram(metric, model=model)
+    if summary.get("count", 0) < settings.adapta_hedge_min_samples:
+        return None
+    return summary["p90"]
+
+
+def hedge_model(model: str) -> str:
+    """Modelo usado na cópia de uma chamada a ``model``."""
+    return settings.adapta_hedge_models.get(model, model)
@@ -0,0 +1,143 @@
+"""Event loop de I/O de longa duração, compartilhado por todo o processo.
+
+Os aplicativos Streamlit executam cada rerun com ``asyncio.run``, em um event
+loop que deixa de rodar quando a chamada termina. Recursos presos a esse loop
+(conexões HTTP, timers da fila de exclusão) morrem com ele. Este módulo mantém
+um único event loop em uma thread própria, onde ficam o transporte HTTP
+compartilhado e os timers em segundo plano; os demais loops apenas aguardam os
+resultados.
+
+No encerramento do processo, as funções registradas com ``at_shutdown`` são
+executadas no loop de I/O, na ordem do registro, antes de ele parar.
+"""
+
+import asyncio
+import atexit
+import concurrent.futures
+import threading
+from typing import Any, Awaitable, Callable, List, Optional, TypeVar
+
+from utils.logger import logger
+
+T = TypeVar("T")
+
+# Tempo máximo, em segundos, das rotinas de encerramento
+SHUTDOWN_TIMEOUT = 10.0
+
+
+async def _await(awaitable: Awaitable[T]) -> T:
+    return await awaitable
+
+
+class IoLoop:
+    """Event loop executado em uma thread daemon, iniciado no primeiro uso."""
+
+    def __init__(self, name: str = "adapta-io"):
+        """Inicializa o loop (a thread só é criada no primeiro uso).
+
+        Args:
+            name: Nome da thread do loop.
+        """
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._shutdown_hooks: List[Callable[[], Awaitable[None]]] = []
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """Event loop de I/O, iniciado se necessário."""
+        with self._lock:
+            if self._loop is None or self._loop.is_closed() or not self._thread.is_alive():
+                self._start_locked()
+            return self._loop  # type: ignore[return-value]
+
+    def _start_locked(self) -> None:
+        loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def run() -> None:
+            asyncio.set_event_loop(loop)
+            loop.call_soon(ready.set)
+            loop.run_forever()
+
+        thread = threading.Thread(target=run, name=self.name, daemon=True)
+        thread.start()
+        ready.wait()
+        self._loop = loop
+        self._thread = thread
+        logger.debug(f"Loop de I/O '{self.name}' iniciado")
+
+    def in_loop(self) -> bool:
+        """True se o chamador está executando no próprio loop de I/O."""
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    def submit(self, awaitable: Awaitable[T]) -> "concurrent.futures.Future[T]":
+        """Agenda uma corrotina no loop de I/O a partir de qualquer thread."""
+        return asyncio.run_coroutine_threadsafe(_await(awaitable), self.loop)
+
+    async def run(self, awaitable: Awaitable[T]) -> T:
+        """Executa uma corrotina no loop de I/O e aguarda o resultado no loop atual.
+
+        Cancelar o chamador cancela a corrotina no loop de I/O.
+        """
+        if self.in_loop():
+            return await awaitable
+        return await asyncio.wrap_future(self.submit(awaitable))
+
+    def run_sync(self, awaitable: Awaitable[T], timeout: Optional[float] = None) -> T:
+        """Executa uma corrotina no loop de I/O bloqueando a thread atual.
+
+        Raises:
+            RuntimeError: Se chamado de dentro do próprio loop de I/O.
+            concurrent.futures.TimeoutError: Se ``timeout`` expirar.
+        """
+        if self.in_loop():
+            raise RuntimeError("run_sync não pode ser chamado de dentro do loop de I/O")
+        return self.submit(awaitable).result(timeout)
+
+    def call_soon(self, callback: Callable[..., Any], *args: Any) -> None:
+        """Agenda uma função no loop de I/O a partir de qualquer thread."""
+        self.loop.call_soon_threadsafe(callback, *args)
+
+    def at_shutdown(self, hook: Callable[[], Awaitable[None]]) -> None:
+        """Registra uma corrotina executada no loop de I/O no encerramento do processo.
+
+        As rotinas rodam na ordem do registro, então quem depende de um recurso
+        (ex.: a fila de exclusão, que usa o cliente HTTP) deve se registrar
+        antes de quem o fecha.
+        """
+        self._shutdown_hooks.append(hook)
+
+    def shutdown(self, timeout: float = SHUTDOWN_TIMEOUT) -> None:
+        """Executa as rotinas de encerramento e para o loop."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+        if loop is None or loop.is_closed() or thread is None or not thread.is_alive():
+            return
+
+        async def run_hooks() -> None:
+            for hook in list(self._shutdown_hooks):
+                try:
+                    await hook()
+                except Exception as e:
+                    logger.warning(f"Erro no encerramento do loop de I/O (não crítico): {e}")
+
+        try:
+            self.run_sync(run_hooks(), timeout)
+        except Exception as e:
+            logger.warning(f"Encerramento do loop de I/O incompleto: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+
+
+_io_loop = IoLoop()
+atexit.register(_io_loop.shutdown)
+
+
+def get_io_loop() -> IoLoop:
+    """Retorna o loop de I/O compartilhado do processo."""
+    return _io_loop
@@ -0,0 +1,268 @@
+"""Limitador adaptativo de concorrência por modelo (AIMD).
+
+Cada ``chatAiModel`` tem uma janela de concorrência compartilhada por todos
+os clientes do processo. A janela cresce de forma aditiva a cada resposta bem
+sucedida e encolhe de forma multiplicativa quando a API responde 429/503,
+quando ocorre timeout ou quando a latência dispara em relação à média.
+Chamadas acima da janela aguardam na fila em vez de falhar.
+
+A latência usada é o tempo até os cabeçalhos da resposta, tanto nas chamadas
+em streaming quanto nas com resposta completa: o tempo total cresce com o
+tamanho da resposta e não indica sobrecarga.
+
+A fila é compartilhada entre threads (sessões do Streamlit), então cada
+espera é um ``Future`` do event loop do chamador, acordado com
+``call_soon_threadsafe``.
+
+O teto da janela é ``ADAPTA_LIMITER_MAX``, ou o ``max_concurrency`` do modelo
+no catálogo, se menor.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Optional, Tuple
+
+import httpx
+
+from config import settings
+from utils.logger import logger
+from utils.metrics import metrics
+from .catalog import CatalogError, ModelSpec, get_catalog
+from .retry import error_reason
+
+
+def is_overload_error(error: BaseException) -> bool:
+    """Indica se a falha sinaliza sobrecarga do servidor."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in (429, 503)
+    return isinstance(error, httpx.TimeoutException)
+
+
+def _wake(future: "asyncio.Future[None]") -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class AdaptiveConcurrencyLimiter:
+    """Janela de concorrência AIMD de um modelo."""
+
+    def __init__(
+        self,
+        name: str,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        decrease_factor: float = 0.5,
+        latency_spike_factor: float = 4.0,
+        cooldown: float = 1.0,
+    ):
+        """Inicializa o limitador.
+
+        Args:
+            name: Nome do modelo (usado em logs e métricas).
+            initial_limit: Janela inicial.
+            min_limit: Janela mínima.
+            max_limit: Janela máxima.
+            decrease_factor: Fator aplicado à janela em caso de sobrecarga.
+            latency_spike_factor: Latência, em múltiplos da média móvel, a
+                partir da qual a resposta é tratada como sinal de sobrecarga.
+            cooldown: Intervalo mínimo, em segundos, entre duas reduções.
+        """
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_factor = decrease_factor
+        self.latency_spike_factor = latency_spike_factor
+        self.cooldown = cooldown
+
+        self._limit = float(max(min_limit, min(initial_limit, max_limit)))
+        self._in_flight = 0
+        self._waiters: Deque[Tuple[asyncio.AbstractEventLoop, "asyncio.Future[None]"]] = deque()
+        self._lock = threading.Lock()
+        self._latency_avg: Optional[float] = None
+        self._latency_samples = 0
+        self._last_decrease = 0.0
+        self._publish()
+
+    @property
+    def limit(self) -> int:
+        """Janela de concorrência atual."""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        """Chamadas em andamento."""
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        """Chamadas aguardando uma vaga."""
+        return len(self._waiters)
+
+    def _publish(self) -> None:
+        metrics.set_gauge("adapta_concurrency_limit", self.limit, model=self.name)
+        metrics.set_gauge("adapta_in_flight", self._in_flight, model=self.name)
+        metrics.set_gauge("adapta_queued", len(self._waiters), model=self.name)
+
+    async def acquire(self) -> None:
+        """Aguarda uma vaga na janela de concorrência."""
+        start = time.monotonic()
+        with self._lock:
+            if self._in_flight < self.limit and not self._waiters:
+                self._in_flight += 1
+                self._publish()
+                return
+            loop = asyncio.get_running_loop()
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+            self._publish()
+
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    self._publish()
+                    raise
+            # A vaga foi concedida ao mesmo tempo em que a espera foi cancelada
+            self._release_slot()
+            raise
+        metrics.observe("adapta_limiter_wait_seconds", time.monotonic() - start, model=self.name)
+
+    def _wake_waiters_locked(self) -> None:
+        while self._waiters and self._in_flight < self.limit:
+            loop, future = self._waiters.popleft()
+            if future.done():
+                continue
+            self._in_flight += 1
+            try:
+                loop.call_soon_threadsafe(_wake, future)
+            except RuntimeError:
+                # Event loop do chamador já foi encerrado
+                self._in_flight -= 1
+
+    def _release_slot(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._wake_waiters_locked()
+            self._publish()
+
+    def release(self, latency: Optional[float] = None, error: Optional[BaseException] = None) -> None:
+        """Libera a vaga e ajusta a janela conforme o resultado da chamada.
+
+        Args:
+            latency: Latência da chamada bem sucedida, em segundos.
+            error: Falha da chamada, se houver. Falhas que não indicam
+                sobrecarga não alteram a janela.
+        """
+        with self._lock:
+            if error is not None:
+                if is_overload_error(error):
+                    self._decrease_locked(error_reason(error))
+            elif latency is not None:
+                if self._is_latency_spike(latency):
+                    self._decrease_locked("latency")
+                else:
+                    # Aumento aditivo: +1 a cada janela completa de sucessos
+                    self._limit = min(self.max_limit, self._limit + 1.0 / self._limit)
+                self._record_latency(latency)
+        self._release_slot()
+
+    def _is_latency_spike(self, latency: float) -> bool:
+        return (
+            self._latency_avg is not None
+            and self._latency_samples >= 5
+            and latency > self._latency_avg * self.latency_spike_factor
+        )
+
+    def _record_latency(self, latency: float) -> None:
+        self._latency_samples += 1
+        if self._latency_avg is None:
+            self._latency_avg = latency
+        else:
+            self._latency_avg = 0.9 * self._latency_avg + 0.1 * latency
+
+    def _decrease_locked(self, reason: str) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        previous = self.limit
+        self._limit = max(float(self.min_limit), self._limit * self.decrease_factor)
+        metrics.increment("adapta_limiter_decreases_total", model=self.name, reason=reason)
+        logger.warning(f"[{self.name}] Janela de concorrência reduzida de {previous} para {self.limit} ({reason})")
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator["LimiterSlot"]:
+        """Context manager que ocupa uma vaga durante o bloco.
+
+        O bloco deve chamar ``LimiterSlot.mark_headers`` quando os cabeçalhos
+        da resposta chegarem; sem a marcação, a latência é a do bloco inteiro.
+        """
+        await self.acquire()
+        slot = LimiterSlot()
+        try:
+            yield slot
+        except Exception as error:
+            self.release(error=error)
+            raise
+        except BaseException:
+            self.release()
+            raise
+        else:
+            self.release(latency=slot.latency)
+
+
+class LimiterSlot:
+    """Vaga ocupada com ``AdaptiveConcurrencyLimiter.slot``."""
+
+    def __init__(self) -> None:
+        self.start = time.monotonic()
+        self._headers_latency: Optional[float] = None
+
+    def mark_headers(self) -> None:
+        """Registra a chegada dos cabeçalhos da resposta (só a primeira chamada conta)."""
+        if self._headers_latency is None:
+            self._headers_latency = time.monotonic() - self.start
+
+    @property
+    def latency(self) -> float:
+        """Tempo até os cabeçalhos, ou desde a ocupação da vaga se não marcado."""
+        if self._headers_latency is not None:
+            return self._headers_latency
+        return time.monotonic() - self.start
+
+
+_limiters: Dict[str, AdaptiveConcurrencyLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def _catalog_spec(model: str) -> Optional[ModelSpec]:
+    """Entrada do catálogo do modelo, ou None (modelo fora do catálogo ou catálogo inválido)."""
+    try:
+        return get_catalog().by_model(model)
+    except CatalogError as e:
+        logger.warning(f"Catálogo de modelos indisponível para o limitador de {model}: {e}")
+        return None
+
+
+def get_limiter(model: str) -> AdaptiveConcurrencyLimiter:
+    """Retorna o limitador compartilhado de um modelo."""
+    with _limiters_lock:
+        limiter = _limiters.get(model)
+        if limiter is None:
+            max_limit = settings.adapta_limiter_max
+            spec = _catalog_spec(model)
+            if spec is not None and spec.max_concurrency is not None:
+                max_limit = min(max_limit, spec.max_concurrency)
+            limiter = _limiters[model] = AdaptiveConcurrencyLimiter(
+                model,
+                initial_limit=settings.adapta_limiter_initial,
+                min_limit=min(settings.adapta_limiter_min, max_limit),
+                max_limit=max_limit,
+            )
+        return limiter
@@ -0,0 +1,311 @@
+"""Gerador de conteúdo genérico, configurado pelo catálogo de modelos.
+
+O ``ModelGenerator`` implementa a interface ``BaseContentGenerator`` para
+qualquer modelo descrito em ``prompts/models_catalog.json``: o identificador
+na API, os pós-processadores da resposta, os timeouts e as capacidades vêm
+da entrada do catálogo. Todos os geradores da conta principal com os mesmos
+timeouts compartilham um único cliente.
+"""
+
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+from pathlib import Path
+
+from ..base import BaseContentGenerator
+from ..chunking import map_reduce, split_text
+from ..mindmap import MindmapEngine
+from .breaker import CircuitOpenError
+from .accounts import create_client, get_shared_client
+from .catalog import ModelSpec, get_catalog, get_post_processor
+from config import settings
+from utils.logger import logger
+
+
+class ModelGenerator(BaseContentGenerator):
+    """Gerador de conteúdo para um modelo do catálogo da Adapta.one.
+
+    Exemplo::
+
+        generator = ModelGenerator(model="Deepseek-R1")
+        resumo = await generator.summarize(texto)
+
+    Subclasses podem fixar o modelo com o atributo ``catalog_name``.
+    """
+
+    catalog_name: Optional[str] = None
+
+    def __init__(
+        self,
+        prompts_dir: Optional[Path] = None,
+        cookies_str: Optional[str] = None,
+        session_id: Optional[str] = None,
+        *,
+        model: Optional[str] = None,
+        spec: Optional[ModelSpec] = None,
+    ):
+        """Inicializa o gerador.
+
+        Args:
+            prompts_dir: Diretório contendo os arquivos de prompt.
+            cookies_str: String de cookies para autenticação na Adapta.one
+                (padrão: a conta principal, com cliente compartilhado).
+            session_id: ID de sessão do Clerk.
+            model: Nome de exibição do modelo no catálogo (padrão: ``catalog_name``).
+            spec: Entrada do catálogo a usar no lugar de ``model``.
+
+        Raises:
+            ValueError: Se nenhum modelo for informado.
+            KeyError: Se o modelo não estiver no catálogo.
+        """
+        super().__init__(prompts_dir)
+
+        if spec is None:
+            name = model or self.catalog_name
+            if name is None:
+                raise ValueError("Informe o modelo do catálogo (model=...)")
+            spec = get_catalog()[name]
+        self.spec = spec
+        self.model_name = spec.model
+        self._post_processors = [get_post_processor(name) for name in spec.post_processors]
+
+        if cookies_str is None and session_id is None:
+            self.client = get_shared_client(**spec.client_options)
+        else:
+            self.client = create_client(cookies_str=cookies_str, session_id=session_id, **spec.client_options)
+        self._client_initialized = False
+
+    async def _ensure_client_initialized(self):
+        """Garante que o cliente está inicializado antes de usar."""
+        if not self._client_initialized:
+            await self.client._ensure_client()
+            self._client_initialized = True
+
+    def _postprocess(self, text: str) -> str:
+        """Aplica os pós-processadores do catálogo à resposta completa."""
+        for process, _ in self._post_processors:
+            text = process(text)
+        return text
+
+    def _postprocess_stream(self, chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+        """Aplica os pós-processadores do catálogo a uma resposta em trechos."""
+        for _, process_stream in self._post_processors:
+            chunks = process_stream(chunks)
+        return chunks
+
+    def _capability_option(self, capability: str, value: Optional[str]) -> Optional[str]:
+        """Descarta ``searchType``/``tool`` quando o modelo não tem a capacidade."""
+        if value is not None and not self.spec.supports(capability):
+            logger.warning(f"Modelo {self.spec.name} não suporta '{capability}'; opção {value!r} ignorada")
+            return None
+        return value
+
+    async def _generate(self, task: str, build_prompt: Callable[[], str]) -> str:
+        """Envia um prompt único (com cache de respostas) e pós-processa o resultado."""
+        try:
+            await self._ensure_client_initialized()
+            messages = [{"role": "user", "content": build_prompt()}]
+            result = await self.client.call_model(messages, self.model_name, new_line=True, cache=True)
+            if result is None:
+                raise Exception(f"Falha ao gerar {task} com {self.spec.name}")
+            return self._postprocess(result)
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            raise Exception(f"Erro ao gerar {task} com {self.spec.name}: {e}")
+
+    async def summarize(self, text: str) -> str:
+        """Gera um resumo do texto fornecido.
+
+        Textos maiores que ``SUMMARIZE_CHUNK_TOKENS`` tokens estimados são
+        divididos em partes, resumidas em paralelo e combinadas no resumo
+        final (veja ``generators.chunking``).
+
+        Args:
+            text: Texto transcrito a ser resumido.
+
+        Returns:
+            Resumo do texto em formato markdown.
+
+        Raises:
+            Exception: Se houver erro na geração do resumo.
+        """
+        max_tokens = settings.summarize_chunk_tokens
+        if max_tokens > 0:
+            chunks = split_text(text, max_tokens)
+            if len(chunks) > 1:
+                return await self._summarize_chunked(chunks, max_tokens)
+        return await self._generate("resumo", lambda: self._render_prompt("summarize", text=text))
+
+    async def _summarize_chunked(self, chunks: List[str], max_tokens: int) -> str:
+        """Resume as partes em paralelo e combina os resumos parciais no resumo final."""
+        parts = len(chunks)
+        logger.info(f"Resumindo texto longo em {parts} partes com {self.spec.name}")
+
+        async def summarize_chunk(item: Tuple[int, str]) -> str:
+            part, chunk = item
+            return await self._generate(
+                f"resumo (parte {part}/{parts})",
+                lambda: self._render_prompt("summarize_chunk", text=chunk, part=part, parts=parts),
+            )
+
+        async def combine_summaries(summaries: List[str]) -> str:
+            joined = "\n\n".join(
+                f'<summary part="{index}">\n{summary}\n</summary>' for index, summary in enumerate(summaries, 1)
+            )
+            return await self._generate(
+                "resumo (combinação das partes)",
+                lambda: self._render_prompt("summarize_reduce", summaries=joined),
+            )
+
+        return await map_reduce(
+            self, chunks, summarize_chunk, combine_summaries, max_tokens, settings.batch_concurrency
+        )
+
+    async def diagram(self, text: str) -> str:
+        """Gera um diagrama baseado no texto fornecido.
+
+        Args:
+            text: Texto transcrito para gerar o diagrama.
+
+        Returns:
+            Diagrama em formato texto estruturado.
+
+        Raises:
+            Exception: Se houver erro na geração do diagrama.
+        """
+        return await self._generate("diagrama", lambda: self._render_prompt("diagram", text=text))
+
+    async def create_mindmap(self, texts: List[str]) -> str:
+        """Cria um mapa mental a partir de uma lista de textos.
+
+        Com ``MINDMAP_INCREMENTAL`` (padrão), cada texto é pré-processado e
+        convertido em OPML em paralelo, com continuação automática de
+        respostas cortadas, e os documentos são juntados em um só (veja
+        ``generators.mindmap``).
+
+        Args:
+            texts: Lista de textos transcritos para criar o mapa mental.
+
+        Returns:
+            Mapa mental em formato OPML.
+
+        Raises:
+            Exception: Se houver erro na criação do mapa mental.
+        """
+        if not settings.mindmap_incremental:
+            return await self._generate("mapa mental", lambda: self._render_prompt("mindmap", texts="\n\n".join(texts)))
+        try:
+            return await MindmapEngine(self).build(texts)
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            raise Exception(f"Erro ao gerar mapa mental com {self.spec.name}: {e}")
+
+    async def generate_content(self, prompt: str, text: str) -> str:
+        """Gera conteúdo personalizado baseado em um prompt e texto.
+
+        Args:
+            prompt: Prompt específico para a geração.
+            text: Texto transcrito como contexto.
+
+        Returns:
+            Conteúdo gerado conforme o prompt.
+
+        Raises:
+            Exception: Se houver erro na geração do conteúdo.
+        """
+        return await self._generate("conteúdo personalizado", lambda: f"{prompt}\n\nTexto: {text}")
+
+    async def call_model_with_messages(self, messages: List[Dict[str, str]], searchType: Optional[str] = None, tool: Optional[str] = None, chat_id: Optional[str] = None) -> str:
+        """Chama o modelo diretamente com uma lista de mensagens.
+
+        Args:
+            messages: Lista de mensagens no formato [{"role": "user/assistant", "content": "..."}]
+            searchType: O tipo de pesquisa a ser realizada.
+            tool: A ferramenta a ser usada.
+            chat_id: O ID do chat a ser usado para manter a conversa.
+
+        Returns:
+            Conteúdo da resposta do modelo.
+
+        Raises:
+            Exception: Se houver erro na chamada do modelo.
+        """
+        try:
+            await self._ensure_client_initialized()
+            result = await self.client.call_model(
+                messages,
+                self.model_name,
+                new_line=True,
+                searchType=self._capability_option("search", searchType),
+                tool=self._capability_option("tools", tool),
+                chat_id=chat_id,
+                hedge=settings.adapta_hedging,
+            )
+            if result is None:
+                raise Exception(f"Falha ao chamar modelo {self.spec.name} com mensagens")
+            return self._postprocess(result)
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            raise Exception(f"Erro ao chamar modelo {self.spec.name} com mensagens: {e}")
+
+    async def stream_model_with_messages(self, messages: List[Dict[str, str]], searchType: Optional[str] = None, tool: Optional[str] = None, chat_id: Optional[str] = None) -> AsyncIterator[str]:
+        """Chama o modelo e produz a resposta em trechos, à medida que chega.
+
+        Args:
+            messages: Lista de mensagens no formato [{"role": "user/assistant", "content": "..."}]
+            searchType: O tipo de pesquisa a ser realizada.
+            tool: A ferramenta a ser usada.
+            chat_id: O ID do chat a ser usado para manter a conversa.
+
+        Yields:
+            Trechos do conteúdo da resposta do modelo.
+
+        Raises:
+            Exception: Se houver erro na chamada do modelo.
+        """
+        try:
+            await self._ensure_client_initialized()
+            stream = self.client.call_model_stream(
+                messages,
+                self.model_name,
+                new_line=True,
+                searchType=self._capability_option("search", searchType),
+                tool=self._capability_option("tools", tool),
+                chat_id=chat_id,
+                hedge=settings.adapta_hedging,
+            )
+            async for chunk in self._postprocess_stream(stream):
+                yield chunk
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            raise Exception(f"Erro ao transmitir resposta do modelo {self.spec.name}: {e}")
+
+    async def health_check(self) -> bool:
+        """Verifica se o provedor de IA está funcionando corretamente.
+
+        Returns:
+            True se o provedor estiver funcionando, False caso contrário.
+        """
+        try:
+            await self._ensure_client_initialized()
+            return await self.client.health_check()
+        except Exception:
+            return False
+
+    def get_supported_models(self) -> List[str]:
+        """Retorna a lista de modelos suportados pelo provedor.
+
+        Returns:
+            Lista de nomes dos modelos suportados.
+        """
+        return list(self.spec.supported_models)
+
+    def get_provider_name(self) -> str:
+        """Retorna o nome do provedor de IA.
+
+        Returns:
+            Nome do provedor.
+        """
+        return self.spec.provider_name
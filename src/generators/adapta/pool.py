@@ -0,0 +1,333 @@
+"""Pool de conexões HTTP compartilhado entre todos os clientes Adapta.
+
+Cada gerador possui o seu próprio ``AdaptaClient``, mas todos falam com os
+mesmos hosts (Clerk e API Adapta.one). Este módulo mantém um registro global
+que entrega o mesmo ``httpx.AsyncClient`` para todos os clientes, de modo que
+as conexões TLS permaneçam aquecidas e sejam reaproveitadas entre modelos,
+sessões do Streamlit e reruns. O registro também compartilha o cache do JWT
+de sessão entre clientes que usam a mesma credencial.
+
+As conexões de um transporte ``httpx`` pertencem ao event loop que as abriu,
+e os aplicativos Streamlit usam um loop novo (``asyncio.run``) a cada rerun.
+Por isso o transporte real vive no loop de I/O compartilhado (``io_loop``):
+o cliente entregue aos chamadores apenas encaminha as requisições para ele,
+de qualquer loop ou thread, e as conexões sobrevivem aos reruns.
+
+Com HTTP/2 habilitado, chamadas paralelas ao mesmo host são multiplexadas em
+uma única conexão. Se o pacote ``h2`` não estiver instalado, se o servidor não
+negociar HTTP/2 via ALPN ou se a conexão HTTP/2 com um host falhar por erro de
+protocolo, o tráfego volta para HTTP/1.1.
+"""
+
+import asyncio
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Optional
+
+import httpx
+
+from config import settings
+from utils.logger import logger
+from .io_loop import IoLoop, get_io_loop
+from .session import SessionTokenCache
+
+
+@dataclass(frozen=True)
+class PoolConfig:
+    """Limites do pool de conexões compartilhado.
+
+    Attributes:
+        max_connections: Número máximo de conexões abertas no pool.
+        max_keepalive_connections: Conexões ociosas mantidas abertas.
+        keepalive_expiry: Tempo, em segundos, que uma conexão ociosa é mantida.
+        max_connections_per_host: Requisições simultâneas por host
+            (None = apenas o limite global).
+        http2: Habilita HTTP/2 (negociado via ALPN, com fallback para HTTP/1.1).
+        http2_max_streams: Streams simultâneos por host quando HTTP/2 está
+            habilitado (None = limite anunciado pelo servidor).
+        http2_prior_knowledge: Usa HTTP/2 sem negociação (h2c). Útil apenas
+            para servidores locais sem TLS.
+    """
+
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 60.0
+    max_connections_per_host: Optional[int] = None
+    http2: bool = True
+    http2_max_streams: Optional[int] = None
+    http2_prior_knowledge: bool = False
+
+    @classmethod
+    def from_settings(cls) -> "PoolConfig":
+        """Cria a configuração a partir das variáveis do ``.env``."""
+        return cls(
+            max_connections=settings.adapta_pool_max_connections,
+            max_keepalive_connections=settings.adapta_pool_max_keepalive,
+            keepalive_expiry=settings.adapta_pool_keepalive_expiry,
+            max_connections_per_host=settings.adapta_pool_max_per_host,
+            http2=settings.adapta_http2,
+            http2_max_streams=settings.adapta_http2_max_streams,
+        )
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Corpo de resposta que libera o semáforo do host ao ser fechado."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, semaphore: asyncio.Semaphore):
+        self._stream = stream
+        self._semaphore = semaphore
+        self._released = False
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._released:
+                self._released = True
+                self._semaphore.release()
+
+
+class PerHostLimitTransport(httpx.AsyncBaseTransport):
+    """Transporte que limita o número de requisições simultâneas por host.
+
+    O semáforo só é liberado quando o corpo da resposta é fechado, já que a
+    conexão continua ocupada enquanto a resposta é lida.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, max_per_host: int):
+        self._transport = transport
+        self._max_per_host = max_per_host
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        semaphore = self._semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._semaphores[host] = asyncio.Semaphore(self._max_per_host)
+
+        await semaphore.acquire()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            semaphore.release()
+            raise
+
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_ReleasingStream(response.stream, semaphore),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class Http2FallbackTransport(httpx.AsyncBaseTransport):
+    """Transporte HTTP/2 que rebaixa para HTTP/1.1 os hosts problemáticos.
+
+    Quando uma conexão HTTP/2 com um host falha por erro de protocolo, o host
+    passa a ser atendido pelo transporte HTTP/1.1. O erro original é repassado
+    ao chamador, que decide se deve repetir a requisição.
+    """
+
+    def __init__(self, http2_transport: httpx.AsyncBaseTransport, http1_transport: httpx.AsyncBaseTransport):
+        self._http2 = http2_transport
+        self._http1 = http1_transport
+        self._http1_hosts: set = set()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        if host in self._http1_hosts:
+            return await self._http1.handle_async_request(request)
+        try:
+            return await self._http2.handle_async_request(request)
+        except httpx.RemoteProtocolError:
+            if host not in self._http1_hosts:
+                self._http1_hosts.add(host)
+                logger.warning(f"Erro de protocolo HTTP/2 com {host}; usando HTTP/1.1 para este host")
+            raise
+
+    async def aclose(self) -> None:
+        await self._http2.aclose()
+        await self._http1.aclose()
+
+
+_END = object()
+
+
+async def _next_chunk(iterator: AsyncIterator[bytes]) -> object:
+    try:
+        return await iterator.__anext__()
+    except StopAsyncIteration:
+        return _END
+
+
+class _IoLoopStream(httpx.AsyncByteStream):
+    """Corpo de resposta lido no loop de I/O e entregue no loop do chamador."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, io_loop: IoLoop):
+        self._stream = stream
+        self._io = io_loop
+
+    async def __aiter__(self):
+        iterator = self._stream.__aiter__()
+        while True:
+            chunk = await self._io.run(_next_chunk(iterator))
+            if chunk is _END:
+                return
+            yield chunk
+
+    async def aclose(self) -> None:
+        await self._io.run(self._stream.aclose())
+
+
+class IoLoopTransport(httpx.AsyncBaseTransport):
+    """Transporte que executa as requisições no loop de I/O compartilhado.
+
+    O transporte interno (pool de conexões, semáforos por host) só é usado no
+    loop de I/O, então pode ser compartilhado por chamadores em qualquer loop.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, io_loop: Optional[IoLoop] = None):
+        self._transport = transport
+        self._io = io_loop or get_io_loop()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self._io.in_loop():
+            return await self._transport.handle_async_request(request)
+        response = await self._io.run(self._transport.handle_async_request(request))
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_IoLoopStream(response.stream, self._io),  # type: ignore[arg-type]
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self._io.run(self._transport.aclose())
+
+
+class ClientRegistry:
+    """Registro global de clientes HTTP e caches de sessão compartilhados."""
+
+    def __init__(self, config: Optional[PoolConfig] = None):
+        """Inicializa o registro.
+
+        Args:
+            config: Limites do pool. Se None, são lidos das configurações no
+                primeiro uso.
+        """
+        self._config = config
+        self._lock = threading.Lock()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._close_at_shutdown = False
+        self._session_caches: Dict[str, SessionTokenCache] = {}
+
+    @property
+    def config(self) -> PoolConfig:
+        """Configuração atual do pool."""
+        if self._config is None:
+            self._config = PoolConfig.from_settings()
+        return self._config
+
+    def configure(self, config: PoolConfig) -> None:
+        """Substitui a configuração usada por clientes criados a partir de agora."""
+        with self._lock:
+            self._config = config
+
+    def _build_transport(self) -> httpx.AsyncBaseTransport:
+        config = self.config
+        limits = httpx.Limits(
+            max_connections=config.max_connections,
+            max_keepalive_connections=config.max_keepalive_connections,
+            keepalive_expiry=config.keepalive_expiry,
+        )
+        transport: httpx.AsyncBaseTransport = httpx.AsyncHTTPTransport(limits=limits)
+        per_host = config.max_connections_per_host
+
+        if config.http2:
+            try:
+                http2_transport = httpx.AsyncHTTPTransport(
+                    limits=limits,
+                    http1=not config.http2_prior_knowledge,
+                    http2=True,
+                )
+            except ImportError:
+                logger.warning("Pacote 'h2' não instalado; usando HTTP/1.1")
+            else:
+                transport = Http2FallbackTransport(http2_transport, transport)
+                # Em HTTP/2 o limite por host equivale aos streams simultâneos
+                # na conexão multiplexada
+                if config.http2_max_streams:
+                    per_host = min(per_host or config.http2_max_streams, config.http2_max_streams)
+
+        if per_host:
+            transport = PerHostLimitTransport(transport, per_host)
+        return transport
+
+    def get_client(self) -> httpx.AsyncClient:
+        """Retorna o cliente HTTP compartilhado do processo.
+
+        O cliente pode ser usado de qualquer event loop: as requisições rodam
+        no loop de I/O, onde as conexões são mantidas entre chamadas e reruns.
+        Os timeouts não são definidos aqui: cada ``AdaptaClient`` informa os
+        seus por requisição.
+        """
+        with self._lock:
+            if self._client is None or self._client.is_closed:
+                self._client = httpx.AsyncClient(
+                    transport=IoLoopTransport(self._build_transport()),
+                    timeout=None,
+                    follow_redirects=True,
+                )
+                logger.debug("Pool HTTP compartilhado criado no loop de I/O")
+                if not self._close_at_shutdown:
+                    # Registrado no primeiro uso, depois das filas de exclusão
+                    # de conversas, que ainda usam o cliente no encerramento
+                    self._close_at_shutdown = True
+                    get_io_loop().at_shutdown(self.aclose)
+            return self._client
+
+    def get_session_cache(self, credential_key: str, refresh_margin: float = 10.0) -> SessionTokenCache:
+        """Retorna o cache de JWT compartilhado para uma credencial.
+
+        Args:
+            credential_key: Identificador estável da credencial.
+            refresh_margin: Margem de renovação usada se o cache for criado.
+        """
+        with self._lock:
+            cache = self._session_caches.get(credential_key)
+            if cache is None:
+                cache = self._session_caches[credential_key] = SessionTokenCache(refresh_margin=refresh_margin)
+            return cache
+
+    async def aclose(self) -> None:
+        """Fecha o cliente compartilhado e as suas conexões."""
+        with self._lock:
+            client, self._client = self._client, None
+        if client is not None:
+            await client.aclose()
+
+
+def credential_key(cookies: Dict[str, str], session_id: Optional[str] = None) -> str:
+    """Gera uma chave estável para uma credencial a partir dos seus cookies.
+
+    Os cookies ``__session*`` são ignorados, pois mudam a cada renovação.
+    """
+    stable = sorted((k, v) for k, v in cookies.items() if not k.startswith("__session"))
+    digest = hashlib.sha256(repr((stable, session_id)).encode("utf-8")).hexdigest()
+    return digest[:16]
+
+
+_registry = ClientRegistry()
+
+
+def get_registry() -> ClientRegistry:
+    """Retorna o registro global de clientes."""
+    return _registry
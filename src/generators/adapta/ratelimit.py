@@ -0,0 +1,126 @@
+"""Limitador de taxa por credencial (token bucket).
+
+Todas as sessões do Streamlit usam as mesmas credenciais do ``.env`` e,
+portanto, a mesma cota da conta na Adapta.one. Este módulo mantém um token
+bucket por credencial e por tipo de endpoint (``api`` para conversas e
+arquivos, ``clerk`` para autenticação), compartilhado por todo o processo.
+
+``acquire`` reserva um token e aguarda a sua vez; ``try_acquire`` consome um
+token apenas se houver um disponível agora, para interfaces que preferem
+mostrar "ocupado" a enfileirar a chamada.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from config import settings
+from utils.metrics import metrics
+
+
+class TokenBucket:
+    """Token bucket seguro para uso entre threads e event loops."""
+
+    def __init__(self, rate: float, burst: float, name: str = ""):
+        """Inicializa o bucket cheio.
+
+        Args:
+            rate: Tokens repostos por segundo.
+            burst: Capacidade máxima do bucket.
+            name: Rótulo usado nas métricas.
+        """
+        self.rate = rate
+        self.burst = burst
+        self.name = name
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill_locked(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    @property
+    def available(self) -> float:
+        """Tokens disponíveis agora (negativo se houver reservas pendentes)."""
+        with self._lock:
+            self._refill_locked()
+            return self._tokens
+
+    def wait_time(self, tokens: float = 1.0) -> float:
+        """Tempo, em segundos, até que ``tokens`` estejam disponíveis."""
+        with self._lock:
+            self._refill_locked()
+            missing = tokens - self._tokens
+            return max(0.0, missing / self.rate) if missing > 0 else 0.0
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Consome ``tokens`` se estiverem disponíveis agora, sem esperar."""
+        with self._lock:
+            self._refill_locked()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                metrics.increment("adapta_rate_limit_acquired_total", bucket=self.name)
+                return True
+        metrics.increment("adapta_rate_limit_rejected_total", bucket=self.name)
+        return False
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """Reserva ``tokens`` e aguarda até que estejam disponíveis.
+
+        Reservas são atendidas na ordem de chegada: o saldo pode ficar negativo
+        e cada chamador espera o tempo necessário para cobri-lo.
+
+        Returns:
+            Tempo esperado, em segundos.
+        """
+        with self._lock:
+            self._refill_locked()
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+        metrics.observe("adapta_rate_limit_wait_seconds", wait, bucket=self.name)
+        metrics.increment("adapta_rate_limit_acquired_total", bucket=self.name)
+        if wait > 0:
+            metrics.increment("adapta_rate_limit_delayed_total", bucket=self.name)
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                # Devolve a reserva para não penalizar os próximos chamadores
+                with self._lock:
+                    self._tokens += tokens
+                raise
+        return wait
+
+
+_buckets: Dict[Tuple[str, str], TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def _bucket_config(kind: str) -> Tuple[Optional[float], float]:
+    if kind == "clerk":
+        return settings.adapta_rate_clerk_per_second, settings.adapta_rate_clerk_burst
+    return settings.adapta_rate_api_per_second, settings.adapta_rate_api_burst
+
+
+def get_rate_limiter(credential: str, kind: str = "api") -> Optional[TokenBucket]:
+    """Retorna o bucket compartilhado de uma credencial.
+
+    Args:
+        credential: Identificador estável da credencial.
+        kind: ``api`` (conversas e arquivos) ou ``clerk`` (autenticação).
+
+    Returns:
+        O bucket, ou None se a taxa para esse tipo estiver desabilitada.
+    """
+    key = (credential, kind)
+    with _buckets_lock:
+        bucket = _buckets.get(key)
+        if bucket is None:
+            rate, burst = _bucket_config(kind)
+            if not rate:
+                return None
+            bucket = _buckets[key] = TokenBucket(rate, burst, name=kind)
+        return bucket
@@ -0,0 +1,196 @@
+"""Política de retentativas para chamadas à API Adapta.one.
+
+Classifica cada falha e decide se a chamada deve ser repetida:
+
+- 401: o JWT de sessão é descartado e a chamada é repetida uma única vez,
+  sem espera;
+- 408, 429 e 5xx, timeouts e erros de transporte: nova tentativa com backoff
+  exponencial e jitter, respeitando o cabeçalho ``Retry-After``;
+- demais 4xx e erros locais: falha imediata.
+
+Cada chamada tem um orçamento de tentativas e de tempo total. As
+retentativas são registradas em ``utils.metrics``.
+"""
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from enum import Enum
+from typing import Awaitable, Callable, Optional, TypeVar
+
+import httpx
+
+from config import settings
+from utils.logger import logger
+from utils.metrics import metrics
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+
+class RetryAction(Enum):
+    """Decisão tomada para uma falha."""
+
+    RETRY = "retry"
+    REFRESH_SESSION = "refresh_session"
+    FAIL = "fail"
+
+
+def parse_retry_after(response: Optional[httpx.Response]) -> Optional[float]:
+    """Interpreta o cabeçalho ``Retry-After`` (segundos ou data HTTP).
+
+    Returns:
+        Espera sugerida em segundos ou None se ausente/inválido.
+    """
+    if response is None:
+        return None
+    value = response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def error_reason(error: BaseException) -> str:
+    """Rótulo curto para a causa de uma falha (usado nas métricas)."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return str(error.response.status_code)
+    if isinstance(error, httpx.TimeoutException):
+        return "timeout"
+    if isinstance(error, httpx.TransportError):
+        return "transport"
+    return type(error).__name__
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Parâmetros de retentativa de uma chamada.
+
+    Attributes:
+        max_attempts: Número máximo de tentativas (incluindo a primeira).
+        base_delay: Espera antes da segunda tentativa, em segundos.
+        max_delay: Espera máxima entre tentativas.
+        multiplier: Fator de crescimento exponencial da espera.
+        jitter: Fração aleatória removida da espera (0 = sem jitter, 1 = full jitter).
+        budget: Tempo máximo, em segundos, gasto em uma chamada incluindo
+            esperas. Nenhuma nova tentativa é iniciada após esse prazo.
+    """
+
+    max_attempts: int = 3
+    base_delay: float = 1.0
+    max_delay: float = 30.0
+    multiplier: float = 2.0
+    jitter: float = 0.5
+    budget: Optional[float] = None
+
+    @classmethod
+    def from_settings(cls) -> "RetryPolicy":
+        """Cria a política a partir das variáveis do ``.env``."""
+        return cls(
+            max_attempts=settings.adapta_retry_max_attempts,
+            base_delay=settings.adapta_retry_base_delay,
+            max_delay=settings.adapta_retry_max_delay,
+            budget=settings.adapta_retry_budget,
+        )
+
+    def classify(self, error: BaseException) -> RetryAction:
+        """Decide o que fazer com uma falha."""
+        if isinstance(error, httpx.HTTPStatusError):
+            status = error.response.status_code
+            if status == 401:
+                return RetryAction.REFRESH_SESSION
+            if status in RETRYABLE_STATUS_CODES:
+                return RetryAction.RETRY
+            return RetryAction.FAIL
+        if isinstance(error, (httpx.TimeoutException, httpx.TransportError)):
+            return RetryAction.RETRY
+        return RetryAction.FAIL
+
+    def compute_delay(self, attempt: int, error: Optional[BaseException] = None) -> float:
+        """Calcula a espera antes da tentativa seguinte.
+
+        Args:
+            attempt: Número da tentativa que acabou de falhar (a partir de 1).
+            error: Falha ocorrida, usada para ler ``Retry-After``.
+        """
+        backoff = min(self.max_delay, self.base_delay * self.multiplier ** (attempt - 1))
+        delay = backoff * (1 - self.jitter * random.random())
+        if isinstance(error, httpx.HTTPStatusError):
+            retry_after = parse_retry_after(error.response)
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+        return delay
+
+    async def execute(
+        self,
+        operation: Callable[[], Awaitable[T]],
+        refresh_session: Optional[Callable[[], None]] = None,
+        label: str = "",
+    ) -> T:
+        """Executa ``operation`` aplicando a política.
+
+        Args:
+            operation: Corrotina sem argumentos a ser executada a cada tentativa.
+            refresh_session: Chamado após um 401 para invalidar a sessão.
+            label: Rótulo (ex.: nome do modelo) usado nos logs e métricas.
+
+        Returns:
+            Resultado da primeira tentativa bem-sucedida.
+
+        Raises:
+            Exception: A última falha, se a chamada não puder ser repetida.
+        """
+        deadline = time.monotonic() + self.budget if self.budget else None
+        session_refreshed = False
+        attempt = 0
+
+        while True:
+            attempt += 1
+            try:
+                return await operation()
+            except Exception as error:
+                action = self.classify(error)
+                reason = error_reason(error)
+
+                if action is RetryAction.REFRESH_SESSION:
+                    if session_refreshed or refresh_session is None:
+                        action = RetryAction.FAIL
+                    else:
+                        session_refreshed = True
+                        refresh_session()
+                        metrics.increment("adapta_session_refresh_on_401_total", model=label)
+                        logger.warning(f"[{label}] 401 recebido; renovando sessão e repetindo a chamada")
+                        # A renovação não conta como tentativa
+                        attempt -= 1
+                        continue
+
+                if action is RetryAction.FAIL:
+                    metrics.increment("adapta_call_failures_total", model=label, reason=reason)
+                    raise
+
+                if attempt >= self.max_attempts:
+                    metrics.increment("adapta_retries_exhausted_total", model=label, reason=reason)
+                    logger.error(f"[{label}] Todas as {self.max_attempts} tentativas falharam. Último erro: {error}")
+                    raise
+
+                delay = self.compute_delay(attempt, error)
+                if deadline is not None and time.monotonic() + delay > deadline:
+                    metrics.increment("adapta_retry_budget_exhausted_total", model=label, reason=reason)
+                    logger.error(f"[{label}] Orçamento de retentativas esgotado. Último erro: {error}")
+                    raise
+
+                metrics.increment("adapta_retries_total", model=label, reason=reason)
+                logger.warning(
+                    f"[{label}] Tentativa {attempt}/{self.max_attempts} falhou ({reason}); "
+                    f"nova tentativa em {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
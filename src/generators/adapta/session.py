@@ -0,0 +1,136 @@
+"""Cache do token de sessão (JWT) emitido pelo Clerk.
+
+O Clerk emite tokens ``__session`` de curta duração. Em vez de chamar o
+endpoint ``/touch`` antes de toda requisição, este módulo decodifica o claim
+``exp`` do JWT e reaproveita o token até pouco antes de expirar. Quando várias
+corrotinas percebem ao mesmo tempo que o token venceu, apenas uma executa a
+renovação (single-flight) e as demais aguardam o resultado.
+
+O cache é compartilhado entre threads (sessões do Streamlit), cada uma com o
+seu event loop. Por isso a renovação roda sempre no loop de I/O compartilhado
+(``io_loop``): um único loop e um único lock para todos os chamadores.
+"""
+
+import asyncio
+import base64
+import json
+import time
+from typing import Awaitable, Callable, Optional
+
+from utils.logger import logger
+from .io_loop import IoLoop, get_io_loop
+
+
+def decode_jwt_exp(token: str) -> Optional[float]:
+    """Extrai o claim ``exp`` de um JWT sem validar a assinatura.
+
+    Args:
+        token: Token JWT no formato ``header.payload.signature``.
+
+    Returns:
+        Timestamp de expiração (segundos desde a época) ou None se o token
+        não puder ser decodificado ou não possuir ``exp``.
+    """
+    try:
+        payload_b64 = token.split(".")[1]
+        padding = "=" * (-len(payload_b64) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(payload_b64 + padding))
+        exp = payload.get("exp")
+        return float(exp) if exp is not None else None
+    except (IndexError, ValueError, TypeError, AttributeError):
+        return None
+
+
+class SessionTokenCache:
+    """Mantém o JWT de sessão atual e coordena sua renovação.
+
+    O token é considerado válido enquanto faltar mais do que
+    ``refresh_margin`` segundos para o seu ``exp``. Tokens sem ``exp``
+    decodificável nunca são reaproveitados.
+    """
+
+    def __init__(self, refresh_margin: float = 10.0, io_loop: Optional[IoLoop] = None):
+        """Inicializa o cache.
+
+        Args:
+            refresh_margin: Antecedência, em segundos, com que o token é
+                renovado antes de expirar.
+            io_loop: Loop onde as renovações são feitas (padrão: o loop de
+                I/O compartilhado do processo).
+        """
+        self.refresh_margin = refresh_margin
+        self._io = io_loop or get_io_loop()
+        self._token: Optional[str] = None
+        self._expires_at: Optional[float] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # Contadores simples para diagnóstico
+        self.hits = 0
+        self.refreshes = 0
+
+    @property
+    def token(self) -> Optional[str]:
+        """Token atualmente em cache (pode estar expirado)."""
+        return self._token
+
+    @property
+    def expires_at(self) -> Optional[float]:
+        """Timestamp de expiração do token em cache."""
+        return self._expires_at
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        """Indica se o token em cache ainda pode ser reaproveitado."""
+        if not self._token or self._expires_at is None:
+            return False
+        now = time.time() if now is None else now
+        return self._expires_at - self.refresh_margin > now
+
+    def set(self, token: str) -> None:
+        """Armazena um novo token e decodifica sua expiração."""
+        self._token = token
+        self._expires_at = decode_jwt_exp(token)
+        if self._expires_at is None:
+            logger.debug("Token de sessão sem claim 'exp' decodificável; será renovado a cada uso")
+
+    def invalidate(self) -> None:
+        """Descarta o token atual, forçando renovação no próximo uso."""
+        self._expires_at = None
+
+    def _get_lock(self) -> asyncio.Lock:
+        """Retorna o lock de renovação, usado apenas no loop de I/O.
+
+        O lock é recriado só se o loop de I/O tiver sido reiniciado.
+        """
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    async def get_or_refresh(self, refresh: Callable[[], Awaitable[str]]) -> str:
+        """Retorna o token válido, renovando-o uma única vez se necessário.
+
+        Args:
+            refresh: Corrotina que obtém um novo JWT junto ao Clerk. É
+                executada no loop de I/O.
+
+        Returns:
+            Token JWT válido.
+        """
+        if self.is_fresh():
+            self.hits += 1
+            return self._token  # type: ignore[return-value]
+        return await self._io.run(self._refresh(refresh))
+
+    async def _refresh(self, refresh: Callable[[], Awaitable[str]]) -> str:
+        async with self._get_lock():
+            # Outra chamada pode ter renovado enquanto aguardávamos o lock
+            if self.is_fresh():
+                self.hits += 1
+                return self._token  # type: ignore[return-value]
+
+            token = await refresh()
+            self.set(token)
+            self.refreshes += 1
+            return token
@@ -0,0 +1,209 @@
+"""Parser do protocolo de stream de dados da API Adapta.one.
+
+A API responde no formato de "data stream" do Vercel AI SDK: uma linha por
+frame, com o tipo do frame, dois pontos e um payload JSON::
+
+    f:{"messageId":"msg-123"}
+    0:"Olá"
+    0:", mundo\\n"
+    e:{"finishReason":"stop","usage":{"promptTokens":10,"completionTokens":2}}
+    d:{"finishReason":"stop","usage":{"promptTokens":10,"completionTokens":2}}
+
+O parser percorre o texto uma única vez, decodificando cada payload com
+``json.JSONDecoder.raw_decode`` diretamente a partir da posição do frame (sem
+dividir ou fatiar linhas), e produz eventos tipados. Sequências de frames de
+texto (``0:``) consecutivos, que são a maior parte da resposta, são
+decodificadas de uma vez como um único array JSON e entregues em um só evento.
+Pode ser usado sobre a resposta completa (``parse_stream``) ou de forma
+incremental, alimentado com trechos de texto à medida que chegam
+(``DataStreamParser.feed``).
+"""
+
+import json
+import re
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+_decode = json.JSONDecoder().raw_decode
+
+# Sequência de linhas completas de frames de texto
+_TEXT_RUN = re.compile(r"(?:0:[^\n]*\n)+")
+
+
+class EventKind(Enum):
+    """Tipos de evento produzidos pelo parser."""
+
+    TEXT = "text"
+    REASONING = "reasoning"
+    ERROR = "error"
+    START = "start"
+    STEP_FINISH = "step_finish"
+    FINISH = "finish"
+    USAGE = "usage"
+    DATA = "data"
+    OTHER = "other"
+
+
+# Tamanho máximo do identificador de tipo de um frame
+_MAX_FRAME_ID = 2
+
+# Tipo do frame -> tipo do evento. ``d`` (fim da mensagem) é tratado à parte,
+# pois também produz o evento de uso de tokens.
+_FRAME_KINDS = {
+    "0": EventKind.TEXT,
+    "g": EventKind.REASONING,
+    "3": EventKind.ERROR,
+    "f": EventKind.START,
+    "e": EventKind.STEP_FINISH,
+    "2": EventKind.DATA,
+    "8": EventKind.DATA,
+}
+
+
+@dataclass(frozen=True)
+class StreamEvent:
+    """Evento decodificado de um frame do stream.
+
+    Attributes:
+        kind: Tipo do evento.
+        value: Payload decodificado (texto para ``TEXT``, ``REASONING`` e
+            ``ERROR``; dicionário para os demais).
+        frame: Tipo do frame de origem (ex.: ``0``, ``d``).
+    """
+
+    kind: EventKind
+    value: Any
+    frame: str
+
+
+class StreamError(RuntimeError):
+    """A API informou um erro (frame ``3:``) no meio do stream."""
+
+
+class DataStreamParser:
+    """Parser incremental de frames do stream de dados."""
+
+    def __init__(self) -> None:
+        self._pending = ""
+        self.frames = 0
+        self.malformed = 0
+
+    def _skip_line(self, text: str, pos: int, final: bool) -> int:
+        """Descarta a linha iniciada em ``pos``; retorna -1 se ela estiver incompleta."""
+        end = text.find("\n", pos)
+        if end == -1:
+            if not final:
+                return -1
+            end = len(text)
+        if text[pos:end].strip():
+            self.malformed += 1
+        return end + 1
+
+    def _decode_text_run(self, run: str) -> Optional[str]:
+        """Decodifica linhas ``0:`` consecutivas como um único array JSON.
+
+        Retorna None se alguma linha for inválida; nesse caso os frames são
+        processados um a um.
+        """
+        if "\r" in run:
+            run = run.replace("\r\n", "\n")
+        # Strings JSON não contêm quebras de linha literais, então cada "\n0:"
+        # é uma fronteira entre frames
+        try:
+            parts = json.loads("[" + run[2:-1].replace("\n0:", ",") + "]")
+        except ValueError:
+            return None
+        if not all(isinstance(part, str) for part in parts):
+            return None
+        self.frames += len(parts)
+        return "".join(parts)
+
+    def _parse(self, text: str, final: bool) -> Iterator[StreamEvent]:
+        pos = 0
+        size = len(text)
+        while pos < size:
+            run = _TEXT_RUN.match(text, pos)
+            if run is not None:
+                text_value = self._decode_text_run(run.group())
+                if text_value is not None:
+                    pos = run.end()
+                    yield StreamEvent(EventKind.TEXT, text_value, "0")
+                    continue
+
+            # O tipo do frame tem no máximo alguns caracteres antes dos dois pontos
+            colon = text.find(":", pos, pos + _MAX_FRAME_ID + 1)
+            value = None
+            value_end = -1
+            if colon != -1:
+                try:
+                    value, value_end = _decode(text, colon + 1)
+                except ValueError:
+                    value_end = -1
+
+            if value_end == size and not final:
+                # Payload completo, mas a quebra de linha ainda não chegou
+                value_end = -1
+            if value_end == -1 or (value_end < size and text[value_end] not in "\r\n"):
+                next_pos = self._skip_line(text, pos, final)
+                if next_pos == -1:
+                    # Linha incompleta: aguarda o próximo trecho
+                    self._pending = text[pos:]
+                    return
+                pos = next_pos
+                continue
+
+            self.frames += 1
+            frame = text[pos:colon]
+            if value_end < size and text[value_end] == "\r":
+                value_end += 1
+            pos = value_end + 1
+
+            if frame == "d":
+                yield StreamEvent(EventKind.FINISH, value, frame)
+                if isinstance(value, dict) and value.get("usage"):
+                    yield StreamEvent(EventKind.USAGE, value["usage"], frame)
+            else:
+                yield StreamEvent(_FRAME_KINDS.get(frame, EventKind.OTHER), value, frame)
+        self._pending = ""
+
+    def feed(self, chunk: str) -> List[StreamEvent]:
+        """Processa um trecho de texto e retorna os eventos dos frames completos.
+
+        Frames partidos entre dois trechos são concluídos na chamada seguinte.
+        """
+        if self._pending:
+            chunk = self._pending + chunk
+            self._pending = ""
+        return list(self._parse(chunk, final=False))
+
+    def close(self) -> List[StreamEvent]:
+        """Processa o último frame, caso a resposta não termine com quebra de linha."""
+        pending, self._pending = self._pending, ""
+        return list(self._parse(pending, final=True)) if pending else []
+
+
+def parse_stream(text: str) -> Iterator[StreamEvent]:
+    """Produz os eventos de uma resposta completa em uma única passada."""
+    return DataStreamParser()._parse(text, final=True)
+
+
+async def aiter_events(chunks: AsyncIterator[str]) -> AsyncIterator[StreamEvent]:
+    """Produz os eventos de um stream à medida que os trechos de texto chegam."""
+    parser = DataStreamParser()
+    async for chunk in chunks:
+        for event in parser.feed(chunk):
+            yield event
+    for event in parser.close():
+        yield event
+
+
+def extract_text(events: Iterator[StreamEvent], new_line: bool = True) -> str:
+    """Concatena os eventos de texto.
+
+    Args:
+        events: Eventos do stream.
+        new_line: Se False, substitui as quebras de linha por espaços.
+    """
+    text = "".join(event.value for event in events if event.kind is EventKind.TEXT)
+    return text if new_line else text.replace("\n", " ")
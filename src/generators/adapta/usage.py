@@ -0,0 +1,134 @@
+"""Contabilização de uso de tokens e motivo de término das respostas.
+
+Os frames de metadados do stream (``e:`` ao fim de cada etapa e ``d:`` ao fim
+da mensagem) trazem o motivo de término e o uso de tokens. Este módulo os
+acumula durante o parse e publica agregados por modelo em ``utils.metrics``:
+
+- ``adapta_prompt_tokens_total`` / ``adapta_completion_tokens_total``;
+- ``adapta_completion_tokens`` (histograma, para planejamento de capacidade);
+- ``adapta_finish_reasons_total`` (rótulo ``reason``);
+- ``adapta_truncated_responses_total``: respostas cortadas pelo limite de
+  tokens, como mapas mentais OPML incompletos;
+- ``adapta_request_bytes_total`` / ``adapta_response_bytes_total``.
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from utils.logger import logger
+from utils.metrics import metrics
+
+from .stream_protocol import EventKind, StreamEvent
+
+# Motivos de término que indicam resposta cortada pelo limite de tokens
+TRUNCATION_REASONS = frozenset({"length", "max_tokens"})
+
+
+def _tokens(value: Any) -> Optional[int]:
+    """Converte uma contagem de tokens do stream (pode vir como NaN)."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return int(value)
+
+
+@dataclass
+class CallResult:
+    """Resultado detalhado de ``AdaptaClient.call_model(detailed=True)``.
+
+    Attributes:
+        text: Conteúdo da resposta.
+        model: Modelo que respondeu (pode ser o alternativo, após failover).
+        finish_reason: Motivo de término informado pela API (ex.: ``stop``,
+            ``length``), se presente.
+        prompt_tokens: Tokens de entrada, se informados.
+        completion_tokens: Tokens gerados, se informados.
+        upstream_seconds: Tempo da requisição HTTP que produziu a resposta.
+        duration_seconds: Tempo total da chamada, incluindo filas e retentativas.
+        request_bytes: Tamanho do corpo da requisição.
+        response_bytes: Tamanho do corpo da resposta.
+        cached: True se a resposta veio do cache de respostas (sem metadados).
+    """
+
+    text: str
+    model: str
+    finish_reason: Optional[str] = None
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    upstream_seconds: Optional[float] = None
+    duration_seconds: Optional[float] = None
+    request_bytes: int = 0
+    response_bytes: int = 0
+    cached: bool = False
+
+    @property
+    def total_tokens(self) -> Optional[int]:
+        """Soma dos tokens de entrada e gerados, se algum for conhecido."""
+        if self.prompt_tokens is None and self.completion_tokens is None:
+            return None
+        return (self.prompt_tokens or 0) + (self.completion_tokens or 0)
+
+    @property
+    def truncated(self) -> bool:
+        """True se a resposta foi cortada pelo limite de tokens."""
+        return self.finish_reason in TRUNCATION_REASONS
+
+
+class UsageAccumulator:
+    """Acumula motivo de término e uso de tokens a partir dos eventos do stream.
+
+    O uso do frame ``d:`` (total da mensagem) tem prioridade; sem ele, soma-se
+    o uso informado em cada etapa (``e:``).
+    """
+
+    def __init__(self) -> None:
+        self.finish_reason: Optional[str] = None
+        self.prompt_tokens: Optional[int] = None
+        self.completion_tokens: Optional[int] = None
+        self._step_prompt: Optional[int] = None
+        self._step_completion: Optional[int] = None
+
+    def add(self, event: StreamEvent) -> None:
+        """Processa um evento; eventos que não são de metadados são ignorados."""
+        if event.kind is EventKind.USAGE and isinstance(event.value, dict):
+            self.prompt_tokens = _tokens(event.value.get("promptTokens"))
+            self.completion_tokens = _tokens(event.value.get("completionTokens"))
+        elif event.kind in (EventKind.FINISH, EventKind.STEP_FINISH) and isinstance(event.value, dict):
+            if event.value.get("finishReason"):
+                self.finish_reason = str(event.value["finishReason"])
+            usage = event.value.get("usage")
+            if event.kind is EventKind.STEP_FINISH and isinstance(usage, dict):
+                self._step_prompt = self._add(self._step_prompt, _tokens(usage.get("promptTokens")))
+                self._step_completion = self._add(self._step_completion, _tokens(usage.get("completionTokens")))
+
+    @staticmethod
+    def _add(total: Optional[int], value: Optional[int]) -> Optional[int]:
+        if value is None:
+            return total
+        return (total or 0) + value
+
+    def usage(self) -> Dict[str, Optional[int]]:
+        """Retorna o uso de tokens da resposta (None quando não informado)."""
+        if self.prompt_tokens is not None or self.completion_tokens is not None:
+            return {"prompt_tokens": self.prompt_tokens, "completion_tokens": self.completion_tokens}
+        return {"prompt_tokens": self._step_prompt, "completion_tokens": self._step_completion}
+
+    def record(self, model: str, request_bytes: int = 0, response_bytes: int = 0) -> None:
+        """Publica os agregados da resposta nas métricas do modelo."""
+        usage = self.usage()
+        if usage["prompt_tokens"] is not None:
+            metrics.increment("adapta_prompt_tokens_total", usage["prompt_tokens"], model=model)
+        if usage["completion_tokens"] is not None:
+            metrics.increment("adapta_completion_tokens_total", usage["completion_tokens"], model=model)
+            metrics.observe("adapta_completion_tokens", usage["completion_tokens"], model=model)
+        metrics.increment("adapta_finish_reasons_total", model=model, reason=self.finish_reason or "unknown")
+        if self.finish_reason in TRUNCATION_REASONS:
+            metrics.increment("adapta_truncated_responses_total", model=model)
+            logger.warning(
+                f"Resposta de {model} cortada pelo limite de tokens "
+                f"(finish_reason={self.finish_reason}, completion_tokens={usage['completion_tokens']})"
+            )
+        metrics.increment("adapta_request_bytes_total", request_bytes, model=model)
+        metrics.increment("adapta_response_bytes_total", response_bytes, model=model)
@@ -6,10 +6,14 @@ de conteúdo no pipeline ContentGen.
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional, Any
+from typing import TYPE_CHECKING, List, Dict, Optional, Any, AsyncIterator, Awaitable, Callable, Iterable, Set, Union
 from pathlib import Path
 import uuid # <--- Added import
 
+if TYPE_CHECKING:
+    from .batch import BatchProgress, BatchResult
+    from .pipeline import ContentPipeline, PipelineResult
+
 
 class BaseContentGenerator(ABC):
     """Classe base abstrata para geradores de conteúdo.
@@ -20,6 +24,17 @@ class BaseContentGenerator(ABC):
     de texto transcrito.
     """
     
+    # Campos que os métodos preenchem em cada prompt (validados na inicialização)
+    PROMPT_FIELDS: Dict[str, Set[str]] = {
+        "summarize": {"text"},
+        "summarize_chunk": {"text", "part", "parts"},
+        "summarize_reduce": {"summaries"},
+        "diagram": {"text"},
+        "mindmap": {"texts"},
+        "mindmap_continue": set(),
+        "preprocess_mindmap": {"texts"},
+    }
+    
     def __init__(self, prompts_dir: Optional[Path] = None):
         """Inicializa o gerador de conteúdo.
         
@@ -34,6 +49,10 @@ class BaseContentGenerator(ABC):
         
         self.prompts_dir = Path(prompts_dir)
         self._validate_prompts_directory()
+        
+        # Templates compilados no primeiro uso, uma vez por processo e diretório
+        from .prompt_store import get_prompt_store
+        self._prompts = get_prompt_store(self.prompts_dir, self.PROMPT_FIELDS)
     
     def _validate_prompts_directory(self) -> None:
         """Valida se o diretório de prompts existe.
@@ -58,14 +77,26 @@ class BaseContentGenerator(ABC):
         Raises:
             FileNotFoundError: Se o arquivo de prompt não existir.
         """
-        prompt_file = self.prompts_dir / f"{prompt_name}.txt"
+        return self._prompts.get(prompt_name).source
+    
+    def _render_prompt(self, prompt_name: str, **values: object) -> str:
+        """Preenche um prompt com os valores dos seus campos.
         
-        if not prompt_file.exists():
-            raise FileNotFoundError(
-                f"Arquivo de prompt não encontrado: {prompt_file}"
-            )
+        Equivale a ``self._load_prompt(prompt_name).format(**values)``, usando
+        o template pré-compilado.
         
-        return prompt_file.read_text(encoding="utf-8")
+        Args:
+            prompt_name: Nome do arquivo de prompt (sem extensão).
+            **values: Valores dos campos do template (ex.: ``text``).
+            
+        Returns:
+            Prompt pronto para envio.
+            
+        Raises:
+            FileNotFoundError: Se o arquivo de prompt não existir.
+            KeyError: Se faltar o valor de algum campo do template.
+        """
+        return self._prompts.get(prompt_name).render(**values)
     
     @abstractmethod
     async def summarize(self, text: str) -> str:
@@ -124,8 +155,7 @@ class BaseContentGenerator(ABC):
         Raises:
             Exception: Se houver erro no pré-processamento.
         """
-        prompt = self._load_prompt("preprocess_mindmap")
-        formatted_prompt = prompt.format(texts="\n\n".join(texts))
+        formatted_prompt = self._render_prompt("preprocess_mindmap", texts="\n\n".join(texts))
         return await self.generate_content(formatted_prompt, "")
     
     @abstractmethod
@@ -166,6 +196,117 @@ class BaseContentGenerator(ABC):
         """
         pass
     
+    async def stream_model_with_messages(self, messages: List[Dict[str, str]], searchType: Optional[str] = None, tool: Optional[str] = None, chat_id: Optional[str] = None) -> AsyncIterator[str]:
+        """Chama o modelo e produz a resposta em trechos, à medida que chega.
+        
+        A implementação padrão aguarda a resposta completa de
+        ``call_model_with_messages`` e a entrega como um único trecho.
+        Provedores com suporte a streaming devem sobrescrever este método.
+        
+        Args:
+            messages: Lista de mensagens no formato [{"role": "user/assistant", "content": "..."}]
+            searchType: O tipo de pesquisa a ser realizada.
+            tool: A ferramenta a ser usada.
+            chat_id: O ID do chat a ser usado para manter a conversa.
+            
+        Yields:
+            Trechos do conteúdo da resposta do modelo.
+            
+        Raises:
+            Exception: Se houver erro na chamada do modelo.
+        """
+        result = await self.call_model_with_messages(messages, searchType=searchType, tool=tool, chat_id=chat_id)
+        if result:
+            yield result
+    
+    def generate_many(
+        self,
+        items: Iterable[Any],
+        task: Union[str, Callable[[Any], Awaitable[str]]] = "summarize",
+        concurrency: Optional[int] = None,
+        on_progress: Optional[Callable[["BatchProgress"], Any]] = None,
+        **task_kwargs: Any,
+    ) -> AsyncIterator["BatchResult"]:
+        """Executa uma tarefa para vários itens, com concorrência limitada.
+        
+        Os resultados são produzidos à medida que ficam prontos; use
+        ``BatchResult.index`` (ou ``generators.batch.ordered``) para recuperar
+        a ordem da entrada. A falha de um item não interrompe os demais: ela
+        é devolvida em ``BatchResult.error``. As chamadas continuam sujeitas
+        aos limites de taxa e de concorrência do cliente compartilhado.
+        
+        Exemplo::
+        
+            async for item in generator.generate_many(transcricoes, task="summarize", concurrency=16):
+                if item.ok:
+                    salvar(item.index, item.result)
+        
+        Args:
+            items: Itens de entrada (textos, ou listas de textos para
+                ``create_mindmap``/``preprocess_mindmap``).
+            task: Método a executar (``summarize``, ``diagram``,
+                ``generate_content``, ``create_mindmap``, ``preprocess_mindmap``)
+                ou uma função assíncrona que recebe o item.
+            concurrency: Máximo de itens em andamento (padrão: ``BATCH_CONCURRENCY``).
+            on_progress: Callback (síncrono ou assíncrono) chamado com um
+                ``BatchProgress`` a cada item concluído.
+            **task_kwargs: Argumentos fixos da tarefa (ex.: ``prompt`` para
+                ``generate_content``).
+            
+        Returns:
+            Iterador assíncrono com um ``BatchResult`` por item, na ordem de conclusão.
+            
+        Raises:
+            ValueError: Se a tarefa for desconhecida ou ``concurrency`` < 1
+                (ao iniciar a iteração).
+        """
+        from config import settings
+        from .batch import run_batch
+        
+        if concurrency is None:
+            concurrency = settings.batch_concurrency
+        # Retorna o próprio iterador do lote: fechá-lo (ex.: ``break`` seguido de
+        # ``aclose()``) cancela os itens em andamento
+        return run_batch(self, items, task, concurrency, on_progress, **task_kwargs)
+    
+    async def run_pipeline(
+        self,
+        text: str,
+        stages: Optional[List[str]] = None,
+        pipeline: Optional["ContentPipeline"] = None,
+    ) -> "PipelineResult":
+        """Gera resumo, diagrama e mapa mental de um texto como um grafo de etapas.
+        
+        Etapas independentes (resumo e diagrama) rodam ao mesmo tempo; o mapa
+        mental é gerado a partir do resumo assim que ele fica pronto. Etapas
+        já executadas com o mesmo modelo, texto e prompts vêm do cache de
+        respostas. A falha de uma etapa fica em ``PipelineResult.errors`` e
+        não interrompe as etapas independentes.
+        
+        Exemplo::
+        
+            resultado = await generator.run_pipeline(transcricao)
+            salvar(resultado["summary"], resultado["diagram"], resultado["mindmap"])
+            print(resultado.timings)
+        
+        Args:
+            text: Texto transcrito (ex.: a transcrição de um vídeo).
+            stages: Etapas a executar, com as suas dependências (padrão:
+                ``summary``, ``diagram`` e ``mindmap``).
+            pipeline: Pipeline com etapas próprias (padrão: ``ContentPipeline()``).
+            
+        Returns:
+            Conteúdo e tempo de cada etapa.
+            
+        Raises:
+            KeyError: Se alguma etapa pedida não existir.
+        """
+        from .pipeline import ContentPipeline
+        
+        if pipeline is None:
+            pipeline = ContentPipeline()
+        return await pipeline.run(self, text, stages)
+    
     def generate_chat_id(self) -> str: # <--- Added method
         """Gera um ID de chat aleatório no formato UUID4.
         
@@ -0,0 +1,199 @@
+"""Execução em lote das tarefas dos geradores com concorrência limitada.
+
+Usado por ``BaseContentGenerator.generate_many``. As chamadas passam pelo
+cliente do gerador, então continuam sujeitas ao limitador de taxa da conta e
+à janela de concorrência adaptativa de cada modelo; ``concurrency`` apenas
+limita quantos itens ficam em andamento (e em memória) ao mesmo tempo.
+"""
+
+import asyncio
+import inspect
+import time
+from dataclasses import dataclass
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+
+from utils.logger import logger
+from utils.metrics import metrics
+
+if TYPE_CHECKING:
+    from .base import BaseContentGenerator
+
+# Tarefa -> argumento do método que recebe cada item
+BATCH_TASKS: Dict[str, str] = {
+    "summarize": "text",
+    "diagram": "text",
+    "generate_content": "text",
+    "create_mindmap": "texts",
+    "preprocess_mindmap": "texts",
+}
+
+BatchTask = Union[str, Callable[[Any], Awaitable[str]]]
+
+
+@dataclass
+class BatchResult:
+    """Resultado de um item do lote.
+
+    Attributes:
+        index: Posição do item na entrada (para restaurar a ordem original).
+        item: O item de entrada.
+        result: Conteúdo gerado, ou None se o item falhou.
+        error: Exceção do item, se falhou.
+        duration: Tempo de processamento do item, em segundos.
+    """
+
+    index: int
+    item: Any
+    result: Optional[str] = None
+    error: Optional[BaseException] = None
+    duration: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        """True se o item foi processado sem erro."""
+        return self.error is None
+
+
+@dataclass
+class BatchProgress:
+    """Andamento do lote, informado ao callback de progresso a cada item concluído.
+
+    Attributes:
+        completed: Itens concluídos (com sucesso ou não).
+        failed: Itens que falharam.
+        total: Total de itens, se conhecido.
+        last: Resultado do item que acabou de concluir.
+    """
+
+    completed: int
+    failed: int
+    total: Optional[int]
+    last: BatchResult
+
+
+def _resolve_task(generator: "BaseContentGenerator", task: BatchTask, task_kwargs: Dict[str, Any]) -> Callable[[Any], Awaitable[str]]:
+    if callable(task):
+        return task
+    argument = BATCH_TASKS.get(task)
+    if argument is None:
+        raise ValueError(f"Tarefa de lote desconhecida: {task!r} (use {', '.join(BATCH_TASKS)} ou uma função)")
+    method = getattr(generator, task)
+    return lambda item: method(**task_kwargs, **{argument: item})
+
+
+async def run_batch(
+    generator: "BaseContentGenerator",
+    items: Iterable[Any],
+    task: BatchTask = "summarize",
+    concurrency: int = 8,
+    on_progress: Optional[Callable[[BatchProgress], Any]] = None,
+    **task_kwargs: Any,
+) -> AsyncIterator[BatchResult]:
+    """Processa os itens com no máximo ``concurrency`` em andamento.
+
+    Veja ``BaseContentGenerator.generate_many``.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency deve ser ao menos 1")
+    call = _resolve_task(generator, task, task_kwargs)
+    task_name = task if isinstance(task, str) else getattr(task, "__name__", "custom")
+    provider = generator.get_provider_name()
+    total = len(items) if hasattr(items, "__len__") else None  # type: ignore[arg-type]
+    source = iter(enumerate(items))
+
+    async def process(index: int, item: Any) -> BatchResult:
+        start = time.perf_counter()
+        try:
+            result = await call(item)
+        except Exception as e:
+            logger.warning(f"Item {index} do lote ({task_name}) falhou: {e}")
+            return BatchResult(index, item, error=e, duration=time.perf_counter() - start)
+        return BatchResult(index, item, result=result, duration=time.perf_counter() - start)
+
+    pending: Set["asyncio.Task[BatchResult]"] = set()
+
+    def fill() -> None:
+        while len(pending) < concurrency:
+            try:
+                index, item = next(source)
+            except StopIteration:
+                return
+            pending.add(asyncio.ensure_future(process(index, item)))
+
+    completed = failed = 0
+    try:
+        fill()
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for finished in done:
+                pending.discard(finished)
+            # Repõe os itens antes de entregar os resultados ao consumidor
+            fill()
+            metrics.set_gauge("batch_in_flight", len(pending), provider=provider)
+            for finished in sorted(done, key=lambda t: t.result().index):
+                result = finished.result()
+                completed += 1
+                if not result.ok:
+                    failed += 1
+                metrics.increment("batch_items_total", provider=provider, task=task_name, status="ok" if result.ok else "error")
+                if on_progress is not None:
+                    await _notify(on_progress, BatchProgress(completed, failed, total, result))
+                yield result
+    finally:
+        for pending_task in pending:
+            pending_task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        metrics.set_gauge("batch_in_flight", 0, provider=provider)
+
+
+async def run_all(
+    generator: "BaseContentGenerator",
+    items: Sequence[Any],
+    call: Callable[[Any], Awaitable[str]],
+    concurrency: int,
+) -> List[str]:
+    """Executa ``call`` para cada item em paralelo e retorna os resultados na ordem dos itens.
+
+    Diferente de ``run_batch``, a primeira falha é propagada e cancela os
+    itens ainda em andamento.
+    """
+    results: List[str] = [""] * len(items)
+    batch = run_batch(generator, items, call, concurrency)
+    try:
+        async for result in batch:
+            if not result.ok:
+                raise result.error  # type: ignore[misc]
+            results[result.index] = result.result  # type: ignore[assignment]
+    finally:
+        await batch.aclose()
+    return results
+
+
+async def _notify(callback: Callable[[BatchProgress], Any], progress: BatchProgress) -> None:
+    """Chama o callback de progresso (síncrono ou assíncrono) sem interromper o lote."""
+    try:
+        outcome = callback(progress)
+        if inspect.isawaitable(outcome):
+            await outcome
+    except Exception as e:
+        logger.warning(f"Callback de progresso do lote falhou: {e}")
+
+
+def ordered(results: Iterable[BatchResult]) -> Tuple[BatchResult, ...]:
+    """Ordena resultados do lote pela posição original dos itens."""
+    return tuple(sorted(results, key=lambda result: result.index))
@@ -0,0 +1,178 @@
+"""Divisão de textos longos e resumo em partes (map-reduce).
+
+Uma transcrição longa enviada em uma única mensagem gera uma requisição
+lenta, que às vezes volta truncada. Para esses textos, o resumo é feito em
+duas etapas:
+
+- *map*: o texto é dividido em partes de tamanho parecido, em limites de
+  parágrafo ou frase, e cada parte é resumida em paralelo;
+- *reduce*: os resumos parciais são combinados no resumo final. Se eles
+  ainda não couberem em uma requisição, são combinados em grupos antes,
+  em quantos níveis forem necessários.
+
+O tempo total passa a depender da maior parte, e não do documento inteiro.
+O tamanho em tokens é estimado pelo número de caracteres, sem tokenizador.
+"""
+
+import math
+import re
+from typing import TYPE_CHECKING, Awaitable, Callable, Iterator, List, Sequence, Tuple
+
+from .batch import run_all
+
+if TYPE_CHECKING:
+    from .base import BaseContentGenerator
+
+# Média aproximada de caracteres por token em textos em português
+CHARS_PER_TOKEN = 3.5
+
+_PARAGRAPH_RE = re.compile(r"\n\s*\n")
+_SENTENCE_RE = re.compile(r"(?<=[.!?…])\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Estima o número de tokens do texto a partir do número de caracteres."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _split_words(text: str, piece_chars: int, max_chars: int) -> Iterator[str]:
+    """Quebra um trecho sem pontuação entre palavras, em pedaços de até ``piece_chars``.
+
+    Só palavras maiores que ``max_chars`` são cortadas no meio.
+    """
+    current = ""
+    for word in text.split():
+        while len(word) > max_chars:
+            if current:
+                yield current
+                current = ""
+            yield word[:max_chars]
+            word = word[max_chars:]
+        if current and len(current) + 1 + len(word) > piece_chars:
+            yield current
+            current = word
+        else:
+            current = f"{current} {word}" if current else word
+    if current:
+        yield current
+
+
+def _units(text: str, piece_chars: int, max_chars: int) -> Iterator[Tuple[str, str]]:
+    """Produz (separador, trecho) com trechos de até ``piece_chars`` caracteres.
+
+    Parágrafos inteiros são preferidos; parágrafos maiores são quebrados em
+    frases, e frases maiores entre palavras.
+    """
+    for paragraph in _PARAGRAPH_RE.split(text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph) <= piece_chars:
+            yield "\n\n", paragraph
+            continue
+        separator = "\n\n"
+        for sentence in _SENTENCE_RE.split(paragraph):
+            pieces = [sentence] if len(sentence) <= piece_chars else _split_words(sentence, piece_chars, max_chars)
+            for piece in pieces:
+                yield separator, piece
+                separator = " "
+
+
+def split_text(text: str, max_tokens: int) -> List[str]:
+    """Divide o texto em partes de até ``max_tokens`` tokens estimados.
+
+    As partes terminam em limites de parágrafo ou frase e têm tamanhos
+    parecidos: um texto com 1,2x o limite vira duas partes de 0,6x, e não
+    uma cheia e outra pequena.
+
+    Args:
+        text: Texto a dividir.
+        max_tokens: Tamanho máximo estimado de cada parte.
+
+    Returns:
+        As partes, na ordem do texto (uma só se o texto couber no limite).
+
+    Raises:
+        ValueError: Se ``max_tokens`` < 1.
+    """
+    if max_tokens < 1:
+        raise ValueError("max_tokens deve ser ao menos 1")
+    text = text.strip()
+    max_chars = max(1, int(max_tokens * CHARS_PER_TOKEN))
+    if len(text) <= max_chars:
+        return [text] if text else []
+
+    def target_size(remaining: int) -> float:
+        # Divide o que falta por igual entre o menor número de partes possível
+        return remaining / math.ceil(remaining / max_chars)
+
+    remaining = len(text)
+    target = target_size(remaining)
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+    # Trechos de até 1/4 do limite: cada parte fica a no máximo 1/8 do alvo
+    for separator, unit in _units(text, max(1, max_chars // 4), max_chars):
+        added = len(unit) + (len(separator) if current else 0)
+        if current and (size + added > max_chars or size + added / 2 > target):
+            chunks.append("".join(current))
+            remaining -= size
+            target = target_size(max(remaining, 1))
+            current, size, added = [], 0, len(unit)
+        current.append(separator + unit if current else unit)
+        size += added
+    if current:
+        chunks.append("".join(current))
+    return chunks
+
+
+def group_texts(texts: Sequence[str], max_tokens: int) -> List[List[str]]:
+    """Agrupa textos consecutivos em grupos de até ``max_tokens`` tokens estimados.
+
+    Cada grupo tem ao menos dois textos (quando há mais de um), para que
+    cada nível de combinação reduza o número de textos.
+    """
+    groups: List[List[str]] = []
+    current: List[str] = []
+    size = 0
+    for text in texts:
+        tokens = estimate_tokens(text)
+        if len(current) >= 2 and size + tokens > max_tokens:
+            groups.append(current)
+            current, size = [], 0
+        current.append(text)
+        size += tokens
+    if current:
+        if len(current) == 1 and groups:
+            groups[-1].append(current[0])
+        else:
+            groups.append(current)
+    return groups
+
+
+async def map_reduce(
+    generator: "BaseContentGenerator",
+    chunks: Sequence[str],
+    summarize_chunk: Callable[[Tuple[int, str]], Awaitable[str]],
+    combine: Callable[[List[str]], Awaitable[str]],
+    max_tokens: int,
+    concurrency: int,
+) -> str:
+    """Resume as partes em paralelo e combina os resumos parciais.
+
+    Args:
+        generator: Gerador usado nas chamadas (para métricas e logs do lote).
+        chunks: Partes do texto, na ordem.
+        summarize_chunk: Resume uma parte; recebe ``(número da parte, texto)``.
+        combine: Combina resumos consecutivos em um só.
+        max_tokens: Tamanho máximo estimado da entrada de cada combinação.
+        concurrency: Chamadas em andamento ao mesmo tempo.
+
+    Returns:
+        O resultado da combinação final.
+    """
+    summaries = await run_all(generator, list(enumerate(chunks, 1)), summarize_chunk, concurrency)
+    while len(summaries) > 2 and estimate_tokens("".join(summaries)) > max_tokens:
+        # Os resumos parciais não cabem em uma requisição: combina em grupos primeiro
+        summaries = await run_all(generator, group_texts(summaries, max_tokens), combine, concurrency)
+    return await combine(summaries)
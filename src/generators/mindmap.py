@@ -0,0 +1,391 @@
+"""Geração incremental de mapas mentais OPML.
+
+O ``create_mindmap`` juntava todos os textos em um único prompt e devolvia o
+que voltasse: mapas grandes chegavam cortados pelo limite de tokens e
+precisavam ser gerados de novo, por inteiro. O ``MindmapEngine``:
+
+- pré-processa cada texto (``preprocess_mindmap``) e gera o OPML de cada um
+  em paralelo;
+- valida o OPML enquanto ele chega, com o parser XML incremental (expat);
+- quando a resposta termina com elementos abertos ou o XML fica inválido,
+  descarta só a última tag e pede a continuação na mesma conversa (até
+  ``MINDMAP_MAX_CONTINUATIONS`` vezes);
+- junta os documentos parciais localmente em uma única árvore OPML, unindo
+  ramos com o mesmo texto, sem pedir ao modelo para gerar de novo os ramos
+  já concluídos.
+"""
+
+import copy
+import re
+import xml.etree.ElementTree as ET
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence
+from xml.parsers import expat
+
+from config import settings
+from utils.logger import logger
+from utils.metrics import metrics
+
+from .batch import run_all
+
+if TYPE_CHECKING:
+    from .base import BaseContentGenerator
+
+XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8"?>'
+
+# Início de um documento OPML na resposta (antes dele pode haver texto ou ```xml)
+_DOCUMENT_START_RE = re.compile(r"<\?xml|<opml\b")
+# "&" que não inicia uma entidade (ex.: "P&D"): os modelos costumam não escapá-lo
+_BARE_AMPERSAND_RE = re.compile(r"&(?!(?:[a-zA-Z][a-zA-Z0-9]*|#[0-9]+|#x[0-9a-fA-F]+);)")
+_CODE_FENCE_RE = re.compile(r"^\s*```[a-zA-Z]*[ \t]*\n?")
+# Maior entidade considerada ao reter um "&" no fim de um trecho
+_MAX_ENTITY = 10
+# Caracteres do início de uma continuação comparados com o fim do documento
+_OVERLAP_WINDOW = 512
+_MIN_OVERLAP = 16
+
+
+class OpmlError(ValueError):
+    """A resposta não é um documento OPML."""
+
+
+class OpmlStreamValidator:
+    """Valida um documento OPML à medida que os trechos da resposta chegam.
+
+    O texto antes do documento (ex.: ```xml) é descartado e ``&`` sem escape
+    é corrigido. A cada tag completa, ``boundary`` avança para o início dela:
+    o documento até ``boundary`` só contém tags completas e válidas, e é o
+    ponto a partir do qual uma continuação é pedida.
+
+    Attributes:
+        started: Se o início do documento já foi encontrado.
+        complete: Se o elemento raiz já foi fechado.
+        error: Descrição do erro de XML, se houver.
+    """
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        """Descarta tudo o que foi recebido, para validar um novo documento."""
+        self._data = bytearray()
+        self._pending = ""
+        self._end = 0
+        self._stack: List[str] = []
+        self._boundary_stack: List[str] = []
+        self.boundary = 0
+        self.started = False
+        self.complete = False
+        self.error: Optional[str] = None
+        self._parser = self._new_parser()
+
+    def _new_parser(self) -> "expat.XMLParserType":
+        parser = expat.ParserCreate()
+        parser.StartElementHandler = self._on_start
+        parser.EndElementHandler = self._on_end
+        return parser
+
+    def _on_start(self, name: str, attrs: Dict[str, str]) -> None:
+        if not self._stack and name != "opml":
+            raise OpmlError(f"elemento raiz <{name}> em vez de <opml>")
+        self.boundary = self._parser.CurrentByteIndex
+        self._boundary_stack = list(self._stack)
+        self._stack.append(name)
+
+    def _on_end(self, name: str) -> None:
+        index = self._parser.CurrentByteIndex
+        # Em "</x>" o evento aponta para o início da tag, com x ainda aberto;
+        # em "<x/>" aponta para depois dela, com x já concluído
+        end_tag = self._data.startswith(b"</", index)
+        if end_tag:
+            self._boundary_stack = list(self._stack)
+        self._stack.pop()
+        if not end_tag:
+            self._boundary_stack = list(self._stack)
+        self.boundary = index
+        if not self._stack:
+            self.complete = True
+            self._end = self._data.index(b">", index) + 1 if end_tag else index
+
+    @property
+    def open_elements(self) -> List[str]:
+        """Elementos abertos em ``boundary``, do mais externo ao mais interno."""
+        return list(self._boundary_stack)
+
+    def feed(self, chunk: str) -> bool:
+        """Valida mais um trecho da resposta.
+
+        Returns:
+            False quando não adianta continuar lendo a resposta (documento
+            concluído ou XML inválido).
+
+        Raises:
+            OpmlError: Se o elemento raiz não for ``<opml>``.
+        """
+        if self.complete or self.error:
+            return False
+        self._pending += chunk
+        if not self.started:
+            match = _DOCUMENT_START_RE.search(self._pending)
+            if match is None:
+                # Guarda só o suficiente para reconhecer um início dividido entre trechos
+                self._pending = self._pending[-5:]
+                return True
+            self.started = True
+            self._pending = self._pending[match.start():]
+
+        text = self._pending
+        ampersand = text.rfind("&", max(0, len(text) - _MAX_ENTITY))
+        if ampersand >= 0 and ";" not in text[ampersand:]:
+            # A entidade pode continuar no próximo trecho
+            text, self._pending = text[:ampersand], text[ampersand:]
+        else:
+            self._pending = ""
+        return self._parse(_BARE_AMPERSAND_RE.sub("&amp;", text).encode("utf-8"))
+
+    def finish(self) -> None:
+        """Valida o que ficou retido no fim da resposta."""
+        if self.started and self._pending and not (self.complete or self.error):
+            text, self._pending = self._pending, ""
+            self._parse(_BARE_AMPERSAND_RE.sub("&amp;", text).encode("utf-8"))
+
+    def _parse(self, data: bytes) -> bool:
+        self._data += data
+        try:
+            self._parser.Parse(data, False)
+        except expat.ExpatError as e:
+            if not self.complete:
+                self.error = expat.ErrorString(e.code)
+                return False
+            # Texto depois de </opml> é ignorado
+        return not self.complete
+
+    def text(self) -> str:
+        """Tudo o que foi validado até agora (após ``resume``, o documento enviado ao modelo)."""
+        return self._data.decode("utf-8", errors="ignore")
+
+    def prefix(self) -> str:
+        """Documento até ``boundary``: só tags completas."""
+        return self._data[:self.boundary].decode("utf-8", errors="ignore")
+
+    def resume(self) -> str:
+        """Volta ao último ponto válido para receber uma continuação.
+
+        Returns:
+            O documento até esse ponto, enviado como resposta anterior do
+            assistente no pedido de continuação.
+        """
+        prefix = self._data[:self.boundary]
+        self._data = bytearray()
+        self._pending = ""
+        self._stack = []
+        self._boundary_stack = []
+        self.boundary = 0
+        self.error = None
+        self._parser = self._new_parser()
+        if prefix:
+            self._parse(bytes(prefix))
+        return prefix.decode("utf-8", errors="ignore")
+
+    def document(self) -> str:
+        """Documento completo, sem o texto depois de ``</opml>``."""
+        return self._data[:self._end].decode("utf-8")
+
+    def close_open(self) -> str:
+        """Documento até ``boundary``, com os elementos abertos fechados."""
+        closing = "".join(f"</{name}>" for name in reversed(self._boundary_stack))
+        return self.prefix().rstrip() + closing
+
+
+def _strip_overlap(prefix: str, continuation: str) -> str:
+    """Remove do início da continuação o trecho que repete o fim do documento."""
+    head = continuation.lstrip()
+    tail = prefix.rstrip()
+    for size in range(min(len(head), len(tail)), _MIN_OVERLAP - 1, -1):
+        if tail.endswith(head[:size]):
+            rest = head[size:]
+            # O espaço depois do trecho repetido já está no fim do documento
+            return rest.lstrip() if prefix[-1:].isspace() else rest
+    return continuation
+
+
+def _outline_key(outline: ET.Element) -> str:
+    return " ".join(outline.get("text", "").split()).casefold()
+
+
+def _merge_outlines(parent: ET.Element, outlines: Sequence[ET.Element]) -> None:
+    """Acrescenta os outlines ao pai, unindo os que têm o mesmo texto."""
+    index = {_outline_key(child): child for child in parent.findall("outline")}
+    for outline in outlines:
+        key = _outline_key(outline)
+        existing = index.get(key) if key else None
+        if existing is None:
+            parent.append(outline)
+            index[key] = outline
+        else:
+            _merge_outlines(existing, outline.findall("outline"))
+
+
+def merge_opml(documents: Sequence[str]) -> str:
+    """Junta documentos OPML em uma única árvore.
+
+    O ``<head>`` e o outline raiz (``[directory_name]``) vêm do primeiro
+    documento. Os ramos de todos os documentos ficam sob a raiz, e ramos com
+    o mesmo texto (no mesmo nível) são unidos.
+
+    Raises:
+        OpmlError: Se algum documento não for um OPML bem formado.
+    """
+    roots = []
+    for number, document in enumerate(documents, 1):
+        try:
+            roots.append(ET.fromstring(document.encode("utf-8")))
+        except ET.ParseError as e:
+            raise OpmlError(f"documento {number} inválido: {e}") from None
+
+    merged = ET.Element("opml", roots[0].attrib or {"version": "2.0"})
+    head = roots[0].find("head")
+    merged.append(copy.deepcopy(head) if head is not None else ET.Element("head"))
+    body = ET.SubElement(merged, "body")
+    top: Optional[ET.Element] = None
+    for root in roots:
+        outlines = root.findall("./body/outline")
+        if len(outlines) == 1:
+            # Outline raiz com o nome do diretório: os ramos ficam dentro dele
+            if top is None:
+                top = ET.SubElement(body, "outline", outlines[0].attrib)
+            outlines = outlines[0].findall("outline")
+        if top is None:
+            top = ET.SubElement(body, "outline", {"text": "[directory_name]"})
+        _merge_outlines(top, [copy.deepcopy(outline) for outline in outlines])
+
+    ET.indent(merged, space="    ")
+    return XML_DECLARATION + "\n" + ET.tostring(merged, encoding="unicode")
+
+
+class MindmapEngine:
+    """Gera mapas mentais OPML por partes, com validação e continuação automática."""
+
+    def __init__(
+        self,
+        generator: "BaseContentGenerator",
+        concurrency: Optional[int] = None,
+        max_continuations: Optional[int] = None,
+    ):
+        """Inicializa o motor.
+
+        Args:
+            generator: Gerador usado no pré-processamento e na geração do OPML.
+            concurrency: Textos processados ao mesmo tempo (padrão: ``BATCH_CONCURRENCY``).
+            max_continuations: Pedidos de continuação por documento (padrão:
+                ``MINDMAP_MAX_CONTINUATIONS``).
+        """
+        self.generator = generator
+        self.concurrency = concurrency if concurrency is not None else settings.batch_concurrency
+        self.max_continuations = (
+            max_continuations if max_continuations is not None else settings.mindmap_max_continuations
+        )
+
+    async def build(self, texts: Sequence[str]) -> str:
+        """Cria um mapa mental OPML a partir dos textos.
+
+        Args:
+            texts: Textos transcritos (ou resumos).
+
+        Returns:
+            Mapa mental em formato OPML.
+
+        Raises:
+            OpmlError: Se o modelo não responder com OPML.
+        """
+        documents = await run_all(self.generator, list(texts), self._outline, self.concurrency)
+        return documents[0] if len(documents) == 1 else merge_opml(documents)
+
+    async def _outline(self, text: str) -> str:
+        structure = await self.generator.preprocess_mindmap([text])
+        return await self.stream_opml(self.generator._render_prompt("mindmap", texts=structure))
+
+    async def stream_opml(self, prompt: str) -> str:
+        """Gera um documento OPML, pedindo continuações até ele ficar completo.
+
+        Se o documento continuar incompleto depois de ``max_continuations``
+        pedidos, os elementos abertos são fechados e o documento é retornado
+        assim mesmo.
+
+        Args:
+            prompt: Prompt que pede o OPML.
+
+        Returns:
+            Documento OPML bem formado.
+
+        Raises:
+            OpmlError: Se o modelo não responder com OPML.
+        """
+        provider = self.generator.get_provider_name()
+        validator = OpmlStreamValidator()
+        messages = [{"role": "user", "content": prompt}]
+        continuing = False
+        for attempt in range(self.max_continuations + 1):
+            await self._consume(messages, validator, continuing)
+            if validator.complete:
+                return validator.document()
+            if attempt == self.max_continuations:
+                break
+            reason = "invalid" if validator.error else "truncated"
+            metrics.increment("mindmap_continuations_total", provider=provider, reason=reason)
+            logger.info(
+                f"OPML incompleto ({validator.error or 'resposta interrompida'}); "
+                f"pedindo continuação {attempt + 1}/{self.max_continuations}"
+            )
+            if not validator.open_elements:
+                # Nada aproveitável: pede o documento de novo
+                validator, continuing = OpmlStreamValidator(), False
+                continue
+            messages = [
+                {"role": "user", "content": prompt},
+                {"role": "assistant", "content": validator.resume()},
+                {"role": "user", "content": self.generator._render_prompt("mindmap_continue")},
+            ]
+            continuing = True
+
+        if not validator.open_elements:
+            raise OpmlError("a resposta do modelo não contém um documento OPML")
+        metrics.increment("mindmap_incomplete_total", provider=provider)
+        logger.warning(
+            f"OPML ainda incompleto após {self.max_continuations} continuações; "
+            f"fechando {len(validator.open_elements)} elementos abertos"
+        )
+        return validator.close_open()
+
+    async def _consume(self, messages: List[Dict[str, str]], validator: OpmlStreamValidator, continuing: bool) -> None:
+        """Passa a resposta pelo validador, interrompendo o stream quando não adianta continuar."""
+        stream = self.generator.stream_model_with_messages(messages)
+        head: Optional[str] = "" if continuing else None
+        try:
+            async for chunk in stream:
+                if head is not None:
+                    # Acumula o início da continuação para remover repetições
+                    head += chunk
+                    if len(head) < _OVERLAP_WINDOW:
+                        continue
+                    chunk, head = self._continuation(validator, head), None
+                if not validator.feed(chunk):
+                    break
+            else:
+                if head:
+                    validator.feed(self._continuation(validator, head))
+                validator.finish()
+        finally:
+            aclose = getattr(stream, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    def _continuation(self, validator: OpmlStreamValidator, head: str) -> str:
+        """Prepara o início de uma continuação para o validador."""
+        head = _CODE_FENCE_RE.sub("", head, count=1)
+        restart = _DOCUMENT_START_RE.search(head)
+        if restart is not None and "<" not in head[:restart.start()]:
+            # O modelo recomeçou o documento (às vezes depois de uma frase):
+            # valida a nova versão desde o início
+            validator.reset()
+            return head[restart.start():]
+        return _strip_overlap(validator.text(), head)
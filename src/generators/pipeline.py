@@ -0,0 +1,309 @@
+"""Pipeline ContentGen: etapas de geração executadas como um grafo de dependências.
+
+Para cada vídeo, os chamadores executavam ``summarize``, ``diagram`` e o mapa
+mental um após o outro, embora só o mapa mental dependa de outra etapa. O
+``ContentPipeline`` declara as etapas e as suas dependências e:
+
+- inicia cada etapa assim que as suas dependências terminam, em paralelo com
+  as etapas independentes;
+- entrega a cada etapa os resultados das etapas de que ela depende (o mapa
+  mental é gerado a partir do resumo);
+- reaproveita resultados de etapas já executadas com o mesmo modelo, texto,
+  entradas e prompts (cache de respostas, respeitando ``cache_mode``);
+- registra o tempo de cada etapa no resultado, no log e em ``utils.metrics``.
+
+O tempo total passa a ser o do ramo mais lento, e não a soma das etapas.
+
+Exemplo::
+
+    resultado = await generator.run_pipeline(transcricao)
+    resultado["mindmap"], resultado.timings
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from utils.logger import logger
+from utils.metrics import metrics
+from utils.response_cache import CacheMode, current_cache_mode, get_response_cache, make_cache_key
+
+if TYPE_CHECKING:
+    from .base import BaseContentGenerator
+
+# Função de uma etapa: (gerador, texto de entrada, resultados das dependências) -> conteúdo
+StageFunction = Callable[["BaseContentGenerator", str, Mapping[str, str]], Awaitable[str]]
+
+
+class PipelineError(ValueError):
+    """Definição de pipeline inválida (etapa repetida, dependência desconhecida ou ciclo)."""
+
+
+@dataclass(frozen=True)
+class Stage:
+    """Etapa do pipeline.
+
+    Attributes:
+        name: Nome da etapa, usado nas dependências e nos resultados.
+        run: Função que gera o conteúdo da etapa.
+        depends_on: Etapas cujos resultados a etapa recebe.
+        prompts: Prompts usados pela etapa; uma alteração neles invalida o
+            resultado em cache.
+        cache: Se o resultado da etapa pode ser reaproveitado.
+    """
+
+    name: str
+    run: StageFunction
+    depends_on: Tuple[str, ...] = ()
+    prompts: Tuple[str, ...] = ()
+    cache: bool = True
+
+
+@dataclass
+class StageResult:
+    """Resultado de uma etapa.
+
+    Attributes:
+        name: Nome da etapa.
+        output: Conteúdo gerado, ou None se a etapa falhou ou não foi executada.
+        error: Exceção da etapa, se falhou.
+        duration: Tempo da etapa, em segundos.
+        cached: Se o conteúdo veio do cache.
+        skipped: Se a etapa não foi executada porque uma dependência falhou.
+    """
+
+    name: str
+    output: Optional[str] = None
+    error: Optional[BaseException] = None
+    duration: float = 0.0
+    cached: bool = False
+    skipped: bool = False
+
+    @property
+    def ok(self) -> bool:
+        """True se a etapa gerou o seu conteúdo."""
+        return self.error is None and not self.skipped
+
+
+@dataclass
+class PipelineResult:
+    """Resultado de uma execução do pipeline.
+
+    Attributes:
+        stages: Resultado de cada etapa, na ordem em que terminaram.
+        duration: Tempo total da execução, em segundos.
+    """
+
+    stages: Dict[str, StageResult] = field(default_factory=dict)
+    duration: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        """True se todas as etapas geraram o seu conteúdo."""
+        return all(result.ok for result in self.stages.values())
+
+    @property
+    def timings(self) -> Dict[str, float]:
+        """Tempo de cada etapa, em segundos."""
+        return {name: result.duration for name, result in self.stages.items()}
+
+    @property
+    def errors(self) -> Dict[str, BaseException]:
+        """Exceção de cada etapa que falhou."""
+        return {name: result.error for name, result in self.stages.items() if result.error is not None}
+
+    def __getitem__(self, name: str) -> str:
+        """Conteúdo da etapa.
+
+        Raises:
+            KeyError: Se a etapa não fez parte da execução.
+            Exception: A exceção da etapa, se ela falhou.
+        """
+        result = self.stages[name]
+        if result.error is not None:
+            raise result.error
+        if result.skipped:
+            raise KeyError(f"{name} (não executada: dependência falhou)")
+        return result.output  # type: ignore[return-value]
+
+
+async def _summary(generator: "BaseContentGenerator", text: str, inputs: Mapping[str, str]) -> str:
+    return await generator.summarize(text)
+
+
+async def _diagram(generator: "BaseContentGenerator", text: str, inputs: Mapping[str, str]) -> str:
+    return await generator.diagram(text)
+
+
+async def _mindmap(generator: "BaseContentGenerator", text: str, inputs: Mapping[str, str]) -> str:
+    # O resumo já condensa o conteúdo: o mapa mental parte dele, e não da transcrição
+    return await generator.create_mindmap([inputs["summary"]])
+
+
+DEFAULT_STAGES: Tuple[Stage, ...] = (
+    Stage("summary", _summary, prompts=("summarize", "summarize_chunk", "summarize_reduce")),
+    Stage("diagram", _diagram, prompts=("diagram",)),
+    Stage("mindmap", _mindmap, depends_on=("summary",), prompts=("preprocess_mindmap", "mindmap", "mindmap_continue")),
+)
+
+
+class ContentPipeline:
+    """Executa as etapas de geração de conteúdo respeitando as dependências entre elas."""
+
+    def __init__(self, stages: Iterable[Stage] = DEFAULT_STAGES):
+        """Valida e ordena as etapas.
+
+        Args:
+            stages: Etapas do pipeline (padrão: resumo, diagrama e mapa
+                mental a partir do resumo).
+
+        Raises:
+            PipelineError: Se houver etapas repetidas, dependências
+                desconhecidas ou ciclos.
+        """
+        self.stages: Dict[str, Stage] = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise PipelineError(f"Etapa repetida: {stage.name!r}")
+            self.stages[stage.name] = stage
+        for stage in self.stages.values():
+            unknown = [name for name in stage.depends_on if name not in self.stages]
+            if unknown:
+                raise PipelineError(f"Etapa {stage.name!r} depende de etapas desconhecidas: {', '.join(unknown)}")
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> List[str]:
+        order: List[str] = []
+        remaining = {name: set(stage.depends_on) for name, stage in self.stages.items()}
+        while remaining:
+            ready = [name for name, deps in remaining.items() if not deps]
+            if not ready:
+                raise PipelineError(f"Dependências circulares entre as etapas: {', '.join(sorted(remaining))}")
+            for name in ready:
+                order.append(name)
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+        return order
+
+    def _selection(self, names: Optional[Sequence[str]]) -> List[str]:
+        """Etapas pedidas e as suas dependências, em ordem topológica."""
+        if names is None:
+            return list(self.order)
+        selected = set()
+        stack = list(names)
+        while stack:
+            name = stack.pop()
+            if name not in self.stages:
+                raise KeyError(f"Etapa desconhecida: {name!r}")
+            if name not in selected:
+                selected.add(name)
+                stack.extend(self.stages[name].depends_on)
+        return [name for name in self.order if name in selected]
+
+    async def run(
+        self,
+        generator: "BaseContentGenerator",
+        text: str,
+        stages: Optional[Sequence[str]] = None,
+    ) -> PipelineResult:
+        """Executa o pipeline para um texto.
+
+        A falha de uma etapa não interrompe as etapas independentes; as
+        etapas que dependem dela são marcadas como não executadas.
+
+        Args:
+            generator: Gerador usado em todas as etapas.
+            text: Texto transcrito (ex.: a transcrição de um vídeo).
+            stages: Etapas a executar, com as suas dependências (padrão: todas).
+
+        Returns:
+            Resultados e tempos de cada etapa.
+
+        Raises:
+            KeyError: Se alguma etapa pedida não existir.
+        """
+        waiting = self._selection(stages)
+        result = PipelineResult()
+        running: Dict["asyncio.Task[StageResult]", str] = {}
+        start = time.perf_counter()
+        try:
+            while waiting or running:
+                for name in list(waiting):
+                    stage = self.stages[name]
+                    if any(dep in result.stages and not result.stages[dep].ok for dep in stage.depends_on):
+                        waiting.remove(name)
+                        result.stages[name] = StageResult(name, skipped=True)
+                        metrics.increment("pipeline_stages_total", stage=name, status="skipped")
+                        logger.warning(f"Etapa '{name}' não executada: uma dependência falhou")
+                    elif all(dep in result.stages for dep in stage.depends_on):
+                        waiting.remove(name)
+                        inputs = {dep: result.stages[dep].output for dep in stage.depends_on}
+                        task = asyncio.ensure_future(self._run_stage(stage, generator, text, inputs))  # type: ignore[arg-type]
+                        running[task] = name
+                if not running:
+                    # Só restaram etapas cujas dependências foram marcadas nesta passada
+                    continue
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    stage_result = task.result()
+                    result.stages[running.pop(task)] = stage_result
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+        result.duration = time.perf_counter() - start
+        logger.info(
+            f"Pipeline concluído em {result.duration:.2f}s: "
+            + ", ".join(
+                f"{name} {stage_result.duration:.2f}s" + (" (cache)" if stage_result.cached else "")
+                for name, stage_result in result.stages.items()
+                if not stage_result.skipped
+            )
+        )
+        return result
+
+    def _cache_key(self, stage: Stage, generator: "BaseContentGenerator", text: str, inputs: Mapping[str, str]) -> str:
+        prompts = {name: generator._load_prompt(name) for name in stage.prompts}
+        model = getattr(generator, "model_name", None)
+        return make_cache_key("pipeline", stage.name, generator.get_provider_name(), model, prompts, text, inputs)
+
+    async def _run_stage(
+        self,
+        stage: Stage,
+        generator: "BaseContentGenerator",
+        text: str,
+        inputs: Mapping[str, str],
+    ) -> StageResult:
+        """Executa uma etapa, consultando o cache de respostas antes."""
+        provider = generator.get_provider_name()
+        start = time.perf_counter()
+        cache = get_response_cache() if stage.cache else None
+        mode = current_cache_mode()
+        cache_key: Optional[str] = None
+        try:
+            if cache is not None and mode is not CacheMode.BYPASS:
+                cache_key = self._cache_key(stage, generator, text, inputs)
+                if mode is CacheMode.USE:
+                    cached = cache.get(cache_key)
+                    if cached is not None:
+                        return self._finish(StageResult(stage.name, cached, cached=True), start, provider)
+            output = await stage.run(generator, text, inputs)
+        except Exception as e:
+            logger.warning(f"Etapa '{stage.name}' falhou: {e}")
+            return self._finish(StageResult(stage.name, error=e), start, provider)
+        if cache_key is not None:
+            cache.set(cache_key, output)  # type: ignore[union-attr]
+        return self._finish(StageResult(stage.name, output), start, provider)
+
+    @staticmethod
+    def _finish(stage_result: StageResult, start: float, provider: str) -> StageResult:
+        stage_result.duration = time.perf_counter() - start
+        status = "error" if stage_result.error is not None else "cached" if stage_result.cached else "ok"
+        metrics.increment("pipeline_stages_total", stage=stage_result.name, status=status)
+        metrics.observe("pipeline_stage_seconds", stage_result.duration, stage=stage_result.name, provider=provider)
+        logger.debug(f"Etapa '{stage_result.name}' ({status}) em {stage_result.duration:.2f}s")
+        return stage_result
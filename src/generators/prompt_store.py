@@ -0,0 +1,278 @@
+"""Armazenamento de templates de prompt compilados.
+
+Os prompts (``prompts/*.txt``, de 3 a 7 KB) eram lidos do disco e
+formatados com ``str.format`` a cada chamada. O ``PromptStore`` compila cada
+template no primeiro uso e o reaproveita pelo resto do processo:
+
+- cada template é dividido em trechos estáticos e campos (``{text}``), e a
+  renderização só concatena os trechos com os valores;
+- um template inválido (ex.: chave sem par) só afeta quem o usa: ``get``
+  levanta ``PromptError`` para ele, e os demais continuam disponíveis;
+- uma alteração no arquivo (``mtime``/tamanho) é detectada em até
+  ``PROMPT_RELOAD_INTERVAL`` segundos e o template é recompilado;
+- com ``PROMPT_MINIFY=true``, a indentação e as linhas em branco dos
+  templates em estilo XML são removidas, reduzindo o tamanho das requisições;
+- campos esperados ausentes no template (ex.: ``{text}`` no lugar de
+  ``{texts}``), desconhecidos ou repetidos (o conteúdo seria enviado mais de
+  uma vez) nos prompts usados pelos geradores são registrados na criação do
+  store, e não descobertos no meio de uma requisição.
+"""
+
+import threading
+import time
+from pathlib import Path
+from string import Formatter
+from typing import Dict, FrozenSet, List, Mapping, Optional, Set, Tuple
+
+from config import settings
+from utils.logger import logger
+
+
+class PromptError(ValueError):
+    """Template de prompt que não pode ser compilado (ex.: chave sem par)."""
+
+
+class PromptTemplate:
+    """Template de prompt pré-compilado.
+
+    Attributes:
+        name: Nome do prompt (nome do arquivo sem extensão).
+        source: Texto do template (após a minificação, se ativa).
+        fields: Campos usados pelo template.
+    """
+
+    __slots__ = ("name", "path", "source", "fields", "_literals", "_names", "_simple", "_stat", "_checked_at")
+
+    def __init__(self, name: str, path: Path, source: str, stat: Tuple[int, int]):
+        self.name = name
+        self.path = path
+        self.source = source
+        self._stat = stat
+        self._checked_at = time.monotonic()
+
+        literals: List[str] = []
+        names: List[str] = []
+        simple = True
+        literal = ""
+        for text, field, spec, conversion in Formatter().parse(source):
+            literal += text
+            if field is None:
+                continue
+            if spec or conversion or not field.isidentifier():
+                # Campos com formatação ou acesso a atributos usam str.format
+                simple = False
+            literals.append(literal)
+            names.append(field)
+            literal = ""
+        literals.append(literal)
+
+        self.fields: FrozenSet[str] = frozenset(name.split(".")[0].split("[")[0] for name in names)
+        self._literals = literals
+        self._names = names
+        self._simple = simple
+
+    def occurrences(self, field: str) -> int:
+        """Quantas vezes o campo aparece no template."""
+        return sum(1 for name in self._names if name == field)
+
+    def render(self, **values: object) -> str:
+        """Preenche o template, como ``str.format(**values)``.
+
+        Raises:
+            KeyError: Se faltar o valor de algum campo do template.
+        """
+        if not self._simple:
+            return self.source.format(**values)
+        literals = self._literals
+        parts = [literals[0]]
+        for index, name in enumerate(self._names, 1):
+            parts.append(str(values[name]))
+            parts.append(literals[index])
+        return "".join(parts)
+
+
+def _file_stat(path: Path) -> Tuple[int, int]:
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def minify(source: str) -> str:
+    """Reduz o espaço em branco de um template.
+
+    Templates em estilo XML (iniciados por ``<``) perdem a indentação e as
+    linhas em branco; nos demais, só os espaços no fim das linhas e as
+    linhas em branco repetidas são removidos.
+    """
+    lines = [line.rstrip() for line in source.splitlines()]
+    if source.lstrip().startswith("<"):
+        return "\n".join(line.lstrip() for line in lines if line.strip())
+    result: List[str] = []
+    for line in lines:
+        if line or (result and result[-1]):
+            result.append(line)
+    return "\n".join(result).strip("\n")
+
+
+class PromptStore:
+    """Templates de um diretório de prompts, compilados uma vez por processo."""
+
+    def __init__(self, prompts_dir: Path, expected_fields: Optional[Mapping[str, Set[str]]] = None):
+        """Valida os templates esperados; os demais são compilados no primeiro uso.
+
+        Args:
+            prompts_dir: Diretório com os arquivos ``*.txt``.
+            expected_fields: Nome do prompt -> campos que os geradores
+                preenchem, usados na validação.
+        """
+        self.prompts_dir = Path(prompts_dir)
+        self._expected: Dict[str, Set[str]] = {name: set(fields) for name, fields in (expected_fields or {}).items()}
+        self._templates: Dict[str, PromptTemplate] = {}
+        self._lock = threading.Lock()
+        self._minify = settings.prompt_minify
+        self.problems: List[str] = []
+        self._validate_all()
+
+    def _compile(self, name: str, path: Path, stat: Tuple[int, int]) -> PromptTemplate:
+        try:
+            source = path.read_text(encoding="utf-8")
+            if self._minify:
+                source = minify(source)
+            return PromptTemplate(name, path, source, stat)
+        except ValueError as e:
+            raise PromptError(f"{name}.txt inválido: {e}") from e
+
+    def _validate_all(self) -> None:
+        self.problems = self.validate()
+        for problem in self.problems:
+            logger.error(f"Prompt inválido em {self.prompts_dir}: {problem}")
+
+    def _load(self, name: str) -> PromptTemplate:
+        """Retorna o template compilado, compilando-o de novo se o arquivo mudou.
+
+        Raises:
+            FileNotFoundError: Se o arquivo de prompt não existir.
+            PromptError: Se o template não puder ser compilado.
+        """
+        template = self._templates.get(name)
+        now = time.monotonic()
+        if template is not None and now - template._checked_at < settings.prompt_reload_interval:
+            return template
+
+        path = self.prompts_dir / f"{name}.txt"
+        try:
+            stat = _file_stat(path)
+        except FileNotFoundError:
+            self._templates.pop(name, None)
+            raise FileNotFoundError(f"Arquivo de prompt não encontrado: {path}") from None
+        if template is not None and template._stat == stat:
+            template._checked_at = now
+            return template
+
+        try:
+            compiled = self._compile(name, path, stat)
+        except PromptError:
+            self._templates.pop(name, None)
+            raise
+        with self._lock:
+            self._templates[name] = compiled
+        logger.debug(f"Prompt '{name}' carregado de {path}")
+        return compiled
+
+    def expect(self, expected_fields: Mapping[str, Set[str]]) -> None:
+        """Acrescenta campos esperados e valida os templates novamente."""
+        added = False
+        with self._lock:
+            for name, fields in expected_fields.items():
+                if not set(fields) <= self._expected.get(name, set()):
+                    self._expected.setdefault(name, set()).update(fields)
+                    added = True
+        if added:
+            for problem in self.validate():
+                if problem not in self.problems:
+                    self.problems.append(problem)
+                    logger.error(f"Prompt inválido em {self.prompts_dir}: {problem}")
+
+    def validate(self) -> List[str]:
+        """Compara os campos de cada template com os campos esperados.
+
+        Returns:
+            Descrição de cada problema encontrado (lista vazia se nenhum).
+        """
+        problems = []
+        for name, expected in sorted(self._expected.items()):
+            try:
+                template = self._load(name)
+            except FileNotFoundError:
+                problems.append(f"{name}.txt não encontrado")
+                continue
+            except PromptError as e:
+                problems.append(str(e))
+                continue
+            missing = expected - template.fields
+            unknown = template.fields - expected
+            if missing:
+                problems.append(
+                    f"{name}.txt não usa {', '.join('{' + field + '}' for field in sorted(missing))}; "
+                    "o conteúdo correspondente não seria enviado ao modelo"
+                )
+            if unknown:
+                problems.append(
+                    f"{name}.txt usa campos que os geradores não preenchem: "
+                    f"{', '.join('{' + field + '}' for field in sorted(unknown))}"
+                )
+            for field in sorted(expected & template.fields):
+                count = template.occurrences(field)
+                if count > 1:
+                    problems.append(
+                        f"{name}.txt usa {{{field}}} {count} vezes; o conteúdo seria enviado {count} vezes "
+                        f"(use {{{{{field}}}}} para citar o nome do campo)"
+                    )
+        return problems
+
+    def get(self, name: str) -> PromptTemplate:
+        """Retorna o template compilado, recarregando-o se o arquivo mudou.
+
+        Raises:
+            FileNotFoundError: Se o arquivo de prompt não existir.
+            PromptError: Se o template não puder ser compilado.
+        """
+        if settings.prompt_minify != self._minify:
+            with self._lock:
+                self._minify = settings.prompt_minify
+                self._templates = {}
+            self._validate_all()
+
+        previous = self._templates.get(name)
+        template = self._load(name)
+        if template is not previous and name in self._expected:
+            self.problems = self.validate()
+            for problem in self.problems:
+                if problem.startswith(f"{name}.txt"):
+                    logger.error(f"Prompt inválido em {self.prompts_dir}: {problem}")
+        return template
+
+    def render(self, name: str, **values: object) -> str:
+        """Atalho para ``get(name).render(**values)``."""
+        return self.get(name).render(**values)
+
+
+_stores: Dict[Path, PromptStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_prompt_store(prompts_dir: Path, expected_fields: Optional[Mapping[str, Set[str]]] = None) -> PromptStore:
+    """Retorna o ``PromptStore`` compartilhado de um diretório de prompts.
+
+    Args:
+        prompts_dir: Diretório com os arquivos ``*.txt``.
+        expected_fields: Campos esperados por prompt, acrescentados à validação.
+    """
+    key = Path(prompts_dir).resolve()
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            _stores[key] = PromptStore(key, expected_fields)
+            return _stores[key]
+    if expected_fields:
+        store.expect(expected_fields)
+    return store
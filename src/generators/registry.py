@@ -0,0 +1,84 @@
+"""Registro preguiçoso dos geradores de conteúdo.
+
+As interfaces listam os modelos disponíveis pelo nome de exibição, mas cada
+sessão normalmente usa só um ou dois deles. Os nomes vêm do catálogo de
+modelos (``prompts/models_catalog.json``); o gerador (``ModelGenerator``) só
+é importado e instanciado no primeiro acesso ao nome.
+
+Exemplo::
+
+    registry = GeneratorRegistry()
+    list(registry)             # nomes, sem importar nenhum gerador
+    gemini = registry["Gemini"]  # importa e instancia o gerador do Gemini
+"""
+
+import threading
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Type
+
+from .adapta.catalog import ModelCatalog, get_catalog
+from .base import BaseContentGenerator
+
+if TYPE_CHECKING:
+    from .adapta.model_generator import ModelGenerator
+
+
+class GeneratorRegistry(Mapping):
+    """Mapa nome -> gerador que importa e instancia cada gerador no primeiro acesso.
+
+    Listar os nomes, verificar se um nome existe e obter o tamanho não
+    carregam nenhum gerador. As instâncias são compartilhadas entre os
+    acessos ao mesmo nome.
+    """
+
+    def __init__(self, catalog: Optional[ModelCatalog] = None, **generator_kwargs: Any):
+        """Inicializa o registro.
+
+        Args:
+            catalog: Catálogo de modelos (padrão: ``prompts/models_catalog.json``).
+            **generator_kwargs: Argumentos repassados ao construtor de cada
+                gerador (ex.: ``prompts_dir``).
+        """
+        self._catalog = catalog if catalog is not None else get_catalog()
+        self._generator_kwargs = generator_kwargs
+        self._instances: Dict[str, BaseContentGenerator] = {}
+        self._lock = threading.Lock()
+
+    def get_class(self, name: str) -> Type["ModelGenerator"]:
+        """Retorna a classe do gerador, importando o seu módulo se necessário.
+
+        Raises:
+            KeyError: Se o nome não estiver no catálogo.
+        """
+        if name not in self._catalog:
+            raise KeyError(name)
+        from .adapta.model_generator import ModelGenerator
+        return ModelGenerator
+
+    def create(self, name: str, **kwargs: Any) -> BaseContentGenerator:
+        """Cria uma nova instância do gerador, fora do cache do registro."""
+        generator_class = self.get_class(name)
+        return generator_class(spec=self._catalog[name], **{**self._generator_kwargs, **kwargs})
+
+    def __getitem__(self, name: str) -> BaseContentGenerator:
+        generator = self._instances.get(name)
+        if generator is not None:
+            return generator
+        with self._lock:
+            generator = self._instances.get(name)
+            if generator is None:
+                generator = self._instances[name] = self.create(name)
+            return generator
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._catalog
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._catalog)
+
+    def __len__(self) -> int:
+        return len(self._catalog)
+
+    def loaded(self) -> List[str]:
+        """Nomes dos geradores já instanciados."""
+        return list(self._instances)
@@ -1,5 +1,6 @@
 """Módulo utils - Funções de utilidade e helpers."""
 
 from .logger import logger
+from .metrics import metrics
 
-__all__ = ["logger"] 
\ No newline at end of file
+__all__ = ["logger", "metrics"] 
\ No newline at end of file
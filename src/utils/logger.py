@@ -22,9 +22,9 @@ def setup_logger(console_level: str = "INFO"):
         colorize=True,
     )
     
-    # Adiciona logger para arquivo
+    # Adiciona logger para arquivo. O diretório e o arquivo só são criados
+    # na primeira mensagem registrada (delay=True).
     log_file = Path("logs") / "adapta-chat.log"
-    log_file.parent.mkdir(exist_ok=True)
     
     logger.add(
         log_file,
@@ -32,6 +32,7 @@ def setup_logger(console_level: str = "INFO"):
         level="DEBUG",
         rotation="10 MB",
         retention="7 days",
+        delay=True,
     )
 
 
@@ -0,0 +1,125 @@
+"""Registro de métricas em memória da aplicação.
+
+Contadores, gauges e histogramas simples identificados por nome e rótulos.
+O registro é seguro para uso entre threads (sessões do Streamlit) e pode ser
+inspecionado com ``metrics.snapshot()``.
+"""
+
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Tuple
+
+_LabelKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _key(name: str, labels: Dict[str, Any]) -> _LabelKey:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_key(key: _LabelKey) -> str:
+    name, labels = key
+    if not labels:
+        return name
+    return name + "{" + ",".join(f"{k}={v}" for k, v in labels) + "}"
+
+
+class _Histogram:
+    """Resumo de observações com amostra limitada para percentis."""
+
+    def __init__(self, reservoir_size: int = 1024):
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+        self.samples: Deque[float] = deque(maxlen=reservoir_size)
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self.samples.append(value)
+
+    def percentile(self, pct: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+        return ordered[index]
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "min": self.min if self.count else 0.0,
+            "max": self.max if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+        }
+
+
+class MetricsRegistry:
+    """Armazena contadores, gauges e histogramas rotulados."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: Dict[_LabelKey, float] = {}
+        self._gauges: Dict[_LabelKey, float] = {}
+        self._histograms: Dict[_LabelKey, _Histogram] = {}
+
+    def increment(self, name: str, value: float = 1.0, **labels: Any) -> None:
+        """Incrementa um contador."""
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def set_gauge(self, name: str, value: float, **labels: Any) -> None:
+        """Define o valor atual de um gauge."""
+        with self._lock:
+            self._gauges[_key(name, labels)] = value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """Registra uma observação em um histograma."""
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram()
+            histogram.observe(value)
+
+    def get(self, name: str, **labels: Any) -> float:
+        """Retorna o valor de um contador ou gauge (0 se inexistente)."""
+        key = _key(name, labels)
+        with self._lock:
+            if key in self._counters:
+                return self._counters[key]
+            return self._gauges.get(key, 0.0)
+
+    def get_histogram(self, name: str, **labels: Any) -> Dict[str, float]:
+        """Retorna o resumo de um histograma (vazio se inexistente)."""
+        with self._lock:
+            histogram = self._histograms.get(_key(name, labels))
+            return histogram.summary() if histogram else {}
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Retorna uma cópia de todas as métricas, com chaves no formato ``nome{rótulo=valor}``."""
+        with self._lock:
+            return {
+                "counters": {_format_key(k): v for k, v in self._counters.items()},
+                "gauges": {_format_key(k): v for k, v in self._gauges.items()},
+                "histograms": {_format_key(k): h.summary() for k, h in self._histograms.items()},
+            }
+
+    def reset(self) -> None:
+        """Descarta todas as métricas."""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+
+# Instância global de métricas
+metrics = MetricsRegistry()
+
+__all__ = ["metrics", "MetricsRegistry"]
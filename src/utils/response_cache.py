@@ -0,0 +1,258 @@
+"""Cache persistente de respostas dos modelos.
+
+Resumos, diagramas e mapas mentais são funções do modelo, do prompt e do
+texto de entrada. Este módulo guarda essas respostas endereçadas pelo hash
+da chamada, em dois níveis:
+
+- memória: LRU com as entradas mais recentes do processo;
+- disco: SQLite com os valores comprimidos (zlib), expiração por TTL e
+  remoção das entradas menos usadas quando o arquivo passa do tamanho máximo.
+
+O comportamento pode ser alterado por chamada com ``cache_mode``::
+
+    with cache_mode(CacheMode.REFRESH):
+        resumo = await generator.summarize(texto)
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Union
+
+from config import settings
+from .logger import logger
+from .metrics import metrics
+
+
+class CacheMode(Enum):
+    """Uso do cache em uma chamada."""
+
+    USE = "use"
+    """Lê do cache e grava respostas novas."""
+    REFRESH = "refresh"
+    """Ignora o valor em cache, mas grava a resposta nova."""
+    BYPASS = "bypass"
+    """Não lê nem grava."""
+
+
+_cache_mode: ContextVar[CacheMode] = ContextVar("response_cache_mode", default=CacheMode.USE)
+
+
+@contextmanager
+def cache_mode(mode: Union[CacheMode, str]) -> Iterator[None]:
+    """Define o uso do cache para as chamadas feitas dentro do bloco.
+
+    Args:
+        mode: ``CacheMode`` ou seu valor (``use``, ``refresh``, ``bypass``).
+    """
+    token = _cache_mode.set(CacheMode(mode))
+    try:
+        yield
+    finally:
+        _cache_mode.reset(token)
+
+
+def current_cache_mode() -> CacheMode:
+    """Retorna o modo de cache em vigor no contexto atual."""
+    return _cache_mode.get()
+
+
+def make_cache_key(*parts: Any) -> str:
+    """Gera a chave de cache a partir dos parâmetros da chamada."""
+    encoded = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Cache de respostas em memória e em SQLite."""
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        ttl: Optional[float] = 7 * 24 * 3600,
+        max_bytes: int = 256 * 1024 * 1024,
+        memory_entries: int = 128,
+    ):
+        """Inicializa o cache.
+
+        Args:
+            path: Arquivo SQLite (None = somente memória).
+            ttl: Validade das entradas em segundos (None = sem expiração).
+            max_bytes: Tamanho máximo dos valores comprimidos em disco.
+            memory_entries: Entradas mantidas no LRU em memória.
+        """
+        self.path = Path(path) if path else None
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+
+        self._memory: "OrderedDict[str, tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if self.path is not None:
+            self._db = self._open(self.path)
+
+    @staticmethod
+    def _open(path: Path) -> sqlite3.Connection:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " value BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " created REAL NOT NULL,"
+            " accessed REAL NOT NULL)"
+        )
+        db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        return db
+
+    def _expired(self, created: float, now: float) -> bool:
+        return self.ttl is not None and now - created > self.ttl
+
+    def _remember_locked(self, key: str, value: str, created: float) -> None:
+        self._memory[key] = (value, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[str]:
+        """Retorna o valor em cache ou None se ausente ou expirado."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if not self._expired(entry[1], now):
+                    self._memory.move_to_end(key)
+                    metrics.increment("response_cache_hits_total", tier="memory")
+                    return entry[0]
+                del self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, size, created FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    blob, size, created = row
+                    if self._expired(created, now):
+                        self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    else:
+                        self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+                        value = zlib.decompress(blob).decode("utf-8")
+                        self._remember_locked(key, value, created)
+                        metrics.increment("response_cache_hits_total", tier="disk")
+                        metrics.increment("response_cache_read_bytes_total", size)
+                        return value
+
+        metrics.increment("response_cache_misses_total")
+        return None
+
+    def set(self, key: str, value: str) -> None:
+        """Grava um valor nos dois níveis do cache."""
+        now = time.time()
+        with self._lock:
+            self._remember_locked(key, value, now)
+            if self._db is None:
+                return
+            blob = zlib.compress(value.encode("utf-8"))
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, blob, len(blob), now, now),
+            )
+            metrics.increment("response_cache_writes_total")
+            metrics.increment("response_cache_written_bytes_total", len(blob))
+            self._evict_locked(now)
+
+    def _evict_locked(self, now: float) -> None:
+        assert self._db is not None
+        if self.ttl is not None:
+            self._db.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total > self.max_bytes:
+            # Remove as entradas menos acessadas até voltar ao limite
+            excess = total - self.max_bytes
+            removed = 0
+            for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY accessed").fetchall():
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._memory.pop(key, None)
+                removed += size
+                metrics.increment("response_cache_evictions_total")
+                if removed >= excess:
+                    break
+            total -= removed
+        metrics.set_gauge("response_cache_disk_bytes", total)
+
+    def invalidate(self, key: str) -> None:
+        """Remove uma entrada do cache."""
+        with self._lock:
+            self._memory.pop(key, None)
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        """Remove todas as entradas."""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                metrics.set_gauge("response_cache_disk_bytes", 0)
+
+    def stats(self) -> Dict[str, int]:
+        """Retorna o número de entradas e o tamanho em disco."""
+        with self._lock:
+            entries, size = 0, 0
+            if self._db is not None:
+                entries, size = self._db.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+                ).fetchone()
+            return {"memory_entries": len(self._memory), "disk_entries": entries, "disk_bytes": size}
+
+
+# Raiz do projeto: caminhos relativos do cache não dependem do diretório atual
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+
+def resolve_cache_path(path: Optional[str]) -> Optional[Path]:
+    """Caminho do arquivo do cache, com caminhos relativos a partir da raiz do projeto."""
+    if not path:
+        return None
+    resolved = Path(path).expanduser()
+    return resolved if resolved.is_absolute() else PROJECT_ROOT / resolved
+
+
+_response_cache: Optional[ResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Retorna o cache de respostas do processo, ou None se desabilitado."""
+    global _response_cache
+    if not settings.response_cache_enabled:
+        return None
+    with _response_cache_lock:
+        if _response_cache is None:
+            path = resolve_cache_path(settings.response_cache_path)
+            try:
+                _response_cache = ResponseCache(
+                    path,
+                    ttl=settings.response_cache_ttl,
+                    max_bytes=settings.response_cache_max_bytes,
+                    memory_entries=settings.response_cache_memory_entries,
+                )
+            except sqlite3.Error as e:
+                logger.warning(f"Cache de respostas em disco indisponível ({e}); usando somente memória")
+                _response_cache = ResponseCache(
+                    None,
+                    ttl=settings.response_cache_ttl,
+                    memory_entries=settings.response_cache_memory_entries,
+                )
+        return _response_cache
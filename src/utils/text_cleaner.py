@@ -1,5 +1,86 @@
 import re
+from typing import AsyncIterator
+
+THINK_OPEN_TAG = "<thinking>"
+THINK_CLOSE_TAG = "</thinking>"
+
 
 def remove_think_tags(text: str) -> str:
     """Remove <thinking>...</thinking> tags from the text."""
-    return re.sub(r"<thinking>.*?</thinking>", "", text, flags=re.DOTALL).strip()
\ No newline at end of file
+    return re.sub(r"<thinking>.*?</thinking>", "", text, flags=re.DOTALL).strip()
+
+
+class ThinkTagStreamFilter:
+    """Incremental version of remove_think_tags for streamed text.
+
+    Feeding all chunks and then calling flush() yields the same text as
+    remove_think_tags() on the concatenated input. Content is held back only
+    while it may still belong to a <thinking> block or is trailing whitespace.
+    """
+
+    def __init__(self) -> None:
+        self._buffer = ""
+        self._inside = False
+        self._started = False
+        self._pending_ws = ""
+
+    def _emit(self, text: str) -> str:
+        if not self._started:
+            text = text.lstrip()
+            if not text:
+                return ""
+            self._started = True
+        text = self._pending_ws + text
+        stripped = text.rstrip()
+        self._pending_ws = text[len(stripped):]
+        return stripped
+
+    def feed(self, chunk: str) -> str:
+        """Adds a chunk and returns the text that is safe to display."""
+        self._buffer += chunk
+        output = []
+        while True:
+            if self._inside:
+                end = self._buffer.find(THINK_CLOSE_TAG)
+                if end == -1:
+                    break
+                self._buffer = self._buffer[end + len(THINK_CLOSE_TAG):]
+                self._inside = False
+                continue
+
+            start = self._buffer.find(THINK_OPEN_TAG)
+            if start != -1:
+                output.append(self._emit(self._buffer[:start]))
+                self._buffer = self._buffer[start:]
+                self._inside = True
+                continue
+
+            # Hold back a possible partial opening tag at the end of the buffer
+            keep = 0
+            for size in range(min(len(THINK_OPEN_TAG) - 1, len(self._buffer)), 0, -1):
+                if THINK_OPEN_TAG.startswith(self._buffer[-size:]):
+                    keep = size
+                    break
+            output.append(self._emit(self._buffer[:len(self._buffer) - keep]))
+            self._buffer = self._buffer[len(self._buffer) - keep:]
+            break
+        return "".join(output)
+
+    def flush(self) -> str:
+        """Returns any held text once the stream is complete."""
+        # An unclosed <thinking> block is kept, as in remove_think_tags()
+        remaining, self._buffer = self._buffer, ""
+        self._inside = False
+        return self._emit(remaining)
+
+
+async def remove_think_tags_stream(chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+    """Applies remove_think_tags to an asynchronous stream of text chunks."""
+    think_filter = ThinkTagStreamFilter()
+    async for chunk in chunks:
+        text = think_filter.feed(chunk)
+        if text:
+            yield text
+    tail = think_filter.flush()
+    if tail:
+        yield tail
@@ -0,0 +1,26 @@
+"""Configuração comum dos testes.
+
+Os testes não usam rede nem o ``.env`` do projeto: as variáveis abaixo são
+definidas antes da primeira importação de ``config``.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+os.environ.setdefault("ADAPTA_COOKIES_STR", "test=1")
+os.environ.setdefault("CONFIG_WATCH_MODE", "off")
+os.environ.setdefault("RESPONSE_CACHE_ENABLED", "false")
+
+
+@pytest.fixture
+def io_loop():
+    """Loop de I/O próprio do teste, encerrado ao final."""
+    from generators.adapta.io_loop import IoLoop
+
+    loop = IoLoop(name="test-io")
+    yield loop
+    loop.shutdown(timeout=5.0)
@@ -0,0 +1,68 @@
+"""Geradores simulados usados pelos testes (sem rede)."""
+
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from generators.adapta.client import AdaptaClient
+from generators.base import BaseContentGenerator
+
+
+class ScriptedGenerator(BaseContentGenerator):
+    """Gerador cujas respostas vêm de uma função ``messages -> texto``.
+
+    Attributes:
+        calls: Mensagens de cada chamada, na ordem.
+    """
+
+    def __init__(self, respond: Callable[[List[Dict[str, str]]], str], chunk_size: int = 7):
+        super().__init__()
+        self.respond = respond
+        self.chunk_size = chunk_size
+        self.calls: List[List[Dict[str, str]]] = []
+
+    async def stream_model_with_messages(self, messages: List[Dict[str, str]], searchType: Optional[str] = None, tool: Optional[str] = None, chat_id: Optional[str] = None) -> AsyncIterator[str]:
+        self.calls.append(messages)
+        output = self.respond(messages)
+        for start in range(0, len(output), self.chunk_size):
+            yield output[start:start + self.chunk_size]
+
+    async def call_model_with_messages(self, messages: List[Dict[str, str]], searchType: Optional[str] = None, tool: Optional[str] = None, chat_id: Optional[str] = None) -> str:
+        self.calls.append(messages)
+        return self.respond(messages)
+
+    async def generate_content(self, prompt: str, text: str) -> str:
+        return await self.call_model_with_messages([{"role": "user", "content": prompt + text}])
+
+    async def summarize(self, text: str) -> str:
+        return await self.generate_content(self._render_prompt("summarize", text=text), "")
+
+    async def diagram(self, text: str) -> str:
+        return await self.generate_content(self._render_prompt("diagram", text=text), "")
+
+    async def create_mindmap(self, texts: List[str]) -> str:
+        return await self.generate_content(self._render_prompt("mindmap", texts="\n\n".join(texts)), "")
+
+    async def health_check(self) -> bool:
+        return True
+
+
+def mock_client(
+    monkeypatch,
+    handler: Callable[[httpx.Request], Awaitable[httpx.Response]],
+    enqueued: Optional[List[str]] = None,
+) -> AdaptaClient:
+    """``AdaptaClient`` cujas requisições são respondidas por ``handler`` (``httpx.MockTransport``).
+
+    Sessão, credenciais e cota da conta são simuladas; os ``chat_id`` enviados
+    para exclusão são acrescentados a ``enqueued``, se informado.
+    """
+    client = AdaptaClient(cookies_str="a=1", session_id="sess")
+    client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    client.cookies["__session"] = "token"
+    monkeypatch.setattr(client, "_ensure_client", lambda: asyncio.sleep(0))
+    monkeypatch.setattr(client, "_ensure_session", lambda: asyncio.sleep(0, "token"))
+    monkeypatch.setattr(client, "_acquire_rate", lambda kind: asyncio.sleep(0))
+    monkeypatch.setattr(client._cleanup_queue, "enqueue", (enqueued if enqueued is not None else []).append)
+    return client
@@ -0,0 +1,113 @@
+"""Testes da classificação das falhas no pool de contas."""
+
+import asyncio
+import threading
+from typing import Dict, Optional
+
+import httpx
+import pytest
+
+from config import SettingsChange, settings
+from generators.adapta import accounts
+from generators.adapta.accounts import Credential, CredentialPool, PooledAdaptaClient
+from generators.adapta.retry import RetryPolicy
+from generators.adapta.usage import CallResult
+
+MESSAGES = [{"role": "user", "content": "Olá"}]
+
+
+def _status_error(status: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "https://api.example/conversation")
+    return httpx.HTTPStatusError(f"{status}", request=request, response=httpx.Response(status, request=request))
+
+
+def _pooled(monkeypatch, error: Optional[BaseException], max_failures: int = 3) -> PooledAdaptaClient:
+    """Cliente com uma única conta cujas chamadas falham com ``error`` (ou respondem "ok")."""
+    pool = CredentialPool([Credential("conta-1", "a=1")], max_failures=max_failures)
+    client = PooledAdaptaClient(pool, retry_policy=RetryPolicy(max_attempts=1))
+
+    async def create_conversation(messages, model, searchType=None, tool=None, chat_id=None):
+        raise error
+
+    async def call_once(messages, model, new_line=True, searchType=None, tool=None, chat_id=None):
+        return CallResult(text="ok", model=model)
+
+    if error is not None:
+        # A falha passa pelas retentativas e por AdaptaClient._call_model_once
+        monkeypatch.setattr(client.primary, "_create_conversation_limited", create_conversation)
+    else:
+        monkeypatch.setattr(client.primary, "_call_model_once", call_once)
+    return client
+
+
+def _status(client: PooledAdaptaClient) -> Dict:
+    return client.pool.status()[0]
+
+
+@pytest.mark.parametrize("status", [401, 403])
+def test_rejected_credential_is_ejected_immediately(monkeypatch, status):
+    client = _pooled(monkeypatch, _status_error(status))
+
+    assert asyncio.run(client.call_model(MESSAGES, "GPT_5")) is None
+
+    state = _status(client)
+    assert not state["healthy"]
+    assert state["ejected_for"] > 0
+
+
+@pytest.mark.parametrize("error", [_status_error(400), _status_error(413), httpx.ReadTimeout("lento")])
+def test_caller_side_errors_do_not_count_against_account(monkeypatch, error):
+    client = _pooled(monkeypatch, error, max_failures=1)
+
+    for _ in range(3):
+        assert asyncio.run(client.call_model(MESSAGES, "GPT_5")) is None
+
+    state = _status(client)
+    assert state["healthy"]
+    assert state["failures"] == 0
+
+
+@pytest.mark.parametrize("status", [429, 500, 503])
+def test_server_errors_count_against_account(monkeypatch, status):
+    client = _pooled(monkeypatch, _status_error(status), max_failures=2)
+
+    asyncio.run(client.call_model(MESSAGES, "GPT_5"))
+    assert _status(client)["failures"] == 1
+    asyncio.run(client.call_model(MESSAGES, "GPT_5"))
+    assert not _status(client)["healthy"]
+
+
+def test_raise_errors_is_passed_to_caller(monkeypatch):
+    client = _pooled(monkeypatch, _status_error(400))
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(client.call_model(MESSAGES, "GPT_5", raise_errors=True))
+
+
+def test_success_resets_failures(monkeypatch):
+    client = _pooled(monkeypatch, None)
+    client.pool.record(client.pool.credentials[0], success=False)
+
+    assert asyncio.run(client.call_model(MESSAGES, "GPT_5")) == "ok"
+    assert _status(client)["failures"] == 0
+
+
+def test_account_changes_apply_at_next_call(monkeypatch):
+    client = PooledAdaptaClient(CredentialPool([Credential("conta-1", "a=1")]))
+    old_client = client._clients["conta-1"]
+    new_pool = CredentialPool([Credential("conta-1", "a=2"), Credential("conta-2", "b=1")])
+    monkeypatch.setattr(accounts, "get_credential_pool", lambda: new_pool)
+    change = SettingsChange(settings.snapshot, settings.snapshot, frozenset({"adapta_accounts"}))
+
+    thread = threading.Thread(target=client._on_settings_change, args=(change,))
+    thread.start()
+    thread.join()
+
+    # Nada muda na thread do observador do .env
+    assert client.pool is not new_pool
+    assert old_client.cookies == {"a": "1"}
+
+    assert client.primary is old_client
+    assert client.pool is new_pool
+    assert old_client.cookies == {"a": "2"}
+    assert set(client._clients) == {"conta-1", "conta-2"}
@@ -0,0 +1,172 @@
+"""Testes da execução em lote (``generate_many``/``run_batch``) e de ``run_all``."""
+
+import asyncio
+from typing import Any, List
+
+import pytest
+
+from generators.batch import BatchProgress, BatchResult, ordered, run_all, run_batch
+from helpers import ScriptedGenerator
+
+
+def _generator() -> ScriptedGenerator:
+    return ScriptedGenerator(lambda messages: messages[-1]["content"].upper())
+
+
+class Tracker:
+    """Tarefa de lote simulada que registra quantos itens estão em andamento."""
+
+    def __init__(self, fail: tuple = ()) -> None:
+        self.fail = fail
+        self.in_flight = 0
+        self.peak = 0
+        self.started: List[int] = []
+        self.cancelled: List[int] = []
+
+    async def __call__(self, item: int) -> str:
+        self.started.append(item)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            # Itens maiores terminam antes: a ordem de conclusão difere da entrada
+            await asyncio.sleep(0.002 * (10 - item % 10))
+            if item in self.fail:
+                raise RuntimeError(f"item {item} falhou")
+            return f"r{item}"
+        except asyncio.CancelledError:
+            self.cancelled.append(item)
+            raise
+        finally:
+            self.in_flight -= 1
+
+
+async def _collect(batch) -> List[BatchResult]:
+    return [result async for result in batch]
+
+
+def test_named_task_uses_generator_method():
+    generator = _generator()
+
+    results = asyncio.run(_collect(generator.generate_many(["a", "b"], task="generate_content", prompt="p:", concurrency=2)))
+
+    assert [result.result for result in ordered(results)] == ["P:A", "P:B"]
+
+
+def test_unknown_task_and_invalid_concurrency():
+    generator = _generator()
+
+    with pytest.raises(ValueError):
+        asyncio.run(_collect(generator.generate_many(["a"], task="traduzir")))
+    with pytest.raises(ValueError):
+        asyncio.run(_collect(generator.generate_many(["a"], concurrency=0)))
+
+
+def test_concurrency_bounds_items_in_flight():
+    tracker = Tracker()
+
+    results = asyncio.run(_collect(run_batch(_generator(), range(20), tracker, concurrency=3)))
+
+    assert len(results) == 20
+    assert tracker.peak == 3
+
+
+def test_items_are_read_lazily():
+    tracker = Tracker()
+    consumed: List[int] = []
+
+    def items():
+        for item in range(10):
+            consumed.append(item)
+            yield item
+
+    async def run() -> int:
+        batch = run_batch(_generator(), items(), tracker, concurrency=2)
+        await batch.__anext__()
+        read = len(consumed)
+        await batch.aclose()
+        return read
+
+    # Só os itens em andamento (e a reposição do que terminou) foram lidos
+    assert asyncio.run(run()) <= 3
+
+
+def test_index_restores_input_order():
+    results = asyncio.run(_collect(run_batch(_generator(), range(10), Tracker(), concurrency=10)))
+
+    assert [result.index for result in results] != list(range(10))
+    assert [result.result for result in ordered(results)] == [f"r{item}" for item in range(10)]
+    assert all(result.item == result.index for result in results)
+
+
+def test_failed_item_does_not_stop_the_others():
+    results = ordered(asyncio.run(_collect(run_batch(_generator(), range(6), Tracker(fail=(2,)), concurrency=2))))
+
+    assert [result.ok for result in results] == [True, True, False, True, True, True]
+    assert isinstance(results[2].error, RuntimeError)
+    assert results[2].result is None
+
+
+@pytest.mark.parametrize("asynchronous", [False, True])
+def test_progress_callback(asynchronous):
+    progress: List[BatchProgress] = []
+
+    if asynchronous:
+        async def on_progress(update: BatchProgress) -> None:
+            await asyncio.sleep(0)
+            progress.append(update)
+    else:
+        on_progress = progress.append
+
+    asyncio.run(_collect(run_batch(_generator(), range(5), Tracker(fail=(3,)), concurrency=2, on_progress=on_progress)))
+
+    assert [update.completed for update in progress] == [1, 2, 3, 4, 5]
+    assert progress[-1].failed == 1
+    assert {update.total for update in progress} == {5}
+    assert sorted(update.last.index for update in progress) == list(range(5))
+
+
+def test_failing_progress_callback_does_not_break_the_batch():
+    def on_progress(update: BatchProgress) -> None:
+        raise RuntimeError("callback quebrado")
+
+    results = asyncio.run(_collect(run_batch(_generator(), range(4), Tracker(), concurrency=2, on_progress=on_progress)))
+
+    assert [result.ok for result in results] == [True] * 4
+
+
+def test_aclose_cancels_pending_items():
+    tracker = Tracker()
+
+    async def run() -> None:
+        batch = run_batch(_generator(), range(10), tracker, concurrency=4)
+        await batch.__anext__()
+        await batch.aclose()
+
+    asyncio.run(run())
+
+    # Todos os itens iniciados, exceto o que já terminou, foram cancelados
+    assert tracker.in_flight == 0
+    assert len(tracker.cancelled) == len(tracker.started) - 1 >= 3
+
+
+def test_run_all_returns_results_in_input_order():
+    results = asyncio.run(run_all(_generator(), list(range(6)), Tracker(), concurrency=3))
+
+    assert results == [f"r{item}" for item in range(6)]
+
+
+def test_run_all_first_failure_cancels_the_rest():
+    tracker = Tracker()
+
+    async def call(item: Any) -> str:
+        if item == 0:
+            raise ValueError("primeiro item falhou")
+        return await tracker(item)
+
+    with pytest.raises(ValueError, match="primeiro item falhou"):
+        asyncio.run(run_all(_generator(), list(range(6)), call, concurrency=3))
+
+    assert tracker.in_flight == 0
+    assert tracker.cancelled
+    # Os itens que ainda não tinham começado não são iniciados
+    assert len(tracker.started) < 6
@@ -0,0 +1,161 @@
+"""Testes da máquina de estados do circuit breaker por modelo."""
+
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from generators.adapta import breaker as breaker_module
+from generators.adapta.breaker import CircuitBreaker, CircuitOpenError, CircuitState, is_breaker_failure, select_model
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(breaker_module, "time", SimpleNamespace(monotonic=clock))
+    return clock
+
+
+def _status_error(status: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "https://api.example/conversation")
+    return httpx.HTTPStatusError(str(status), request=request, response=httpx.Response(status, request=request))
+
+
+def _call(breaker: CircuitBreaker, error=None) -> None:
+    breaker.check()
+    breaker.record(error)
+
+
+def _breaker(**kwargs) -> CircuitBreaker:
+    options = dict(failure_rate=0.5, min_calls=4, window=60.0, open_duration=30.0)
+    options.update(kwargs)
+    return CircuitBreaker("modelo-teste", **options)
+
+
+@pytest.mark.parametrize(
+    "error, counts",
+    [
+        (_status_error(500), True),
+        (_status_error(503), True),
+        (_status_error(429), True),
+        (httpx.ReadTimeout("lento"), True),
+        (httpx.ConnectError("recusada"), True),
+        (_status_error(400), False),
+        (_status_error(401), False),
+        (_status_error(404), False),
+        (ValueError("local"), False),
+    ],
+)
+def test_failure_classification(error, counts):
+    assert is_breaker_failure(error) is counts
+
+
+def test_opens_when_failure_rate_reached(clock):
+    breaker = _breaker()
+    _call(breaker)
+    _call(breaker, _status_error(503))
+    _call(breaker)
+    assert breaker.state is CircuitState.CLOSED
+
+    _call(breaker, _status_error(503))
+
+    assert breaker.state is CircuitState.OPEN
+    with pytest.raises(CircuitOpenError) as info:
+        breaker.check()
+    assert info.value.retry_in == pytest.approx(30.0)
+
+
+def test_needs_min_calls_before_opening(clock):
+    breaker = _breaker(min_calls=4)
+    for _ in range(3):
+        _call(breaker, _status_error(503))
+
+    assert breaker.state is CircuitState.CLOSED
+
+
+def test_neutral_errors_do_not_count(clock):
+    breaker = _breaker(min_calls=2)
+    for _ in range(10):
+        _call(breaker, _status_error(400))
+
+    assert breaker.state is CircuitState.CLOSED
+
+
+def test_old_outcomes_leave_the_window(clock):
+    breaker = _breaker(min_calls=4)
+    for _ in range(3):
+        _call(breaker, _status_error(503))
+    clock.now += 61
+
+    _call(breaker, _status_error(503))
+
+    assert breaker.state is CircuitState.CLOSED
+
+
+def test_half_open_after_open_duration_allows_one_probe(clock):
+    breaker = _breaker(min_calls=1)
+    _call(breaker, _status_error(503))
+    clock.now += 30
+
+    assert breaker.state is CircuitState.HALF_OPEN
+    breaker.check()
+    assert not breaker.available
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+
+
+def test_successful_probe_closes(clock):
+    breaker = _breaker(min_calls=1)
+    _call(breaker, _status_error(503))
+    clock.now += 30
+
+    _call(breaker)
+
+    assert breaker.state is CircuitState.CLOSED
+    assert breaker.available
+
+
+def test_failed_probe_reopens(clock):
+    breaker = _breaker(min_calls=1)
+    _call(breaker, _status_error(503))
+    clock.now += 30
+
+    _call(breaker, httpx.ReadTimeout("lento"))
+
+    assert breaker.state is CircuitState.OPEN
+    assert breaker.retry_in == pytest.approx(30.0)
+
+
+def test_neutral_probe_frees_slot_without_closing(clock):
+    breaker = _breaker(min_calls=1)
+    _call(breaker, _status_error(503))
+    clock.now += 30
+
+    _call(breaker, _status_error(400))
+
+    assert breaker.state is CircuitState.HALF_OPEN
+    assert breaker.available
+
+
+def test_select_model_uses_fallback_when_open(clock, monkeypatch):
+    primary = _breaker(min_calls=1)
+    fallback = _breaker(min_calls=1)
+    monkeypatch.setitem(breaker_module._breakers, "PRIMARIO", primary)
+    monkeypatch.setitem(breaker_module._breakers, "ALTERNATIVO", fallback)
+    monkeypatch.setattr(breaker_module.settings, "adapta_breaker_fallbacks", {"PRIMARIO": "ALTERNATIVO"})
+
+    assert select_model("PRIMARIO") == "PRIMARIO"
+    _call(primary, _status_error(503))
+    assert select_model("PRIMARIO") == "ALTERNATIVO"
+
+    _call(fallback, _status_error(503))
+    with pytest.raises(CircuitOpenError):
+        select_model("PRIMARIO")
@@ -0,0 +1,147 @@
+"""Testes do catálogo de modelos e da paridade com os antigos geradores por modelo."""
+
+import asyncio
+from typing import Any, Dict, List
+
+import pytest
+
+import generators.adapta as adapta
+from generators.adapta import limiter as limiter_module
+from generators.adapta import model_generator
+from generators.adapta.catalog import CatalogError, ModelCatalog, get_catalog, load_catalog
+from generators.adapta.model_generator import ModelGenerator
+from generators.registry import GeneratorRegistry
+
+TIMEOUTS = {"timeout": 600.0, "connect_timeout": 120.0, "read_timeout": 600.0}
+
+# Comportamento dos geradores por modelo anteriores ao catálogo:
+# nome de exibição -> (classe, model_name, get_supported_models(), remove_think_tags)
+LEGACY_GENERATORS = {
+    "Gemini": ("GeminiGenerator", "GEMINI", ["GEMINI", "GEMINI_FLASH"], True),
+    "Claude": ("ClaudeGenerator", "CLAUDE_4", ["CLAUDE_4"], False),
+    "GPT": ("GPTGenerator", "GPT_5", ["GPT_5"], False),
+    "Claude Opus": ("ClaudeOpusGenerator", "CLAUDE_4_OPUS", ["CLAUDE_4_OPUS"], False),
+    "Deepseek": ("DeepseekGenerator", "DEEPSEEK", ["DEEPSEEK"], False),
+    "Grok-4": ("Grok4Generator", "GROK_4", ["GROK_4"], False),
+    "GPT-OSS": ("GptOssGenerator", "GPT_OSS", ["GPT_OSS"], False),
+    "Deepseek-R1": ("DeepseekR1Generator", "DEEPSEEK_R1", ["DEEPSEEK_R1"], False),
+    "O3": ("GptO3Generator", "O3", ["O3"], False),
+    "O4-Mini": ("GptO4MiniGenerator", "O4_MINI", ["O4_MINI"], False),
+}
+
+THINKING = "<thinking>raciocínio</thinking>\nResposta"
+
+
+@pytest.fixture
+def client_options(monkeypatch) -> List[Dict[str, Any]]:
+    """Opções passadas ao cliente compartilhado, sem criar clientes de verdade."""
+    recorded: List[Dict[str, Any]] = []
+
+    def get_shared_client(**kwargs):
+        recorded.append(kwargs)
+        return object()
+
+    monkeypatch.setattr(model_generator, "get_shared_client", get_shared_client)
+    return recorded
+
+
+def test_catalog_lists_the_legacy_models_in_order():
+    assert list(get_catalog()) == list(LEGACY_GENERATORS)
+    assert list(GeneratorRegistry()) == list(LEGACY_GENERATORS)
+
+
+@pytest.mark.parametrize("name", list(LEGACY_GENERATORS))
+def test_generator_matches_legacy_class(name, client_options):
+    provider_name, model, supported_models, _ = LEGACY_GENERATORS[name]
+
+    generator = ModelGenerator(model=name)
+
+    assert generator.model_name == model
+    assert generator.get_provider_name() == provider_name
+    assert generator.get_supported_models() == supported_models
+    assert client_options == [TIMEOUTS]
+    assert get_catalog().by_model(model).name == name
+
+
+@pytest.mark.parametrize("name", list(LEGACY_GENERATORS))
+def test_named_subclass_uses_its_catalog_entry(name, client_options):
+    provider_name, model, _, _ = LEGACY_GENERATORS[name]
+
+    generator = getattr(adapta, provider_name)()
+
+    assert isinstance(generator, ModelGenerator)
+    assert generator.spec is get_catalog()[name]
+    assert generator.model_name == model
+
+
+@pytest.mark.parametrize("name", list(LEGACY_GENERATORS))
+def test_post_processing_matches_legacy_class(name, client_options):
+    removes_think_tags = LEGACY_GENERATORS[name][3]
+    generator = ModelGenerator(model=name)
+
+    async def stream() -> str:
+        async def chunks():
+            for chunk in ["<think", "ing>raciocínio</thin", "king>\nResp", "osta"]:
+                yield chunk
+
+        return "".join([chunk async for chunk in generator._postprocess_stream(chunks())])
+
+    expected = "Resposta" if removes_think_tags else THINKING
+    assert generator._postprocess(THINKING) == expected
+    assert asyncio.run(stream()) == expected
+
+
+def test_defaults_fill_omitted_fields():
+    catalog = ModelCatalog.from_dict({
+        "defaults": {"timeout": 30.0, "capabilities": {"search": True, "tools": False}},
+        "models": {"Novo": {"model": "NOVO", "capabilities": {"tools": True}}},
+    })
+
+    spec = catalog["Novo"]
+
+    assert spec.provider_name == "NovoGenerator"
+    assert spec.supported_models == ("NOVO",)
+    assert spec.timeout == 30.0
+    assert spec.supports("search") and spec.supports("tools") and not spec.supports("reasoning")
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        {},
+        {"models": {}},
+        {"models": {"Novo": "NOVO"}},
+        {"models": {"Novo": {}}},
+        {"models": {"Novo": {"model": "NOVO", "post_processors": ["desconhecido"]}}},
+        {"models": {"Novo": {"model": "NOVO", "capabilities": {"voar": True}}}},
+        {"models": {"Novo": {"model": "NOVO", "max_concurrency": 0}}},
+    ],
+)
+def test_invalid_catalog_is_rejected(data):
+    with pytest.raises(CatalogError):
+        ModelCatalog.from_dict(data)
+
+
+def test_load_catalog_reports_missing_and_malformed_files(tmp_path):
+    with pytest.raises(CatalogError):
+        load_catalog(tmp_path / "ausente.json")
+
+    malformed = tmp_path / "catalogo.json"
+    malformed.write_text("{", encoding="utf-8")
+    with pytest.raises(CatalogError):
+        load_catalog(malformed)
+
+
+def test_limiter_window_capped_by_max_concurrency(monkeypatch):
+    catalog = ModelCatalog.from_dict({
+        "models": {
+            "Limitado": {"model": "LIMITADO", "max_concurrency": 2},
+            "Livre": {"model": "LIVRE"},
+        },
+    })
+    monkeypatch.setattr(limiter_module, "_limiters", {})
+    monkeypatch.setattr(limiter_module, "get_catalog", lambda: catalog)
+    monkeypatch.setattr(limiter_module.settings, "adapta_limiter_max", 8)
+
+    assert limiter_module.get_limiter("LIMITADO").max_limit == 2
+    assert limiter_module.get_limiter("LIVRE").max_limit == 8
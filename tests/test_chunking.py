@@ -0,0 +1,149 @@
+"""Testes da divisão de textos longos e do resumo em partes (map-reduce)."""
+
+import asyncio
+import random
+from typing import List, Tuple
+
+import pytest
+
+from generators.chunking import CHARS_PER_TOKEN, group_texts, map_reduce, split_text
+from helpers import ScriptedGenerator
+
+MAX_TOKENS = 40
+MAX_CHARS = int(MAX_TOKENS * CHARS_PER_TOKEN)
+
+
+def _sentence(rng: random.Random) -> str:
+    words = ["aula", "de", "física", "energia", "o", "professor", "explica", "movimento", "exemplo", "força"]
+    return " ".join(rng.choice(words) for _ in range(rng.randint(3, 12))).capitalize() + rng.choice(".!?")
+
+
+def _document(seed: int) -> str:
+    rng = random.Random(seed)
+    paragraphs = [" ".join(_sentence(rng) for _ in range(rng.randint(1, 6))) for _ in range(rng.randint(1, 12))]
+    return "\n\n".join(paragraphs)
+
+
+def test_invalid_max_tokens():
+    with pytest.raises(ValueError):
+        split_text("texto", 0)
+
+
+@pytest.mark.parametrize("text, expected", [("", []), ("  \n ", []), ("  curto  ", ["curto"])])
+def test_short_text_is_a_single_part(text, expected):
+    assert split_text(text, MAX_TOKENS) == expected
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_parts_fit_the_limit_and_keep_the_text(seed):
+    text = _document(seed)
+
+    chunks = split_text(text, MAX_TOKENS)
+
+    assert all(0 < len(chunk) <= MAX_CHARS for chunk in chunks)
+    assert " ".join(chunks).split() == text.split()
+
+
+def test_parts_have_similar_sizes():
+    text = "\n\n".join(f"Parágrafo número {index} da aula." for index in range(40))
+
+    chunks = split_text(text, MAX_TOKENS)
+    sizes = [len(chunk) for chunk in chunks]
+
+    # Cabem no máximo 4 parágrafos inteiros em cada parte
+    assert len(chunks) == 10
+    assert max(sizes) - min(sizes) <= MAX_CHARS // 4
+
+
+def test_slightly_over_the_limit_becomes_two_halves():
+    paragraphs = [f"Frase {index:02d} de teste." for index in range(12)]
+    text = " ".join(paragraphs)
+    assert MAX_CHARS < len(text) <= 2 * MAX_CHARS
+
+    first, second = split_text(text, MAX_TOKENS)
+
+    assert abs(len(first) - len(second)) <= MAX_CHARS // 4
+
+
+def test_parts_end_at_paragraph_or_sentence_boundaries():
+    rng = random.Random(7)
+    text = "\n\n".join(" ".join(f"Frase {rng.randint(0, 999)}." for _ in range(rng.randint(1, 8))) for _ in range(20))
+
+    for chunk in split_text(text, MAX_TOKENS):
+        assert chunk[-1] in ".!?"
+        assert not chunk.startswith(" ")
+
+
+def test_long_sentence_is_split_between_words():
+    text = " ".join(f"palavra{index}" for index in range(100))
+
+    chunks = split_text(text, MAX_TOKENS)
+
+    assert len(chunks) > 1
+    assert " ".join(chunks).split() == text.split()
+
+
+def test_word_longer_than_the_limit_is_cut():
+    text = "x" * (MAX_CHARS * 2 + 5)
+
+    chunks = split_text(text, MAX_TOKENS)
+
+    assert all(len(chunk) <= MAX_CHARS for chunk in chunks)
+    assert "".join(chunks) == text
+
+
+def _texts(*sizes: int) -> List[str]:
+    return ["x" * int(tokens * CHARS_PER_TOKEN) for tokens in sizes]
+
+
+def test_group_texts_respects_the_limit():
+    texts = _texts(10, 10, 10, 10, 10, 10)
+
+    groups = group_texts(texts, 30)
+
+    assert [len(group) for group in groups] == [3, 3]
+    assert [text for group in groups for text in group] == texts
+
+
+def test_group_texts_has_at_least_two_per_group():
+    texts = _texts(50, 50, 50, 50)
+
+    groups = group_texts(texts, 30)
+
+    assert [len(group) for group in groups] == [2, 2]
+
+
+def test_group_texts_joins_a_trailing_single_text():
+    texts = _texts(10, 10, 10, 10, 10, 10, 10)
+
+    groups = group_texts(texts, 30)
+
+    assert [len(group) for group in groups] == [3, 4]
+
+
+def test_group_texts_always_reduces():
+    for count in range(2, 30):
+        groups = group_texts(_texts(*[25] * count), 30)
+        assert len(groups) < count
+        assert all(len(group) >= 2 for group in groups)
+
+
+def test_map_reduce_combines_in_levels_until_it_fits():
+    generator = ScriptedGenerator(lambda messages: "")
+    combined: List[int] = []
+    size = int(10 * CHARS_PER_TOKEN)  # Cada resumo tem 10 tokens estimados
+
+    async def summarize_chunk(item: Tuple[int, str]) -> str:
+        part, _ = item
+        return f"{part:02d}".ljust(size, "r")
+
+    async def combine(summaries: List[str]) -> str:
+        combined.append(len(summaries))
+        return "+".join(summary[:2] for summary in summaries).ljust(size, "c")
+
+    chunks = [f"parte {index}" for index in range(1, 10)]
+    result = asyncio.run(map_reduce(generator, chunks, summarize_chunk, combine, 30, 3))
+
+    # 9 resumos (90 tokens) -> 3 grupos de 3 -> 3 resumos (30 tokens) -> combinação final
+    assert combined == [3, 3, 3, 3]
+    assert result.startswith("01+04+07")
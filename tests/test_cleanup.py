@@ -0,0 +1,83 @@
+"""Testes da fila de exclusão de conversas temporárias."""
+
+import asyncio
+import time
+from typing import List
+
+from generators.adapta.cleanup import ConversationCleanupQueue
+
+
+def _wait_for(condition, timeout: float = 3.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+def test_deletes_issued_after_caller_loops_close(io_loop):
+    """Cada rerun do Streamlit roda em um ``asyncio.run`` que termina antes do timer."""
+    deleted: List[str] = []
+
+    async def delete(batch: List[str]) -> None:
+        deleted.extend(batch)
+
+    queue = ConversationCleanupQueue(delete, batch_size=20, flush_interval=0.05, io_loop=io_loop)
+
+    async def call(chat_id: str) -> None:
+        queue.enqueue(chat_id)
+
+    asyncio.run(call("chat-0"))
+    asyncio.run(call("chat-1"))
+
+    assert _wait_for(lambda: len(deleted) == 2)
+    assert sorted(deleted) == ["chat-0", "chat-1"]
+    assert queue.pending == []
+
+
+def test_full_batch_is_sent_without_waiting(io_loop):
+    batches: List[List[str]] = []
+
+    async def delete(batch: List[str]) -> None:
+        batches.append(list(batch))
+
+    queue = ConversationCleanupQueue(delete, batch_size=3, flush_interval=60.0, io_loop=io_loop)
+    for i in range(3):
+        queue.enqueue(f"chat-{i}")
+
+    assert _wait_for(lambda: batches == [["chat-0", "chat-1", "chat-2"]])
+
+
+def test_failed_batch_is_retried_then_dropped(io_loop):
+    attempts: List[List[str]] = []
+
+    async def delete(batch: List[str]) -> None:
+        attempts.append(list(batch))
+        raise RuntimeError("indisponível")
+
+    queue = ConversationCleanupQueue(delete, batch_size=20, flush_interval=0.01, max_retries=3, io_loop=io_loop)
+    queue.enqueue("chat-0")
+
+    assert _wait_for(lambda: len(attempts) == 3)
+    time.sleep(0.1)
+    assert len(attempts) == 3
+    assert queue.pending == []
+
+
+def test_drain_from_caller_loop(io_loop):
+    deleted: List[str] = []
+
+    async def delete(batch: List[str]) -> None:
+        deleted.extend(batch)
+
+    queue = ConversationCleanupQueue(delete, batch_size=20, flush_interval=60.0, io_loop=io_loop)
+
+    async def call_and_drain() -> None:
+        queue.enqueue("chat-0")
+        queue.enqueue("chat-1")
+        await queue.drain()
+
+    asyncio.run(call_and_drain())
+    assert deleted == ["chat-0", "chat-1"]
+    assert queue.pending == []
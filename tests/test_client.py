@@ -0,0 +1,44 @@
+"""Testes da troca de credenciais do ``AdaptaClient`` a partir do ``.env``."""
+
+import asyncio
+import threading
+
+from config import SettingsChange, settings
+from generators.adapta.client import AdaptaClient
+
+
+def _change(**values: str) -> SettingsChange:
+    old = settings.snapshot
+    return SettingsChange(old, old.model_copy(update=values), frozenset(values))
+
+
+def _publish_from_watcher_thread(client: AdaptaClient, change: SettingsChange) -> None:
+    thread = threading.Thread(target=client._on_settings_change, args=(change,))
+    thread.start()
+    thread.join()
+
+
+def test_new_credentials_apply_at_next_request():
+    client = AdaptaClient(cookies_str="a=1", session_id="sess-1")
+    cookies = client.cookies
+
+    _publish_from_watcher_thread(client, _change(adapta_cookies_str="a=2", adapta_session_id="sess-2"))
+
+    # A thread do observador não altera a credencial de requisições em andamento
+    assert client.cookies is cookies and client.session_id == "sess-1"
+
+    asyncio.run(client._ensure_client())
+
+    assert client.cookies == {"a": "2"}
+    assert client.session_id == "sess-2"
+    assert client._pending_credentials is None
+
+
+def test_unrelated_change_keeps_credentials():
+    client = AdaptaClient(cookies_str="a=1", session_id="sess-1")
+
+    _publish_from_watcher_thread(client, _change(prompt_reload_interval=5.0))
+    asyncio.run(client._ensure_client())
+
+    assert client.cookies == {"a": "1"}
+    assert client._pending_credentials is None
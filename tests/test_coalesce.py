@@ -0,0 +1,175 @@
+"""Testes do agrupamento (single-flight) de chamadas idênticas."""
+
+import asyncio
+import threading
+from typing import AsyncIterator, List
+
+import pytest
+
+from generators.adapta.coalesce import SingleFlight, coalesce_key
+
+
+def test_coalesce_key_is_stable():
+    messages = [{"role": "user", "content": "Olá"}]
+
+    assert coalesce_key("call", "GPT_5", messages) == coalesce_key("call", "GPT_5", [{"content": "Olá", "role": "user"}])
+    assert coalesce_key("call", "GPT_5", messages) != coalesce_key("call", "CLAUDE_4", messages)
+
+
+def test_concurrent_calls_share_one_execution():
+    flights = SingleFlight()
+    executions: List[int] = []
+
+    async def operation() -> str:
+        executions.append(1)
+        await asyncio.sleep(0.02)
+        return "resposta"
+
+    async def run() -> List[str]:
+        return list(await asyncio.gather(*(flights.call("k", operation) for _ in range(5))))
+
+    assert asyncio.run(run()) == ["resposta"] * 5
+    assert executions == [1]
+    assert (flights.leaders, flights.hits, flights.in_flight) == (1, 4, 0)
+
+
+def test_different_keys_and_later_calls_run_separately():
+    flights = SingleFlight()
+    executions: List[str] = []
+
+    async def operation(key: str):
+        async def run() -> str:
+            executions.append(key)
+            await asyncio.sleep(0.01)
+            return key
+
+        return await flights.call(key, run)
+
+    async def run() -> None:
+        await asyncio.gather(operation("a"), operation("b"))
+        await operation("a")
+
+    asyncio.run(run())
+
+    assert sorted(executions) == ["a", "a", "b"]
+
+
+def test_error_is_shared_by_all_callers():
+    flights = SingleFlight()
+    executions: List[int] = []
+
+    async def operation() -> str:
+        executions.append(1)
+        await asyncio.sleep(0.01)
+        raise ValueError("falhou")
+
+    async def run() -> list:
+        return await asyncio.gather(*(flights.call("k", operation) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+
+    assert executions == [1]
+    assert all(isinstance(result, ValueError) for result in results)
+    assert flights.in_flight == 0
+
+
+def test_late_stream_subscriber_replays_from_start():
+    flights = SingleFlight()
+
+    async def run() -> List[List[str]]:
+        first_sent = asyncio.Event()
+        resume = asyncio.Event()
+
+        async def source() -> AsyncIterator[str]:
+            yield "a"
+            first_sent.set()
+            await resume.wait()
+            yield "b"
+            yield "c"
+
+        async def consume() -> List[str]:
+            return [item async for item in flights.stream("k", source)]
+
+        leader = asyncio.ensure_future(consume())
+        await first_sent.wait()
+        late = asyncio.ensure_future(consume())
+        await asyncio.sleep(0.01)
+        resume.set()
+        return [await leader, await late]
+
+    first, second = asyncio.run(run())
+
+    assert first == second == ["a", "b", "c"]
+    assert flights.leaders == 1 and flights.hits == 1
+
+
+def test_result_survives_leader_cancellation():
+    flights = SingleFlight()
+    executions: List[int] = []
+
+    async def operation() -> str:
+        executions.append(1)
+        await asyncio.sleep(0.05)
+        return "resposta"
+
+    async def run() -> str:
+        leader = asyncio.ensure_future(flights.call("k", operation))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flights.call("k", operation))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(run()) == "resposta"
+    assert executions == [1]
+
+
+def test_operation_cancelled_when_nobody_waits():
+    flights = SingleFlight()
+    cancelled = []
+
+    async def operation() -> str:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(1)
+            raise
+        return "nunca"
+
+    async def run() -> None:
+        caller = asyncio.ensure_future(flights.call("k", operation))
+        await asyncio.sleep(0.01)
+        caller.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+        await asyncio.sleep(0.01)
+
+    asyncio.run(run())
+
+    assert cancelled == [1]
+    assert flights.in_flight == 0
+
+
+def test_caller_on_another_thread_gets_the_result():
+    flights = SingleFlight()
+    executions: List[int] = []
+    started = threading.Event()
+    results: List[str] = []
+
+    async def operation() -> str:
+        executions.append(1)
+        started.set()
+        await asyncio.sleep(0.1)
+        return "resposta"
+
+    def other_thread() -> None:
+        started.wait(5.0)
+        results.append(asyncio.run(flights.call("k", operation)))
+
+    thread = threading.Thread(target=other_thread)
+    thread.start()
+    results.append(asyncio.run(flights.call("k", operation)))
+    thread.join(5.0)
+
+    assert results == ["resposta", "resposta"]
+    assert executions == [1]
@@ -0,0 +1,277 @@
+"""Testes da recarga do ``.env`` (``EnvFileWatcher`` e ``SettingsManager``)."""
+
+import threading
+import time
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from config import EnvFileWatcher, SettingsChange, SettingsManager
+
+# Variáveis que os .env dos testes definem; o monkeypatch restaura os valores originais
+ENV_KEYS = ("ADAPTA_COOKIES_STR", "ADAPTA_SESSION_ID", "ADAPTA_ACCOUNT_WEIGHT", "CONFIG_WATCH_MODE", "CONFIG_WATCH_INTERVAL")
+INTERVAL = 0.01
+TIMEOUT = 5.0
+
+
+@pytest.fixture
+def env_file(tmp_path, monkeypatch) -> Path:
+    for key in ENV_KEYS:
+        monkeypatch.delenv(key, raising=False)
+    monkeypatch.setenv("ADAPTA_COOKIES_STR", "test=1")
+    # Nenhum .env do diretório atual é lido pelo BaseSettings
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / ".env"
+    _write(path, ADAPTA_SESSION_ID="sess-1")
+    return path
+
+
+def _write(path: Path, **values: str) -> None:
+    path.write_text("".join(f"{key}={value}\n" for key, value in values.items()))
+
+
+class Calls:
+    """Callback que conta as chamadas e permite esperar pela próxima."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.changes: List[SettingsChange] = []
+        self._event = threading.Event()
+
+    def __call__(self, change: SettingsChange = None) -> None:
+        self.count += 1
+        if change is not None:
+            self.changes.append(change)
+        self._event.set()
+
+    def wait(self) -> bool:
+        called = self._event.wait(TIMEOUT)
+        self._event.clear()
+        return called
+
+
+def _watcher(path: Path, callback, mode: str = "poll") -> EnvFileWatcher:
+    watcher = EnvFileWatcher(path, callback, mode=mode, interval=INTERVAL).start()
+    # O polling compara com o estado lido ao iniciar a thread
+    time.sleep(INTERVAL * 3)
+    return watcher
+
+
+def test_poll_detects_change(env_file):
+    calls = Calls()
+    watcher = _watcher(env_file, calls)
+    try:
+        _write(env_file, ADAPTA_SESSION_ID="sess-22")
+        assert calls.wait()
+        assert watcher.mode == "poll"
+    finally:
+        watcher.stop()
+
+
+def test_poll_detects_removal_and_recreation(env_file):
+    calls = Calls()
+    watcher = _watcher(env_file, calls)
+    try:
+        env_file.unlink()
+        assert calls.wait()
+        _write(env_file, ADAPTA_SESSION_ID="sess-3")
+        assert calls.wait()
+    finally:
+        watcher.stop()
+
+
+def test_unchanged_file_is_not_reported(env_file):
+    calls = Calls()
+    watcher = _watcher(env_file, calls)
+    time.sleep(INTERVAL * 10)
+    watcher.stop()
+
+    assert calls.count == 0
+
+
+@pytest.mark.parametrize("mode", ["auto", "inotify"])
+def test_falls_back_to_polling_without_inotify(env_file, monkeypatch, mode):
+    monkeypatch.setattr(EnvFileWatcher, "_open_inotify", lambda self: None)
+    calls = Calls()
+
+    watcher = _watcher(env_file, calls, mode=mode)
+    try:
+        assert watcher.mode == "poll"
+        _write(env_file, ADAPTA_SESSION_ID="sess-22")
+        assert calls.wait()
+    finally:
+        watcher.stop()
+
+
+def test_inotify_reports_one_change_per_save(env_file):
+    calls = Calls()
+    watcher = _watcher(env_file, calls, mode="inotify")
+    try:
+        if watcher.mode != "inotify":
+            pytest.skip("inotify indisponível")
+        # Um salvamento gera vários eventos (criação, escrita, fechamento)
+        _write(env_file, ADAPTA_SESSION_ID="sess-22")
+        assert calls.wait()
+        time.sleep(EnvFileWatcher._DEBOUNCE * 4)
+        assert calls.count == 1
+    finally:
+        watcher.stop()
+
+
+def test_failing_callback_keeps_watching(env_file):
+    calls = Calls()
+
+    def callback() -> None:
+        calls()
+        raise RuntimeError("assinante quebrado")
+
+    watcher = _watcher(env_file, callback)
+    try:
+        _write(env_file, ADAPTA_SESSION_ID="sess-22")
+        assert calls.wait()
+        _write(env_file, ADAPTA_SESSION_ID="sess-333")
+        assert calls.wait()
+    finally:
+        watcher.stop()
+
+
+def test_stop_ends_the_thread(env_file):
+    calls = Calls()
+    watcher = _watcher(env_file, calls)
+    thread = watcher._thread
+
+    watcher.stop()
+    _write(env_file, ADAPTA_SESSION_ID="sess-22")
+    time.sleep(INTERVAL * 10)
+
+    assert not thread.is_alive()
+    assert calls.count == 0
+
+
+def test_stop_from_the_callback_does_not_deadlock(env_file):
+    stopped = threading.Event()
+
+    def callback() -> None:
+        watcher.stop()
+        stopped.set()
+
+    watcher = _watcher(env_file, callback)
+    _write(env_file, ADAPTA_SESSION_ID="sess-22")
+
+    assert stopped.wait(TIMEOUT)
+    watcher._thread.join(TIMEOUT)
+    assert not watcher._thread.is_alive()
+
+
+@pytest.fixture
+def manager(env_file):
+    _write(env_file, ADAPTA_SESSION_ID="sess-1", CONFIG_WATCH_MODE="poll", CONFIG_WATCH_INTERVAL=str(INTERVAL))
+    manager = SettingsManager(env_file)
+    yield manager
+    manager.close()
+
+
+def test_manager_reloads_and_notifies_once(manager, env_file):
+    calls = Calls()
+    manager.subscribe(calls)
+    assert manager.adapta_session_id == "sess-1"
+    time.sleep(INTERVAL * 3)
+
+    _write(env_file, ADAPTA_SESSION_ID="sess-22", CONFIG_WATCH_MODE="poll", CONFIG_WATCH_INTERVAL=str(INTERVAL))
+
+    assert calls.wait()
+    time.sleep(INTERVAL * 10 + EnvFileWatcher._DEBOUNCE * 2)
+    assert calls.count == 1
+    change = calls.changes[0]
+    assert change.changed == {"adapta_session_id"}
+    assert (change.old.adapta_session_id, change.new.adapta_session_id) == ("sess-1", "sess-22")
+    assert manager.adapta_session_id == "sess-22"
+
+
+def test_invalid_file_keeps_current_settings(manager, env_file):
+    calls = Calls()
+    manager.subscribe(calls)
+    assert manager.adapta_account_weight == 1.0
+    time.sleep(INTERVAL * 3)
+
+    _write(
+        env_file,
+        ADAPTA_SESSION_ID="sess-1",
+        ADAPTA_ACCOUNT_WEIGHT="muito",
+        CONFIG_WATCH_MODE="poll",
+        CONFIG_WATCH_INTERVAL=str(INTERVAL),
+    )
+    time.sleep(INTERVAL * 10 + EnvFileWatcher._DEBOUNCE * 2)
+
+    assert calls.count == 0
+    assert manager.adapta_account_weight == 1.0
+
+
+def test_unchanged_reload_does_not_notify(manager):
+    calls = Calls()
+    manager.subscribe(calls)
+    manager.snapshot
+
+    manager.reload()
+
+    assert calls.count == 0
+
+
+def test_unsubscribe(manager, env_file):
+    calls = Calls()
+    unsubscribe = manager.subscribe(calls)
+    manager.snapshot
+
+    unsubscribe()
+    _write(env_file, ADAPTA_SESSION_ID="sess-22")
+    manager.reload()
+
+    assert calls.count == 0
+
+
+def test_snapshot_is_consistent_during_reloads(env_file):
+    manager = SettingsManager(env_file, watch=False)
+    _write(env_file, ADAPTA_SESSION_ID="sess-0", ADAPTA_ACCOUNT_WEIGHT="0")
+    manager.snapshot
+    done = threading.Event()
+    inconsistent: List[str] = []
+
+    def read() -> None:
+        while not done.is_set():
+            snapshot = manager.snapshot
+            if snapshot.adapta_session_id != f"sess-{int(snapshot.adapta_account_weight)}":
+                inconsistent.append(snapshot.adapta_session_id)
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    for version in range(1, 20):
+        _write(env_file, ADAPTA_SESSION_ID=f"sess-{version}", ADAPTA_ACCOUNT_WEIGHT=str(version))
+        manager.reload()
+    done.set()
+    for reader in readers:
+        reader.join(TIMEOUT)
+
+    assert inconsistent == []
+    assert manager.adapta_session_id == "sess-19"
+
+
+def test_watch_mode_off_starts_no_thread(env_file):
+    _write(env_file, CONFIG_WATCH_MODE="off")
+    manager = SettingsManager(env_file)
+
+    manager.snapshot
+
+    assert manager._watcher is None
+    manager.close()
+
+
+def test_close_stops_the_watcher(manager):
+    manager.snapshot
+    thread = manager._watcher._thread
+
+    manager.close()
+
+    assert not thread.is_alive()
+    assert manager._watcher is None
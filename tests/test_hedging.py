@@ -0,0 +1,201 @@
+"""Testes das requisições "hedged" (cópia disparada quando a resposta atrasa)."""
+
+import asyncio
+import json
+from typing import Dict, List
+
+import httpx
+import pytest
+
+from generators.adapta import breaker as breaker_module
+from generators.adapta import client as client_module
+from generators.adapta import limiter as limiter_module
+from generators.adapta.hedging import HedgeBudget
+from helpers import mock_client
+
+MESSAGES = [{"role": "user", "content": "Olá"}]
+DELAY = 0.05
+
+
+class FakeApi:
+    """API simulada: cada modelo responde após a sua latência, em segundos.
+
+    Attributes:
+        started: Modelos das requisições recebidas, na ordem.
+        cancelled: Modelos das requisições canceladas antes de responder.
+        closed: Modelos cujos streams foram fechados antes do fim.
+        chats: ``chatId`` de cada modelo.
+    """
+
+    def __init__(self, latencies: Dict[str, float], first_chunk: bool = False):
+        self.latencies = latencies
+        # Com first_chunk=True, os cabeçalhos chegam logo e o atraso fica no primeiro trecho
+        self.first_chunk = first_chunk
+        self.started: List[str] = []
+        self.cancelled: List[str] = []
+        self.closed: List[str] = []
+        self.chats: Dict[str, str] = {}
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content)
+        model = payload["chatAiModel"]
+        self.started.append(model)
+        self.chats[model] = payload["chatId"]
+        if self.first_chunk:
+            return httpx.Response(200, stream=_Body(self, model, self.latencies[model]))
+        try:
+            await asyncio.sleep(self.latencies[model])
+        except asyncio.CancelledError:
+            self.cancelled.append(model)
+            raise
+        return httpx.Response(200, stream=_Body(self, model))
+
+
+class _Body(httpx.AsyncByteStream):
+    """Corpo lido sob demanda, como o de um transporte real."""
+
+    def __init__(self, api: FakeApi, model: str, delay: float = 0.0):
+        self.api = api
+        self.model = model
+        self.delay = delay
+        self.finished = False
+
+    async def __aiter__(self):
+        await asyncio.sleep(self.delay)
+        yield b'0:"resposta de "\n'
+        yield f'0:"{self.model}"\n'.encode()
+        self.finished = True
+
+    async def aclose(self) -> None:
+        if not self.finished:
+            self.api.closed.append(self.model)
+
+
+@pytest.fixture
+def hedging(monkeypatch):
+    """Hedging com espera fixa de ``DELAY`` e orçamento de uma cópia por chamada."""
+    budget = HedgeBudget(ratio=1.0)
+    monkeypatch.setattr(client_module, "get_hedge_budget", lambda: budget)
+    monkeypatch.setattr(client_module, "hedge_delay", lambda metric, model: DELAY)
+    monkeypatch.setattr(client_module.settings, "adapta_hedge_models", {"LENTO": "RAPIDO"})
+    monkeypatch.setattr(limiter_module, "_limiters", {})
+    monkeypatch.setattr(breaker_module, "_breakers", {})
+    return budget
+
+
+def _call(client, model: str = "LENTO"):
+    return asyncio.run(client.call_model(MESSAGES, model=model, hedge=True, detailed=True, raise_errors=True))
+
+
+def _stream(client, model: str = "LENTO") -> List[str]:
+    async def collect() -> List[str]:
+        return [chunk async for chunk in client.call_model_stream(MESSAGES, model=model, hedge=True)]
+
+    return asyncio.run(collect())
+
+
+def test_fast_answer_does_not_hedge(monkeypatch, hedging):
+    api = FakeApi({"LENTO": 0.0, "RAPIDO": 0.0})
+    client = mock_client(monkeypatch, api)
+
+    result = _call(client)
+
+    assert result.text == "resposta de LENTO"
+    assert api.started == ["LENTO"]
+
+
+def test_hedge_fires_after_delay_and_first_winner_is_returned(monkeypatch, hedging):
+    api = FakeApi({"LENTO": 1.0, "RAPIDO": 0.01})
+    enqueued: List[str] = []
+    client = mock_client(monkeypatch, api, enqueued)
+    loop_time: List[float] = []
+
+    async def call():
+        start = asyncio.get_running_loop().time()
+        result = await client.call_model(MESSAGES, model="LENTO", hedge=True, detailed=True)
+        loop_time.append(asyncio.get_running_loop().time() - start)
+        return result
+
+    result = asyncio.run(call())
+
+    assert result.text == "resposta de RAPIDO" and result.model == "RAPIDO"
+    assert api.started == ["LENTO", "RAPIDO"]
+    assert DELAY <= loop_time[0] < 0.5
+    # A chamada perdedora é cancelada e a sua conversa temporária vai para a exclusão
+    assert api.cancelled == ["LENTO"]
+    assert sorted(enqueued) == sorted(api.chats.values())
+
+
+def test_primary_wins_when_it_finishes_first(monkeypatch, hedging):
+    api = FakeApi({"LENTO": DELAY + 0.02, "RAPIDO": 1.0})
+    client = mock_client(monkeypatch, api)
+
+    result = _call(client)
+
+    assert result.model == "LENTO"
+    assert api.started == ["LENTO", "RAPIDO"]
+    assert api.cancelled == ["RAPIDO"]
+
+
+def test_exhausted_budget_suppresses_hedge(monkeypatch, hedging):
+    budget = HedgeBudget(ratio=0.5)
+    monkeypatch.setattr(client_module, "get_hedge_budget", lambda: budget)
+    api = FakeApi({"LENTO": DELAY * 2, "RAPIDO": 0.0})
+    client = mock_client(monkeypatch, api)
+
+    # A primeira chamada só credita meia cópia; a segunda completa uma
+    assert _call(client).model == "LENTO"
+    assert api.started == ["LENTO"]
+    assert _call(client).model == "RAPIDO"
+    assert api.started == ["LENTO", "LENTO", "RAPIDO"]
+
+
+def test_without_latency_samples_there_is_no_hedge(monkeypatch, hedging):
+    monkeypatch.setattr(client_module, "hedge_delay", lambda metric, model: None)
+    api = FakeApi({"LENTO": DELAY * 2, "RAPIDO": 0.0})
+    client = mock_client(monkeypatch, api)
+
+    assert _call(client).model == "LENTO"
+    assert api.started == ["LENTO"]
+
+
+def test_budget_accounting():
+    budget = HedgeBudget(ratio=0.4, max_tokens=1.0)
+
+    assert not budget.try_spend()
+    for _ in range(5):
+        budget.record_request()
+    assert budget.tokens == pytest.approx(1.0)
+    assert budget.try_spend()
+    assert not budget.try_spend()
+
+
+def test_streamed_hedge_commits_to_the_first_stream(monkeypatch, hedging):
+    api = FakeApi({"LENTO": 1.0, "RAPIDO": 0.01}, first_chunk=True)
+    enqueued: List[str] = []
+    client = mock_client(monkeypatch, api, enqueued)
+
+    chunks = _stream(client)
+
+    # Nenhum trecho do stream perdedor é misturado à resposta
+    assert chunks == ["resposta de ", "RAPIDO"]
+    assert api.started == ["LENTO", "RAPIDO"]
+    assert api.closed == ["LENTO"]
+    assert sorted(enqueued) == sorted(api.chats.values())
+
+
+def test_streamed_primary_keeps_the_stream_when_first(monkeypatch, hedging):
+    api = FakeApi({"LENTO": DELAY + 0.02, "RAPIDO": 1.0}, first_chunk=True)
+    client = mock_client(monkeypatch, api)
+
+    assert _stream(client) == ["resposta de ", "LENTO"]
+    assert api.closed == ["RAPIDO"]
+
+
+def test_streamed_hedge_respects_budget(monkeypatch, hedging):
+    monkeypatch.setattr(client_module, "get_hedge_budget", lambda: HedgeBudget(ratio=0.0))
+    api = FakeApi({"LENTO": DELAY * 2, "RAPIDO": 0.0}, first_chunk=True)
+    client = mock_client(monkeypatch, api)
+
+    assert _stream(client) == ["resposta de ", "LENTO"]
+    assert api.started == ["LENTO"]
@@ -0,0 +1,253 @@
+"""Testes do limitador adaptativo de concorrência (AIMD)."""
+
+import asyncio
+import threading
+from types import SimpleNamespace
+from typing import List
+
+import httpx
+import pytest
+
+from generators.adapta import client as client_module
+from generators.adapta import limiter as limiter_module
+from generators.adapta.limiter import AdaptiveConcurrencyLimiter, is_overload_error
+from helpers import mock_client
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(limiter_module, "time", SimpleNamespace(monotonic=clock))
+    return clock
+
+
+def _status_error(status: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "https://api.example/conversation")
+    return httpx.HTTPStatusError(str(status), request=request, response=httpx.Response(status, request=request))
+
+
+def _limiter(**kwargs) -> AdaptiveConcurrencyLimiter:
+    options = dict(initial_limit=4, min_limit=1, max_limit=8, cooldown=1.0)
+    options.update(kwargs)
+    return AdaptiveConcurrencyLimiter("modelo-teste", **options)
+
+
+def _complete(limiter: AdaptiveConcurrencyLimiter, count: int = 1, latency: float = 1.0, error=None) -> None:
+    async def run() -> None:
+        for _ in range(count):
+            await limiter.acquire()
+            limiter.release(latency=None if error else latency, error=error)
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize(
+    "error, overload",
+    [
+        (_status_error(429), True),
+        (_status_error(503), True),
+        (httpx.ReadTimeout("lento"), True),
+        (_status_error(500), False),
+        (_status_error(400), False),
+        (httpx.ConnectError("recusada"), False),
+    ],
+)
+def test_overload_classification(error, overload):
+    assert is_overload_error(error) is overload
+
+
+def test_additive_increase_per_full_window(clock):
+    limiter = _limiter(initial_limit=4)
+
+    _complete(limiter, 3)
+    assert limiter.limit == 4
+    _complete(limiter, 2)
+    assert limiter.limit == 5
+
+
+def test_increase_is_capped_at_max(clock):
+    limiter = _limiter(initial_limit=2, max_limit=3)
+
+    _complete(limiter, 50)
+
+    assert limiter.limit == 3
+
+
+@pytest.mark.parametrize("error", [_status_error(429), _status_error(503), httpx.ReadTimeout("lento")])
+def test_multiplicative_decrease_on_overload(clock, error):
+    limiter = _limiter(initial_limit=8)
+
+    _complete(limiter, error=error)
+
+    assert limiter.limit == 4
+
+
+def test_other_errors_keep_the_window(clock):
+    limiter = _limiter(initial_limit=8)
+
+    _complete(limiter, error=_status_error(400))
+    _complete(limiter, error=_status_error(500))
+
+    assert limiter.limit == 8
+
+
+def test_decreases_respect_cooldown_and_min(clock):
+    limiter = _limiter(initial_limit=8, min_limit=2)
+
+    _complete(limiter, 3, error=_status_error(429))
+    assert limiter.limit == 4
+
+    clock.now += 1.0
+    _complete(limiter, error=_status_error(429))
+    clock.now += 1.0
+    _complete(limiter, error=_status_error(429))
+    assert limiter.limit == 2
+
+
+def test_latency_spike_decreases_window(clock):
+    limiter = _limiter(initial_limit=8, max_limit=8, latency_spike_factor=4.0)
+    _complete(limiter, 5, latency=1.0)
+
+    _complete(limiter, latency=10.0)
+
+    assert limiter.limit == 4
+
+
+def test_latency_spike_ignored_before_enough_samples(clock):
+    limiter = _limiter(initial_limit=8, max_limit=8)
+    _complete(limiter, 2, latency=1.0)
+
+    _complete(limiter, latency=100.0)
+
+    assert limiter.limit == 8
+
+
+def test_concurrency_never_exceeds_window():
+    limiter = _limiter(initial_limit=2, max_limit=2)
+    peak: List[int] = []
+
+    async def call() -> None:
+        async with limiter.slot():
+            peak.append(limiter.in_flight)
+            await asyncio.sleep(0.01)
+
+    async def run() -> None:
+        await asyncio.gather(*(call() for _ in range(10)))
+
+    asyncio.run(run())
+
+    assert max(peak) == 2
+    assert limiter.in_flight == 0 and limiter.queued == 0
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    limiter = _limiter(initial_limit=1, max_limit=1)
+
+    async def run() -> None:
+        await limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        assert limiter.queued == 1
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert limiter.queued == 0
+        limiter.release(latency=0.1)
+
+    asyncio.run(run())
+
+    assert limiter.in_flight == 0
+
+
+def test_waiter_on_another_event_loop_is_woken():
+    limiter = _limiter(initial_limit=1, max_limit=1)
+    acquired = threading.Event()
+
+    async def hold() -> None:
+        await limiter.acquire()
+
+    asyncio.run(hold())
+
+    def other_thread() -> None:
+        async def wait() -> None:
+            await limiter.acquire()
+            acquired.set()
+            limiter.release(latency=0.1)
+
+        asyncio.run(wait())
+
+    thread = threading.Thread(target=other_thread)
+    thread.start()
+    while limiter.queued == 0:
+        thread.join(0.01)
+
+    limiter.release(latency=0.1)
+    thread.join(5.0)
+
+    assert acquired.is_set()
+    assert limiter.in_flight == 0
+
+
+def test_response_length_does_not_shrink_window(clock):
+    limiter = _limiter(initial_limit=8, max_limit=8)
+
+    async def call(generation: float) -> None:
+        async with limiter.slot() as slot:
+            clock.now += 0.5
+            slot.mark_headers()
+            # O tempo de geração do corpo não conta como latência
+            clock.now += generation
+
+    async def run() -> None:
+        for generation in [0.5, 60.0, 0.5, 0.5, 0.5, 0.5, 0.5, 120.0, 0.5, 90.0]:
+            await call(generation)
+
+    asyncio.run(run())
+
+    assert limiter.limit == 8
+
+
+class _SlowBody(httpx.AsyncByteStream):
+    """Corpo de resposta cuja geração leva ``generation`` segundos do relógio simulado."""
+
+    def __init__(self, clock: FakeClock, generation: float) -> None:
+        self.clock = clock
+        self.generation = generation
+
+    async def __aiter__(self):
+        self.clock.now += self.generation
+        yield b'0:"resposta"\n'
+
+
+def test_buffered_and_streamed_calls_share_header_latency(clock, monkeypatch):
+    monkeypatch.setattr(client_module, "time", SimpleNamespace(monotonic=clock))
+    model = "MODELO-LATENCIA"
+    limiter = _limiter(initial_limit=8, max_limit=8)
+    monkeypatch.setitem(limiter_module._limiters, model, limiter)
+    generations = iter([0.1, 45.0] * 6)
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        clock.now += 0.5
+        return httpx.Response(200, stream=_SlowBody(clock, next(generations)))
+
+    client = mock_client(monkeypatch, handler)
+
+    async def run() -> None:
+        for _ in range(6):
+            response = await client._create_conversation_limited([{"role": "user", "content": "Olá"}], model)
+            assert response.text == '0:"resposta"\n'
+            stream = client._call_model_stream_once([{"role": "user", "content": "Olá"}], model)
+            assert [chunk async for chunk in stream] == ["resposta"]
+
+    asyncio.run(run())
+
+    assert limiter.limit == 8
+    assert limiter._latency_avg == pytest.approx(0.5)
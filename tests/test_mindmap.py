@@ -0,0 +1,193 @@
+"""Testes do validador OPML incremental, da junção e do motor de mapas mentais."""
+
+import asyncio
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from generators.mindmap import MindmapEngine, OpmlError, OpmlStreamValidator, merge_opml
+from helpers import ScriptedGenerator
+
+DOCUMENT = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<opml version="2.0">\n'
+    "  <head><title>Aula</title></head>\n"
+    "  <body>\n"
+    '    <outline text="Aula">\n'
+    '      <outline text="Tema A">\n'
+    '        <outline text="Conceito 1"/>\n'
+    '        <outline text="Conceito 2"/>\n'
+    "      </outline>\n"
+    '      <outline text="P&amp;D"/>\n'
+    "    </outline>\n"
+    "  </body>\n"
+    "</opml>"
+)
+
+
+def _texts(document: str):
+    return [outline.get("text") for outline in ET.fromstring(document.encode("utf-8")).iter("outline")]
+
+
+def _feed(document: str, size: int = 5) -> OpmlStreamValidator:
+    validator = OpmlStreamValidator()
+    for start in range(0, len(document), size):
+        if not validator.feed(document[start:start + size]):
+            break
+    validator.finish()
+    return validator
+
+
+@pytest.mark.parametrize("size", [1, 3, 64, 10_000])
+def test_complete_document_in_chunks(size):
+    validator = _feed(DOCUMENT, size)
+    assert validator.complete and validator.error is None
+    assert validator.document() == DOCUMENT
+
+
+def test_preamble_code_fence_and_trailing_text_are_dropped():
+    validator = _feed("Claro! Segue o mapa:\n```xml\n" + DOCUMENT + "\n```\nEspero ter ajudado.")
+    assert validator.document() == DOCUMENT
+
+
+def test_bare_ampersand_is_escaped():
+    validator = _feed(DOCUMENT.replace("P&amp;D", "P&D"))
+    assert validator.complete
+    assert "P&D" in _texts(validator.document())
+
+
+def test_entity_split_between_chunks():
+    validator = OpmlStreamValidator()
+    cut = DOCUMENT.index("&amp;") + 2
+    assert validator.feed(DOCUMENT[:cut])
+    validator.feed(DOCUMENT[cut:])
+    assert validator.complete
+    assert validator.document() == DOCUMENT
+
+
+def test_wrong_root_raises():
+    with pytest.raises(OpmlError):
+        _feed('<?xml version="1.0"?>\n<html><body/></html>')
+
+
+def test_truncated_after_self_closing_elements():
+    validator = _feed('<opml><body><outline text="a"/><outline text="b"/><outline text="c')
+    assert validator.prefix().endswith('<outline text="b"/>')
+    assert validator.open_elements == ["opml", "body"]
+    assert _texts(validator.close_open()) == ["a", "b"]
+
+
+def test_truncated_after_nested_self_closing_element():
+    validator = _feed('<opml><body><outline text="r"><outline text="a"/><outline text="b"/><outline text="c')
+    assert validator.open_elements == ["opml", "body", "outline"]
+    assert _texts(validator.close_open()) == ["r", "a", "b"]
+
+
+def test_truncated_after_open_tag():
+    validator = _feed('<opml><body><outline text="r"><outline text="a">')
+    # A última tag é descartada: só o documento até ela é aproveitado
+    assert validator.prefix().endswith('<outline text="r">')
+    assert validator.open_elements == ["opml", "body", "outline"]
+    assert _texts(validator.close_open()) == ["r"]
+
+
+def test_truncated_after_close_tag():
+    validator = _feed('<opml><body><outline text="r"><outline text="a"></outline></outline><outl')
+    assert validator.open_elements == ["opml", "body", "outline"]
+    assert _texts(validator.close_open()) == ["r", "a"]
+
+
+@pytest.mark.parametrize("cut", range(40, len(DOCUMENT) - 1, 7))
+def test_close_open_is_well_formed_at_any_cut(cut):
+    validator = _feed(DOCUMENT[:cut])
+    if validator.open_elements:
+        ET.fromstring(validator.close_open().encode("utf-8"))
+
+
+def test_invalid_xml_stops_and_resume_returns_valid_prefix():
+    validator = _feed('<opml><body><outline text="a"/><outline text="b"></outlin></body></opml>')
+    assert validator.error is not None and not validator.complete
+    prefix = validator.resume()
+    assert prefix.endswith('<outline text="a"/>')
+    assert validator.error is None
+    validator.feed('<outline text="b"/></body></opml>')
+    assert validator.complete
+    assert _texts(validator.document()) == ["a", "b"]
+
+
+def test_merge_unites_branches_with_same_text():
+    first = '<opml version="2.0"><head><title>X</title></head><body><outline text="Raiz"><outline text="Tema"><outline text="a"/></outline></outline></body></opml>'
+    second = '<opml version="2.0"><head/><body><outline text="Outra raiz"><outline text="tema "><outline text="b"/></outline><outline text="Novo"/></outline></body></opml>'
+    merged = merge_opml([first, second])
+    root = ET.fromstring(merged.encode("utf-8"))
+    assert root.find("head/title").text == "X"
+    assert _texts(merged) == ["Raiz", "Tema", "a", "b", "Novo"]
+
+
+def test_merge_rejects_malformed_document():
+    with pytest.raises(OpmlError):
+        merge_opml([DOCUMENT, "<opml><body>"])
+
+
+def _engine_generator(respond):
+    generator = ScriptedGenerator(respond)
+
+    async def preprocess(texts):
+        return "\n".join(texts)
+
+    generator.preprocess_mindmap = preprocess
+    return generator
+
+
+def test_engine_continues_truncated_answer():
+    cut = DOCUMENT.index('<outline text="Conceito 2"/>') + 10
+
+    def respond(messages):
+        if len(messages) == 1:
+            return DOCUMENT[:cut]
+        written = messages[1]["content"]
+        # O modelo repete o fim do que já escreveu, dentro de um bloco de código
+        return "```xml\n" + written[-30:] + DOCUMENT[len(written):] + "\n```"
+
+    generator = _engine_generator(respond)
+    document = asyncio.run(MindmapEngine(generator, concurrency=1, max_continuations=2).build(["aula"]))
+    assert document == DOCUMENT
+    assert len(generator.calls) == 2
+
+
+def test_engine_accepts_restarted_document():
+    def respond(messages):
+        return DOCUMENT[:150] if len(messages) == 1 else "Desculpe, segue o documento:\n" + DOCUMENT
+
+    generator = _engine_generator(respond)
+    document = asyncio.run(MindmapEngine(generator, concurrency=1, max_continuations=2).build(["aula"]))
+    assert document == DOCUMENT
+
+
+def test_engine_restarts_when_only_declaration_arrived():
+    def respond(messages):
+        return DOCUMENT[:45] if len(generator.calls) == 1 else DOCUMENT
+
+    generator = _engine_generator(respond)
+    document = asyncio.run(MindmapEngine(generator, concurrency=1, max_continuations=2).build(["aula"]))
+    assert document == DOCUMENT
+    # Sem elementos abertos não há o que continuar: o documento é pedido de novo
+    assert [len(messages) for messages in generator.calls] == [1, 1]
+
+
+def test_engine_closes_document_after_max_continuations():
+    truncated = '<opml version="2.0"><body><outline text="r"><outline text="a"/><outline text="b"/><outline text="c'
+
+    def respond(messages):
+        return truncated if len(messages) == 1 else ""
+
+    generator = _engine_generator(respond)
+    document = asyncio.run(MindmapEngine(generator, concurrency=2, max_continuations=1).build(["aula 1", "aula 2"]))
+    # Os dois documentos fechados são OPML válidos e podem ser unidos
+    assert _texts(document) == ["r", "a", "b"]
+
+
+def test_engine_without_opml_raises():
+    generator = _engine_generator(lambda messages: "Não consigo gerar o mapa.")
+    with pytest.raises(OpmlError):
+        asyncio.run(MindmapEngine(generator, concurrency=1, max_continuations=1).build(["aula"]))
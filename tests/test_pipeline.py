@@ -0,0 +1,220 @@
+"""Testes do pipeline de geração: ordem das etapas, etapas puladas e cache."""
+
+import asyncio
+from typing import Dict, List, Mapping
+
+import pytest
+
+from generators import pipeline as pipeline_module
+from generators.pipeline import ContentPipeline, PipelineError, Stage
+from helpers import ScriptedGenerator
+from utils.response_cache import CacheMode, ResponseCache, cache_mode
+
+
+@pytest.fixture
+def cache(monkeypatch) -> ResponseCache:
+    cache = ResponseCache(None)
+    monkeypatch.setattr(pipeline_module, "get_response_cache", lambda: cache)
+    return cache
+
+
+def _generator() -> ScriptedGenerator:
+    return ScriptedGenerator(lambda messages: messages[-1]["content"])
+
+
+class Recorder:
+    """Etapas simuladas que registram o início e o fim de cada execução."""
+
+    def __init__(self) -> None:
+        self.events: List[str] = []
+        self.inputs: Dict[str, Mapping[str, str]] = {}
+
+    def stage(self, name: str, *depends_on: str, fail: bool = False, delay: float = 0.01, **kwargs) -> Stage:
+        async def run(generator, text: str, inputs: Mapping[str, str]) -> str:
+            self.events.append(f"início {name}")
+            self.inputs[name] = dict(inputs)
+            await asyncio.sleep(delay)
+            self.events.append(f"fim {name}")
+            if fail:
+                raise RuntimeError(f"{name} falhou")
+            return f"{name}({text})"
+
+        return Stage(name, run, depends_on=depends_on, **kwargs)
+
+
+@pytest.mark.parametrize(
+    "names",
+    [
+        [("a",), ("a",)],
+        [("a", "x")],
+        [("a", "b"), ("b", "a")],
+        [("a", "a")],
+    ],
+)
+def test_invalid_definitions(names):
+    recorder = Recorder()
+
+    with pytest.raises(PipelineError):
+        ContentPipeline([recorder.stage(*stage) for stage in names])
+
+
+def test_topological_order():
+    recorder = Recorder()
+
+    pipeline = ContentPipeline([
+        recorder.stage("d", "b", "c"),
+        recorder.stage("c", "a"),
+        recorder.stage("b", "a"),
+        recorder.stage("a"),
+    ])
+
+    assert pipeline.order == ["a", "c", "b", "d"]
+
+
+def test_selection_includes_dependencies():
+    recorder = Recorder()
+    pipeline = ContentPipeline([recorder.stage("a"), recorder.stage("b", "a"), recorder.stage("c")])
+
+    assert pipeline._selection(["b"]) == ["a", "b"]
+    assert pipeline._selection(None) == ["a", "c", "b"]
+    with pytest.raises(KeyError):
+        pipeline._selection(["x"])
+
+
+def test_independent_stages_run_in_parallel_and_dependents_wait(cache):
+    recorder = Recorder()
+    pipeline = ContentPipeline([
+        recorder.stage("resumo", delay=0.02),
+        recorder.stage("diagrama", delay=0.1),
+        recorder.stage("mapa", "resumo", delay=0.01),
+    ])
+
+    result = asyncio.run(pipeline.run(_generator(), "texto"))
+
+    assert result.ok
+    assert recorder.events.index("início diagrama") < recorder.events.index("fim resumo")
+    assert recorder.events.index("fim resumo") < recorder.events.index("início mapa")
+    # O mapa termina antes do diagrama: não espera etapas de que não depende
+    assert recorder.events.index("fim mapa") < recorder.events.index("fim diagrama")
+    assert recorder.inputs["mapa"] == {"resumo": "resumo(texto)"}
+    assert result["mapa"] == "mapa(texto)"
+    assert set(result.timings) == {"resumo", "diagrama", "mapa"}
+
+
+def test_only_requested_stages_run(cache):
+    recorder = Recorder()
+    pipeline = ContentPipeline([recorder.stage("a"), recorder.stage("b", "a"), recorder.stage("c")])
+
+    result = asyncio.run(pipeline.run(_generator(), "texto", ["b"]))
+
+    assert list(result.stages) == ["a", "b"]
+
+
+def test_failure_skips_dependents_only(cache):
+    recorder = Recorder()
+    pipeline = ContentPipeline([
+        recorder.stage("a", fail=True),
+        recorder.stage("b", "a"),
+        recorder.stage("c", "b"),
+        recorder.stage("d"),
+    ])
+
+    result = asyncio.run(pipeline.run(_generator(), "texto"))
+
+    assert not result.ok
+    assert result.stages["b"].skipped and result.stages["c"].skipped
+    assert result["d"] == "d(texto)"
+    assert list(result.errors) == ["a"]
+    assert "início b" not in recorder.events
+    with pytest.raises(RuntimeError):
+        result["a"]
+    with pytest.raises(KeyError):
+        result["b"]
+
+
+def test_cached_stage_is_not_run_again(cache):
+    recorder = Recorder()
+    pipeline = ContentPipeline([recorder.stage("a"), recorder.stage("b", "a")])
+    generator = _generator()
+
+    asyncio.run(pipeline.run(generator, "texto"))
+    result = asyncio.run(pipeline.run(generator, "texto"))
+
+    assert result.stages["a"].cached and result.stages["b"].cached
+    assert result["b"] == "b(texto)"
+    assert recorder.events.count("início a") == 1
+
+    asyncio.run(pipeline.run(generator, "outro texto"))
+    assert recorder.events.count("início a") == 2
+
+
+def test_prompt_change_invalidates_cache(cache, monkeypatch):
+    recorder = Recorder()
+    pipeline = ContentPipeline([recorder.stage("a", prompts=("summarize",))])
+    generator = _generator()
+
+    asyncio.run(pipeline.run(generator, "texto"))
+    monkeypatch.setattr(generator, "_load_prompt", lambda name: "prompt alterado")
+    result = asyncio.run(pipeline.run(generator, "texto"))
+
+    assert not result.stages["a"].cached
+    assert recorder.events.count("início a") == 2
+
+
+def test_failures_are_not_cached(cache):
+    recorder = Recorder()
+    pipeline = ContentPipeline([recorder.stage("a", fail=True)])
+
+    asyncio.run(pipeline.run(_generator(), "texto"))
+    asyncio.run(pipeline.run(_generator(), "texto"))
+
+    assert recorder.events.count("início a") == 2
+
+
+def test_refresh_runs_again_and_updates_cache(cache):
+    recorder = Recorder()
+    pipeline = ContentPipeline([recorder.stage("a")])
+    generator = _generator()
+    asyncio.run(pipeline.run(generator, "texto"))
+
+    with cache_mode(CacheMode.REFRESH):
+        refreshed = asyncio.run(pipeline.run(generator, "texto"))
+    reused = asyncio.run(pipeline.run(generator, "texto"))
+
+    assert not refreshed.stages["a"].cached and reused.stages["a"].cached
+    assert recorder.events.count("início a") == 2
+
+
+def test_bypass_neither_reads_nor_writes_cache(cache):
+    recorder = Recorder()
+    pipeline = ContentPipeline([recorder.stage("a")])
+    generator = _generator()
+
+    with cache_mode(CacheMode.BYPASS):
+        asyncio.run(pipeline.run(generator, "texto"))
+    first = asyncio.run(pipeline.run(generator, "texto"))
+    with cache_mode(CacheMode.BYPASS):
+        bypassed = asyncio.run(pipeline.run(generator, "texto"))
+
+    assert not first.stages["a"].cached and not bypassed.stages["a"].cached
+    assert recorder.events.count("início a") == 3
+
+
+def test_stage_without_cache_always_runs(cache):
+    recorder = Recorder()
+    pipeline = ContentPipeline([recorder.stage("a", cache=False)])
+
+    for _ in range(2):
+        asyncio.run(pipeline.run(_generator(), "texto"))
+
+    assert recorder.events.count("início a") == 2
+
+
+def test_default_pipeline_builds_mindmap_from_summary(cache):
+    generator = _generator()
+
+    result = asyncio.run(generator.run_pipeline("transcrição da aula"))
+
+    assert result.ok
+    assert "transcrição da aula" in result["summary"]
+    assert result["summary"] in result["mindmap"]
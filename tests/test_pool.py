@@ -0,0 +1,233 @@
+"""Testes do pool HTTP compartilhado entre event loops."""
+
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+import httpx
+import pytest
+
+from generators.adapta.io_loop import IoLoop
+from generators.adapta.pool import (
+    ClientRegistry,
+    Http2FallbackTransport,
+    IoLoopTransport,
+    PerHostLimitTransport,
+    PoolConfig,
+)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self) -> None:
+        super().setup()
+        self.server.connections += 1  # type: ignore[attr-defined]
+
+    def do_GET(self) -> None:
+        body = b"ok " * 1000
+        self.send_response(200)
+        self.send_header("content-length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.connections = 0  # type: ignore[attr-defined]
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _client(registry: ClientRegistry, io_loop: IoLoop):
+    return httpx.AsyncClient(transport=IoLoopTransport(registry._build_transport(), io_loop))
+
+
+def test_connection_reused_across_asyncio_run(server, io_loop):
+    """Reruns do Streamlit (um ``asyncio.run`` cada) reaproveitam a mesma conexão."""
+    registry = ClientRegistry(PoolConfig(http2=False))
+    client = _client(registry, io_loop)
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+
+    async def fetch() -> bytes:
+        response = await client.get(url)
+        return response.content
+
+    first = asyncio.run(fetch())
+    second = asyncio.run(fetch())
+
+    assert first == second == b"ok " * 1000
+    assert server.connections == 1
+    io_loop.run_sync(client.aclose(), timeout=5.0)
+
+
+def test_stream_read_across_loops(server, io_loop):
+    registry = ClientRegistry(PoolConfig(http2=False))
+    client = _client(registry, io_loop)
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+
+    async def stream() -> bytes:
+        async with client.stream("GET", url) as response:
+            return b"".join([chunk async for chunk in response.aiter_bytes()])
+
+    assert asyncio.run(stream()) == asyncio.run(stream()) == b"ok " * 1000
+    assert server.connections == 1
+    io_loop.run_sync(client.aclose(), timeout=5.0)
+
+
+def test_registry_returns_one_client_for_all_loops():
+    registry = ClientRegistry(PoolConfig(http2=False))
+
+    async def get():
+        return registry.get_client()
+
+    assert asyncio.run(get()) is asyncio.run(get())
+    assert registry.get_client() is registry.get_client()
+
+
+def test_registry_reopens_after_aclose(io_loop):
+    registry = ClientRegistry(PoolConfig(http2=False))
+    client = registry.get_client()
+    io_loop.run_sync(registry.aclose(), timeout=5.0)
+
+    assert client.is_closed
+    assert registry.get_client() is not client
+
+
+class Protocols:
+    """Transportes HTTP/2 e HTTP/1.1 simulados; o HTTP/2 falha para ``broken``."""
+
+    def __init__(self, broken: str = "quebrado.example", error: Optional[Exception] = None):
+        self.broken = broken
+        self.error = error or httpx.RemoteProtocolError("GOAWAY")
+        self.calls: List[str] = []
+        self.http2 = httpx.MockTransport(lambda request: self._handle("h2", request))
+        self.http1 = httpx.MockTransport(lambda request: self._handle("h1", request))
+
+    def _handle(self, protocol: str, request: httpx.Request) -> httpx.Response:
+        self.calls.append(f"{protocol} {request.url.host}")
+        if protocol == "h2" and request.url.host == self.broken:
+            raise self.error
+        return httpx.Response(200, text=protocol)
+
+
+def _get(transport: httpx.AsyncBaseTransport, *urls: str) -> List[str]:
+    async def run() -> List[str]:
+        results = []
+        async with httpx.AsyncClient(transport=transport) as client:
+            for url in urls:
+                try:
+                    results.append((await client.get(url)).text)
+                except httpx.TransportError as e:
+                    results.append(type(e).__name__)
+        return results
+
+    return asyncio.run(run())
+
+
+def test_protocol_error_falls_back_to_http1_and_stays():
+    protocols = Protocols()
+    transport = Http2FallbackTransport(protocols.http2, protocols.http1)
+
+    results = _get(transport, *["https://quebrado.example/"] * 3)
+
+    # O erro original é repassado; as requisições seguintes usam HTTP/1.1
+    assert results == ["RemoteProtocolError", "h1", "h1"]
+    assert protocols.calls == ["h2 quebrado.example", "h1 quebrado.example", "h1 quebrado.example"]
+
+
+def test_fallback_is_per_host():
+    protocols = Protocols()
+    transport = Http2FallbackTransport(protocols.http2, protocols.http1)
+
+    results = _get(transport, "https://quebrado.example/", "https://api.example/", "https://quebrado.example/")
+
+    assert results == ["RemoteProtocolError", "h2", "h1"]
+
+
+def test_other_errors_do_not_fall_back():
+    protocols = Protocols(error=httpx.ConnectError("recusada"))
+    transport = Http2FallbackTransport(protocols.http2, protocols.http1)
+
+    results = _get(transport, *["https://quebrado.example/"] * 2)
+
+    assert results == ["ConnectError", "ConnectError"]
+    assert all(call.startswith("h2") for call in protocols.calls)
+
+
+class SlowApi:
+    """API simulada que registra as requisições em andamento por host."""
+
+    def __init__(self, delay: float = 0.01):
+        self.delay = delay
+        self.in_flight: Dict[str, int] = {}
+        self.peak: Dict[str, int] = {}
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        self.in_flight[host] = self.in_flight.get(host, 0) + 1
+        self.peak[host] = max(self.peak.get(host, 0), self.in_flight[host])
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight[host] -= 1
+        if request.url.path == "/falha":
+            raise httpx.ReadError("conexão perdida")
+        return httpx.Response(200, text=host)
+
+
+def test_per_host_limit_bounds_requests_in_flight():
+    api = SlowApi()
+    transport = PerHostLimitTransport(httpx.MockTransport(api), max_per_host=2)
+
+    async def run() -> List[str]:
+        async with httpx.AsyncClient(transport=transport) as client:
+            urls = [f"https://{host}/" for host in ("a.example", "b.example") for _ in range(6)]
+            return [response.text for response in await asyncio.gather(*(client.get(url) for url in urls))]
+
+    results = asyncio.run(run())
+
+    assert sorted(results) == ["a.example"] * 6 + ["b.example"] * 6
+    # Hosts diferentes não disputam as mesmas vagas
+    assert api.peak == {"a.example": 2, "b.example": 2}
+
+
+def test_per_host_slot_is_held_until_the_body_is_closed():
+    transport = PerHostLimitTransport(httpx.MockTransport(SlowApi(delay=0)), max_per_host=1)
+
+    async def run() -> None:
+        async with httpx.AsyncClient(transport=transport) as client:
+            async with client.stream("GET", "https://a.example/"):
+                with pytest.raises(asyncio.TimeoutError):
+                    await asyncio.wait_for(client.get("https://a.example/"), 0.05)
+                assert (await client.get("https://b.example/")).text == "b.example"
+            assert (await client.get("https://a.example/")).text == "a.example"
+
+    asyncio.run(run())
+
+
+def test_per_host_slot_is_released_on_error():
+    transport = PerHostLimitTransport(httpx.MockTransport(SlowApi(delay=0)), max_per_host=1)
+
+    results = _get(transport, "https://a.example/falha", "https://a.example/falha", "https://a.example/")
+
+    assert results == ["ReadError", "ReadError", "a.example"]
+
+
+def test_transport_layers_follow_config():
+    registry = ClientRegistry(PoolConfig(http2=True, max_connections_per_host=8, http2_max_streams=4))
+
+    transport = registry._build_transport()
+
+    assert isinstance(transport, PerHostLimitTransport)
+    assert transport._max_per_host == 4
+    assert isinstance(transport._transport, Http2FallbackTransport)
+    assert not isinstance(ClientRegistry(PoolConfig(http2=False))._build_transport(), PerHostLimitTransport)
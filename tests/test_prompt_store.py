@@ -0,0 +1,145 @@
+"""Testes dos templates de prompt compilados e da validação dos seus campos."""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from generators.prompt_store import PromptError, PromptStore, PromptTemplate, minify
+
+SOURCE_DIR = Path(__file__).resolve().parents[1] / "src" / "prompts"
+
+
+@pytest.fixture(autouse=True)
+def _reload_immediately(monkeypatch):
+    from generators import prompt_store
+
+    monkeypatch.setattr(prompt_store.settings, "prompt_reload_interval", 0.0)
+    monkeypatch.setattr(prompt_store.settings, "prompt_minify", False)
+
+
+def _write(directory: Path, name: str, source: str) -> Path:
+    path = directory / f"{name}.txt"
+    path.write_text(source, encoding="utf-8")
+    return path
+
+
+def _template(source: str) -> PromptTemplate:
+    return PromptTemplate("t", Path("t.txt"), source, (0, 0))
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "Resuma:\n{text}\nFim",
+        "{text}",
+        "Sem campos",
+        "Chaves literais {{text}} e {text}",
+        "Parte {part} de {parts}: {text}",
+        "Formatado {part:>3}",
+    ],
+)
+def test_render_matches_str_format(source):
+    values = {"text": "conteúdo", "part": 2, "parts": 5}
+    assert _template(source).render(**values) == source.format(**values)
+
+
+def test_render_missing_value_raises_key_error():
+    with pytest.raises(KeyError):
+        _template("{text} {other}").render(text="x")
+
+
+def test_fields_and_occurrences():
+    template = _template("{text} e {text}, {{literal}}")
+    assert template.fields == {"text"}
+    assert template.occurrences("text") == 2
+
+
+def test_validation_reports_missing_unknown_and_repeated_fields(tmp_path):
+    _write(tmp_path, "summarize", "{texts}")
+    _write(tmp_path, "diagram", "{text} {text}")
+    store = PromptStore(tmp_path, {"summarize": {"text"}, "diagram": {"text"}, "mindmap": {"texts"}})
+
+    problems = "\n".join(store.problems)
+    assert "summarize.txt não usa {text}" in problems
+    assert "summarize.txt usa campos que os geradores não preenchem: {texts}" in problems
+    assert "diagram.txt usa {text} 2 vezes" in problems
+    assert "mindmap.txt não encontrado" in problems
+
+
+def test_invalid_unrelated_template_does_not_break_store(tmp_path):
+    _write(tmp_path, "summarize", "Resuma: {text}")
+    _write(tmp_path, "rascunho", "chave sem par {text")
+
+    store = PromptStore(tmp_path, {"summarize": {"text"}})
+
+    assert store.problems == []
+    assert store.render("summarize", text="aula") == "Resuma: aula"
+    with pytest.raises(PromptError, match="rascunho.txt"):
+        store.get("rascunho")
+
+
+def test_invalid_expected_template_is_isolated(tmp_path):
+    _write(tmp_path, "summarize", "Resuma: {text")
+    _write(tmp_path, "diagram", "Diagrama: {text}")
+
+    store = PromptStore(tmp_path, {"summarize": {"text"}, "diagram": {"text"}})
+
+    assert len(store.problems) == 1 and store.problems[0].startswith("summarize.txt inválido")
+    assert store.render("diagram", text="aula") == "Diagrama: aula"
+    with pytest.raises(PromptError):
+        store.render("summarize", text="aula")
+
+
+def test_templates_are_compiled_on_first_use(tmp_path):
+    _write(tmp_path, "summarize", "{text}")
+    _write(tmp_path, "outro", "{x}")
+
+    store = PromptStore(tmp_path, {"summarize": {"text"}})
+
+    assert set(store._templates) == {"summarize"}
+    store.get("outro")
+    assert set(store._templates) == {"summarize", "outro"}
+
+
+def test_changed_file_is_recompiled(tmp_path):
+    path = _write(tmp_path, "summarize", "v1 {text}")
+    store = PromptStore(tmp_path, {"summarize": {"text"}})
+    assert store.render("summarize", text="x") == "v1 x"
+
+    path.write_text("versão 2 {text}", encoding="utf-8")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert store.render("summarize", text="x") == "versão 2 x"
+
+
+def test_fixed_template_becomes_available(tmp_path):
+    path = _write(tmp_path, "summarize", "{text")
+    store = PromptStore(tmp_path, {"summarize": {"text"}})
+    with pytest.raises(PromptError):
+        store.get("summarize")
+
+    path.write_text("{text}", encoding="utf-8")
+
+    assert store.render("summarize", text="ok") == "ok"
+    assert store.problems == []
+
+
+def test_missing_file_raises_file_not_found(tmp_path):
+    store = PromptStore(tmp_path)
+    with pytest.raises(FileNotFoundError):
+        store.get("inexistente")
+
+
+def test_minify_xml_and_plain_text():
+    assert minify("<a>\n    <b>{text}</b>\n\n</a>\n") == "<a>\n<b>{text}</b>\n</a>"
+    assert minify("Linha 1   \n\n\n\nLinha 2\n") == "Linha 1\n\nLinha 2"
+
+
+def test_project_prompts_have_expected_fields():
+    from generators.base import BaseContentGenerator
+
+    store = PromptStore(SOURCE_DIR, BaseContentGenerator.PROMPT_FIELDS)
+
+    assert store.problems == []
@@ -0,0 +1,126 @@
+"""Testes do token bucket por credencial."""
+
+import asyncio
+from types import SimpleNamespace
+from typing import List
+
+import pytest
+
+from generators.adapta import ratelimit as ratelimit_module
+from generators.adapta.ratelimit import TokenBucket, get_rate_limiter
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(ratelimit_module, "time", SimpleNamespace(monotonic=clock))
+    return clock
+
+
+@pytest.fixture
+def sleeps(monkeypatch, clock) -> List[float]:
+    """Esperas pedidas pelo bucket, sem esperar de fato (o relógio fica parado)."""
+    recorded: List[float] = []
+
+    async def sleep(delay: float) -> None:
+        recorded.append(delay)
+
+    monkeypatch.setattr(ratelimit_module.asyncio, "sleep", sleep)
+    return recorded
+
+
+def test_starts_full_and_refills_up_to_burst(clock):
+    bucket = TokenBucket(rate=2.0, burst=3.0)
+
+    assert all(bucket.try_acquire() for _ in range(3))
+    assert not bucket.try_acquire()
+
+    clock.now += 0.5
+    assert bucket.available == pytest.approx(1.0)
+    clock.now += 100
+    assert bucket.available == pytest.approx(3.0)
+
+
+def test_wait_time(clock):
+    bucket = TokenBucket(rate=4.0, burst=1.0)
+    assert bucket.wait_time() == 0.0
+
+    bucket.try_acquire()
+
+    assert bucket.wait_time() == pytest.approx(0.25)
+    assert bucket.wait_time(2.0) == pytest.approx(0.5)
+
+
+def test_acquire_within_burst_does_not_wait(sleeps):
+    bucket = TokenBucket(rate=1.0, burst=2.0)
+
+    waits = [asyncio.run(bucket.acquire()) for _ in range(2)]
+
+    assert waits == [0.0, 0.0]
+    assert sleeps == []
+
+
+def test_reservations_are_served_in_order(sleeps):
+    bucket = TokenBucket(rate=2.0, burst=1.0)
+
+    async def run() -> List[float]:
+        return list(await asyncio.gather(*(bucket.acquire() for _ in range(4))))
+
+    waits = asyncio.run(run())
+
+    # Cada reserva espera o tempo para cobrir o saldo negativo acumulado
+    assert waits == pytest.approx([0.0, 0.5, 1.0, 1.5])
+
+
+def test_try_acquire_does_not_take_reserved_tokens(clock):
+    bucket = TokenBucket(rate=1.0, burst=1.0)
+
+    async def run() -> bool:
+        await bucket.acquire()
+        waiter = asyncio.ensure_future(bucket.acquire())
+        await asyncio.sleep(0)
+        clock.now += 0.5
+        # Meio token reposto ainda pertence à reserva em espera
+        acquired = bucket.try_acquire()
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        return acquired
+
+    assert not asyncio.run(run())
+
+
+def test_cancelled_wait_returns_reservation():
+    bucket = TokenBucket(rate=1.0, burst=1.0)
+
+    async def run() -> float:
+        await bucket.acquire()
+        waiter = asyncio.ensure_future(bucket.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        return bucket.available
+
+    # Sem a devolução o saldo ficaria em -1
+    assert asyncio.run(run()) > -0.5
+
+
+def test_rate_limiter_is_shared_per_credential_and_kind(monkeypatch):
+    monkeypatch.setattr(ratelimit_module, "_buckets", {})
+    monkeypatch.setattr(ratelimit_module.settings, "adapta_rate_api_per_second", 5.0)
+    monkeypatch.setattr(ratelimit_module.settings, "adapta_rate_clerk_per_second", None)
+
+    api = get_rate_limiter("conta-1", "api")
+
+    assert get_rate_limiter("conta-1", "api") is api
+    assert get_rate_limiter("conta-2", "api") is not api
+    assert api.rate == 5.0
+    assert get_rate_limiter("conta-1", "clerk") is None
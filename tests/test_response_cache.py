@@ -0,0 +1,89 @@
+"""Testes do cache de respostas e do seu uso em ``AdaptaClient.call_model``."""
+
+import asyncio
+from typing import List
+
+import pytest
+
+import generators.adapta.client as client_module
+from generators.adapta.client import AdaptaClient
+from generators.adapta.usage import CallResult
+from utils import response_cache as response_cache_module
+from utils.response_cache import PROJECT_ROOT, CacheMode, ResponseCache, cache_mode, resolve_cache_path
+
+MESSAGES = [{"role": "user", "content": "Resuma a aula"}]
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = ResponseCache(None)
+    monkeypatch.setattr(client_module, "get_response_cache", lambda: cache)
+    return cache
+
+
+def _client(monkeypatch, served: List[str]) -> AdaptaClient:
+    """Cliente cujas chamadas são respondidas pelos modelos em ``served``, em ordem."""
+    client = AdaptaClient(cookies_str="test=1", session_id="sess")
+
+    async def call(messages, model, new_line, searchType, tool, hedge):
+        return CallResult(text=f"resposta de {served[0]}", model=served.pop(0))
+
+    monkeypatch.setattr(client, "_call_model_uncoalesced", call)
+    return client
+
+
+def test_response_from_requested_model_is_cached(monkeypatch, cache):
+    client = _client(monkeypatch, ["GPT_5"])
+
+    first = asyncio.run(client.call_model(MESSAGES, model="GPT_5", cache=True))
+    second = asyncio.run(client.call_model(MESSAGES, model="GPT_5", cache=True, detailed=True))
+
+    assert first == "resposta de GPT_5"
+    assert second.cached and second.text == first
+
+
+def test_response_from_fallback_model_is_not_cached(monkeypatch, cache):
+    # Failover do circuito ou hedging respondem com outro modelo
+    client = _client(monkeypatch, ["CLAUDE_4", "GPT_5"])
+
+    first = asyncio.run(client.call_model(MESSAGES, model="GPT_5", cache=True))
+    second = asyncio.run(client.call_model(MESSAGES, model="GPT_5", cache=True))
+
+    assert first == "resposta de CLAUDE_4"
+    assert second == "resposta de GPT_5"
+    assert cache.stats()["memory_entries"] == 1
+
+
+def test_bypass_neither_reads_nor_writes(monkeypatch, cache):
+    client = _client(monkeypatch, ["GPT_5", "GPT_5"])
+
+    with cache_mode(CacheMode.BYPASS):
+        asyncio.run(client.call_model(MESSAGES, model="GPT_5", cache=True))
+
+    assert cache.stats()["memory_entries"] == 0
+
+
+def test_relative_path_is_anchored_to_project_root(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    assert resolve_cache_path("cache/responses.sqlite3") == PROJECT_ROOT / "cache" / "responses.sqlite3"
+    assert (PROJECT_ROOT / "pyproject.toml").exists()
+
+
+def test_absolute_and_empty_paths(tmp_path):
+    assert resolve_cache_path(str(tmp_path / "r.sqlite3")) == tmp_path / "r.sqlite3"
+    assert resolve_cache_path("") is None
+    assert resolve_cache_path(None) is None
+
+
+def test_get_response_cache_ignores_working_directory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(response_cache_module.settings, "response_cache_enabled", True)
+    monkeypatch.setattr(response_cache_module.settings, "response_cache_path", "cache/test-responses.sqlite3")
+    monkeypatch.setattr(response_cache_module, "_response_cache", None)
+    monkeypatch.setattr(response_cache_module, "PROJECT_ROOT", tmp_path / "projeto")
+
+    cache = response_cache_module.get_response_cache()
+
+    assert cache.path == tmp_path / "projeto" / "cache" / "test-responses.sqlite3"
+    assert not (tmp_path / "cache").exists()
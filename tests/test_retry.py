@@ -0,0 +1,182 @@
+"""Testes da política de retentativas."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from typing import List, Optional
+
+import httpx
+import pytest
+
+from generators.adapta import retry as retry_module
+from generators.adapta.retry import RetryAction, RetryPolicy, error_reason, parse_retry_after
+
+
+def _status_error(status: int, retry_after: Optional[str] = None) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "https://api.example/conversation")
+    headers = {"retry-after": retry_after} if retry_after is not None else {}
+    response = httpx.Response(status, request=request, headers=headers)
+    return httpx.HTTPStatusError(str(status), request=request, response=response)
+
+
+@pytest.fixture
+def sleeps(monkeypatch) -> List[float]:
+    """Esperas pedidas pela política, sem esperar de fato."""
+    recorded: List[float] = []
+
+    async def sleep(delay: float) -> None:
+        recorded.append(delay)
+
+    monkeypatch.setattr(retry_module.asyncio, "sleep", sleep)
+    return recorded
+
+
+def _operation(*outcomes):
+    """Operação que falha ou retorna conforme ``outcomes``, em ordem."""
+    calls: List[int] = []
+    remaining = list(outcomes)
+
+    async def operation():
+        calls.append(1)
+        outcome = remaining.pop(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+    return operation, calls
+
+
+@pytest.mark.parametrize(
+    "error, action",
+    [
+        (_status_error(401), RetryAction.REFRESH_SESSION),
+        (_status_error(408), RetryAction.RETRY),
+        (_status_error(429), RetryAction.RETRY),
+        (_status_error(500), RetryAction.RETRY),
+        (_status_error(503), RetryAction.RETRY),
+        (_status_error(400), RetryAction.FAIL),
+        (_status_error(403), RetryAction.FAIL),
+        (_status_error(404), RetryAction.FAIL),
+        (httpx.ReadTimeout("lento"), RetryAction.RETRY),
+        (httpx.ConnectError("recusada"), RetryAction.RETRY),
+        (ValueError("local"), RetryAction.FAIL),
+    ],
+)
+def test_classify(error, action):
+    assert RetryPolicy().classify(error) is action
+
+
+@pytest.mark.parametrize(
+    "error, reason",
+    [
+        (_status_error(503), "503"),
+        (httpx.ReadTimeout("lento"), "timeout"),
+        (httpx.ConnectError("recusada"), "transport"),
+        (ValueError("x"), "ValueError"),
+    ],
+)
+def test_error_reason(error, reason):
+    assert error_reason(error) == reason
+
+
+def test_delay_grows_exponentially_up_to_max():
+    policy = RetryPolicy(base_delay=1.0, multiplier=2.0, max_delay=5.0, jitter=0.0)
+
+    assert [policy.compute_delay(attempt) for attempt in range(1, 6)] == [1.0, 2.0, 4.0, 5.0, 5.0]
+
+
+def test_jitter_only_shortens_delay():
+    policy = RetryPolicy(base_delay=2.0, jitter=0.5)
+
+    delays = [policy.compute_delay(1) for _ in range(200)]
+
+    assert all(1.0 <= delay <= 2.0 for delay in delays)
+    assert len(set(delays)) > 1
+
+
+def test_retry_after_raises_delay():
+    policy = RetryPolicy(base_delay=0.1, jitter=0.0)
+
+    assert policy.compute_delay(1, _status_error(429, "7")) == 7.0
+    # Retry-After menor que o backoff não encurta a espera
+    assert policy.compute_delay(1, _status_error(429, "0")) == 0.1
+
+
+def test_parse_retry_after_formats():
+    future = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+
+    assert parse_retry_after(_status_error(429, "12").response) == 12.0
+    assert 25 <= parse_retry_after(_status_error(429, future).response) <= 30
+    assert parse_retry_after(_status_error(429, "soon").response) is None
+    assert parse_retry_after(_status_error(429).response) is None
+    assert parse_retry_after(None) is None
+
+
+def test_execute_retries_until_success(sleeps):
+    operation, calls = _operation(_status_error(503), httpx.ReadTimeout("lento"), "ok")
+    policy = RetryPolicy(max_attempts=3, base_delay=1.0, jitter=0.0)
+
+    assert asyncio.run(policy.execute(operation, label="GPT_5")) == "ok"
+    assert len(calls) == 3
+    assert sleeps == [1.0, 2.0]
+
+
+def test_execute_raises_last_error_after_max_attempts(sleeps):
+    operation, calls = _operation(_status_error(503), _status_error(502), _status_error(500))
+
+    with pytest.raises(httpx.HTTPStatusError) as info:
+        asyncio.run(RetryPolicy(max_attempts=3, jitter=0.0).execute(operation))
+
+    assert info.value.response.status_code == 500
+    assert len(calls) == 3
+
+
+def test_execute_fails_fast_on_client_error(sleeps):
+    operation, calls = _operation(_status_error(400))
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(RetryPolicy(max_attempts=5).execute(operation))
+
+    assert len(calls) == 1
+    assert sleeps == []
+
+
+def test_execute_refreshes_session_once_on_401(sleeps):
+    refreshes: List[int] = []
+    operation, calls = _operation(_status_error(401), "ok")
+
+    result = asyncio.run(RetryPolicy(max_attempts=1).execute(operation, refresh_session=lambda: refreshes.append(1)))
+
+    # A renovação não conta como tentativa nem espera
+    assert result == "ok"
+    assert refreshes == [1]
+    assert sleeps == []
+
+
+def test_execute_second_401_fails(sleeps):
+    operation, calls = _operation(_status_error(401), _status_error(401))
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(RetryPolicy(max_attempts=3).execute(operation, refresh_session=lambda: None))
+
+    assert len(calls) == 2
+
+
+def test_execute_401_without_refresh_fails(sleeps):
+    operation, calls = _operation(_status_error(401))
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(RetryPolicy(max_attempts=3).execute(operation))
+
+    assert len(calls) == 1
+
+
+def test_execute_stops_when_budget_exhausted(sleeps):
+    operation, calls = _operation(_status_error(503), "ok")
+    policy = RetryPolicy(max_attempts=5, base_delay=10.0, jitter=0.0, budget=1.0)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(policy.execute(operation))
+
+    assert len(calls) == 1
+    assert sleeps == []
@@ -0,0 +1,153 @@
+"""Testes do cache do JWT de sessão do Clerk."""
+
+import asyncio
+import base64
+import json
+import threading
+import time
+from typing import List, Optional
+
+import pytest
+
+from generators.adapta.session import SessionTokenCache, decode_jwt_exp
+
+
+def _jwt(payload: dict) -> str:
+    def encode(data: dict) -> str:
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).rstrip(b"=").decode()
+
+    return f"{encode({'alg': 'RS256'})}.{encode(payload)}.assinatura"
+
+
+@pytest.mark.parametrize(
+    "token, expected",
+    [
+        (_jwt({"exp": 1700000000}), 1700000000.0),
+        (_jwt({"exp": "1700000000"}), 1700000000.0),
+        (_jwt({"sub": "usuario"}), None),
+        (_jwt({"exp": "amanhã"}), None),
+        ("sem-pontos", None),
+        ("a.%%%.c", None),
+        ("a." + base64.urlsafe_b64encode(b"nao e json").decode() + ".c", None),
+        ("a." + base64.urlsafe_b64encode(b"[1, 2]").decode() + ".c", None),
+        ("", None),
+    ],
+)
+def test_decode_jwt_exp(token, expected):
+    assert decode_jwt_exp(token) == expected
+
+
+@pytest.mark.parametrize(
+    "expires_in, fresh",
+    [
+        (3600, True),
+        (11, True),
+        (9, False),  # Dentro da margem de renovação
+        (-60, False),  # Já expirado
+    ],
+)
+def test_freshness_respects_margin(expires_in, fresh, io_loop):
+    cache = SessionTokenCache(refresh_margin=10.0, io_loop=io_loop)
+    now = 1700000000.0
+
+    cache.set(_jwt({"exp": now + expires_in}))
+
+    assert cache.is_fresh(now) is fresh
+
+
+def test_token_without_exp_is_never_reused(io_loop):
+    cache = SessionTokenCache(io_loop=io_loop)
+
+    cache.set(_jwt({"sub": "usuario"}))
+
+    assert not cache.is_fresh()
+
+
+class Refresher:
+    """Renovação simulada que conta as chamadas e demora ``delay`` segundos."""
+
+    def __init__(self, delay: float = 0.05, expires_in: float = 3600):
+        self.delay = delay
+        self.expires_in = expires_in
+        self.calls = 0
+        self.loops: List[Optional[asyncio.AbstractEventLoop]] = []
+
+    async def __call__(self) -> str:
+        self.calls += 1
+        self.loops.append(asyncio.get_running_loop())
+        await asyncio.sleep(self.delay)
+        return _jwt({"exp": time.time() + self.expires_in, "n": self.calls})
+
+
+def test_fresh_token_skips_refresh(io_loop):
+    cache = SessionTokenCache(io_loop=io_loop)
+    refresh = Refresher()
+
+    first = asyncio.run(cache.get_or_refresh(refresh))
+    second = asyncio.run(cache.get_or_refresh(refresh))
+
+    assert first == second
+    assert refresh.calls == 1 and cache.hits == 1
+
+
+def test_concurrent_callers_share_one_refresh(io_loop):
+    cache = SessionTokenCache(io_loop=io_loop)
+    refresh = Refresher()
+
+    async def run() -> List[str]:
+        return list(await asyncio.gather(*(cache.get_or_refresh(refresh) for _ in range(5))))
+
+    tokens = asyncio.run(run())
+
+    assert len(set(tokens)) == 1
+    assert refresh.calls == 1
+    assert refresh.loops == [io_loop.loop]
+
+
+def test_callers_on_different_threads_share_one_refresh(io_loop):
+    cache = SessionTokenCache(io_loop=io_loop)
+    refresh = Refresher(delay=0.1)
+    start = threading.Barrier(4)
+    tokens: List[str] = []
+
+    def rerun() -> None:
+        # Cada sessão do Streamlit executa em seu próprio asyncio.run
+        start.wait(5.0)
+        tokens.append(asyncio.run(cache.get_or_refresh(refresh)))
+
+    threads = [threading.Thread(target=rerun) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5.0)
+
+    assert len(tokens) == 4 and len(set(tokens)) == 1
+    assert refresh.calls == 1
+
+
+def test_invalidate_forces_refresh(io_loop):
+    cache = SessionTokenCache(io_loop=io_loop)
+    refresh = Refresher()
+
+    first = asyncio.run(cache.get_or_refresh(refresh))
+    cache.invalidate()
+    second = asyncio.run(cache.get_or_refresh(refresh))
+
+    assert first != second
+    assert refresh.calls == 2
+
+
+def test_failed_refresh_is_not_cached(io_loop):
+    cache = SessionTokenCache(io_loop=io_loop)
+    calls = []
+
+    async def failing() -> str:
+        calls.append(1)
+        raise RuntimeError("touch falhou")
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            asyncio.run(cache.get_or_refresh(failing))
+
+    assert len(calls) == 2
+    assert cache.token is None
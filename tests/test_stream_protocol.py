@@ -0,0 +1,176 @@
+"""Testes do parser do stream de dados da API Adapta.one."""
+
+import asyncio
+import json
+from typing import List
+
+import httpx
+import pytest
+
+from generators.adapta import client as client_module
+from generators.adapta.stream_protocol import (
+    DataStreamParser,
+    EventKind,
+    StreamError,
+    StreamEvent,
+    aiter_events,
+    extract_text,
+    parse_stream,
+)
+from helpers import mock_client
+from utils.response_cache import ResponseCache
+
+USAGE = {"promptTokens": 10, "completionTokens": 2}
+
+STREAM = (
+    'f:{"messageId":"msg-123"}\n'
+    '0:"Olá"\n'
+    '0:", mundo\\n"\n'
+    '0:"P&D \\"citado\\" \\u00e9 ok"\n'
+    'g:"pensando"\n'
+    f'e:{json.dumps({"finishReason": "stop", "usage": USAGE})}\n'
+    f'd:{json.dumps({"finishReason": "stop", "usage": USAGE})}\n'
+)
+TEXT = 'Olá, mundo\nP&D "citado" é ok'
+
+
+def _feed(text: str, size: int) -> List[StreamEvent]:
+    parser = DataStreamParser()
+    events: List[StreamEvent] = []
+    for start in range(0, len(text), size):
+        events.extend(parser.feed(text[start:start + size]))
+    events.extend(parser.close())
+    return events
+
+
+def test_parse_complete_stream():
+    events = list(parse_stream(STREAM))
+
+    assert [event.kind for event in events] == [
+        EventKind.START,
+        EventKind.TEXT,
+        EventKind.REASONING,
+        EventKind.STEP_FINISH,
+        EventKind.FINISH,
+        EventKind.USAGE,
+    ]
+    assert extract_text(events) == TEXT
+    assert events[0].value == {"messageId": "msg-123"}
+    assert events[-1].value == USAGE
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 16, 64, len(STREAM)])
+def test_chunked_feed_matches_complete_parse(size):
+    events = _feed(STREAM, size)
+
+    assert extract_text(events) == TEXT
+    assert [event.kind for event in events if event.kind is not EventKind.TEXT] == [
+        event.kind for event in parse_stream(STREAM) if event.kind is not EventKind.TEXT
+    ]
+
+
+def test_text_run_is_merged_into_one_event():
+    parser = DataStreamParser()
+
+    events = parser.feed('0:"a"\n0:"b"\n0:"c"\n')
+
+    assert events == [StreamEvent(EventKind.TEXT, "abc", "0")]
+    assert parser.frames == 3
+
+
+def test_last_frame_without_newline_is_parsed_on_close():
+    parser = DataStreamParser()
+
+    assert parser.feed('0:"fim"') == []
+    assert parser.close() == [StreamEvent(EventKind.TEXT, "fim", "0")]
+
+
+def test_crlf_line_endings():
+    events = list(parse_stream('0:"a"\r\n0:"b"\r\nd:{"finishReason":"stop"}\r\n'))
+
+    assert extract_text(events) == "ab"
+    assert events[-1].kind is EventKind.FINISH
+
+
+def test_malformed_lines_are_skipped_and_counted():
+    parser = DataStreamParser()
+
+    events = parser.feed('0:"a"\nlixo sem frame\n0:"b" extra\n0:"c"\n')
+
+    assert extract_text(events) == "ac"
+    assert parser.malformed == 2
+
+
+def test_non_string_text_payload_falls_back_to_frames():
+    events = list(parse_stream('0:"a"\n0:{"x":1}\n0:"b"\n'))
+
+    assert [(event.kind, event.value) for event in events] == [
+        (EventKind.TEXT, "a"),
+        (EventKind.TEXT, {"x": 1}),
+        (EventKind.TEXT, "b"),
+    ]
+
+
+def test_error_and_unknown_frames():
+    events = list(parse_stream('3:"limite excedido"\n9:{"a":1}\n'))
+
+    assert events == [
+        StreamEvent(EventKind.ERROR, "limite excedido", "3"),
+        StreamEvent(EventKind.OTHER, {"a": 1}, "9"),
+    ]
+
+
+def test_finish_without_usage_has_no_usage_event():
+    events = list(parse_stream('d:{"finishReason":"length"}\n'))
+
+    assert [event.kind for event in events] == [EventKind.FINISH]
+
+
+def test_extract_text_without_new_lines():
+    assert extract_text(parse_stream('0:"a\\nb"\n'), new_line=False) == "a b"
+
+
+def test_aiter_events():
+    async def chunks():
+        for start in range(0, len(STREAM), 5):
+            yield STREAM[start:start + 5]
+
+    async def collect() -> List[StreamEvent]:
+        return [event async for event in aiter_events(chunks())]
+
+    assert extract_text(asyncio.run(collect())) == TEXT
+
+
+ERROR_STREAM = '0:"Resposta "\n0:"cortada"\n3:"limite excedido"\n'
+MESSAGES = [{"role": "user", "content": "Olá"}]
+
+
+@pytest.fixture
+def error_client(monkeypatch):
+    cache = ResponseCache(None)
+    monkeypatch.setattr(client_module, "get_response_cache", lambda: cache)
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, text=ERROR_STREAM)
+
+    return mock_client(monkeypatch, handler), cache
+
+
+def test_buffered_error_frame_is_not_an_answer(error_client):
+    client, cache = error_client
+
+    assert asyncio.run(client.call_model(MESSAGES, model="MODELO-ERRO", cache=True)) is None
+    with pytest.raises(StreamError, match="limite excedido"):
+        asyncio.run(client.call_model(MESSAGES, model="MODELO-ERRO", cache=True, raise_errors=True))
+    # O texto parcial anterior ao erro não vai para o cache
+    assert cache.stats()["memory_entries"] == 0
+
+
+def test_streamed_error_frame_raises(error_client):
+    client, _ = error_client
+
+    async def collect() -> List[str]:
+        return [chunk async for chunk in client.call_model_stream(MESSAGES, model="MODELO-ERRO")]
+
+    with pytest.raises(StreamError, match="limite excedido"):
+        asyncio.run(collect())
@@ -0,0 +1,87 @@
+"""Testes da remoção de blocos <thinking> em texto completo e em stream."""
+
+import asyncio
+import random
+from typing import List
+
+import pytest
+
+from utils.text_cleaner import ThinkTagStreamFilter, remove_think_tags, remove_think_tags_stream
+
+CASES = [
+    "",
+    "   ",
+    "Resposta simples.",
+    "  \n Resposta com espaços  \n",
+    "<thinking>raciocínio</thinking>Resposta",
+    "<thinking>\nvárias\nlinhas\n</thinking>\n\nResposta\n",
+    "Antes <thinking>meio</thinking> depois",
+    "a<thinking>1</thinking>b<thinking>2</thinking>c",
+    "<thinking>só raciocínio</thinking>",
+    "Texto <thinking>sem fechamento",
+    "<thinking>a<thinking>b</thinking>c</thinking>d",
+    "a < b e <think> não é a tag",
+    "Fim com tag parcial <thinki",
+    "<thinking>x</thinking",
+    "Fecha sem abrir</thinking> texto",
+]
+
+
+def _stream(chunks: List[str]) -> str:
+    think_filter = ThinkTagStreamFilter()
+    return "".join(think_filter.feed(chunk) for chunk in chunks) + think_filter.flush()
+
+
+@pytest.mark.parametrize("text", CASES)
+def test_single_chunk_matches_remove_think_tags(text):
+    assert _stream([text]) == remove_think_tags(text)
+
+
+@pytest.mark.parametrize("text", CASES)
+def test_every_split_point_matches_remove_think_tags(text):
+    expected = remove_think_tags(text)
+    for cut in range(len(text) + 1):
+        assert _stream([text[:cut], text[cut:]]) == expected, cut
+
+
+@pytest.mark.parametrize("text", CASES)
+def test_char_by_char_matches_remove_think_tags(text):
+    assert _stream(list(text)) == remove_think_tags(text)
+
+
+def test_random_chunkings_match_remove_think_tags():
+    rng = random.Random(4)
+    pieces = ["Olá", " ", "\n", "<thinking>", "</thinking>", "pensando", "<", ">", "resposta", "<thin"]
+    for _ in range(300):
+        text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 14)))
+        chunks, position = [], 0
+        while position < len(text):
+            size = rng.randint(1, 12)
+            chunks.append(text[position:position + size])
+            position += size
+        assert _stream(chunks) == remove_think_tags(text), (text, chunks)
+
+
+def test_text_is_emitted_as_soon_as_it_is_safe():
+    think_filter = ThinkTagStreamFilter()
+
+    assert think_filter.feed("  Olá, ") == "Olá,"
+    assert think_filter.feed("mundo <thi") == " mundo"
+    assert think_filter.feed("nking>oculto") == ""
+    # Como em remove_think_tags, o espaço antes do bloco é mantido
+    assert think_filter.feed("</thinking> fim") == "  fim"
+    assert think_filter.flush() == ""
+
+
+def test_remove_think_tags_stream():
+    async def chunks():
+        for chunk in ["<think", "ing>x</thi", "nking>\n", "Resposta", " final\n"]:
+            yield chunk
+
+    async def collect() -> List[str]:
+        return [chunk async for chunk in remove_think_tags_stream(chunks())]
+
+    result = asyncio.run(collect())
+
+    assert "".join(result) == "Resposta final"
+    assert "" not in result
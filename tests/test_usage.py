@@ -0,0 +1,194 @@
+"""Testes da contabilização de tokens e do motivo de término (``usage``)."""
+
+import asyncio
+import json
+from typing import List
+
+import httpx
+import pytest
+
+from generators.adapta import breaker as breaker_module
+from generators.adapta import limiter as limiter_module
+from generators.adapta.stream_protocol import parse_stream
+from generators.adapta.usage import CallResult, UsageAccumulator
+from helpers import mock_client
+from utils.metrics import metrics
+
+MESSAGES = [{"role": "user", "content": "Resuma a aula"}]
+
+
+def _frame(kind: str, value) -> str:
+    return f"{kind}:{json.dumps(value)}\n"
+
+
+def _step(reason: str, prompt, completion) -> str:
+    return _frame("e", {"finishReason": reason, "usage": {"promptTokens": prompt, "completionTokens": completion}})
+
+
+def _finish(reason: str, prompt, completion) -> str:
+    return _frame("d", {"finishReason": reason, "usage": {"promptTokens": prompt, "completionTokens": completion}})
+
+
+def _accumulate(text: str) -> UsageAccumulator:
+    usage = UsageAccumulator()
+    for event in parse_stream(text):
+        usage.add(event)
+    return usage
+
+
+def test_message_usage_takes_precedence_over_steps():
+    usage = _accumulate(
+        _frame("0", "a") + _step("tool-calls", 10, 5) + _step("stop", 12, 7) + _finish("stop", 30, 15)
+    )
+
+    assert usage.usage() == {"prompt_tokens": 30, "completion_tokens": 15}
+    assert usage.finish_reason == "stop"
+
+
+def test_steps_are_summed_without_message_usage():
+    usage = _accumulate(_step("tool-calls", 10, 5) + _step("stop", 12, 7) + _frame("d", {"finishReason": "stop"}))
+
+    assert usage.usage() == {"prompt_tokens": 22, "completion_tokens": 12}
+
+
+def test_last_finish_reason_wins():
+    usage = _accumulate(_step("tool-calls", 1, 1) + _finish("length", 1, 1))
+
+    assert usage.finish_reason == "length"
+
+
+@pytest.mark.parametrize("value", [None, "NaN", "dez", True])
+def test_invalid_token_counts_are_unknown(value):
+    if value == "NaN":
+        text = 'd:{"finishReason":"stop","usage":{"promptTokens":NaN,"completionTokens":NaN}}\n'
+    else:
+        text = _finish("stop", value, value)
+
+    usage = _accumulate(text)
+
+    assert usage.usage() == {"prompt_tokens": None, "completion_tokens": None}
+
+
+def test_invalid_step_counts_are_skipped():
+    usage = _accumulate(_step("tool-calls", None, 5) + _step("stop", 4, float("inf")))
+
+    assert usage.usage() == {"prompt_tokens": 4, "completion_tokens": 5}
+
+
+def test_missing_metadata():
+    usage = _accumulate(_frame("0", "só texto"))
+
+    assert usage.finish_reason is None
+    assert usage.usage() == {"prompt_tokens": None, "completion_tokens": None}
+
+
+def test_record_publishes_metrics():
+    usage = _accumulate(_finish("stop", 30, 15))
+
+    usage.record("USO-REGISTRO", request_bytes=100, response_bytes=250)
+
+    assert metrics.get("adapta_prompt_tokens_total", model="USO-REGISTRO") == 30
+    assert metrics.get("adapta_completion_tokens_total", model="USO-REGISTRO") == 15
+    assert metrics.get("adapta_finish_reasons_total", model="USO-REGISTRO", reason="stop") == 1
+    assert metrics.get("adapta_truncated_responses_total", model="USO-REGISTRO") == 0
+    assert metrics.get("adapta_request_bytes_total", model="USO-REGISTRO") == 100
+    assert metrics.get("adapta_response_bytes_total", model="USO-REGISTRO") == 250
+
+
+@pytest.mark.parametrize("reason", ["length", "max_tokens"])
+def test_truncation_is_counted(reason):
+    model = f"USO-CORTE-{reason}"
+
+    _accumulate(_finish(reason, 10, 4096)).record(model)
+
+    assert metrics.get("adapta_truncated_responses_total", model=model) == 1
+    assert metrics.get("adapta_finish_reasons_total", model=model, reason=reason) == 1
+
+
+def test_unknown_reason_and_missing_tokens_are_not_counted():
+    UsageAccumulator().record("USO-VAZIO")
+
+    assert metrics.get("adapta_finish_reasons_total", model="USO-VAZIO", reason="unknown") == 1
+    assert metrics.get("adapta_prompt_tokens_total", model="USO-VAZIO") == 0
+    assert metrics.get_histogram("adapta_completion_tokens", model="USO-VAZIO") == {}
+
+
+@pytest.mark.parametrize(
+    "prompt, completion, total",
+    [(10, 5, 15), (None, 5, 5), (10, None, 10), (None, None, None)],
+)
+def test_call_result_total_tokens(prompt, completion, total):
+    result = CallResult(text="t", model="m", prompt_tokens=prompt, completion_tokens=completion)
+
+    assert result.total_tokens == total
+
+
+class _Body(httpx.AsyncByteStream):
+    def __init__(self, text: str):
+        self.text = text
+
+    async def __aiter__(self):
+        yield self.text.encode()
+
+
+class FakeApi:
+    """API simulada que responde ``body`` a todas as requisições."""
+
+    def __init__(self) -> None:
+        self.body = ""
+        self.requests: List[httpx.Request] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        return httpx.Response(200, stream=_Body(self.body))
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+@pytest.fixture
+def api(monkeypatch) -> FakeApi:
+    monkeypatch.setattr(limiter_module, "_limiters", {})
+    monkeypatch.setattr(breaker_module, "_breakers", {})
+    api = FakeApi()
+    api.client = mock_client(monkeypatch, api)
+    return api
+
+
+def test_buffered_call_returns_detailed_result(api):
+    api.body = _frame("0", "Resumo ") + _frame("0", "cortado") + _finish("length", 120, 4096)
+
+    result = asyncio.run(api.client.call_model(MESSAGES, model="USO-BUFFER", detailed=True))
+
+    assert result.text == "Resumo cortado" and result.model == "USO-BUFFER"
+    assert result.finish_reason == "length" and result.truncated
+    assert (result.prompt_tokens, result.completion_tokens, result.total_tokens) == (120, 4096, 4216)
+    assert result.request_bytes == len(api.requests[0].content)
+    assert result.response_bytes == len(api.body.encode())
+    assert result.upstream_seconds is not None and result.duration_seconds >= 0
+    assert not result.cached
+    assert metrics.get("adapta_truncated_responses_total", model="USO-BUFFER") == 1
+
+
+def test_buffered_call_without_detailed_returns_text(api):
+    api.body = _frame("0", "texto") + _finish("stop", 1, 1)
+
+    assert asyncio.run(api.client.call_model(MESSAGES, model="USO-TEXTO")) == "texto"
+
+
+def test_stream_publishes_usage(api):
+    api.body = _frame("0", "parte") + _step("stop", 3, 2) + _frame("d", {"finishReason": "length"})
+
+    async def collect() -> List[str]:
+        return [chunk async for chunk in api.client.call_model_stream(MESSAGES, model="USO-STREAM")]
+
+    assert asyncio.run(collect()) == ["parte"]
+    assert metrics.get("adapta_prompt_tokens_total", model="USO-STREAM") == 3
+    assert metrics.get("adapta_completion_tokens_total", model="USO-STREAM") == 2
+    assert metrics.get("adapta_truncated_responses_total", model="USO-STREAM") == 1
+    assert metrics.get("adapta_response_bytes_total", model="USO-STREAM") == len(api.body.encode())
+    assert metrics.get("adapta_request_bytes_total", model="USO-STREAM") == len(api.requests[0].content)